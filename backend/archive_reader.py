@@ -0,0 +1,134 @@
+"""Read regular-file members out of zip and tar archives."""
+
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional
+
+from backend.blocking_io import run_blocking
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Chunk size used when streaming a member out of an archive
+MEMBER_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ArchiveMember:
+    """
+    A regular file inside an archive.
+    
+    Duck-type compatible with the upload validators (filename, content_type).
+    """
+    name: str
+    size: int
+    content_type: Optional[str] = None
+    
+    @property
+    def filename(self) -> str:
+        """Base name of the member, without its directory inside the archive."""
+        return Path(self.name).name
+
+
+def is_archive_filename(filename: str) -> bool:
+    """
+    Check whether a filename has a supported archive extension.
+    
+    Args:
+        filename: Filename to check
+    
+    Returns:
+        True for zip and (optionally compressed) tar names
+    """
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def list_members(archive_path: Path) -> List[ArchiveMember]:
+    """
+    List the regular files in an archive.
+    
+    Directories, links and hidden or resource-fork entries (names starting
+    with "." or "__MACOSX/") are skipped.
+    
+    Args:
+        archive_path: Path of a zip or tar file
+    
+    Returns:
+        Members in archive order
+    
+    Raises:
+        ValueError: If the file is not a readable zip or tar archive
+    """
+    try:
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                members = [
+                    ArchiveMember(info.filename, info.file_size)
+                    for info in archive.infolist() if not info.is_dir()
+                ]
+        else:
+            with tarfile.open(archive_path, 'r:*') as archive:
+                members = [ArchiveMember(info.name, info.size) for info in archive.getmembers() if info.isreg()]
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as e:
+        raise ValueError(f"Unreadable archive: {e}") from e
+    
+    return [
+        member for member in members
+        if not member.filename.startswith('.') and not member.name.startswith('__MACOSX/')
+    ]
+
+
+def iter_member(archive_path: Path, member_name: str, chunk_size: int = MEMBER_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read one member's content in chunks through its own archive handle.
+    
+    Each call opens the archive separately, so several members can be read
+    concurrently from different threads.
+    
+    Args:
+        archive_path: Path of a zip or tar file
+        member_name: Member name as returned by list_members
+        chunk_size: Bytes per chunk
+    
+    Yields:
+        Member content
+    
+    Raises:
+        ValueError: If the archive or member cannot be read
+    """
+    try:
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive, archive.open(member_name) as member:
+                yield from iter(lambda: member.read(chunk_size), b'')
+        else:
+            with tarfile.open(archive_path, 'r:*') as archive:
+                member = archive.extractfile(member_name)
+                if member is None:
+                    raise ValueError(f"Not a regular file: {member_name}")
+                with member:
+                    yield from iter(lambda: member.read(chunk_size), b'')
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, KeyError, OSError) as e:
+        raise ValueError(f"Unreadable archive member {member_name}: {e}") from e
+
+
+async def aiter_member(archive_path: Path, member_name: str) -> AsyncIterator[bytes]:
+    """
+    Async variant of iter_member; reads and decompression run in the blocking I/O pool.
+    
+    Args:
+        archive_path: Path of a zip or tar file
+        member_name: Member name as returned by list_members
+    
+    Yields:
+        Member content
+    """
+    chunks = iter_member(archive_path, member_name)
+    try:
+        while True:
+            chunk = await run_blocking(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        await run_blocking(chunks.close)
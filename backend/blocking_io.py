@@ -0,0 +1,78 @@
+"""Bounded thread pool for blocking filesystem and parsing work."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.request_profiler import bind_worker
+
+T = TypeVar('T')
+
+DEFAULT_MAX_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers = DEFAULT_MAX_WORKERS
+
+
+def set_max_workers(max_workers: int) -> None:
+    """
+    Set the size of the blocking I/O pool.
+    
+    Takes effect for work submitted afterwards; an existing pool finishes
+    its queued work in the background.
+    
+    Args:
+        max_workers: Maximum number of worker threads
+    """
+    global _executor, _max_workers
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    _max_workers = max_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix='blocking-io')
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable in the bounded pool without blocking the event loop.
+    
+    When the calling request is being profiled, the call's samples are
+    attributed to it.
+    
+    Args:
+        func: Callable doing filesystem or CPU-heavy work
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+    
+    Returns:
+        Whatever func returns (exceptions propagate unchanged)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), bind_worker(functools.partial(func, *args, **kwargs)))
+
+
+def open_async(path, mode: str = 'rb'):
+    """
+    Open a file for async reads and writes with aiofiles.
+    
+    aiofiles is imported on the first call rather than at module level, so
+    starting the server does not pay for loading it; only uploads use it.
+    
+    Args:
+        path: Path of the file
+        mode: File mode, as for open()
+    
+    Returns:
+        aiofiles context manager yielding the open file
+    """
+    import aiofiles
+    return aiofiles.open(path, mode)
@@ -0,0 +1,92 @@
+"""Content negotiation and compression for cue payloads."""
+
+import gzip
+from typing import Dict, Optional
+
+import brotli
+
+# Media type of CueTable.to_binary payloads
+CUE_BINARY_MEDIA_TYPE = "application/vnd.wsync.cues"
+
+# Payloads are compressed once and cached, so favour ratio over speed
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Content codings this server can produce, most preferred first
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+
+def _parse_qvalues(header: Optional[str]) -> Dict[str, float]:
+    """Parse a comma-separated header into {lowercased token: q-value}."""
+    values: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        token, _, params = item.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        values[token] = max(q, values.get(token, 0.0))
+    return values
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Choose a content coding from an Accept-Encoding header.
+    
+    Args:
+        accept_encoding: Request Accept-Encoding header (may be None)
+    
+    Returns:
+        "br", "gzip" or "identity"
+    """
+    qvalues = _parse_qvalues(accept_encoding)
+    wildcard = qvalues.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = qvalues.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def accepts_binary_cues(accept: Optional[str]) -> bool:
+    """
+    Check whether the client explicitly asked for the binary cue format.
+    
+    Wildcards do not count, so JSON stays the default for browsers and tools.
+    
+    Args:
+        accept: Request Accept header (may be None)
+    
+    Returns:
+        True if CUE_BINARY_MEDIA_TYPE is listed with a non-zero q-value
+        at least as high as application/json
+    """
+    qvalues = _parse_qvalues(accept)
+    binary_q = qvalues.get(CUE_BINARY_MEDIA_TYPE, 0.0)
+    return binary_q > 0 and binary_q >= qvalues.get("application/json", 0.0)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Apply a content coding.
+    
+    Args:
+        data: Uncompressed payload
+        encoding: Coding returned by negotiate_encoding
+    
+    Returns:
+        Encoded payload
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return data
@@ -0,0 +1,187 @@
+"""Time-interval index over subtitle cues for point and range queries."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+from backend.cue_table import CueTable, CueView
+
+
+class CueIndex:
+    """
+    Interval index over a table of subtitle cues.
+    
+    Cues are sorted by start time (ties keep file order). A segment tree
+    holding the maximum end time of each range of that order lets queries
+    skip every range that finished before the requested time, so overlapping
+    and arbitrarily long cues are handled correctly. Queries cost
+    O(log n + k) for k matching cues.
+    """
+    
+    def __init__(self, cues: Sequence):
+        """
+        Build the index.
+        
+        Args:
+            cues: CueTable, or any sequence of SubtitleCue-like objects
+        """
+        table = cues if isinstance(cues, CueTable) else CueTable.from_cues(cues)
+        starts = table.starts
+        ends = table.ends
+        order = sorted(range(len(table)), key=starts.__getitem__)
+        
+        self.table = table
+        self.order = array('l', order)
+        self.starts = array('d', [starts[row] for row in order])
+        
+        # Implicit binary tree: leaves hold cue end times, parents the max of their children
+        size = 1
+        while size < len(order):
+            size *= 2
+        tree = array('d', [float('-inf')]) * (2 * size)
+        for position, row in enumerate(order):
+            tree[size + position] = ends[row]
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._size = size
+        self._tree = tree
+    
+    def __len__(self) -> int:
+        return len(self.order)
+    
+    def rows_at(self, time: float) -> List[int]:
+        """
+        Get table rows of cues active at a point in time.
+        
+        Uses the same rule as SubtitleCue.is_active: start <= time < end.
+        
+        Args:
+            time: Playback time in seconds
+        
+        Returns:
+            Table row numbers ordered by cue start time
+        """
+        return self._overlapping(bisect_right(self.starts, time), time)
+    
+    def rows_in_window(self, start: float, end: float) -> List[int]:
+        """
+        Get table rows of cues overlapping the half-open window [start, end).
+        
+        Args:
+            start: Window start in seconds
+            end: Window end in seconds
+        
+        Returns:
+            Table row numbers ordered by cue start time
+        """
+        if end <= start:
+            return []
+        return self._overlapping(bisect_left(self.starts, end), start)
+    
+    def at(self, time: float) -> List[CueView]:
+        """
+        Get cues active at a point in time.
+        
+        Args:
+            time: Playback time in seconds
+        
+        Returns:
+            Active cues ordered by start time
+        """
+        return [self.table[row] for row in self.rows_at(time)]
+    
+    def window(self, start: float, end: float) -> List[CueView]:
+        """
+        Get cues overlapping the half-open window [start, end).
+        
+        Args:
+            start: Window start in seconds
+            end: Window end in seconds
+        
+        Returns:
+            Overlapping cues ordered by start time
+        """
+        return [self.table[row] for row in self.rows_in_window(start, end)]
+    
+    def next_start(self, time: float) -> Optional[float]:
+        """
+        Get the start time of the first cue beginning after a point in time.
+        
+        Args:
+            time: Playback time in seconds
+        
+        Returns:
+            Start time in seconds, or None if no cue starts later
+        """
+        position = bisect_right(self.starts, time)
+        if position < len(self.starts):
+            return self.starts[position]
+        return None
+    
+    def page_after(self, after: Optional[float], limit: int) -> Tuple[List[int], Optional[float]]:
+        """
+        Get one page of cues in start order, for cursor pagination.
+        
+        The cursor is a start time: a page holds cues starting strictly
+        after it. Cues sharing the last start time are never split across
+        pages, so a page may exceed `limit` by the number of such ties.
+        
+        Args:
+            after: Cursor from the previous page (None for the first page)
+            limit: Number of cues per page
+        
+        Returns:
+            Tuple of (table rows ordered by start time, cursor for the next
+            page or None if this is the last page)
+        """
+        starts = self.starts
+        first = 0 if after is None else bisect_right(starts, after)
+        stop = min(first + limit, len(starts))
+        if first < stop < len(starts):
+            stop = bisect_right(starts, starts[stop - 1], stop)
+        
+        rows = list(self.order[first:stop])
+        cursor = starts[stop - 1] if first < stop < len(starts) else None
+        return rows, cursor
+    
+    def estimated_size(self) -> int:
+        """Estimate memory held by the index structures in bytes."""
+        return (
+            self.order.itemsize * len(self.order)
+            + self.starts.itemsize * len(self.starts)
+            + self._tree.itemsize * len(self._tree)
+        )
+    
+    def _overlapping(self, limit: int, threshold: float) -> List[int]:
+        """
+        Collect rows among the first `limit` (by start) whose end is after `threshold`.
+        
+        Args:
+            limit: Number of leading cues in start order to consider
+            threshold: Cues must end strictly after this time
+        
+        Returns:
+            Table row numbers ordered by cue start time
+        """
+        result: List[int] = []
+        if limit <= 0:
+            return result
+        
+        tree = self._tree
+        size = self._size
+        order = self.order
+        # (node, first leaf position, one past last leaf position)
+        stack = [(1, 0, size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or tree[node] <= threshold:
+                continue
+            if node >= size:
+                result.append(order[node - size])
+                continue
+            middle = (low + high) // 2
+            # Push right child first so cues come out in ascending order
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+        
+        return result
@@ -0,0 +1,272 @@
+"""Compact columnar storage for parsed subtitle cues."""
+
+import struct
+import sys
+from array import array
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class CueView:
+    """Lightweight per-cue view into a CueTable row."""
+    
+    __slots__ = ('_table', '_row')
+    
+    def __init__(self, table: "CueTable", row: int):
+        self._table = table
+        self._row = row
+    
+    @property
+    def start_time(self) -> float:
+        return self._table.starts[self._row]
+    
+    @property
+    def end_time(self) -> float:
+        return self._table.ends[self._row]
+    
+    @property
+    def text(self) -> str:
+        return self._table.texts[self._table.text_ids[self._row]]
+    
+    def to_dict(self) -> dict:
+        """
+        Convert cue to JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary with start, end, and text fields
+        """
+        return {
+            "start": self.start_time,
+            "end": self.end_time,
+            "text": self.text
+        }
+    
+    def is_active(self, current_time: float) -> bool:
+        """
+        Check if subtitle should be displayed at given time.
+        
+        Args:
+            current_time: Current playback time in seconds
+        
+        Returns:
+            True if subtitle is active at current time
+        """
+        return self.start_time <= current_time < self.end_time
+    
+    def __repr__(self) -> str:
+        return f"CueView(start_time={self.start_time!r}, end_time={self.end_time!r}, text={self.text!r})"
+
+
+class CueTable:
+    """
+    Column-oriented table of subtitle cues.
+    
+    Start and end times are kept in array('d') columns and each distinct
+    text is stored once, so a cue costs about 20 bytes plus its unique text.
+    Behaves as a read-only sequence of CueView objects.
+    """
+    
+    __slots__ = ('starts', 'ends', 'text_ids', 'texts', '_text_lookup', '_json_texts')
+    
+    BINARY_MAGIC = b'WSCU'
+    BINARY_VERSION = 1
+    BINARY_HEADER_FORMAT = '<4sHHII'
+    
+    def __init__(self):
+        """Initialize an empty table."""
+        self.starts = array('d')
+        self.ends = array('d')
+        self.text_ids = array('L')
+        self.texts: List[str] = []
+        self._text_lookup: Optional[Dict[str, int]] = {}
+        self._json_texts: Optional[List[str]] = None
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[float, float, str]]) -> "CueTable":
+        """
+        Build a table from (start, end, text) rows.
+        
+        Args:
+            rows: Iterable of (start seconds, end seconds, text) tuples
+        
+        Returns:
+            Populated CueTable
+        """
+        table = cls()
+        append = table.append
+        for start, end, text in rows:
+            append(start, end, text)
+        table.finish()
+        return table
+    
+    @classmethod
+    def from_cues(cls, cues: Iterable) -> "CueTable":
+        """
+        Build a table from objects with start_time, end_time and text.
+        
+        Args:
+            cues: Iterable of SubtitleCue-like objects
+        
+        Returns:
+            Populated CueTable
+        """
+        return cls.from_rows((cue.start_time, cue.end_time, cue.text) for cue in cues)
+    
+    def append(self, start: float, end: float, text: str) -> None:
+        """
+        Append one cue.
+        
+        Args:
+            start: Start time in seconds
+            end: End time in seconds
+            text: Cue text
+        """
+        text_lookup = self._text_lookup
+        if text_lookup is None:
+            text_lookup = {text: text_id for text_id, text in enumerate(self.texts)}
+            self._text_lookup = text_lookup
+        
+        text_id = text_lookup.get(text)
+        if text_id is None:
+            text_id = len(self.texts)
+            self.texts.append(text)
+            text_lookup[text] = text_id
+            self._json_texts = None
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text_ids.append(text_id)
+    
+    def finish(self) -> None:
+        """
+        Drop the text interning lookup once the table is fully built.
+        
+        The lookup is only needed while appending; a later append rebuilds it.
+        """
+        self._text_lookup = None
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, row: int) -> CueView:
+        if row < 0:
+            row += len(self.starts)
+        if not 0 <= row < len(self.starts):
+            raise IndexError("cue index out of range")
+        return CueView(self, row)
+    
+    def __iter__(self) -> Iterator[CueView]:
+        for row in range(len(self.starts)):
+            yield CueView(self, row)
+    
+    def to_json(self, rows: Optional[Sequence[int]] = None) -> str:
+        """
+        Serialize cues to a JSON array straight from the columns.
+        
+        Produces the same document as json.dumps([cue.to_dict() ...],
+        ensure_ascii=False) with compact separators, without building a dictionary per cue. Each
+        distinct text is JSON-encoded once and reused.
+        
+        Args:
+            rows: Row numbers to include (default: all rows in table order)
+        
+        Returns:
+            JSON array of {"start", "end", "text"} objects
+        """
+        json_texts = self._get_json_texts()
+        starts = self.starts
+        ends = self.ends
+        text_ids = self.text_ids
+        if rows is None:
+            rows = range(len(starts))
+        
+        return '[' + ','.join([
+            '{"start":%r,"end":%r,"text":%s}' % (starts[i], ends[i], json_texts[text_ids[i]])
+            for i in rows
+        ]) + ']'
+    
+    def iter_ndjson(self, rows: Optional[Sequence[int]] = None, batch_size: int = 1000) -> Iterator[bytes]:
+        """
+        Serialize cues as newline-delimited JSON, a batch of lines at a time.
+        
+        Each line is the same object to_json emits for the cue. Only one
+        batch is held in memory, so the output can be streamed for tables
+        of any size.
+        
+        Args:
+            rows: Row numbers to include (default: all rows in table order)
+            batch_size: Cues per yielded chunk
+        
+        Yields:
+            UTF-8 encoded chunks of complete lines
+        """
+        json_texts = self._get_json_texts()
+        starts = self.starts
+        ends = self.ends
+        text_ids = self.text_ids
+        if rows is None:
+            rows = range(len(starts))
+        
+        for batch_start in range(0, len(rows), batch_size):
+            yield ''.join([
+                '{"start":%r,"end":%r,"text":%s}\n' % (starts[i], ends[i], json_texts[text_ids[i]])
+                for i in rows[batch_start:batch_start + batch_size]
+            ]).encode('utf-8')
+    
+    def _get_json_texts(self) -> List[str]:
+        """JSON encodings of the distinct texts, built once and reused."""
+        json_texts = self._json_texts
+        if json_texts is None or len(json_texts) != len(self.texts):
+            json_texts = [encode_basestring(text) for text in self.texts]
+            self._json_texts = json_texts
+        return json_texts
+    
+    def to_binary(self) -> bytes:
+        """
+        Serialize cues to the packed binary cue format.
+        
+        Layout (little-endian): magic b'WSCU', version u16, reserved u16,
+        cue count u32, text count u32; then start times float64[cues], end
+        times float64[cues], text ids uint32[cues], UTF-8 text lengths
+        uint32[texts] and the concatenated UTF-8 texts. The time columns
+        start at 8-byte aligned offsets, so a browser can view them as
+        Float64Array without copying.
+        
+        Returns:
+            Packed cue table
+        """
+        encoded_texts = [text.encode('utf-8') for text in self.texts]
+        text_ids = array('I', self.text_ids)
+        text_lengths = array('I', [len(text) for text in encoded_texts])
+        starts = self.starts
+        ends = self.ends
+        if sys.byteorder == 'big':
+            starts, ends = array('d', starts), array('d', ends)
+            for column in (starts, ends, text_ids, text_lengths):
+                column.byteswap()
+        
+        return b''.join([
+            struct.pack(
+                self.BINARY_HEADER_FORMAT,
+                self.BINARY_MAGIC,
+                self.BINARY_VERSION,
+                0,
+                len(self.starts),
+                len(self.texts),
+            ),
+            starts.tobytes(),
+            ends.tobytes(),
+            text_ids.tobytes(),
+            text_lengths.tobytes(),
+            *encoded_texts,
+        ])
+    
+    def estimated_size(self) -> int:
+        """Estimate memory held by the table in bytes."""
+        column_bytes = (
+            self.starts.itemsize * len(self.starts)
+            + self.ends.itemsize * len(self.ends)
+            + self.text_ids.itemsize * len(self.text_ids)
+        )
+        # Text objects, their cached JSON encodings and list slots
+        text_bytes = sum(2 * sys.getsizeof(text) + 16 for text in self.texts)
+        return column_bytes + text_bytes
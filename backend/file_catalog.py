@@ -0,0 +1,310 @@
+"""SQLite catalog of stored files and their metadata."""
+
+import json
+import threading
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Metadata set after a file is stored, once its content has been inspected
+METADATA_FIELDS = ('duration', 'sample_rate', 'channels', 'bit_depth', 'cue_count')
+
+
+@dataclass
+class CatalogEntry:
+    """Catalog row describing one stored file."""
+    name: str
+    kind: str
+    size: int
+    sha256: Optional[str]
+    created_at: float
+    accessed_at: float
+    duration: Optional[float] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bit_depth: Optional[int] = None
+    cue_count: Optional[int] = None
+    
+    def to_dict(self) -> dict:
+        """
+        Convert CatalogEntry to JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary with all catalog fields
+        """
+        return asdict(self)
+
+
+@dataclass
+class SessionEntry:
+    """Catalog row of a player session: the files played together."""
+    id: str
+    audio: str
+    subtitles: List[str]
+    image: Optional[str]
+    created_at: float
+
+
+_COLUMNS = tuple(f.name for f in fields(CatalogEntry))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    duration REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    bit_depth INTEGER,
+    cue_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+CREATE INDEX IF NOT EXISTS files_kind ON files (kind, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    audio TEXT NOT NULL,
+    subtitles TEXT NOT NULL,
+    image TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class FileCatalog:
+    """
+    Embedded SQLite catalog of stored files.
+    
+    One row per filename with its kind, size, digest, times and content
+    metadata, so files can be listed and described without scanning the
+    upload directory or re-reading their content. The database runs in WAL
+    mode, so readers are not blocked by the writer. Rows are written when a
+    file is stored, and access times are flushed in batches. A second table
+    keeps player sessions, the groups of files played together.
+
+    The database file and its directory are created on first use.
+    """
+    
+    BUSY_TIMEOUT_MS = 5000
+    
+    def __init__(self, path: Path):
+        """
+        Initialize FileCatalog.
+        
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = Path(path)
+        self._connection = None
+        # One connection shared by the blocking I/O pool threads
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        """Open the database on first use; call with the lock held."""
+        if self._connection is None:
+            import sqlite3  # imported on first use to keep startup fast
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            # Durable at checkpoints; a crash loses at most the last commits, never integrity
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+    
+    def close(self) -> None:
+        """Close the database connection; it is reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+    
+    def add(self, entry: CatalogEntry) -> None:
+        """
+        Add or replace the row for a filename.
+        
+        Content metadata missing from the entry is copied from another row
+        with the same digest, so linking stored content to a new name keeps
+        its duration and cue count.
+        
+        Args:
+            entry: Row to store
+        """
+        values = asdict(entry)
+        with self._lock:
+            connection = self._connect()
+            if entry.sha256 is not None and all(values[name] is None for name in METADATA_FIELDS):
+                row = connection.execute(
+                    f"SELECT {', '.join(METADATA_FIELDS)} FROM files WHERE sha256 = ? LIMIT 1", (entry.sha256,)
+                ).fetchone()
+                if row is not None:
+                    values.update(zip(METADATA_FIELDS, row))
+            # REPLACE gives the row a new id, so a re-upload lists as the newest file
+            connection.execute(
+                f"INSERT OR REPLACE INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [values[name] for name in _COLUMNS]
+            )
+    
+    def add_many(self, entries: Iterable[CatalogEntry]) -> None:
+        """Add rows in one transaction, keeping existing rows for the same names."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    f"INSERT OR IGNORE INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    ([getattr(entry, name) for name in _COLUMNS] for entry in entries)
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+    
+    def set_metadata(self, name: str, **metadata) -> bool:
+        """
+        Set content metadata of a file.
+        
+        Args:
+            name: Filename
+            **metadata: Values for fields in METADATA_FIELDS
+        
+        Returns:
+            True if the file is in the catalog
+        
+        Raises:
+            ValueError: If a field is not a metadata field
+        """
+        unknown = set(metadata) - set(METADATA_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(sorted(unknown))}")
+        if not metadata:
+            return self.get(name) is not None
+        
+        assignments = ', '.join(f"{field} = ?" for field in metadata)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE files SET {assignments} WHERE name = ?", [*metadata.values(), name]
+            )
+        return cursor.rowcount > 0
+    
+    def remove(self, name: str) -> bool:
+        """
+        Remove the row for a filename.
+        
+        Returns:
+            True if a row was removed
+        """
+        with self._lock:
+            cursor = self._connect().execute("DELETE FROM files WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+    
+    def update_access_times(self, access_times: Dict[str, float]) -> None:
+        """
+        Store last access times in one transaction.
+        
+        Args:
+            access_times: Filename -> Unix timestamp; unknown names are ignored
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "UPDATE files SET accessed_at = ? WHERE name = ? AND accessed_at < ?",
+                    ((accessed_at, name, accessed_at) for name, accessed_at in access_times.items())
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+    
+    def get(self, name: str) -> Optional[CatalogEntry]:
+        """
+        Get the row for a filename.
+        
+        Returns:
+            CatalogEntry, or None if the file is not in the catalog
+        """
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM files WHERE name = ?", (name,)
+            ).fetchone()
+        return CatalogEntry(*row) if row is not None else None
+    
+    def list_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        kind: Optional[str] = None
+    ) -> Tuple[List[CatalogEntry], Optional[int]]:
+        """
+        List files newest first, one page at a time.
+        
+        Pages are read by row id, so they stay consistent while files are
+        added: new files appear on the first page, not between pages.
+        
+        Args:
+            limit: Maximum number of files to return
+            after: Cursor returned with the previous page
+            kind: Only list files of this kind
+        
+        Returns:
+            Tuple of (entries, cursor for the next page or None on the last page)
+        """
+        conditions = []
+        params: list = []
+        if after is not None:
+            conditions.append("id < ?")
+            params.append(after)
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id, {', '.join(_COLUMNS)} FROM files {where} ORDER BY id DESC LIMIT ?",
+                [*params, limit + 1]
+            ).fetchall()
+        
+        entries = [CatalogEntry(*row[1:]) for row in rows[:limit]]
+        cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return entries, cursor
+    
+    def add_session(self, session: SessionEntry) -> None:
+        """
+        Store a player session.
+        
+        Args:
+            session: Session row; subtitles are stored as a JSON array
+        """
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO sessions (id, audio, subtitles, image, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session.id, session.audio, json.dumps(session.subtitles), session.image, session.created_at)
+            )
+    
+    def get_session(self, session_id: str) -> Optional[SessionEntry]:
+        """
+        Get a player session by id.
+        
+        Returns:
+            SessionEntry, or None if there is no such session
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, audio, subtitles, image, created_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionEntry(row[0], row[1], json.loads(row[2]), row[3], row[4])
+    
+    def count(self) -> int:
+        """Number of files in the catalog."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM files").fetchone()[0]
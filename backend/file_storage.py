@@ -1,12 +1,34 @@
 """File Storage Service for managing file uploads and storage."""
 
 import os
-import aiofiles
+import re
+import asyncio
+import uuid
+import hashlib
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from fastapi import UploadFile
 import mimetypes
 
+from backend import metrics
+from backend.blocking_io import open_async, run_blocking
+from backend.file_catalog import CatalogEntry, FileCatalog
+from backend.storage_backends import (
+    BlobInfo, LocalStorageBackend, StorageBackend, read_json_file, write_json_file
+)
+
+
+def allocated_bytes(stat: os.stat_result) -> int:
+    """Bytes a file occupies, counting only allocated blocks of sparse files."""
+    return min(stat.st_size, stat.st_blocks * 512)
+
+
+class FileTooLargeError(ValueError):
+    """Raised when streamed content exceeds the maximum file size."""
+
 
 class FileStorageService:
     """Service for managing file uploads, validation, and storage."""
@@ -22,15 +44,110 @@ class FileStorageService:
         'image/jpeg', 'image/png', 'image/gif', 'image/webp'
     }
     
-    def __init__(self, upload_dir: str = "uploads"):
+    # Content-addressed storage layout inside upload_dir
+    BLOBS_DIRNAME = '.blobs'        # one file per distinct content, named by SHA-256
+    INCOMING_DIRNAME = '.incoming'  # partial writes before they are hashed
+    MANIFEST_FILENAME = '.manifest.json'  # filename -> SHA-256 mapping
+    ACCESS_TIMES_FILENAME = '.access.json'  # filename -> last access time
+    CATALOG_FILENAME = '.catalog.sqlite3'  # file metadata (see FileCatalog)
+    SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+    
+    # How long a manifest shared with other instances is used before re-reading it
+    MANIFEST_REFRESH_SECONDS = 5.0
+    
+    def __init__(
+        self,
+        upload_dir: str = "uploads",
+        max_file_size: int = MAX_FILE_SIZE,
+        backend: Optional[StorageBackend] = None
+    ):
         """
         Initialize FileStorageService.
         
+        Uploaded content is stored once per SHA-256 digest under
+        upload_dir/.blobs, and filenames are mapped to digests in a manifest.
+        A blob is removed when the last filename referencing it is deleted.
+        With a remote backend, blobs and manifest live in the backend and
+        upload_dir/.blobs only caches content. Nothing is created on disk
+        until the first write or create_upload_dir().
+        
         Args:
             upload_dir: Directory path for storing uploaded files
+            max_file_size: Maximum size of a stored file in bytes
+            backend: Where blobs and the manifest are kept (local disk by default)
         """
         self.upload_dir = Path(upload_dir)
-        self.upload_dir.mkdir(exist_ok=True)
+        self.MAX_FILE_SIZE = max_file_size
+        self.backend = backend if backend is not None else LocalStorageBackend()
+        self._delete_callbacks: List[Callable[[Path], None]] = []
+        
+        # Manifest is loaded lazily and reloaded if upload_dir changes
+        self._manifest_dir: Optional[Path] = None
+        self._manifest_loaded_at = 0.0
+        self._manifest: Dict[str, str] = {}
+        self._refcounts: Counter = Counter()
+        # Blobs being stored before their filename is mapped; never released
+        self._pending_blobs: Counter = Counter()
+        
+        # Last access per filename; kept in memory, persisted by save_access_times
+        self._access_times: Dict[str, float] = {}
+        
+        # Opened on first use and reopened if upload_dir changes
+        self._catalog: Optional[FileCatalog] = None
+        
+        # Manifest reads and updates run in worker threads (see blocking_io)
+        self._lock = threading.RLock()
+    
+    def create_upload_dir(self) -> None:
+        """Create upload_dir (and its parents) if it does not exist yet."""
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+    
+    def add_delete_callback(self, callback: Callable[[Path], None]) -> None:
+        """
+        Register a callback invoked with the file path after a file is deleted.
+        
+        Used to invalidate caches that hold data derived from stored files.
+        
+        Args:
+            callback: Callable taking the deleted file's path
+        """
+        self._delete_callbacks.append(callback)
+    
+    def file_kind(self, filename: str) -> Optional[str]:
+        """
+        Get the kind of a file from its extension.
+        
+        Args:
+            filename: Filename to check
+            
+        Returns:
+            "audio", "subtitle" or "image", or None for other extensions
+        """
+        file_ext = Path(filename).suffix.lower()
+        if file_ext in self.ALLOWED_AUDIO_EXTENSIONS:
+            return "audio"
+        if file_ext in self.ALLOWED_SUBTITLE_EXTENSIONS:
+            return "subtitle"
+        if file_ext in self.ALLOWED_IMAGE_EXTENSIONS:
+            return "image"
+        return None
+    
+    def is_allowed_filename(self, filename: str) -> bool:
+        """
+        Check whether a filename has an extension accepted for any file kind.
+        
+        Args:
+            filename: Filename to check
+            
+        Returns:
+            True if the extension is an allowed audio, subtitle or image type
+        """
+        file_ext = Path(filename).suffix.lower()
+        return file_ext in (
+            self.ALLOWED_AUDIO_EXTENSIONS
+            | self.ALLOWED_SUBTITLE_EXTENSIONS
+            | self.ALLOWED_IMAGE_EXTENSIONS
+        )
     
     def validate_audio(self, file: UploadFile) -> tuple[bool, str]:
         """
@@ -152,6 +269,8 @@ class FileStorageService:
         """
         Save uploaded file to disk asynchronously.
         
+        Reads the UploadFile in 1MB chunks and stores it with save_stream.
+        
         Args:
             file: Uploaded file object
             filename: Sanitized filename to save as
@@ -163,50 +282,250 @@ class FileStorageService:
             IOError: If file cannot be saved
             ValueError: If file size exceeds maximum allowed size
         """
-        file_path = self.upload_dir / filename
+        async def read_chunks() -> AsyncIterator[bytes]:
+            chunk_size = 1024 * 1024  # 1MB chunks
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        
+        return await self.save_stream(read_chunks(), filename)
+    
+    async def save_stream(self, chunks: AsyncIterator[bytes], filename: str) -> Path:
+        """
+        Save a stream of bytes to disk asynchronously.
+        
+        The content is hashed while it is written. If a blob with the same
+        SHA-256 already exists the new copy is discarded, so re-uploads use
+        no extra disk space. Saving under an existing filename repoints the
+        name to the new content. Data is written once, to a file in the
+        same filesystem as the blob store, and renamed into place.
+        
+        Args:
+            chunks: Async iterator over the file content
+            filename: Sanitized filename to save as
+            
+        Returns:
+            Path to saved file
+            
+        Raises:
+            IOError: If file cannot be saved
+            FileTooLargeError: If file size exceeds maximum allowed size
+            ValueError: If the stream raises ValueError (e.g. malformed input)
+        """
+        incoming_dir = self.upload_dir / self.INCOMING_DIRNAME
+        await run_blocking(incoming_dir.mkdir, parents=True, exist_ok=True)
+        temp_path = incoming_dir / f"{uuid.uuid4().hex}.part"
         
-        # Save file in chunks to handle large files
-        chunk_size = 1024 * 1024  # 1MB chunks
         total_size = 0
+        digest = hashlib.sha256()
+        clock = time.perf_counter
+        observe_write = metrics.UPLOAD_CHUNK_WRITE_SECONDS.observe
+        count_bytes = metrics.UPLOAD_BYTES.inc
         
+        metrics.UPLOADS_IN_PROGRESS.inc()
         try:
-            async with aiofiles.open(file_path, 'wb') as f:
-                while True:
-                    chunk = await file.read(chunk_size)
+            async with open_async(temp_path, 'wb') as f:
+                async for chunk in chunks:
                     if not chunk:
-                        break
+                        continue
                     
                     total_size += len(chunk)
                     
                     # Check file size limit
                     if total_size > self.MAX_FILE_SIZE:
-                        # Delete partially written file
-                        await self._delete_file_async(file_path)
                         max_size_gb = self.MAX_FILE_SIZE / (1024**3)
-                        raise ValueError(
+                        raise FileTooLargeError(
                             f"파일 크기가 너무 큽니다 (최대 {max_size_gb:.1f}GB)"
                         )
                     
+                    digest.update(chunk)
+                    started = clock()
                     await f.write(chunk)
+                    observe_write(clock() - started)
+                    count_bytes(len(chunk))
             
             # Verify file was written successfully
-            if not file_path.exists() or file_path.stat().st_size == 0:
+            if total_size == 0:
                 raise IOError("파일이 제대로 저장되지 않았습니다")
             
-            return file_path
+            return await run_blocking(self.commit_blob, temp_path, digest.hexdigest(), filename)
             
-        except ValueError:
-            # Re-raise ValueError for file size limit
+        except (ValueError, asyncio.CancelledError):
+            # Delete partially written file, re-raise for size limit / bad input
+            await self._delete_file_async(temp_path)
             raise
         except Exception as e:
             # Clean up on error
-            if file_path.exists():
-                await self._delete_file_async(file_path)
+            await self._delete_file_async(temp_path)
+            raise IOError(f"파일 저장 실패: {str(e)}")
+        finally:
+            metrics.UPLOADS_IN_PROGRESS.dec()
+    
+    async def spool_stream(self, chunks: AsyncIterator[bytes], suffix: str = '') -> Path:
+        """
+        Write a stream to a temporary file without storing it.
+        
+        Used for uploads that must be read back before their content is
+        stored, such as archives. The caller removes the file when done
+        (see discard_spooled).
+        
+        Args:
+            chunks: Async iterator over the content
+            suffix: Suffix for the temporary filename
+            
+        Returns:
+            Path of the temporary file under upload_dir/.incoming
+            
+        Raises:
+            FileTooLargeError: If the content exceeds the maximum file size
+            ValueError: If the stream raises ValueError
+            IOError: If the file cannot be written
+        """
+        incoming_dir = self.upload_dir / self.INCOMING_DIRNAME
+        await run_blocking(incoming_dir.mkdir, parents=True, exist_ok=True)
+        temp_path = incoming_dir / f"{uuid.uuid4().hex}{suffix}"
+        
+        total_size = 0
+        clock = time.perf_counter
+        observe_write = metrics.UPLOAD_CHUNK_WRITE_SECONDS.observe
+        count_bytes = metrics.UPLOAD_BYTES.inc
+        
+        metrics.UPLOADS_IN_PROGRESS.inc()
+        try:
+            async with open_async(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    total_size += len(chunk)
+                    if total_size > self.MAX_FILE_SIZE:
+                        max_size_gb = self.MAX_FILE_SIZE / (1024**3)
+                        raise FileTooLargeError(f"파일 크기가 너무 큽니다 (최대 {max_size_gb:.1f}GB)")
+                    started = clock()
+                    await f.write(chunk)
+                    observe_write(clock() - started)
+                    count_bytes(len(chunk))
+            return temp_path
+        except (ValueError, asyncio.CancelledError):
+            await self._delete_file_async(temp_path)
+            raise
+        except Exception as e:
+            await self._delete_file_async(temp_path)
             raise IOError(f"파일 저장 실패: {str(e)}")
+        finally:
+            metrics.UPLOADS_IN_PROGRESS.dec()
+    
+    async def discard_spooled(self, temp_path: Path) -> None:
+        """
+        Remove a file written by spool_stream.
+        
+        Args:
+            temp_path: Path returned by spool_stream
+        """
+        await self._delete_file_async(temp_path)
+    
+    def commit_blob(self, temp_path: Path, sha256: str, filename: str) -> Path:
+        """
+        Move fully written content into blob storage and map a filename to it.
+        
+        If the blob already exists the temporary file is discarded. The
+        upload to a remote backend runs without holding the manifest lock.
+        
+        Args:
+            temp_path: Path of the completely written temporary file
+            sha256: Hex SHA-256 digest of the file content
+            filename: Sanitized filename to map to the content
+            
+        Returns:
+            Path to the stored blob (a local copy for remote backends)
+        """
+        blob_path = self.get_blob_path(sha256)
+        size = temp_path.stat().st_size
+        
+        with self._lock:
+            self._pending_blobs[sha256] += 1
+        try:
+            if self.backend.remote:
+                self.backend.put_blob(sha256, temp_path, blob_path)
+            with self._lock:
+                if not self.backend.remote:
+                    self.backend.put_blob(sha256, temp_path, blob_path)
+                self._link_name(filename, sha256, size)
+        finally:
+            with self._lock:
+                self._pending_blobs[sha256] -= 1
+                if self._pending_blobs[sha256] <= 0:
+                    del self._pending_blobs[sha256]
+        return blob_path
+    
+    def link_blob(self, sha256: str, filename: str) -> Optional[Path]:
+        """
+        Map a filename to already stored content without uploading it again.
+        
+        Args:
+            sha256: Hex SHA-256 digest of existing content
+            filename: Sanitized filename to map to the content
+            
+        Returns:
+            Path to the blob, or None if no such content is stored
+        """
+        blob_path = self.get_blob_path(sha256)
+        with self._lock:
+            blob_info = self.backend.stat_blob(sha256, blob_path)
+            if blob_info is None:
+                return None
+            
+            self._link_name(filename, sha256, blob_info.size)
+        return blob_path
+    
+    def get_blob_path(self, sha256: str) -> Path:
+        """
+        Get the storage path for content with the given digest.
+        
+        Args:
+            sha256: Hex SHA-256 digest
+            
+        Returns:
+            Path inside the blob directory (may not exist)
+            
+        Raises:
+            ValueError: If the digest is not 64 lowercase hex characters
+        """
+        if not self.SHA256_PATTERN.match(sha256):
+            raise ValueError(f"올바른 SHA-256 값이 아닙니다: {sha256}")
+        return self.upload_dir / self.BLOBS_DIRNAME / sha256
+    
+    def get_blob_info(self, sha256: str) -> Optional[BlobInfo]:
+        """
+        Get the size and modification time of stored content.
+        
+        Args:
+            sha256: Hex SHA-256 digest
+            
+        Returns:
+            BlobInfo, or None if no such content is stored
+            
+        Raises:
+            ValueError: If the digest is not 64 lowercase hex characters
+        """
+        return self.backend.stat_blob(sha256, self.get_blob_path(sha256))
+    
+    def get_file_hash(self, filename: str) -> Optional[str]:
+        """
+        Get the SHA-256 digest a filename is mapped to.
+        
+        Args:
+            filename: Name of the file
+            
+        Returns:
+            Hex digest, or None for unknown or legacy (unhashed) files
+        """
+        return self._load_manifest().get(filename)
     
     def get_file_path(self, filename: str) -> Optional[Path]:
         """
-        Get path to stored file.
+        Get path to stored file, recording the access for eviction.
+        
+        Content of a remote backend is downloaded to the local cache first.
         
         Args:
             filename: Name of the file
@@ -214,17 +533,225 @@ class FileStorageService:
         Returns:
             Path object if file exists, None otherwise
         """
-        file_path = self.upload_dir / filename
+        sha256 = self._load_manifest().get(filename)
+        if sha256 is not None:
+            # fetch_blob has checked the file exists; no second stat
+            file_path = self.get_blob_path(sha256)
+            if not self.backend.fetch_blob(sha256, file_path):
+                return None
+        elif filename.startswith('.'):
+            # Internal storage files are never served by name
+            return None
+        else:
+            # Files stored before content addressing was introduced
+            file_path = self.upload_dir / filename
+            if not file_path.is_file():
+                return None
+        
+        self.record_access(filename)
+        return file_path
+    
+    def record_access(self, filename: str) -> None:
+        """
+        Mark a file as used now, for least-recently-accessed eviction.
         
-        if file_path.exists() and file_path.is_file():
-            return file_path
+        Done by get_file_path; call it directly when content is served
+        without a local path (e.g. from a remote backend).
         
-        return None
+        Args:
+            filename: Name of the file
+        """
+        self._access_times[filename] = time.time()
+    
+    def list_files(self) -> List[str]:
+        """
+        List the names of all stored files.
+        
+        Returns:
+            Content-addressed filenames followed by legacy plain files
+        """
+        with self._lock:
+            names = list(self._load_manifest())
+        known = set(names)
+        if not self.upload_dir.is_dir():
+            return names
+        for entry in os.scandir(self.upload_dir):
+            if not entry.name.startswith('.') and entry.name not in known and entry.is_file():
+                names.append(entry.name)
+        return names
+    
+    def get_access_time(self, filename: str) -> Optional[float]:
+        """
+        Get when a file was last accessed through get_file_path or stored.
+        
+        Files not accessed since the service started fall back to the last
+        saved access time, then to the modification time of their content.
+        Looking up the time does not count as an access.
+        
+        Args:
+            filename: Name of the file
+            
+        Returns:
+            Unix timestamp, or None if the file does not exist
+        """
+        self._load_manifest()
+        accessed_at = self._access_times.get(filename)
+        if accessed_at is not None:
+            return accessed_at
+        
+        sha256 = self._manifest.get(filename)
+        if sha256 is not None:
+            info = self.get_blob_info(sha256)
+            return info.modified if info is not None else None
+        if filename.startswith('.'):
+            return None
+        
+        try:
+            return (self.upload_dir / filename).stat().st_mtime
+        except OSError:
+            return None
+    
+    def save_access_times(self) -> None:
+        """Persist recorded access times so eviction order survives a restart."""
+        with self._lock:
+            manifest = self._load_manifest()
+            access_times = {
+                name: accessed_at for name, accessed_at in self._access_times.items()
+                if name in manifest or (self.upload_dir / name).is_file()
+            }
+            write_json_file(self.upload_dir / self.ACCESS_TIMES_FILENAME, access_times)
+            self.catalog.update_access_times(access_times)
+    
+    @property
+    def catalog(self) -> FileCatalog:
+        """
+        Catalog of the files in upload_dir.
+        
+        A catalog created for an upload directory that already holds files
+        is filled from the manifest and legacy files first (without content
+        metadata, which is only gathered at upload time). With a remote
+        backend, each instance keeps its own catalog.
+        """
+        with self._lock:
+            path = self.upload_dir / self.CATALOG_FILENAME
+            if self._catalog is None or self._catalog.path != path:
+                if self._catalog is not None:
+                    self._catalog.close()
+                is_new = not path.exists()
+                self._catalog = FileCatalog(path)
+                if is_new:
+                    self._catalog.add_many(self._scan_entries())
+            return self._catalog
+    
+    def _scan_entries(self) -> List[CatalogEntry]:
+        """Catalog rows for the files stored so far, read from storage."""
+        entries = []
+        for filename, sha256 in self._load_manifest().items():
+            info = self.get_blob_info(sha256)
+            if info is not None:
+                entries.append(self._catalog_entry(filename, sha256, info.size, info.modified))
+        if self.upload_dir.is_dir():
+            for entry in os.scandir(self.upload_dir):
+                if not entry.name.startswith('.') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append(self._catalog_entry(entry.name, None, stat.st_size, stat.st_mtime))
+        return entries
+    
+    def _catalog_entry(self, filename: str, sha256: Optional[str], size: int, created_at: float) -> CatalogEntry:
+        """Catalog row for a file without content metadata."""
+        return CatalogEntry(
+            name=filename,
+            kind=self.file_kind(filename) or "other",
+            size=size,
+            sha256=sha256,
+            created_at=created_at,
+            accessed_at=self._access_times.get(filename, created_at),
+        )
+    
+    def set_file_metadata(self, filename: str, **metadata) -> bool:
+        """
+        Record content metadata of a stored file in the catalog.
+        
+        Called once at upload time with what was read from the content, so
+        listings never have to read it again.
+        
+        Args:
+            filename: Name of the file
+            **metadata: Fields of file_catalog.METADATA_FIELDS (duration, sample_rate,
+                channels, bit_depth, cue_count)
+            
+        Returns:
+            True if the file is in the catalog
+        """
+        return self.catalog.set_metadata(filename, **metadata)
+    
+    def list_catalog(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        kind: Optional[str] = None
+    ) -> Tuple[List[CatalogEntry], Optional[int]]:
+        """
+        List stored files newest first from the catalog.
+        
+        Access times not yet flushed by save_access_times are filled in from
+        memory.
+        
+        Args:
+            limit: Maximum number of files to return
+            after: Cursor returned with the previous page
+            kind: Only list "audio", "subtitle" or "image" files
+            
+        Returns:
+            Tuple of (entries, cursor for the next page or None on the last page)
+        """
+        if not self.upload_dir.is_dir():
+            return [], None
+        entries, cursor = self.catalog.list_page(limit, after, kind)
+        for entry in entries:
+            entry.accessed_at = max(entry.accessed_at, self._access_times.get(entry.name, 0.0))
+        return entries, cursor
+    
+    def disk_usage(self) -> Tuple[int, int]:
+        """
+        Measure the disk space used by upload_dir.
+        
+        Walks the whole directory, including blobs, partial writes, upload
+        sessions and sidecars, so call it through run_blocking.
+        
+        Returns:
+            Tuple of (number of files, bytes allocated)
+        """
+        files = 0
+        total = 0
+        for root, _, names in os.walk(self.upload_dir):
+            for name in names:
+                try:
+                    total += allocated_bytes(os.stat(os.path.join(root, name)))
+                except FileNotFoundError:
+                    continue
+                files += 1
+        return files, total
+    
+    async def get_file_path_async(self, filename: str) -> Optional[Path]:
+        """
+        Get path to stored file without blocking the event loop.
+        
+        Args:
+            filename: Name of the file
+            
+        Returns:
+            Path object if file exists, None otherwise
+        """
+        return await run_blocking(self.get_file_path, filename)
     
     async def delete_file(self, filename: str) -> bool:
         """
         Delete file from storage.
         
+        Removes the filename mapping; the underlying content is deleted
+        once no other filename references it. Runs in the blocking I/O pool.
+        
         Args:
             filename: Name of the file to delete
             
@@ -234,16 +761,185 @@ class FileStorageService:
         Raises:
             IOError: If file cannot be deleted
         """
+        return await run_blocking(self._delete_file, filename)
+    
+    def _delete_file(self, filename: str) -> bool:
+        """Synchronous implementation of delete_file."""
+        with self._lock:
+            manifest = self._load_manifest()
+            sha256 = manifest.get(filename)
+            
+            if sha256 is not None:
+                try:
+                    removed_path = self._unlink_name(filename)
+                except Exception as e:
+                    raise IOError(f"Failed to delete file: {str(e)}")
+                if removed_path is not None:
+                    for callback in self._delete_callbacks:
+                        callback(removed_path)
+                return True
+        
+        if filename.startswith('.'):
+            return False
+        
         file_path = self.upload_dir / filename
         
-        if not file_path.exists():
+        if not file_path.is_file():
             return False
         
         try:
-            await self._delete_file_async(file_path)
-            return True
+            os.remove(file_path)
         except Exception as e:
             raise IOError(f"Failed to delete file: {str(e)}")
+        self._access_times.pop(filename, None)
+        self.catalog.remove(filename)
+        
+        for callback in self._delete_callbacks:
+            callback(file_path)
+        
+        return True
+    
+    def evict_file(self, filename: str, accessed_at: float) -> Optional[int]:
+        """
+        Delete a file unless it has been accessed after the given time.
+        
+        Used by garbage collection, which picks files from a snapshot of
+        access times that requests may have changed in the meantime.
+        
+        Args:
+            filename: Name of the file
+            accessed_at: Access time the file was picked with
+            
+        Returns:
+            Bytes freed (0 if its content is still referenced by another
+            name), or None if the file is gone or was accessed since
+            
+        Raises:
+            IOError: If file cannot be deleted
+        """
+        with self._lock:
+            current = self.get_access_time(filename)
+            if current is None or current > accessed_at:
+                return None
+            
+            sha256 = self._load_manifest().get(filename)
+            if sha256 is not None:
+                info = self.get_blob_info(sha256)
+                size = info.size if info is not None else 0
+                shared = self._refcounts[sha256] > 1
+            else:
+                try:
+                    size = (self.upload_dir / filename).stat().st_size
+                except OSError:
+                    size = 0
+                shared = False
+            
+            if not self._delete_file(filename):
+                return None
+            return 0 if shared else size
+    
+    def _load_manifest(self) -> Dict[str, str]:
+        """
+        Get the filename -> digest manifest, loading it from the backend if needed.
+        
+        A manifest shared with other instances is re-read once it is older
+        than MANIFEST_REFRESH_SECONDS.
+        
+        Returns:
+            Manifest dictionary (shared, do not mutate directly)
+        """
+        with self._lock:
+            dir_changed = self._manifest_dir != self.upload_dir
+            expired = (
+                self.backend.remote
+                and time.monotonic() - self._manifest_loaded_at > self.MANIFEST_REFRESH_SECONDS
+            )
+            if dir_changed or expired:
+                manifest = self.backend.load_manifest(self.upload_dir / self.MANIFEST_FILENAME)
+                self._manifest = manifest
+                self._refcounts = Counter(manifest.values())
+                self._manifest_loaded_at = time.monotonic()
+            
+            if dir_changed:
+                try:
+                    access_times = read_json_file(self.upload_dir / self.ACCESS_TIMES_FILENAME)
+                except ValueError:
+                    # Only affects eviction order; start over from mtimes
+                    access_times = {}
+                self._access_times = access_times
+                self._manifest_dir = self.upload_dir
+            return self._manifest
+    
+    def _set_name(self, filename: str, sha256: Optional[str]) -> Optional[str]:
+        """
+        Map a filename to a digest (or remove it, for None) in the manifest.
+        
+        Returns:
+            Digest the filename was mapped to before
+        """
+        previous: Dict[str, Optional[str]] = {}
+        
+        def update(manifest: Dict[str, str]) -> None:
+            previous['sha256'] = manifest.get(filename)
+            if sha256 is None:
+                manifest.pop(filename, None)
+            else:
+                manifest[filename] = sha256
+        
+        manifest = self.backend.update_manifest(
+            self.upload_dir / self.MANIFEST_FILENAME, self._load_manifest(), update
+        )
+        self._manifest = manifest
+        self._refcounts = Counter(manifest.values())
+        return previous.get('sha256')
+    
+    def _link_name(self, filename: str, sha256: str, size: int) -> None:
+        """Point a filename at a blob of the given size, releasing the blob it referenced before."""
+        now = time.time()
+        self._access_times[filename] = now
+        removed_path = None
+        if self._load_manifest().get(filename) != sha256:
+            previous = self._set_name(filename, sha256)
+            
+            # A legacy plain file with the same name is replaced by the mapping
+            legacy_path = self.upload_dir / filename
+            if legacy_path.is_file():
+                os.remove(legacy_path)
+            
+            if previous not in (None, sha256):
+                removed_path = self._release_blob(previous)
+        
+        self.catalog.add(self._catalog_entry(filename, sha256, size, now))
+        if removed_path is not None:
+            for callback in self._delete_callbacks:
+                callback(removed_path)
+    
+    def _unlink_name(self, filename: str) -> Optional[Path]:
+        """
+        Remove a filename mapping.
+        
+        Returns:
+            Path of the blob if it was deleted because nothing references it anymore
+        """
+        previous = self._set_name(filename, None)
+        self._access_times.pop(filename, None)
+        self.catalog.remove(filename)
+        return self._release_blob(previous) if previous is not None else None
+    
+    def _release_blob(self, sha256: str) -> Optional[Path]:
+        """
+        Delete a blob once no filename references it.
+        
+        Returns:
+            Path of the deleted blob, or None if it is still referenced
+        """
+        if self._refcounts[sha256] > 0 or self._pending_blobs[sha256] > 0:
+            return None
+        
+        self._refcounts.pop(sha256, None)
+        blob_path = self.get_blob_path(sha256)
+        self.backend.delete_blob(sha256, blob_path)
+        return blob_path
     
     async def _delete_file_async(self, file_path: Path) -> None:
         """
@@ -252,11 +948,7 @@ class FileStorageService:
         Args:
             file_path: Path to file to delete
         """
-        # Use os.remove in async context
-        # aiofiles doesn't provide async remove, so we use sync version
-        # For production, consider using aiofiles.os.remove if available
-        if file_path.exists():
-            os.remove(file_path)
+        await run_blocking(file_path.unlink, missing_ok=True)
     
     def sanitize_filename(self, filename: str) -> str:
         """
@@ -0,0 +1,444 @@
+"""Prometheus metrics: counters, gauges and histograms in the text exposition format."""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket upper bounds in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+CHUNK_WRITE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Cue count classes for parse durations, as (upper bound, label value)
+CUE_COUNT_CLASSES = ((100, '0-100'), (1000, '100-1k'), (10000, '1k-10k'), (100000, '10k-100k'))
+CUE_COUNT_LARGEST_CLASS = '100k+'
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+class _CounterValue:
+    """One labelled counter; safe to update from worker threads."""
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+    
+    def get(self) -> float:
+        return self._value
+
+
+class _GaugeValue(_CounterValue):
+    """One labelled gauge."""
+    
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+    
+    def set(self, value: float) -> None:
+        self._value = value
+
+
+class _HistogramValue:
+    """One labelled histogram with fixed bucket bounds."""
+    
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = bounds
+        # Per-bucket (not cumulative) counts; the last slot is +Inf
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+    
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Metric:
+    """
+    Base class of a named metric family with optional labels.
+    
+    Metrics without labels are updated directly (counter.inc()); labelled
+    ones through a child per label combination (counter.labels("GET").inc()).
+    Keep a reference to the child in hot loops to skip the lookup.
+    """
+    
+    TYPE = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize Metric.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels, in the order labels() takes them
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._children_lock = threading.Lock()
+        self._default = None if self.labelnames else self._new_child()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str):
+        """
+        Get the child for a combination of label values.
+        
+        Raises:
+            ValueError: If the number of values does not match labelnames
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._children_lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def _items(self) -> List[Tuple[Dict[str, str], object]]:
+        if self._default is not None:
+            return [({}, self._default)]
+        with self._children_lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+    
+    def samples(self) -> Iterable[Sample]:
+        """Yield (name, labels, value) for every exposed sample."""
+        for labels, child in self._items():
+            yield self.name, labels, child.get()
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+    
+    TYPE = 'counter'
+    
+    def _new_child(self):
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter of a metric without labels."""
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    
+    TYPE = 'gauge'
+    
+    def _new_child(self):
+        return _GaugeValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the gauge of a metric without labels."""
+        self._default.inc(amount)
+    
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the gauge of a metric without labels."""
+        self._default.dec(amount)
+    
+    def set(self, value: float) -> None:
+        """Set the gauge of a metric without labels."""
+        self._default.set(value)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+    
+    TYPE = 'histogram'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = REQUEST_BUCKETS
+    ):
+        """
+        Initialize Histogram.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels
+            buckets: Increasing bucket upper bounds (+Inf is implied)
+        """
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float) -> None:
+        """Record an observation of a metric without labels."""
+        self._default.observe(value)
+    
+    def samples(self) -> Iterable[Sample]:
+        bounds = self.buckets + (float('inf'),)
+        for labels, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_count', labels, cumulative
+            yield f'{self.name}_sum', labels, total
+
+
+class CallbackMetric(Metric):
+    """
+    Metric whose samples are read from a function at scrape time.
+    
+    Used for values other services already track (cache counters, disk
+    usage), so nothing is updated on their hot paths.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+    ):
+        """
+        Initialize CallbackMetric.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            metric_type: 'counter' or 'gauge'
+            callback: Returns (labels, value) pairs; runs in the blocking I/O pool
+        """
+        self.TYPE = metric_type
+        self.callback = callback
+        super().__init__(name, documentation)
+    
+    def _new_child(self):
+        return None
+    
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self.callback():
+            yield self.name, labels, value
+
+
+class Registry:
+    """Set of metric families rendered together."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, replacing any earlier one with the same name.
+        
+        Returns:
+            The registered metric
+        """
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text format.
+        
+        Callback metrics may do filesystem work, so call this through
+        run_blocking.
+        
+        Returns:
+            Exposition text, ending in a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create and register a Counter."""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Create and register a Gauge."""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = REQUEST_BUCKETS
+) -> Histogram:
+    """Create and register a Histogram."""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_callback(
+    name: str,
+    documentation: str,
+    metric_type: str,
+    callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+) -> CallbackMetric:
+    """Create and register a CallbackMetric."""
+    return REGISTRY.register(CallbackMetric(name, documentation, metric_type, callback))
+
+
+# Metrics updated by the middleware and the storage and parsing services
+REQUEST_SECONDS = histogram(
+    'wsync_http_request_duration_seconds',
+    'HTTP request latency by method, route and status',
+    labelnames=('method', 'route', 'status')
+)
+UPLOAD_BYTES = counter(
+    'wsync_upload_bytes_total',
+    'Bytes received by uploads (rate() gives upload bytes/sec)'
+)
+UPLOADS_IN_PROGRESS = gauge(
+    'wsync_uploads_in_progress',
+    'Uploads currently receiving data'
+)
+UPLOAD_CHUNK_WRITE_SECONDS = histogram(
+    'wsync_upload_chunk_write_seconds',
+    'Time to write one received chunk to disk',
+    buckets=CHUNK_WRITE_BUCKETS
+)
+VTT_PARSE_SECONDS = histogram(
+    'wsync_vtt_parse_seconds',
+    'Time to parse a WebVTT file, by number of cues',
+    labelnames=('cues',),
+    buckets=PARSE_BUCKETS
+)
+
+
+def cue_count_class(cue_count: int) -> str:
+    """
+    Label value for a number of cues.
+    
+    Args:
+        cue_count: Number of cues in a parsed file
+    
+    Returns:
+        Size class such as '1k-10k'
+    """
+    for bound, label in CUE_COUNT_CLASSES:
+        if cue_count <= bound:
+            return label
+    return CUE_COUNT_LARGEST_CLASS
+
+
+def observe_vtt_parse(seconds: float, cue_count: int) -> None:
+    """
+    Record how long parsing a WebVTT file took.
+    
+    Args:
+        seconds: Parse duration
+        cue_count: Number of cues parsed
+    """
+    VTT_PARSE_SECONDS.labels(cue_count_class(cue_count)).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+    
+    Requests are labelled with the matched route's path (e.g.
+    /api/files/audio/{filename}) rather than the raw URL, so label
+    cardinality stays bounded; requests matching no route are labelled
+    "unmatched". Latency runs until the last body chunk is sent.
+    """
+    
+    UNMATCHED = 'unmatched'
+    
+    def __init__(self, app, histogram: Optional[Histogram] = None):
+        """
+        Initialize MetricsMiddleware.
+        
+        Args:
+            app: ASGI application to wrap
+            histogram: Histogram labelled (method, route, status); defaults
+                to wsync_http_request_duration_seconds
+        """
+        self.app = app
+        self.histogram = histogram or REQUEST_SECONDS
+        self._route_paths: Dict[object, str] = {}
+    
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return self.UNMATCHED
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Map endpoints (and mounted apps) back to their path templates
+            router = scope.get('app')
+            for route in getattr(router, 'routes', ()):
+                target = getattr(route, 'endpoint', None) or getattr(route, 'app', None)
+                if target is not None:
+                    self._route_paths[target] = route.path
+            path = self._route_paths.setdefault(endpoint, self.UNMATCHED)
+        return path
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.histogram.labels(scope['method'], self._route_path(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
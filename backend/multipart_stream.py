@@ -0,0 +1,167 @@
+"""Streaming multipart/form-data reader that never buffers file bodies."""
+
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartError(ValueError):
+    """Raised when a request body is not valid multipart/form-data."""
+
+
+class MultipartPart:
+    """Headers of one form-data part; its body is read with MultipartStreamReader.iter_data."""
+    
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+        disposition, options = parse_options_header(headers.get('content-disposition', ''))
+        if disposition != b'form-data':
+            raise MultipartError("Part is missing a form-data Content-Disposition")
+        self.name: str = options.get(b'name', b'').decode('utf-8', 'replace')
+        filename = options.get(b'filename')
+        self.filename: Optional[str] = filename.decode('utf-8', 'replace') if filename is not None else None
+        self.content_type: Optional[str] = headers.get('content-type')
+
+
+class MultipartStreamReader:
+    """
+    Incremental multipart/form-data reader over an async byte stream.
+    
+    Feeds request body chunks to python-multipart's callback parser and
+    exposes parts one at a time, so a file body can be written to its
+    destination as it arrives instead of being spooled to a temporary file
+    first (which is what Starlette's UploadFile does).
+    
+    Usage:
+        reader = MultipartStreamReader(request.stream(), request.headers["content-type"])
+        part = await reader.next_part()
+        async for chunk in reader.iter_data():
+            ...
+    """
+    
+    def __init__(self, stream: AsyncIterator[bytes], content_type: str):
+        """
+        Initialize MultipartStreamReader.
+        
+        Args:
+            stream: Async iterator over the raw request body
+            content_type: Value of the request Content-Type header
+        
+        Raises:
+            MultipartError: If the content type is not multipart/form-data with a boundary
+        """
+        media_type, options = parse_options_header(content_type or '')
+        boundary = options.get(b'boundary')
+        if media_type != b'multipart/form-data' or not boundary:
+            raise MultipartError("Request body is not multipart/form-data")
+        
+        self._stream = stream.__aiter__()
+        self._events: List[Tuple[str, object]] = []
+        self._position = 0
+        self._exhausted = False
+        self._in_body = False
+        self._header_field = b''
+        self._header_value = b''
+        self._headers: Dict[str, str] = {}
+        self._parser = MultipartParser(boundary.strip(b'"'), {
+            'on_part_begin': self._on_part_begin,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+            'on_end': self._on_end,
+        })
+    
+    async def next_part(self) -> Optional[MultipartPart]:
+        """
+        Advance to the next part, skipping any unread body of the current one.
+        
+        Returns:
+            The next part's headers, or None at the end of the body
+        
+        Raises:
+            MultipartError: If the body is malformed or ends early
+        """
+        while True:
+            event = await self._next_event()
+            if event is None:
+                return None
+            kind, value = event
+            if kind == 'headers':
+                self._in_body = True
+                return MultipartPart(value)
+    
+    async def iter_data(self) -> AsyncIterator[bytes]:
+        """
+        Yield the body of the current part as it arrives.
+        
+        Raises:
+            MultipartError: If the body is malformed or ends early
+        """
+        while self._in_body:
+            event = await self._next_event()
+            if event is None:
+                raise MultipartError("Request body ended inside a part")
+            kind, value = event
+            if kind == 'data':
+                yield value
+            elif kind == 'part_end':
+                self._in_body = False
+    
+    async def _next_event(self) -> Optional[Tuple[str, object]]:
+        """Return the next parser event, feeding more of the stream as needed."""
+        while self._position >= len(self._events):
+            self._events.clear()
+            self._position = 0
+            if self._exhausted:
+                return None
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                self._exhausted = True
+                self._parser.finalize()
+                continue
+            if chunk:
+                try:
+                    self._parser.write(chunk)
+                except MultipartParseError as e:
+                    raise MultipartError(f"Malformed multipart body: {e}") from e
+        
+        event = self._events[self._position]
+        self._position += 1
+        if event[0] == 'end':
+            self._exhausted = True
+            return None
+        return event
+    
+    # python-multipart callbacks
+    
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+    
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+    
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+    
+    def _on_header_end(self) -> None:
+        field = self._header_field.decode('latin-1').lower()
+        self._headers[field] = self._header_value.decode('latin-1')
+        self._header_field = b''
+        self._header_value = b''
+    
+    def _on_headers_finished(self) -> None:
+        self._events.append(('headers', self._headers))
+    
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(('data', data[start:end]))
+    
+    def _on_part_end(self) -> None:
+        self._events.append(('part_end', None))
+    
+    def _on_end(self) -> None:
+        self._events.append(('end', None))
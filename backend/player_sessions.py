@@ -0,0 +1,321 @@
+"""Player sessions: an audio file with its subtitles and image, served as one bundle."""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from backend.cue_encoding import compress
+from backend.file_catalog import SessionEntry
+from backend.file_storage import FileStorageService
+from backend.vtt_parser import VTTParserService
+from backend.wav_header import read_wav_info
+
+
+class PlayerSessionError(Exception):
+    """Raised when a player session cannot be created or served."""
+    
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+@dataclass
+class _Bundle:
+    """Serialized bundle of a session, valid for the member versions it was built from."""
+    session: SessionEntry
+    versions: Tuple[str, ...]
+    tag: str
+    # Content coding -> encoded body
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+
+class PlayerSessionService:
+    """
+    Service grouping the files a player needs into one cached response.
+    
+    A session names an audio file, one or more subtitle tracks and an
+    optional image, and is kept in the file catalog. Its bundle carries
+    everything needed to start playback: the audio duration and format,
+    each track's cues (inline, or index URLs for tracks above
+    `inline_cue_limit` cues), the image URL, and an ETag per member.
+    
+    Bundles are built once and cached per content coding. Every read
+    checks each member's version (its digest, or size and mtime for
+    legacy files) against the cached one, so a member that is replaced or
+    deleted invalidates the bundle without any callback; the check is a
+    manifest lookup per member.
+    """
+    
+    SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+    MAX_SUBTITLES = 8
+    DEFAULT_INLINE_CUE_LIMIT = 5000
+    DEFAULT_CACHE_MAX_ENTRIES = 256
+    
+    def __init__(
+        self,
+        file_storage: FileStorageService,
+        vtt_parser: VTTParserService,
+        inline_cue_limit: int = DEFAULT_INLINE_CUE_LIMIT,
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES
+    ):
+        """
+        Initialize PlayerSessionService.
+        
+        Args:
+            file_storage: Storage service holding the member files and the catalog
+            vtt_parser: Parser (and cue cache) for subtitle tracks
+            inline_cue_limit: Tracks with more cues are referenced, not embedded
+            cache_max_entries: Maximum number of bundles kept in memory
+        """
+        self.file_storage = file_storage
+        self.vtt_parser = vtt_parser
+        self.inline_cue_limit = inline_cue_limit
+        self.cache_max_entries = cache_max_entries
+        
+        # session id -> _Bundle, in LRU order
+        self._cache: "OrderedDict[str, _Bundle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def create_session(self, audio: str, subtitles: List[str], image: Optional[str] = None) -> str:
+        """
+        Group stored files into a new session.
+        
+        Args:
+            audio: Audio filename
+            subtitles: Subtitle filenames, in track order
+            image: Image filename, if any
+        
+        Returns:
+            Session id
+        
+        Raises:
+            PlayerSessionError: If a file has the wrong kind (400) or is not stored (404)
+        """
+        if not 1 <= len(subtitles) <= self.MAX_SUBTITLES:
+            raise PlayerSessionError(400, f"자막 트랙은 1개에서 {self.MAX_SUBTITLES}개까지 지정할 수 있습니다")
+        if len(set(subtitles)) != len(subtitles):
+            raise PlayerSessionError(400, "같은 자막 파일이 두 번 지정되었습니다")
+        
+        expected = [(audio, "audio")] + [(name, "subtitle") for name in subtitles]
+        if image is not None:
+            expected.append((image, "image"))
+        for name, kind in expected:
+            if self.file_storage.file_kind(name) != kind:
+                raise PlayerSessionError(400, f"'{name}'은(는) {kind} 파일이 아닙니다")
+            if self._member_version(name) is None:
+                raise PlayerSessionError(404, f"파일을 찾을 수 없습니다: {name}")
+        
+        session = SessionEntry(uuid.uuid4().hex, audio, list(subtitles), image, time.time())
+        self.file_storage.catalog.add_session(session)
+        return session.id
+    
+    def get_bundle(self, session_id: str, encoding: str = "identity") -> Tuple[bytes, str]:
+        """
+        Get the bundle of a session.
+        
+        Args:
+            session_id: Session id
+            encoding: Content coding returned by negotiate_encoding
+        
+        Returns:
+            Tuple of (encoded JSON body, strong ETag of this encoding)
+        
+        Raises:
+            PlayerSessionError: If the session or one of its files does not exist (404)
+            ValueError: If a subtitle track is malformed
+        """
+        with self._lock:
+            bundle = self._cache.get(session_id)
+            if bundle is not None:
+                self._cache.move_to_end(session_id)
+        
+        if bundle is not None:
+            session = bundle.session
+        else:
+            session = self._load_session(session_id)
+        versions = self._member_versions(session)
+        
+        if bundle is not None and bundle.versions == versions:
+            with self._lock:
+                self.cache_hits += 1
+        else:
+            with self._lock:
+                self.cache_misses += 1
+            bundle = _Bundle(session, versions, self._bundle_tag(session, versions))
+            bundle.bodies["identity"] = self._build(session).encode("utf-8")
+            with self._lock:
+                self._cache[session_id] = bundle
+                self._cache.move_to_end(session_id)
+                while len(self._cache) > self.cache_max_entries:
+                    self._cache.popitem(last=False)
+        
+        body = bundle.bodies.get(encoding)
+        if body is None:
+            # Encoded once per coding; a racing request just encodes it twice
+            body = compress(bundle.bodies["identity"], encoding)
+            bundle.bodies[encoding] = body
+        tag = bundle.tag if encoding == "identity" else f"{bundle.tag}-{encoding}"
+        return body, f'"{tag}"'
+    
+    def clear_cache(self) -> None:
+        """Drop all cached bundles and reset the hit/miss counters."""
+        with self._lock:
+            self._cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+    
+    def cache_stats(self) -> dict:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with hits, misses and entries
+        """
+        with self._lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "entries": len(self._cache),
+            }
+    
+    def _load_session(self, session_id: str) -> SessionEntry:
+        """Read a session from the catalog; 404 if it does not exist."""
+        session = None
+        if self.SESSION_ID_PATTERN.match(session_id) and self.file_storage.upload_dir.is_dir():
+            session = self.file_storage.catalog.get_session(session_id)
+        if session is None:
+            raise PlayerSessionError(404, "세션을 찾을 수 없습니다")
+        return session
+    
+    def _member_version(self, filename: str) -> Optional[str]:
+        """
+        Identify the current content of a file without reading it.
+        
+        Returns:
+            Its digest, "size-mtime" for legacy files, or None if it is not stored
+        """
+        sha256 = self.file_storage.get_file_hash(filename)
+        if sha256 is not None:
+            return sha256
+        if filename.startswith('.'):
+            return None
+        try:
+            stat = (self.file_storage.upload_dir / filename).stat()
+        except OSError:
+            return None
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    
+    def _member_versions(self, session: SessionEntry) -> Tuple[str, ...]:
+        """Versions of all members of a session; 404 if one of them is gone."""
+        members = [session.audio, *session.subtitles]
+        if session.image is not None:
+            members.append(session.image)
+        versions = []
+        for name in members:
+            version = self._member_version(name)
+            if version is None:
+                raise PlayerSessionError(404, f"세션의 파일을 찾을 수 없습니다: {name}")
+            versions.append(version)
+        return tuple(versions)
+    
+    @staticmethod
+    def _bundle_tag(session: SessionEntry, versions: Tuple[str, ...]) -> str:
+        """Entity tag of a bundle, derived from its session and member versions."""
+        return hashlib.sha256(json.dumps([session.id, versions]).encode("utf-8")).hexdigest()[:32]
+    
+    def _member_etag(self, filename: str) -> Optional[str]:
+        """The ETag a member's own endpoint serves, if it is content-addressed."""
+        sha256 = self.file_storage.get_file_hash(filename)
+        return f'"{sha256}"' if sha256 is not None else None
+    
+    def _build(self, session: SessionEntry) -> str:
+        """Serialize the bundle of a session as JSON."""
+        image = None
+        if session.image is not None:
+            image = {
+                "filename": session.image,
+                "url": f"/api/files/image/{quote(session.image)}",
+                "etag": self._member_etag(session.image),
+            }
+        head = json.dumps({
+            "id": session.id,
+            "created_at": session.created_at,
+            "audio": self._describe_audio(session.audio),
+            "image": image,
+        }, ensure_ascii=False)
+        subtitles = ",".join(self._describe_subtitle(name) for name in session.subtitles)
+        return '%s,"subtitles":[%s]}' % (head[:-1], subtitles)
+    
+    def _describe_audio(self, filename: str) -> dict:
+        """Audio member: URLs, ETag and the format recorded in the catalog."""
+        entry = self.file_storage.catalog.get(filename)
+        metadata = {
+            "duration": entry.duration if entry is not None else None,
+            "sample_rate": entry.sample_rate if entry is not None else None,
+            "channels": entry.channels if entry is not None else None,
+            "bit_depth": entry.bit_depth if entry is not None else None,
+        }
+        if metadata["duration"] is None:
+            # Catalogued without metadata (backfilled); read the header once and record it
+            file_path = self.file_storage.get_file_path(filename)
+            try:
+                wav_info = read_wav_info(file_path) if file_path is not None else None
+            except (ValueError, OSError):
+                wav_info = None
+            if wav_info is not None:
+                metadata = {
+                    "duration": wav_info.duration,
+                    "sample_rate": wav_info.sample_rate,
+                    "channels": wav_info.channels,
+                    "bit_depth": wav_info.bit_depth,
+                }
+                self.file_storage.set_file_metadata(filename, **metadata)
+        
+        url = f"/api/files/audio/{quote(filename)}"
+        return {
+            "filename": filename,
+            "url": url,
+            "etag": self._member_etag(filename),
+            "size": entry.size if entry is not None else None,
+            **metadata,
+            "peaks_url": f"{url}/peaks",
+        }
+    
+    def _describe_subtitle(self, filename: str) -> str:
+        """
+        Subtitle member as JSON: URLs, ETag, cue count and the cues themselves
+        unless the track has more than inline_cue_limit cues.
+        """
+        entry = self.file_storage.catalog.get(filename)
+        cue_count = entry.cue_count if entry is not None else None
+        cues_json = "null"
+        if cue_count is None or cue_count <= self.inline_cue_limit:
+            file_path = self.file_storage.get_file_path(filename)
+            if file_path is None:
+                raise PlayerSessionError(404, f"세션의 파일을 찾을 수 없습니다: {filename}")
+            cues = self.vtt_parser.parse_vtt_file(str(file_path))
+            if cue_count is None:
+                cue_count = len(cues)
+                self.file_storage.set_file_metadata(filename, cue_count=cue_count)
+            if len(cues) <= self.inline_cue_limit:
+                cues_json = cues.to_json()
+        
+        url = f"/api/files/subtitle/{quote(filename)}"
+        head = json.dumps({
+            "filename": filename,
+            "url": url,
+            "etag": self._member_etag(filename),
+            "cue_count": cue_count,
+            "index": {"at": f"{url}/at", "window": f"{url}/window"},
+        }, ensure_ascii=False)
+        return '%s,"cues":%s}' % (head[:-1], cues_json)
@@ -0,0 +1,392 @@
+"""File response with HTTP range, ETag and conditional request support."""
+
+import abc
+import os
+import stat as stat_module
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from backend.blocking_io import run_blocking
+
+# ASGI extension that lets the server transfer file data with os.sendfile
+ZEROCOPY_EXTENSION = "http.response.zerocopy"
+
+# More ranges than this are answered with the full file
+MAX_RANGES = 32
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse a bytes Range header.
+    
+    Args:
+        range_header: Value of the Range header
+        file_size: Size of the file in bytes
+    
+    Returns:
+        Sorted, coalesced list of inclusive (start, end) byte ranges; an empty
+        list if no range is satisfiable; None if the header is malformed or
+        uses another unit and should be ignored
+    """
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not range_set.strip():
+        return None
+    
+    ranges: List[Tuple[int, int]] = []
+    for spec in range_set.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        first, dash, last = spec.partition("-")
+        first = first.strip()
+        last = last.strip()
+        if not dash or not (first or last):
+            return None
+        if not (first.isdigit() or not first) or not (last.isdigit() or not last):
+            return None
+        
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(file_size - length, 0), file_size - 1
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), file_size - 1) if last else file_size - 1
+        
+        if start < file_size:
+            ranges.append((start, end))
+    
+    ranges.sort()
+    coalesced: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if coalesced and start <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def content_disposition(filename: str) -> str:
+    """Content-Disposition value for downloading a file under its name."""
+    quoted_filename = quote(filename)
+    if quoted_filename != filename:
+        return f"attachment; filename*=utf-8''{quoted_filename}"
+    return f'attachment; filename="{filename}"'
+
+
+def etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """Check an If-None-Match / If-Range style entity-tag list against an ETag."""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _parse_http_date(value: str) -> Optional[int]:
+    """Parse an HTTP date into a Unix timestamp, or None if invalid."""
+    try:
+        return int(parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RangedResponse(Response, abc.ABC):
+    """
+    Serve content of known size with Range/206 (including
+    multipart/byteranges), a strong ETag and If-None-Match,
+    If-Modified-Since and If-Range handling.
+    
+    Subclasses send the bytes of each selected range.
+    """
+    
+    def __init__(
+        self,
+        file_size: int,
+        last_modified: int,
+        etag: str,
+        request_headers: Mapping[str, str],
+        media_type: str,
+        filename: Optional[str] = None
+    ):
+        """
+        Initialize RangedResponse.
+        
+        Args:
+            file_size: Size of the content in bytes
+            last_modified: Modification time of the content (Unix seconds)
+            etag: Strong ETag (quoted)
+            request_headers: Headers of the incoming request
+            media_type: Content type of the content
+            filename: Download filename for Content-Disposition
+        """
+        self.background = None
+        self.body = b""
+        self.media_type = media_type
+        self.file_size = file_size
+        
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(last_modified, usegmt=True),
+        }
+        if filename is not None:
+            headers["content-disposition"] = content_disposition(filename)
+        
+        self.ranges: List[Tuple[int, int]] = []
+        self.boundary: Optional[str] = None
+        self.status_code = 200
+        
+        if self._is_not_modified(request_headers, etag, last_modified):
+            self.status_code = 304
+            self.ranges = []
+        else:
+            self._select_ranges(request_headers, etag, last_modified, headers)
+        
+        self.init_headers(headers)
+        self.raw_headers = [
+            (key, value) for key, value in self.raw_headers if key != b"content-length"
+        ]
+        if self.status_code != 304:
+            self.raw_headers.append((b"content-length", str(self._content_length()).encode("latin-1")))
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        
+        if scope["method"].upper() == "HEAD" or not self.ranges:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        await self._send_ranges(scope, send)
+        
+        closing = b"\r\n" + self._closing_boundary() if self.boundary is not None else b""
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
+    
+    async def _send_ranges(self, scope: Scope, send: Send) -> None:
+        """Send the selected ranges, preceded by part headers for multipart/byteranges."""
+        for index, (start, end) in enumerate(self.ranges):
+            await self._send_part_header(index, start, end, send)
+            await self._send_range(start, end, send)
+    
+    async def _send_part_header(self, index: int, start: int, end: int, send: Send) -> None:
+        if self.boundary is not None:
+            await send({
+                "type": "http.response.body",
+                "body": (b"\r\n" if index else b"") + self._part_header(start, end),
+                "more_body": True,
+            })
+    
+    @abc.abstractmethod
+    async def _send_range(self, start: int, end: int, send: Send) -> None:
+        """Send an inclusive byte range of the content."""
+    
+    def _is_not_modified(self, request_headers: Mapping[str, str], etag: str, last_modified: int) -> bool:
+        """Evaluate If-None-Match, falling back to If-Modified-Since."""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag, weak=True)
+        
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is not None:
+            since = _parse_http_date(if_modified_since)
+            return since is not None and last_modified <= since
+        
+        return False
+    
+    def _select_ranges(
+        self,
+        request_headers: Mapping[str, str],
+        etag: str,
+        last_modified: int,
+        headers: dict
+    ) -> None:
+        """Choose between a full, single-range, multi-range or 416 response."""
+        full = [(0, self.file_size - 1)] if self.file_size else []
+        self.ranges = full
+        
+        range_header = request_headers.get("range")
+        if range_header is None:
+            return
+        
+        # If-Range: only honor Range if the client's copy is still current
+        if_range = request_headers.get("if-range")
+        if if_range is not None:
+            if_range = if_range.strip()
+            if if_range.startswith('"') or if_range.startswith("W/"):
+                if if_range != etag:
+                    return
+            else:
+                if _parse_http_date(if_range) != last_modified:
+                    return
+        
+        ranges = parse_range_header(range_header, self.file_size)
+        if ranges is None or len(ranges) > MAX_RANGES:
+            return
+        
+        if not ranges:
+            self.status_code = 416
+            self.ranges = []
+            headers["content-range"] = f"bytes */{self.file_size}"
+            return
+        
+        self.status_code = 206
+        self.ranges = ranges
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers["content-range"] = f"bytes {start}-{end}/{self.file_size}"
+        else:
+            self.boundary = uuid.uuid4().hex
+            self.part_media_type = self.media_type
+            self.media_type = f"multipart/byteranges; boundary={self.boundary}"
+    
+    def _part_header(self, start: int, end: int) -> bytes:
+        """Header preceding one part of a multipart/byteranges body."""
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.part_media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+        ).encode("latin-1")
+    
+    def _closing_boundary(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+    
+    def _content_length(self) -> int:
+        """Exact body length for the selected ranges."""
+        length = sum(end - start + 1 for start, end in self.ranges)
+        if self.boundary is not None:
+            length += sum(len(self._part_header(start, end)) + 2 for start, end in self.ranges)
+            length += len(self._closing_boundary())
+        return length
+
+
+class RangedFileResponse(RangedResponse):
+    """
+    Serve a file with range and conditional request support.
+    
+    File data is sent with the ASGI zero-copy extension (os.sendfile) when
+    the server offers it, otherwise read with os.pread in the blocking I/O pool.
+    """
+    
+    chunk_size = 256 * 1024
+    
+    def __init__(
+        self,
+        path: str,
+        request_headers: Mapping[str, str],
+        media_type: str,
+        filename: Optional[str] = None,
+        etag: Optional[str] = None,
+        stat_result: Optional[os.stat_result] = None
+    ):
+        """
+        Initialize RangedFileResponse.
+        
+        Args:
+            path: Path of the file to serve
+            request_headers: Headers of the incoming request
+            media_type: Content type of the file
+            filename: Download filename for Content-Disposition
+            etag: Strong ETag (quoted); derived from the file's identity if omitted
+            stat_result: Result of os.stat on the file, if the caller already has it
+        """
+        self.path = path
+        
+        file_stat = stat_result if stat_result is not None else os.stat(path)
+        if not stat_module.S_ISREG(file_stat.st_mode):
+            raise RuntimeError(f"File at path {path} is not a file.")
+        
+        if etag is None:
+            etag = f'"{file_stat.st_ino:x}-{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+        super().__init__(
+            file_stat.st_size, int(file_stat.st_mtime), etag, request_headers, media_type, filename
+        )
+    
+    async def _send_ranges(self, scope: Scope, send: Send) -> None:
+        self._zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        with open(self.path, "rb") as self._file:
+            await super()._send_ranges(scope, send)
+    
+    async def _send_range(self, start: int, end: int, send: Send) -> None:
+        """Send an inclusive byte range with sendfile, or read with os.pread in the blocking I/O pool."""
+        if self._zerocopy:
+            await send({
+                "type": ZEROCOPY_EXTENSION,
+                "file": self._file,
+                "offset": start,
+                "count": end - start + 1,
+                "more_body": True,
+            })
+            return
+        
+        fd = self._file.fileno()
+        position = start
+        while position <= end:
+            size = min(self.chunk_size, end - position + 1)
+            chunk = await run_blocking(os.pread, fd, size, position)
+            if not chunk:
+                break
+            position += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+
+class RangedStreamResponse(RangedResponse):
+    """
+    Serve content read by a blocking range reader (e.g. ranged GETs from
+    object storage) with range and conditional request support.
+    """
+    
+    def __init__(
+        self,
+        read_range: Callable[[int, int], Iterator[bytes]],
+        file_size: int,
+        last_modified: int,
+        etag: str,
+        request_headers: Mapping[str, str],
+        media_type: str,
+        filename: Optional[str] = None
+    ):
+        """
+        Initialize RangedStreamResponse.
+        
+        Args:
+            read_range: Callable returning an iterator over the inclusive
+                byte range (start, end); iterated in the blocking I/O pool
+            file_size: Size of the content in bytes
+            last_modified: Modification time of the content (Unix seconds)
+            etag: Strong ETag (quoted)
+            request_headers: Headers of the incoming request
+            media_type: Content type of the content
+            filename: Download filename for Content-Disposition
+        """
+        self.read_range = read_range
+        super().__init__(file_size, last_modified, etag, request_headers, media_type, filename)
+    
+    async def _send_range(self, start: int, end: int, send: Send) -> None:
+        chunks = await run_blocking(self.read_range, start, end)
+        try:
+            while True:
+                chunk = await run_blocking(next, chunks, None)
+                if chunk is None:
+                    break
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                await run_blocking(close)
@@ -0,0 +1,390 @@
+"""On-demand sampling profiler for individual requests, with collapsed-stack output."""
+
+import contextvars
+import functools
+import hmac
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+PROFILE_ID_HEADER = 'x-profile-id'
+PROFILE_TOKEN_HEADER = 'x-profile-token'
+
+# Stack labels for samples taken outside the request's own frames
+WORKER_ROOT = '[blocking-io]'
+AWAITING_ROOT = '[awaiting]'
+
+# Profile of the request the current task is handling, if it is profiled
+_current_profile: contextvars.ContextVar[Optional["_ActiveProfile"]] = contextvars.ContextVar(
+    'current_profile', default=None
+)
+
+
+def _frame_label(frame) -> str:
+    """Collapsed-stack label of a frame: module:qualified function name."""
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+@dataclass
+class ProfileRecord:
+    """A finished request profile."""
+    id: str
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration: float
+    sample_count: int
+    # Collapsed stack ("frame;frame;frame") -> number of samples
+    stacks: Dict[str, int] = field(repr=False)
+    
+    def to_dict(self) -> dict:
+        """
+        Convert ProfileRecord to JSON-serializable dictionary, without stacks.
+        
+        Returns:
+            Dictionary with request, timing and sample count fields
+        """
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "samples": self.sample_count,
+        }
+    
+    def collapsed(self) -> str:
+        """
+        Render the stacks in collapsed format, one "stack count" per line.
+        
+        The output is the input format of flamegraph.pl, speedscope and
+        similar flamegraph tools.
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class _ActiveProfile:
+    """Samples being collected for one in-flight request."""
+    
+    def __init__(self, profile_id: str, loop_thread: int, root_frame, max_stacks: int):
+        self.id = profile_id
+        self.loop_thread = loop_thread
+        self.root_frame = root_frame
+        self.max_stacks = max_stacks
+        self.started = time.monotonic()
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        # Worker thread ident -> frame of the call running on behalf of this request
+        self.workers: Dict[int, object] = {}
+    
+    def add(self, stack: str) -> None:
+        if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+            stack = '[truncated]'
+        self.stacks[stack] += 1
+        self.sample_count += 1
+
+
+class RequestProfiler:
+    """
+    Statistical profiler attributing samples to individual requests.
+    
+    While at least one profiled request is in flight, a background thread
+    reads the stack of every thread (sys._current_frames) each interval:
+    
+    - event loop frames belong to a request when its ProfilingMiddleware
+      call is on the stack; the stack is cut at that frame
+    - blocking I/O pool threads belong to the request that submitted the
+      work through run_blocking (see bind_worker), under [blocking-io]
+    - a sample where the request is in neither is counted as [awaiting]
+      (network, sleeps, or the loop running other requests)
+    
+    so sample counts times the interval approximate wall time. Work in
+    tasks the request spawns (e.g. streaming response bodies) shows up as
+    [awaiting]. Nothing runs unless a request is being profiled.
+    """
+    
+    DEFAULT_INTERVAL = 0.005  # 5ms
+    DEFAULT_MAX_PROFILES = 32
+    DEFAULT_MAX_STACKS = 5000
+    DEFAULT_MAX_DURATION = 60.0
+    
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        token: Optional[str] = None,
+        interval: float = DEFAULT_INTERVAL,
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+        max_stacks: int = DEFAULT_MAX_STACKS,
+        max_duration: float = DEFAULT_MAX_DURATION
+    ):
+        """
+        Initialize RequestProfiler.
+        
+        Args:
+            sample_rate: Fraction of requests profiled at random (0 to disable)
+            token: Secret that turns profiling on for a request sent with it
+                in the X-Profile-Token header, and grants access to profiles
+                (None to disable both)
+            interval: Seconds between stack samples
+            max_profiles: Finished profiles kept; the oldest are dropped
+            max_stacks: Distinct stacks kept per profile; more are counted as [truncated]
+            max_duration: Seconds after which a request stops being sampled
+        """
+        self.sample_rate = sample_rate
+        self.token = token or None
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_duration = max_duration
+        self.max_profiles = max_profiles
+        
+        self._profiles: "OrderedDict[str, ProfileRecord]" = OrderedDict()
+        self._active: Dict[str, _ActiveProfile] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._sampler: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any request can be profiled."""
+        return self.sample_rate > 0 or self.token is not None
+    
+    def should_profile(self, token: Optional[str]) -> bool:
+        """
+        Decide whether to profile a request.
+        
+        Args:
+            token: Value of the request's X-Profile-Token header, if any
+        
+        Returns:
+            True if the token matches or the request was sampled
+        """
+        if token is not None and self.check_token(token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def check_token(self, token: Optional[str]) -> bool:
+        """Check a token against the configured one in constant time."""
+        return self.token is not None and token is not None and hmac.compare_digest(token.encode(), self.token.encode())
+    
+    def start(self, root_frame) -> _ActiveProfile:
+        """
+        Start sampling a request.
+        
+        Args:
+            root_frame: Frame of the request's handler call on the event loop
+        
+        Returns:
+            Handle to pass to finish()
+        """
+        profile = _ActiveProfile(
+            f"{int(time.time())}-{next(self._ids)}", threading.get_ident(), root_frame, self.max_stacks
+        )
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run_sampler, name='request-profiler', daemon=True)
+                self._sampler.start()
+            self._wake.set()
+        return profile
+    
+    def finish(
+        self,
+        profile: _ActiveProfile,
+        method: str,
+        path: str,
+        status: int,
+        started_at: float,
+        duration: float
+    ) -> ProfileRecord:
+        """
+        Stop sampling a request and keep its profile.
+        
+        Returns:
+            The stored ProfileRecord
+        """
+        with self._lock:
+            self._active.pop(profile.id, None)
+            profile.root_frame = None
+            record = ProfileRecord(
+                id=profile.id,
+                method=method,
+                path=path,
+                status=status,
+                started_at=started_at,
+                duration=duration,
+                sample_count=profile.sample_count,
+                stacks=dict(profile.stacks),
+            )
+            self._profiles[record.id] = record
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return record
+    
+    def list_profiles(self) -> List[ProfileRecord]:
+        """List kept profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+    
+    def get_profile(self, profile_id: str) -> Optional[ProfileRecord]:
+        """Get a kept profile by id."""
+        with self._lock:
+            return self._profiles.get(profile_id)
+    
+    def _run_sampler(self) -> None:
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            self.sample()
+    
+    def sample(self) -> None:
+        """Take one sample of every in-flight profiled request."""
+        frames = sys._current_frames()
+        now = time.monotonic()
+        with self._lock:
+            active = [
+                profile for profile in self._active.values()
+                if now - profile.started < self.max_duration
+            ]
+        
+        roots: Dict[int, _ActiveProfile] = {}
+        loop_threads = set()
+        for profile in active:
+            if profile.root_frame is not None:
+                roots[id(profile.root_frame)] = profile
+                loop_threads.add(profile.loop_thread)
+        
+        sampled = set()
+        for thread_id in loop_threads:
+            labels = []
+            frame = frames.get(thread_id)
+            while frame is not None:
+                profile = roots.get(id(frame))
+                if profile is not None:
+                    profile.add(';'.join(reversed(labels)) or _frame_label(frame))
+                    sampled.add(profile.id)
+                    break
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+        
+        for profile in active:
+            for thread_id, root in list(profile.workers.items()):
+                labels = []
+                frame = frames.get(thread_id)
+                while frame is not None and frame is not root:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                if frame is root:
+                    labels.append(WORKER_ROOT)
+                    profile.add(';'.join(reversed(labels)))
+                    sampled.add(profile.id)
+            if profile.id not in sampled:
+                profile.add(AWAITING_ROOT)
+        del frames
+
+
+def bind_worker(func: Callable[[], T]) -> Callable[[], T]:
+    """
+    Attribute a call made in a worker thread to the current request's profile.
+    
+    Used by run_blocking; returns func unchanged unless the calling task is
+    handling a profiled request, so unprofiled requests only pay a
+    context variable lookup.
+    
+    Args:
+        func: Callable about to be submitted to a thread pool
+    
+    Returns:
+        func, or a wrapper registering the worker thread while it runs
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return func
+    
+    @functools.wraps(func)
+    def run_profiled():
+        thread_id = threading.get_ident()
+        profile.workers[thread_id] = sys._getframe()
+        try:
+            return func()
+        finally:
+            profile.workers.pop(thread_id, None)
+    return run_profiled
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests picked by a RequestProfiler.
+    
+    A profiled response carries an X-Profile-Id header naming the profile
+    to download. Only add it when the profiler is enabled; unprofiled
+    requests still pay a header scan and a random draw.
+    """
+    
+    def __init__(self, app, profiler: RequestProfiler, exclude_prefixes: Tuple[str, ...] = ()):
+        """
+        Initialize ProfilingMiddleware.
+        
+        Args:
+            app: ASGI application to wrap
+            profiler: Profiler deciding which requests to profile and keeping results
+            exclude_prefixes: Paths never profiled (e.g. the profile download endpoints)
+        """
+        self.app = app
+        self.profiler = profiler
+        self.exclude_prefixes = exclude_prefixes
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        token = None
+        for name, value in scope['headers']:
+            if name == PROFILE_TOKEN_HEADER.encode():
+                token = value.decode('latin-1')
+                break
+        if not self.profiler.should_profile(token):
+            await self.app(scope, receive, send)
+            return
+        
+        # This coroutine's frame marks the request's part of event loop stacks
+        profile = self.profiler.start(sys._getframe())
+        context_token = _current_profile.set(profile)
+        started_at = time.time()
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((PROFILE_ID_HEADER.encode(), profile.id.encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(context_token)
+            self.profiler.finish(
+                profile, scope['method'], scope['path'], status, started_at, time.perf_counter() - started
+            )
@@ -0,0 +1,252 @@
+"""
+Fingerprinted, precompressed frontend assets.
+
+Usage (build step, e.g. in the Docker image):
+    python -m backend.static_assets [static_dir]
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import brotli
+
+# Built once, so use the best ratio the codecs have
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+@dataclass
+class Asset:
+    """A servable file with its precompressed variants."""
+    name: str
+    media_type: str
+    etag: str
+    # Content coding ("identity", "gzip", "br") -> body
+    bodies: Dict[str, bytes] = field(repr=False, default_factory=dict)
+
+
+class StaticAssetService:
+    """
+    Build and serve the frontend with immutable, precompressed assets.
+    
+    The build copies each asset with a FINGERPRINT_SUFFIXES extension to
+    `<stem>.<hash><suffix>` in build_dir, rewrites the `src`/`href`
+    references to them in index.html, and writes gzip and brotli variants
+    next to every file, keeping only variants smaller than the original. A fingerprinted name changes
+    whenever the content does, so those files can be cached forever;
+    index.html keeps its URL and is revalidated instead.
+    
+    build_dir/manifest.json records a digest of the sources it was built
+    from. ensure_built() rebuilds only when the sources differ, so a build
+    made ahead of time (see the Dockerfile) turns startup into reading a
+    few small files.
+    """
+    
+    INDEX_FILENAME = 'index.html'
+    MANIFEST_FILENAME = 'manifest.json'
+    FINGERPRINT_SUFFIXES = {'.js', '.css', '.svg'}
+    COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.svg', '.html'}
+    HASH_LENGTH = 12
+    URL_PREFIX = '/assets/'
+    SOURCE_PREFIX = '/static/'
+    
+    def __init__(self, source_dir: Path, build_dir: Path, watch: bool = False):
+        """
+        Initialize StaticAssetService.
+        
+        Args:
+            source_dir: Directory holding index.html and the assets it references
+            build_dir: Directory for the fingerprinted and compressed output
+            watch: Check the sources for changes whenever index.html is
+                requested (for development; reads every source file)
+        """
+        self.source_dir = Path(source_dir)
+        self.build_dir = Path(build_dir)
+        self.watch = watch
+        self._index: Optional[Asset] = None
+        self._assets: Dict[str, Asset] = {}
+        self._source_digest: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def ensure_built(self) -> bool:
+        """
+        Build the assets unless build_dir already holds a build of the current sources,
+        and load them into memory.
+        
+        Returns:
+            True if index.html exists and the frontend can be served
+        """
+        with self._lock:
+            sources = self._source_files()
+            if self.INDEX_FILENAME not in sources:
+                self._index = None
+                self._assets = {}
+                self._source_digest = None
+                return False
+            
+            digest = self._digest(sources)
+            if digest == self._source_digest:
+                return True
+            
+            manifest = self._read_manifest()
+            if manifest is None or manifest.get('source_digest') != digest:
+                manifest = self._build(sources, digest)
+            self._load(manifest)
+            self._source_digest = digest
+            return True
+    
+    def index(self) -> Optional[Asset]:
+        """Get index.html with rewritten references, or None if there is no frontend."""
+        if self._index is None or self.watch:
+            self.ensure_built()
+        return self._index
+    
+    def get(self, name: str) -> Optional[Asset]:
+        """
+        Get a fingerprinted asset by its built name (e.g. "app.1a2b3c4d5e6f.js").
+        
+        Returns:
+            Asset, or None if no current asset has that name
+        """
+        if self._index is None:
+            self.ensure_built()
+        return self._assets.get(name)
+    
+    def _source_files(self) -> Dict[str, bytes]:
+        """Contents of index.html and the files that get fingerprinted."""
+        sources = {}
+        if not self.source_dir.is_dir():
+            return sources
+        for entry in sorted(os.scandir(self.source_dir), key=lambda e: e.name):
+            suffix = Path(entry.name).suffix
+            if entry.is_file() and (entry.name == self.INDEX_FILENAME or suffix in self.FINGERPRINT_SUFFIXES):
+                with open(entry.path, 'rb') as f:
+                    sources[entry.name] = f.read()
+        return sources
+    
+    @staticmethod
+    def _digest(sources: Dict[str, bytes]) -> str:
+        """Digest over the names and contents of the sources."""
+        digest = hashlib.sha256()
+        for name, data in sources.items():
+            digest.update(name.encode('utf-8') + b'\0')
+            digest.update(hashlib.sha256(data).digest())
+        return digest.hexdigest()
+    
+    def _read_manifest(self) -> Optional[dict]:
+        """Read the manifest of the last build, or None if there is no readable build."""
+        try:
+            with open(self.build_dir / self.MANIFEST_FILENAME, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _build(self, sources: Dict[str, bytes], digest: str) -> dict:
+        """Write fingerprinted copies, the rewritten index and compressed variants."""
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        
+        assets = {}
+        for name, data in sources.items():
+            if name == self.INDEX_FILENAME:
+                continue
+            path = Path(name)
+            built_name = f"{path.stem}.{hashlib.sha256(data).hexdigest()[:self.HASH_LENGTH]}{path.suffix}"
+            self._write_variants(built_name, data)
+            assets[name] = built_name
+        
+        self._write_variants(self.INDEX_FILENAME, self._rewrite_index(sources[self.INDEX_FILENAME], assets))
+        
+        manifest = {"source_digest": digest, "assets": assets}
+        self._write_file(self.build_dir / self.MANIFEST_FILENAME, json.dumps(manifest, indent=2).encode('utf-8'))
+        
+        # Files of previous builds are only read at load time, never served from disk
+        current = {self.MANIFEST_FILENAME, self.INDEX_FILENAME, *assets.values()}
+        for entry in os.scandir(self.build_dir):
+            name = entry.name.removesuffix('.gz').removesuffix('.br')
+            if name not in current and not name.startswith('.tmp-'):
+                Path(entry.path).unlink(missing_ok=True)
+        return manifest
+    
+    def _rewrite_index(self, html: bytes, assets: Dict[str, str]) -> bytes:
+        """Point src/href attributes referencing source assets at their fingerprinted names."""
+        def replace(match: re.Match) -> str:
+            built_name = assets.get(match.group(3))
+            if built_name is None:
+                return match.group(0)
+            return f'{match.group(1)}={match.group(2)}{self.URL_PREFIX}{built_name}{match.group(2)}'
+        
+        pattern = re.compile(r'\b(src|href)=(["\'])' + re.escape(self.SOURCE_PREFIX) + r'([^"\'?#]+)\2')
+        return pattern.sub(replace, html.decode('utf-8')).encode('utf-8')
+    
+    def _write_variants(self, name: str, data: bytes) -> None:
+        """Write a file and its compressed variants, dropping variants that do not help."""
+        self._write_file(self.build_dir / name, data)
+        for encoding, extension in (('gzip', '.gz'), ('br', '.br')):
+            variant_path = self.build_dir / (name + extension)
+            compressed = self._compress(data, encoding) if Path(name).suffix in self.COMPRESSIBLE_SUFFIXES else None
+            if compressed is not None and len(compressed) < len(data):
+                self._write_file(variant_path, compressed)
+            else:
+                variant_path.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _compress(data: bytes, encoding: str) -> bytes:
+        """Compress data with gzip or brotli."""
+        if encoding == 'gzip':
+            return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        """Write a file atomically, so other processes never read a partial build."""
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+    
+    def _load(self, manifest: dict) -> None:
+        """Read the built files listed in a manifest into memory."""
+        self._assets = {built_name: self._load_asset(built_name) for built_name in manifest['assets'].values()}
+        self._index = self._load_asset(self.INDEX_FILENAME)
+    
+    def _load_asset(self, name: str) -> Asset:
+        """Read a built file and whichever compressed variants exist."""
+        media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if media_type.startswith('text/') or media_type == 'application/javascript':
+            media_type += '; charset=utf-8'
+        data = (self.build_dir / name).read_bytes()
+        asset = Asset(name=name, media_type=media_type, etag=hashlib.sha256(data).hexdigest()[:self.HASH_LENGTH])
+        asset.bodies['identity'] = data
+        for encoding, extension in (('gzip', '.gz'), ('br', '.br')):
+            variant_path = self.build_dir / (name + extension)
+            if variant_path.is_file():
+                asset.bodies[encoding] = variant_path.read_bytes()
+        return asset
+
+
+def main(argv: List[str]) -> None:
+    source_dir = Path(argv[0]) if argv else Path('static')
+    service = StaticAssetService(source_dir, source_dir / '.build')
+    if not service.ensure_built():
+        sys.exit(f"No {StaticAssetService.INDEX_FILENAME} in {source_dir}")
+    for asset in sorted(service._assets.values(), key=lambda a: a.name) + [service.index()]:
+        sizes = ', '.join(f"{encoding} {len(body)}" for encoding, body in asset.bodies.items())
+        print(f"{asset.name}: {sizes}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,428 @@
+"""Storage backends for content-addressed blobs and the filename manifest."""
+
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from backend.ranged_file_response import content_disposition
+
+# Bytes read per chunk when streaming blob content
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class BlobInfo:
+    """Size and modification time of a stored blob."""
+    size: int
+    modified: float
+
+
+def read_json_file(path: Path) -> Dict[str, Any]:
+    """Read a JSON document, or return an empty dict if the file does not exist."""
+    if not path.is_file():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json_file(path: Path, data: dict) -> None:
+    """Write a JSON document atomically."""
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class StorageBackend(ABC):
+    """
+    Where blob content and the filename -> digest manifest are kept.
+    
+    FileStorageService owns hashing, validation and reference counting and
+    passes the local paths it uses for each blob (upload_dir/.blobs/<digest>)
+    and for the manifest. For a local backend those paths are the storage
+    itself; a remote backend keeps the content elsewhere and uses the local
+    blob path as a cache, so code that needs a real file (parsing, peak
+    computation) keeps working.
+    """
+    
+    # Whether content lives outside upload_dir and may be shared by several instances
+    remote = False
+    
+    @abstractmethod
+    def put_blob(self, sha256: str, source: Path, local_path: Path) -> None:
+        """
+        Store a completely written file as the blob for a digest.
+        
+        Args:
+            sha256: Hex SHA-256 digest of the content
+            source: Temporary file with the content; moved to local_path
+            local_path: Local blob path
+        """
+    
+    @abstractmethod
+    def stat_blob(self, sha256: str, local_path: Path) -> Optional[BlobInfo]:
+        """
+        Get the size and modification time of a blob.
+        
+        Returns:
+            BlobInfo, or None if the blob is not stored
+        """
+    
+    @abstractmethod
+    def fetch_blob(self, sha256: str, local_path: Path) -> bool:
+        """
+        Make sure the blob's content is available at local_path.
+        
+        Returns:
+            False if the blob is not stored
+        """
+    
+    @abstractmethod
+    def read_range(self, sha256: str, local_path: Path, start: int, end: int) -> Iterator[bytes]:
+        """
+        Read an inclusive byte range of a blob in chunks.
+        
+        Args:
+            sha256: Hex SHA-256 digest of the content
+            local_path: Local blob path
+            start: First byte
+            end: Last byte
+        
+        Yields:
+            Blob content
+        """
+    
+    @abstractmethod
+    def delete_blob(self, sha256: str, local_path: Path) -> None:
+        """Delete a blob and any local copy of it."""
+    
+    def presigned_url(self, sha256: str, filename: str, media_type: str) -> Optional[str]:
+        """
+        Get a temporary URL clients can download the blob from directly.
+        
+        Returns:
+            URL, or None if the backend serves content through the app
+        """
+        return None
+    
+    @abstractmethod
+    def load_manifest(self, local_path: Path) -> Dict[str, str]:
+        """
+        Read the filename -> digest manifest.
+        
+        Args:
+            local_path: Path of the manifest inside upload_dir
+        """
+    
+    @abstractmethod
+    def update_manifest(
+        self,
+        local_path: Path,
+        manifest: Dict[str, str],
+        update: Callable[[Dict[str, str]], None]
+    ) -> Dict[str, str]:
+        """
+        Apply a change to the manifest and persist it.
+        
+        Args:
+            local_path: Path of the manifest inside upload_dir
+            manifest: Manifest as last loaded by this process
+            update: Function mutating a manifest in place; may be called
+                again on a fresher copy if another instance changed it
+        
+        Returns:
+            The manifest as persisted
+        """
+
+
+class LocalStorageBackend(StorageBackend):
+    """Blobs and manifest stored as files in upload_dir."""
+    
+    def put_blob(self, sha256: str, source: Path, local_path: Path) -> None:
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        if local_path.exists():
+            os.remove(source)
+        else:
+            os.replace(source, local_path)
+    
+    def stat_blob(self, sha256: str, local_path: Path) -> Optional[BlobInfo]:
+        try:
+            stat = local_path.stat()
+        except FileNotFoundError:
+            return None
+        return BlobInfo(size=stat.st_size, modified=stat.st_mtime)
+    
+    def fetch_blob(self, sha256: str, local_path: Path) -> bool:
+        return local_path.is_file()
+    
+    def read_range(self, sha256: str, local_path: Path, start: int, end: int) -> Iterator[bytes]:
+        with open(local_path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+    
+    def delete_blob(self, sha256: str, local_path: Path) -> None:
+        local_path.unlink(missing_ok=True)
+    
+    def load_manifest(self, local_path: Path) -> Dict[str, str]:
+        return read_json_file(local_path)
+    
+    def update_manifest(
+        self,
+        local_path: Path,
+        manifest: Dict[str, str],
+        update: Callable[[Dict[str, str]], None]
+    ) -> Dict[str, str]:
+        update(manifest)
+        write_json_file(local_path, manifest)
+        return manifest
+
+
+def create_s3_client(endpoint_url: Optional[str] = None, region_name: Optional[str] = None) -> Any:
+    """
+    Create a boto3 S3 client.
+    
+    Credentials come from the usual AWS environment variables or config.
+    
+    Args:
+        endpoint_url: Endpoint of an S3-compatible service (None for AWS)
+        region_name: Region of the bucket
+    
+    Raises:
+        RuntimeError: If boto3 is not installed
+    """
+    try:
+        import boto3
+    except ImportError as e:
+        raise RuntimeError("S3 storage requires boto3 (pip install boto3)") from e
+    return boto3.client('s3', endpoint_url=endpoint_url, region_name=region_name)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """Error code of a botocore ClientError (or compatible exception), if any."""
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return None
+    return str(response.get('Error', {}).get('Code', '')) or None
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Blobs and manifest stored in an S3-compatible bucket.
+    
+    Works with a boto3 S3 client (or anything with the same methods).
+    Large blobs are uploaded with multipart upload; ranges are read with
+    ranged GETs, and audio can be served from presigned URLs so the bytes
+    never pass through the app. The manifest is a single JSON object
+    updated with conditional writes (If-Match), so instances sharing the
+    bucket do not overwrite each other's changes.
+    
+    The local blob path keeps a cached copy: uploads leave their temporary
+    file there and fetch_blob downloads on demand.
+    """
+    
+    remote = True
+    
+    BLOBS_PREFIX = 'blobs/'
+    MANIFEST_KEY = 'manifest.json'
+    
+    # S3 requires parts of at least 5MB (except the last)
+    DEFAULT_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+    DEFAULT_PART_SIZE = 16 * 1024 * 1024
+    DEFAULT_PRESIGN_EXPIRES = 60 * 60
+    MAX_MANIFEST_RETRIES = 10
+    
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        prefix: str = '',
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        part_size: int = DEFAULT_PART_SIZE,
+        presign_expires: int = DEFAULT_PRESIGN_EXPIRES,
+        presign: bool = True
+    ):
+        """
+        Initialize S3StorageBackend.
+        
+        Args:
+            client: boto3 S3 client
+            bucket: Bucket name
+            prefix: Key prefix for everything this service stores
+            multipart_threshold: Blobs at least this large use multipart upload
+            part_size: Size of each multipart upload part
+            presign_expires: Lifetime of presigned URLs in seconds
+            presign: Whether to hand out presigned URLs at all
+        """
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.presign_expires = presign_expires
+        self.presign = presign
+        # ETag of the manifest as last read, for conditional requests
+        self._manifest_etag: Optional[str] = None
+        self._manifest: Dict[str, str] = {}
+    
+    def blob_key(self, sha256: str) -> str:
+        """Object key of a blob."""
+        return f"{self.prefix}{self.BLOBS_PREFIX}{sha256}"
+    
+    @property
+    def manifest_key(self) -> str:
+        """Object key of the manifest."""
+        return f"{self.prefix}{self.MANIFEST_KEY}"
+    
+    def put_blob(self, sha256: str, source: Path, local_path: Path) -> None:
+        if self.stat_blob(sha256, local_path) is None:
+            if source.stat().st_size >= self.multipart_threshold:
+                self._multipart_upload(self.blob_key(sha256), source)
+            else:
+                with open(source, 'rb') as f:
+                    self.client.put_object(Bucket=self.bucket, Key=self.blob_key(sha256), Body=f)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        if local_path.exists():
+            os.remove(source)
+        else:
+            os.replace(source, local_path)
+    
+    def _multipart_upload(self, key: str, source: Path) -> None:
+        """Upload a file in parts, aborting the upload on failure."""
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)['UploadId']
+        try:
+            parts = []
+            with open(source, 'rb') as f:
+                for part_number in range(1, 10001):
+                    data = f.read(self.part_size)
+                    if not data:
+                        break
+                    response = self.client.upload_part(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id,
+                        PartNumber=part_number, Body=data
+                    )
+                    parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+    
+    def stat_blob(self, sha256: str, local_path: Path) -> Optional[BlobInfo]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self.blob_key(sha256))
+        except Exception as e:
+            if _error_code(e) in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return BlobInfo(size=response['ContentLength'], modified=response['LastModified'].timestamp())
+    
+    def fetch_blob(self, sha256: str, local_path: Path) -> bool:
+        if local_path.is_file():
+            return True
+        
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.blob_key(sha256))
+        except Exception as e:
+            if _error_code(e) in ('404', 'NoSuchKey'):
+                return False
+            raise
+        
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = local_path.with_name(f"{local_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in iter(lambda: response['Body'].read(READ_CHUNK_SIZE), b''):
+                    f.write(chunk)
+            os.replace(temp_path, local_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return True
+    
+    def read_range(self, sha256: str, local_path: Path, start: int, end: int) -> Iterator[bytes]:
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self.blob_key(sha256), Range=f"bytes={start}-{end}"
+        )
+        body = response['Body']
+        try:
+            yield from iter(lambda: body.read(READ_CHUNK_SIZE), b'')
+        finally:
+            body.close()
+    
+    def delete_blob(self, sha256: str, local_path: Path) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.blob_key(sha256))
+        local_path.unlink(missing_ok=True)
+    
+    def presigned_url(self, sha256: str, filename: str, media_type: str) -> Optional[str]:
+        if not self.presign:
+            return None
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': self.blob_key(sha256),
+                'ResponseContentType': media_type,
+                'ResponseContentDisposition': content_disposition(filename),
+            },
+            ExpiresIn=self.presign_expires
+        )
+    
+    def load_manifest(self, local_path: Path) -> Dict[str, str]:
+        self._manifest, self._manifest_etag = self._get_manifest(self._manifest_etag)
+        return dict(self._manifest)
+    
+    def _get_manifest(self, etag: Optional[str]) -> Tuple[Dict[str, str], Optional[str]]:
+        """Read the manifest object, reusing the last copy if its ETag still matches."""
+        kwargs = {'IfNoneMatch': etag} if etag is not None else {}
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.manifest_key, **kwargs)
+        except Exception as e:
+            code = _error_code(e)
+            if code in ('304', 'NotModified'):
+                return self._manifest, etag
+            if code in ('404', 'NoSuchKey'):
+                return {}, None
+            raise
+        body = response['Body']
+        try:
+            return json.loads(body.read()), response['ETag']
+        finally:
+            body.close()
+    
+    def update_manifest(
+        self,
+        local_path: Path,
+        manifest: Dict[str, str],
+        update: Callable[[Dict[str, str]], None]
+    ) -> Dict[str, str]:
+        for _ in range(self.MAX_MANIFEST_RETRIES):
+            current, etag = self._get_manifest(self._manifest_etag)
+            current = dict(current)
+            update(current)
+            condition = {'IfMatch': etag} if etag is not None else {'IfNoneMatch': '*'}
+            try:
+                response = self.client.put_object(
+                    Bucket=self.bucket, Key=self.manifest_key,
+                    Body=json.dumps(current, ensure_ascii=False).encode('utf-8'),
+                    ContentType='application/json', **condition
+                )
+            except Exception as e:
+                # Another instance wrote first: retry on its version
+                if _error_code(e) in ('412', 'PreconditionFailed', 'ConditionalRequestConflict'):
+                    self._manifest_etag = None
+                    continue
+                raise
+            self._manifest, self._manifest_etag = current, response['ETag']
+            return dict(current)
+        raise IOError("Manifest update kept conflicting with other writers")
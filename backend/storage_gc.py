@@ -0,0 +1,371 @@
+"""Background garbage collection and quota enforcement for the upload directory."""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.blocking_io import run_blocking
+from backend.file_storage import FileStorageService, allocated_bytes
+from backend.upload_sessions import UploadSessionService
+from backend.waveform_peaks import WaveformPeakService
+
+logger = logging.getLogger(__name__)
+
+
+async def _repeat(func: Callable[[], Awaitable], interval: float, delay: float, description: str) -> None:
+    """Await func every interval seconds until cancelled, logging failures."""
+    if delay > 0:
+        await asyncio.sleep(delay)
+    while True:
+        try:
+            await func()
+        except Exception:
+            logger.exception("%s failed", description)
+        await asyncio.sleep(interval)
+
+
+@dataclass
+class SweepReport:
+    """What one garbage collection sweep removed."""
+    files_deleted: int = 0
+    temp_files_deleted: int = 0
+    sessions_expired: int = 0
+    bytes_reclaimed: int = 0
+    # Stored content (blobs and legacy files) left after the sweep
+    bytes_stored: int = 0
+    duration: float = 0.0
+    
+    def to_dict(self) -> dict:
+        """
+        Convert SweepReport to JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary with all report fields
+        """
+        return asdict(self)
+
+
+class StorageCollector:
+    """
+    Reclaims disk space in upload_dir.
+    
+    Each sweep:
+    1. removes partial writes in .incoming (and stray temporary files next
+       to peak sidecars and the manifest) not modified for incoming_ttl
+    2. expires inactive upload sessions
+    3. removes peak sidecars whose audio no longer exists
+    4. deletes files not accessed within file_ttl
+    5. deletes least recently accessed files until stored content fits in
+       max_total_bytes
+    
+    Access times come from FileStorageService.get_file_path. Work is split
+    into steps touching at most batch_size files, each run in the blocking
+    I/O pool, so a sweep over a large directory never holds up requests.
+    A file accessed after the sweep picked it is kept.
+    """
+    
+    DEFAULT_INCOMING_TTL = 60 * 60  # 1 hour
+    DEFAULT_BATCH_SIZE = 64
+    TEMP_SUFFIX = '.tmp'
+    
+    def __init__(
+        self,
+        file_storage: FileStorageService,
+        upload_sessions: Optional[UploadSessionService] = None,
+        waveform_peaks: Optional[WaveformPeakService] = None,
+        max_total_bytes: int = 0,
+        file_ttl: float = 0,
+        incoming_ttl: float = DEFAULT_INCOMING_TTL,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        """
+        Initialize StorageCollector.
+        
+        Args:
+            file_storage: Storage service to collect
+            upload_sessions: Resumable upload sessions to expire, if any
+            waveform_peaks: Peak sidecar service to clean up after, if any
+            max_total_bytes: Quota for stored content in bytes (0 for no quota)
+            file_ttl: Seconds without access after which a file is deleted (0 to keep files)
+            incoming_ttl: Seconds without writes after which a partial file is abandoned
+            batch_size: Files handled per step in the blocking I/O pool
+        """
+        self.file_storage = file_storage
+        self.upload_sessions = upload_sessions
+        self.waveform_peaks = waveform_peaks
+        self.max_total_bytes = max_total_bytes
+        self.file_ttl = file_ttl
+        self.incoming_ttl = incoming_ttl
+        self.batch_size = batch_size
+        
+        self.last_report: Optional[SweepReport] = None
+        self.total_bytes_reclaimed = 0
+        # Upload directory usage as of the last measure_usage()
+        self.disk_files = 0
+        self.disk_bytes = 0
+    
+    async def run(self, interval: float, delay: float = 0.0) -> None:
+        """
+        Sweep every interval seconds until cancelled.
+        
+        A failed sweep is logged and retried at the next interval.
+        
+        Args:
+            interval: Seconds between the end of one sweep and the next
+            delay: Seconds to wait before the first sweep
+        """
+        await _repeat(self.sweep, interval, delay, "Storage sweep")
+    
+    async def run_usage(self, interval: float, delay: float = 0.0) -> None:
+        """
+        Measure upload directory usage every interval seconds until cancelled.
+        
+        Args:
+            interval: Seconds between the end of one measurement and the next
+            delay: Seconds to wait before the first measurement
+        """
+        await _repeat(self.measure_usage, interval, delay, "Disk usage measurement")
+    
+    async def measure_usage(self) -> Tuple[int, int]:
+        """
+        Walk upload_dir in the blocking I/O pool and keep the result in
+        disk_files and disk_bytes, so metrics can report it without a walk.
+        
+        Returns:
+            Tuple of (number of files, bytes allocated)
+        """
+        self.disk_files, self.disk_bytes = await run_blocking(self.file_storage.disk_usage)
+        return self.disk_files, self.disk_bytes
+    
+    async def sweep(self, now: Optional[float] = None) -> SweepReport:
+        """
+        Run one incremental sweep.
+        
+        Args:
+            now: Current time (defaults to time.time())
+        
+        Returns:
+            SweepReport of what was removed
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        report = SweepReport()
+        
+        await self._remove_temp_files(report, now)
+        if self.upload_sessions is not None:
+            await run_blocking(self._expire_sessions, report, now)
+        if self.waveform_peaks is not None:
+            await self._remove_orphan_sidecars(report)
+        await self._evict_files(report, now)
+        await run_blocking(self.file_storage.save_access_times)
+        
+        report.duration = time.perf_counter() - started
+        self.last_report = report
+        self.total_bytes_reclaimed += report.bytes_reclaimed
+        if report.bytes_reclaimed:
+            logger.info(
+                "Storage sweep reclaimed %d bytes (%d files, %d temporary files, %d sessions); %d bytes stored",
+                report.bytes_reclaimed, report.files_deleted, report.temp_files_deleted,
+                report.sessions_expired, report.bytes_stored
+            )
+        return report
+    
+    def _batches(self, items: list) -> List[list]:
+        """Split items into steps of batch_size."""
+        return [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+    
+    # Temporary files
+    
+    def _list_temp_files(self) -> List[Path]:
+        """List partial writes and stray temporary files."""
+        upload_dir = self.file_storage.upload_dir
+        paths: List[Path] = []
+        incoming_dir = upload_dir / FileStorageService.INCOMING_DIRNAME
+        if incoming_dir.is_dir():
+            paths.extend(Path(entry.path) for entry in os.scandir(incoming_dir) if entry.is_file())
+        
+        temp_dirs = [upload_dir, upload_dir / FileStorageService.BLOBS_DIRNAME]
+        if self.waveform_peaks is not None:
+            temp_dirs.append(self.waveform_peaks.peaks_dir)
+        for directory in temp_dirs:
+            if directory.is_dir():
+                paths.extend(
+                    Path(entry.path) for entry in os.scandir(directory)
+                    if entry.name.endswith(self.TEMP_SUFFIX) and entry.is_file()
+                )
+        return paths
+    
+    @staticmethod
+    def _remove_stale(paths: List[Path], cutoff: float) -> Tuple[int, int]:
+        """
+        Remove files last modified before cutoff.
+        
+        Returns:
+            Tuple of (files removed, bytes freed)
+        """
+        removed = 0
+        freed = 0
+        for path in paths:
+            try:
+                stat = path.stat()
+                if stat.st_mtime >= cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += allocated_bytes(stat)
+        return removed, freed
+    
+    async def _remove_temp_files(self, report: SweepReport, now: float) -> None:
+        paths = await run_blocking(self._list_temp_files)
+        for batch in self._batches(paths):
+            removed, freed = await run_blocking(self._remove_stale, batch, now - self.incoming_ttl)
+            report.temp_files_deleted += removed
+            report.bytes_reclaimed += freed
+    
+    # Upload sessions
+    
+    def _sessions_bytes(self) -> int:
+        """Disk space used by upload sessions."""
+        total = 0
+        for root, _, files in os.walk(self.upload_sessions.sessions_dir):
+            for name in files:
+                try:
+                    total += allocated_bytes(os.stat(os.path.join(root, name)))
+                except FileNotFoundError:
+                    pass
+        return total
+    
+    def _expire_sessions(self, report: SweepReport, now: float) -> None:
+        before = self._sessions_bytes()
+        report.sessions_expired += self.upload_sessions.expire_sessions(now=now)
+        # Active sessions may grow meanwhile; never report negative savings
+        report.bytes_reclaimed += max(0, before - self._sessions_bytes())
+    
+    # Peak sidecars
+    
+    def _list_sidecars(self) -> List[Path]:
+        peaks_dir = self.waveform_peaks.peaks_dir
+        if not peaks_dir.is_dir():
+            return []
+        suffix = WaveformPeakService.SIDECAR_SUFFIX
+        return [Path(entry.path) for entry in os.scandir(peaks_dir) if entry.name.endswith(suffix)]
+    
+    def _remove_orphans(self, sidecars: List[Path]) -> Tuple[int, int]:
+        """
+        Remove sidecars of audio that is no longer stored.
+        
+        Returns:
+            Tuple of (sidecars removed, bytes freed)
+        """
+        storage = self.file_storage
+        removed = 0
+        freed = 0
+        for sidecar in sidecars:
+            source_name = sidecar.name[:-len(WaveformPeakService.SIDECAR_SUFFIX)]
+            if storage.SHA256_PATTERN.match(source_name):
+                source_exists = storage.get_blob_info(source_name) is not None
+            else:
+                source_exists = (storage.upload_dir / source_name).exists()
+            if source_exists:
+                continue
+            try:
+                stat = sidecar.stat()
+                os.remove(sidecar)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += allocated_bytes(stat)
+        return removed, freed
+    
+    async def _remove_orphan_sidecars(self, report: SweepReport) -> None:
+        sidecars = await run_blocking(self._list_sidecars)
+        for batch in self._batches(sidecars):
+            removed, freed = await run_blocking(self._remove_orphans, batch)
+            report.temp_files_deleted += removed
+            report.bytes_reclaimed += freed
+    
+    # Stored files
+    
+    def _describe_files(self, names: List[str]) -> List[Tuple[float, str, str, int]]:
+        """
+        Look up access time, content and size of stored files.
+        
+        Returns:
+            (accessed_at, filename, content key, size) for files that still
+            exist; the key is the blob digest, or the name of a legacy file
+        """
+        storage = self.file_storage
+        entries = []
+        for name in names:
+            accessed_at = storage.get_access_time(name)
+            if accessed_at is None:
+                continue
+            sha256 = storage.get_file_hash(name)
+            if sha256 is not None:
+                info = storage.get_blob_info(sha256)
+                if info is None:
+                    continue
+                entries.append((accessed_at, name, sha256, info.size))
+            else:
+                try:
+                    size = (storage.upload_dir / name).stat().st_size
+                except OSError:
+                    continue
+                entries.append((accessed_at, name, name, size))
+        return entries
+    
+    def _evict(self, victims: List[Tuple[str, float]]) -> Tuple[int, int]:
+        """
+        Delete picked files that have not been accessed since.
+        
+        Returns:
+            Tuple of (files deleted, bytes freed)
+        """
+        deleted = 0
+        freed = 0
+        for name, accessed_at in victims:
+            size = self.file_storage.evict_file(name, accessed_at)
+            if size is not None:
+                deleted += 1
+                freed += size
+        return deleted, freed
+    
+    async def _evict_files(self, report: SweepReport, now: float) -> None:
+        names = await run_blocking(self.file_storage.list_files)
+        entries: List[Tuple[float, str, str, int]] = []
+        for batch in self._batches(names):
+            entries.extend(await run_blocking(self._describe_files, batch))
+        
+        # Several names may share one content-addressed blob; its space is
+        # only freed with the last of them
+        references = Counter(key for _, _, key, _ in entries)
+        sizes: Dict[str, int] = {key: size for _, _, key, size in entries}
+        stored = sum(sizes.values())
+        
+        expire_before = now - self.file_ttl if self.file_ttl else None
+        victims: List[Tuple[str, float]] = []
+        for accessed_at, name, key, _ in sorted(entries):
+            expired = expire_before is not None and accessed_at < expire_before
+            over_quota = self.max_total_bytes > 0 and stored > self.max_total_bytes
+            if not expired and not over_quota:
+                # Entries are oldest first, so nothing later qualifies either
+                break
+            victims.append((name, accessed_at))
+            references[key] -= 1
+            if references[key] == 0:
+                stored -= sizes[key]
+        
+        freed_total = 0
+        for batch in self._batches(victims):
+            deleted, freed = await run_blocking(self._evict, batch)
+            report.files_deleted += deleted
+            freed_total += freed
+        report.bytes_reclaimed += freed_total
+        report.bytes_stored = sum(sizes.values()) - freed_total
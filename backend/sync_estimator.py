@@ -0,0 +1,250 @@
+"""Estimate the offset and drift between subtitle cues and WAV audio."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from backend.waveform_peaks import map_wav_samples, normalize_samples
+from backend.wav_header import read_wav_info
+
+
+@dataclass
+class SyncEstimate:
+    """
+    Correction that aligns cues with the audio.
+    
+    A cue time t maps to t + offset + drift * t in the audio.
+    """
+    offset: float
+    drift: float
+    confidence: float
+    # (cue time, local offset) measured per analysis segment
+    segments: List[Tuple[float, float]] = field(default_factory=list)
+    
+    def to_dict(self) -> dict:
+        """
+        Convert SyncEstimate to JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary with offset, drift, drift in ppm, confidence and segments
+        """
+        return {
+            "offset": self.offset,
+            "drift": self.drift,
+            "drift_ppm": self.drift * 1e6,
+            "confidence": self.confidence,
+            "segments": [{"time": time, "offset": offset} for time, offset in self.segments],
+        }
+
+
+class SyncEstimator:
+    """
+    Estimates subtitle timing errors from voice activity in the audio.
+    
+    The memory-mapped WAV data is reduced block by block to a log-energy
+    envelope with one value per analysis frame, and mapped to a soft voice
+    activity signal between its noise floor and speech level percentiles.
+    Cue start/end times become a coverage signal at the same frame rate.
+    The FFT cross-correlation of the two gives the constant offset; the same
+    correlation over consecutive segments of the audio gives local offsets,
+    and a weighted line through them gives the drift.
+    """
+    
+    # Frames reduced per NumPy pass; small enough for the float32 copy of a
+    # block to stay in cache, which is faster than larger passes
+    BLOCK_FRAMES = 1 << 16
+    
+    # Percentiles of frame log-energy treated as silence and as speech
+    NOISE_PERCENTILE = 20
+    SPEECH_PERCENTILE = 80
+    # Minimum gap between them (log10 power, i.e. 6 dB) for any activity to count
+    MIN_DYNAMIC_RANGE = 0.6
+    
+    def __init__(
+        self,
+        frame_seconds: float = 0.02,
+        max_offset: float = 60.0,
+        segment_seconds: float = 300.0,
+        max_segment_deviation: float = 5.0
+    ):
+        """
+        Initialize SyncEstimator.
+        
+        Args:
+            frame_seconds: Resolution of the envelopes in seconds
+            max_offset: Largest constant offset searched, in seconds either way
+            segment_seconds: Length of the segments used to measure drift
+            max_segment_deviation: Largest local offset change searched per segment
+        """
+        self.frame_seconds = frame_seconds
+        self.max_offset = max_offset
+        self.segment_seconds = segment_seconds
+        self.max_segment_deviation = max_segment_deviation
+    
+    def estimate(self, audio_path: Path, starts: Sequence[float], ends: Sequence[float]) -> SyncEstimate:
+        """
+        Estimate the offset and drift of cues relative to an audio file.
+        
+        Args:
+            audio_path: Path of the WAV file
+            starts: Cue start times in seconds
+            ends: Cue end times in seconds
+        
+        Returns:
+            SyncEstimate for the cues
+        
+        Raises:
+            ValueError: If the audio is not a supported WAV file, or there is
+                no speech or no cue to align
+        """
+        activity = self.voice_activity(audio_path)
+        coverage = self.cue_coverage(starts, ends, len(activity))
+        if not coverage.any():
+            raise ValueError("No cues to align")
+        if not activity.any():
+            raise ValueError("No voice activity found in the audio")
+        
+        max_lag = int(round(self.max_offset / self.frame_seconds))
+        lag, confidence = self._best_lag(activity, coverage, -max_lag, max_lag)
+        
+        segments, weights = self._segment_offsets(activity, coverage, lag)
+        offset = lag * self.frame_seconds
+        drift = 0.0
+        if len(segments) >= 2:
+            times = np.array([time for time, _ in segments])
+            offsets = np.array([segment_offset for _, segment_offset in segments])
+            # Weighted least squares line offset(t) = offset + drift * t
+            drift, offset = np.polyfit(times, offsets, 1, w=np.sqrt(weights))
+        
+        return SyncEstimate(
+            offset=float(offset),
+            drift=float(drift),
+            confidence=float(confidence),
+            segments=segments
+        )
+    
+    def voice_activity(self, audio_path: Path) -> np.ndarray:
+        """
+        Compute a zero-mean voice activity envelope of a WAV file.
+        
+        Args:
+            audio_path: Path of the WAV file
+        
+        Returns:
+            float32 array with one value per analysis frame
+        
+        Raises:
+            ValueError: If the file is not a supported WAV file
+        """
+        info = read_wav_info(audio_path)
+        frame_size = max(1, int(round(info.sample_rate * self.frame_seconds)))
+        frame_count = info.frame_count // frame_size
+        if frame_count == 0:
+            return np.zeros(0, dtype=np.float32)
+        
+        samples = map_wav_samples(audio_path, info)
+        energy = np.empty(frame_count, dtype=np.float32)
+        block_frames = max(frame_size, self.BLOCK_FRAMES // frame_size * frame_size)
+        for block_start in range(0, frame_count * frame_size, block_frames):
+            block = normalize_samples(samples[block_start:min(block_start + block_frames, frame_count * frame_size)])
+            rows = block.astype(np.float32).reshape(len(block) // frame_size, -1)
+            first = block_start // frame_size
+            energy[first:first + len(rows)] = np.einsum('ij,ij->i', rows, rows)
+        del samples
+        
+        log_energy = np.log10(energy + 1.0, out=energy)
+        noise, speech = np.percentile(log_energy, [self.NOISE_PERCENTILE, self.SPEECH_PERCENTILE])
+        if speech - noise < self.MIN_DYNAMIC_RANGE:
+            return np.zeros(frame_count, dtype=np.float32)
+        activity = np.clip((log_energy - noise) / (speech - noise), 0.0, 1.0, out=log_energy)
+        activity -= activity.mean()
+        return activity
+    
+    def cue_coverage(self, starts: Sequence[float], ends: Sequence[float], frame_count: int) -> np.ndarray:
+        """
+        Build a zero-mean signal that is high while any cue is shown.
+        
+        Args:
+            starts: Cue start times in seconds
+            ends: Cue end times in seconds
+            frame_count: Length of the signal in analysis frames
+        
+        Returns:
+            float32 array with one value per analysis frame
+        """
+        first = np.clip(np.rint(np.asarray(starts, dtype=np.float64) / self.frame_seconds), 0, frame_count).astype(np.int64)
+        last = np.clip(np.rint(np.asarray(ends, dtype=np.float64) / self.frame_seconds), 0, frame_count).astype(np.int64)
+        keep = last > first
+        
+        edges = np.zeros(frame_count + 1, dtype=np.int32)
+        np.add.at(edges, first[keep], 1)
+        np.add.at(edges, last[keep], -1)
+        coverage = (np.cumsum(edges[:-1]) > 0).astype(np.float32)
+        if coverage.any():
+            coverage -= coverage.mean()
+        return coverage
+    
+    def _segment_offsets(
+        self,
+        activity: np.ndarray,
+        coverage: np.ndarray,
+        lag: int
+    ) -> Tuple[List[Tuple[float, float]], np.ndarray]:
+        """
+        Measure the local offset of each audio segment around the global lag.
+        
+        Returns:
+            Tuple of ([(cue time at segment centre, offset)], weights), only
+            for segments with both speech and cues
+        """
+        segment_frames = int(round(self.segment_seconds / self.frame_seconds))
+        deviation = int(round(self.max_segment_deviation / self.frame_seconds))
+        segments: List[Tuple[float, float]] = []
+        weights: List[float] = []
+        
+        for start in range(0, len(activity) - segment_frames // 2, segment_frames):
+            stop = min(start + segment_frames, len(activity))
+            # Audio frame n lines up with cue frame n - lag
+            low = max(0, start - lag - deviation)
+            high = min(len(coverage), stop - lag + deviation)
+            if high <= low:
+                continue
+            audio_segment = activity[start:stop]
+            cue_segment = coverage[low:high]
+            if not audio_segment.any() or not cue_segment.any():
+                continue
+            
+            # Audio frame start + n + k against cue frame low + n is lag start + k - low
+            shift = start - low
+            k, score = self._best_lag(audio_segment, cue_segment, lag - deviation - shift, lag + deviation - shift)
+            if score <= 0:
+                continue
+            segment_lag = k + shift
+            centre = (start + stop) / 2 - segment_lag
+            segments.append((centre * self.frame_seconds, segment_lag * self.frame_seconds))
+            weights.append(score)
+        
+        return segments, np.array(weights)
+    
+    @staticmethod
+    def _best_lag(signal: np.ndarray, reference: np.ndarray, min_lag: int, max_lag: int) -> Tuple[int, float]:
+        """
+        Find the lag k in [min_lag, max_lag] maximizing sum(signal[n + k] * reference[n]).
+        
+        Returns:
+            Tuple of (lag, normalized correlation at that lag)
+        """
+        size = 1 << int(len(signal) + len(reference) - 1).bit_length()
+        spectrum = np.fft.rfft(signal, size) * np.conj(np.fft.rfft(reference, size))
+        correlation = np.fft.irfft(spectrum, size)
+        
+        # Negative lags wrap around to the end of the circular correlation
+        lags = np.arange(max(min_lag, -(len(reference) - 1)), min(max_lag, len(signal) - 1) + 1)
+        if len(lags) == 0:
+            return 0, 0.0
+        values = correlation[lags % size]
+        best = int(np.argmax(values))
+        norm = float(np.linalg.norm(signal) * np.linalg.norm(reference))
+        return int(lags[best]), float(values[best] / norm) if norm else 0.0
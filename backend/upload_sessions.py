@@ -0,0 +1,418 @@
+"""Resumable upload sessions for large files."""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from collections import Counter
+from typing import AsyncIterator, List, Optional
+
+from backend import metrics
+from backend.blocking_io import open_async, run_blocking
+from backend.file_storage import FileStorageService
+from backend.vtt_parser import VTTStreamParser
+
+
+class UploadSessionError(Exception):
+    """Raised when an upload session operation is not allowed."""
+    
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class UploadSessionService:
+    """
+    Service for tus-style resumable uploads built on FileStorageService.
+    
+    Each session lives in upload_dir/.sessions/<id>/ with a preallocated
+    data file and a meta.json recording the declared size and the byte
+    ranges received so far, so sessions survive a process restart. Chunks
+    may be written sequentially (PATCH at the current offset) or in
+    parallel at arbitrary offsets. Finalizing hashes the data and hands it
+    to FileStorageService.commit_blob.
+    
+    Sessions are expected to be served by a single process; concurrent
+    chunk writes are safe because range bookkeeping holds a lock around
+    each metadata read-modify-write. Completing a session excludes chunk
+    writes, aborts and other completes of it: whichever comes second gets
+    a 409.
+    """
+    
+    SESSIONS_DIRNAME = '.sessions'
+    DATA_FILENAME = 'data.part'
+    META_FILENAME = 'meta.json'
+    SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+    DEFAULT_SESSION_TTL = 24 * 60 * 60  # 24 hours
+    
+    KIND_EXTENSIONS = {
+        'audio': FileStorageService.ALLOWED_AUDIO_EXTENSIONS,
+        'subtitle': FileStorageService.ALLOWED_SUBTITLE_EXTENSIONS,
+        'image': FileStorageService.ALLOWED_IMAGE_EXTENSIONS,
+    }
+    
+    def __init__(self, file_storage: FileStorageService, session_ttl: int = DEFAULT_SESSION_TTL):
+        """
+        Initialize UploadSessionService.
+        
+        Args:
+            file_storage: Storage service that receives finished uploads
+            session_ttl: Seconds without activity after which a session expires
+        """
+        self.file_storage = file_storage
+        self.session_ttl = session_ttl
+        self._meta_lock = threading.Lock()
+        # Chunk writes in flight and sessions being completed; guarded by _meta_lock
+        self._writers: Counter = Counter()
+        self._completing: set = set()
+    
+    @property
+    def sessions_dir(self) -> Path:
+        """Directory holding all upload sessions."""
+        return self.file_storage.upload_dir / self.SESSIONS_DIRNAME
+    
+    def create_session(self, filename: str, size: int, kind: str) -> dict:
+        """
+        Create a new upload session.
+        
+        Args:
+            filename: Original filename
+            size: Total size of the file in bytes
+            kind: File kind ("audio", "subtitle" or "image")
+        
+        Returns:
+            Session status dictionary
+        
+        Raises:
+            UploadSessionError: If the file kind, name or size is not accepted
+        """
+        allowed_extensions = self.KIND_EXTENSIONS.get(kind)
+        if allowed_extensions is None:
+            raise UploadSessionError(400, f"지원되지 않는 파일 종류입니다: {kind}")
+        
+        if not filename or not filename.strip():
+            raise UploadSessionError(400, "올바른 파일명이 아닙니다")
+        
+        file_ext = Path(filename).suffix.lower()
+        if file_ext not in allowed_extensions:
+            raise UploadSessionError(400, f"지원되지 않는 파일 형식입니다 (업로드된 파일: {file_ext or '확장자 없음'})")
+        
+        if size <= 0:
+            raise UploadSessionError(400, "파일이 비어있습니다")
+        
+        if size > self.file_storage.MAX_FILE_SIZE:
+            max_size_gb = self.file_storage.MAX_FILE_SIZE / (1024**3)
+            raise UploadSessionError(413, f"파일 크기가 너무 큽니다 (최대 {max_size_gb:.1f}GB)")
+        
+        self.expire_sessions()
+        
+        session_id = uuid.uuid4().hex
+        session_dir = self.sessions_dir / session_id
+        session_dir.mkdir(parents=True)
+        
+        # Preallocate (sparse) so chunks can be written at any offset
+        with open(session_dir / self.DATA_FILENAME, 'wb') as f:
+            f.truncate(size)
+        
+        now = time.time()
+        meta = {
+            "id": session_id,
+            "filename": self.file_storage.sanitize_filename(filename),
+            "kind": kind,
+            "size": size,
+            "ranges": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._save_meta(session_dir, meta)
+        return self._status(meta)
+    
+    def get_session(self, session_id: str) -> dict:
+        """
+        Get the status of an upload session.
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Session status dictionary
+        
+        Raises:
+            UploadSessionError: If the session does not exist or has expired
+        """
+        return self._status(self._load_meta(session_id))
+    
+    async def write_chunk(
+        self,
+        session_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        sequential: bool = False
+    ) -> dict:
+        """
+        Write a chunk of data at an offset.
+        
+        Bytes are recorded as received as they are written, so a dropped
+        connection keeps whatever arrived.
+        
+        Args:
+            session_id: Session identifier
+            offset: Byte offset the chunk starts at
+            chunks: Async iterator over the chunk body
+            sequential: Require offset to equal the current contiguous offset (tus PATCH)
+        
+        Returns:
+            Session status dictionary after the write
+        
+        Raises:
+            UploadSessionError: If the session is unknown, the offset is wrong
+                or the chunk runs past the declared size
+        """
+        with self._meta_lock:
+            if session_id in self._completing:
+                raise UploadSessionError(409, "업로드를 완료하는 중입니다")
+            self._writers[session_id] += 1
+        try:
+            return await self._write_chunk(session_id, offset, chunks, sequential)
+        finally:
+            with self._meta_lock:
+                self._writers[session_id] -= 1
+                if not self._writers[session_id]:
+                    del self._writers[session_id]
+    
+    async def _write_chunk(
+        self,
+        session_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        sequential: bool
+    ) -> dict:
+        """Implementation of write_chunk, run while registered as a writer."""
+        meta = await run_blocking(self._load_meta, session_id)
+        size = meta["size"]
+        
+        if offset < 0 or offset > size:
+            raise UploadSessionError(400, f"잘못된 오프셋입니다: {offset}")
+        if sequential and offset != self._contiguous_offset(meta["ranges"]):
+            raise UploadSessionError(409, "업로드 오프셋이 일치하지 않습니다")
+        
+        session_dir = self.sessions_dir / session_id
+        position = offset
+        clock = time.perf_counter
+        observe_write = metrics.UPLOAD_CHUNK_WRITE_SECONDS.observe
+        count_bytes = metrics.UPLOAD_BYTES.inc
+        
+        metrics.UPLOADS_IN_PROGRESS.inc()
+        try:
+            async with open_async(session_dir / self.DATA_FILENAME, 'r+b') as f:
+                await f.seek(offset)
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if position + len(chunk) > size:
+                        raise UploadSessionError(413, "선언된 파일 크기를 초과했습니다")
+                    started = clock()
+                    await f.write(chunk)
+                    observe_write(clock() - started)
+                    count_bytes(len(chunk))
+                    position += len(chunk)
+        finally:
+            metrics.UPLOADS_IN_PROGRESS.dec()
+            if position > offset:
+                meta = await run_blocking(self._record_range, session_id, offset, position)
+        
+        return self._status(meta)
+    
+    async def complete_session(self, session_id: str) -> dict:
+        """
+        Finalize an upload once every byte has been received.
+        
+        Subtitles are parsed while the data is hashed; a malformed or empty
+        file is rejected and its session discarded, as the subtitle upload
+        endpoint would reject it.
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Dictionary with filename, kind, size and sha256 of the stored
+            file, plus the parsed "cues" (CueTable) for subtitles
+        
+        Raises:
+            UploadSessionError: If the session is unknown, incomplete, busy
+                (409) or holds an invalid subtitle file (400)
+        """
+        with self._meta_lock:
+            if session_id in self._completing or self._writers[session_id]:
+                raise UploadSessionError(409, "업로드 세션이 사용 중입니다")
+            self._completing.add(session_id)
+        
+        try:
+            meta = await run_blocking(self._load_meta, session_id)
+            if self._contiguous_offset(meta["ranges"]) != meta["size"]:
+                raise UploadSessionError(409, "아직 모든 데이터가 업로드되지 않았습니다")
+            
+            session_dir = self.sessions_dir / session_id
+            data_path = session_dir / self.DATA_FILENAME
+            parser = VTTStreamParser() if meta["kind"] == "subtitle" else None
+            
+            # Chunks may have arrived out of order, so hash the finished file
+            try:
+                sha256 = await run_blocking(self._hash_file, data_path, parser)
+                cues = await run_blocking(parser.close) if parser is not None else None
+            except ValueError as e:
+                await run_blocking(shutil.rmtree, session_dir, ignore_errors=True)
+                raise UploadSessionError(400, f"VTT 파싱 실패: {str(e)}")
+            if cues is not None and not cues:
+                await run_blocking(shutil.rmtree, session_dir, ignore_errors=True)
+                raise UploadSessionError(400, "자막 파일이 비어있습니다. 올바른 VTT 파일을 업로드해주세요")
+            
+            await run_blocking(self.file_storage.commit_blob, data_path, sha256, meta["filename"])
+            await run_blocking(shutil.rmtree, session_dir, ignore_errors=True)
+        finally:
+            with self._meta_lock:
+                self._completing.discard(session_id)
+        
+        result = {
+            "filename": meta["filename"],
+            "kind": meta["kind"],
+            "size": meta["size"],
+            "sha256": sha256,
+        }
+        if cues is not None:
+            result["cues"] = cues
+        return result
+    
+    def abort_session(self, session_id: str) -> None:
+        """
+        Discard an upload session and its data.
+        
+        Args:
+            session_id: Session identifier
+        
+        Raises:
+            UploadSessionError: If the session does not exist or is being completed
+        """
+        self._load_meta(session_id)
+        with self._meta_lock:
+            if session_id in self._completing:
+                raise UploadSessionError(409, "업로드를 완료하는 중입니다")
+        shutil.rmtree(self.sessions_dir / session_id, ignore_errors=True)
+    
+    def expire_sessions(self, now: Optional[float] = None) -> int:
+        """
+        Delete sessions that have been inactive for longer than the TTL.
+        
+        Args:
+            now: Current time (defaults to time.time())
+        
+        Returns:
+            Number of sessions removed
+        """
+        if not self.sessions_dir.is_dir():
+            return 0
+        
+        now = time.time() if now is None else now
+        removed = 0
+        for session_dir in self.sessions_dir.iterdir():
+            meta_path = session_dir / self.META_FILENAME
+            try:
+                with open(meta_path, encoding='utf-8') as f:
+                    updated_at = json.load(f)["updated_at"]
+            except (OSError, ValueError, KeyError):
+                # Unreadable session: fall back to the directory's mtime
+                try:
+                    updated_at = session_dir.stat().st_mtime
+                except OSError:
+                    continue
+            
+            if now - updated_at > self.session_ttl:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        
+        return removed
+    
+    def _record_range(self, session_id: str, start: int, end: int) -> dict:
+        """Record received bytes [start, end) and return the updated metadata."""
+        with self._meta_lock:
+            # Reload: other chunks may have been recorded while this one was written
+            meta = self._load_meta(session_id)
+            meta["ranges"] = self._add_range(meta["ranges"], start, end)
+            meta["updated_at"] = time.time()
+            self._save_meta(self.sessions_dir / session_id, meta)
+        return meta
+    
+    def _load_meta(self, session_id: str) -> dict:
+        """Load session metadata, raising 404 for unknown or expired sessions."""
+        if not self.SESSION_ID_PATTERN.match(session_id):
+            raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다")
+        
+        session_dir = self.sessions_dir / session_id
+        try:
+            with open(session_dir / self.META_FILENAME, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise UploadSessionError(404, "업로드 세션을 찾을 수 없습니다")
+        
+        if time.time() - meta["updated_at"] > self.session_ttl:
+            shutil.rmtree(session_dir, ignore_errors=True)
+            raise UploadSessionError(404, "업로드 세션이 만료되었습니다")
+        
+        return meta
+    
+    def _save_meta(self, session_dir: Path, meta: dict) -> None:
+        """Persist session metadata atomically."""
+        temp_path = session_dir / f"{self.META_FILENAME}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, session_dir / self.META_FILENAME)
+    
+    def _status(self, meta: dict) -> dict:
+        """Build the public status of a session."""
+        return {
+            "id": meta["id"],
+            "filename": meta["filename"],
+            "kind": meta["kind"],
+            "size": meta["size"],
+            "offset": self._contiguous_offset(meta["ranges"]),
+            "ranges": meta["ranges"],
+            "expires_at": meta["updated_at"] + self.session_ttl,
+        }
+    
+    @staticmethod
+    def _add_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+        """Merge [start, end) into a sorted list of disjoint ranges."""
+        merged: List[List[int]] = []
+        for range_start, range_end in sorted(ranges + [[start, end]]):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        return merged
+    
+    @staticmethod
+    def _contiguous_offset(ranges: List[List[int]]) -> int:
+        """Number of bytes received without gaps from the start of the file."""
+        if ranges and ranges[0][0] == 0:
+            return ranges[0][1]
+        return 0
+    
+    @staticmethod
+    def _hash_file(path: Path, parser: Optional[VTTStreamParser] = None) -> str:
+        """Compute the SHA-256 of a file, feeding its content to a parser on the way."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                if parser is not None:
+                    parser.feed(chunk)
+        return digest.hexdigest()
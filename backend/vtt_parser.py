@@ -1,8 +1,29 @@
 """VTT Parser Service for parsing WebVTT subtitle files."""
 
+import codecs
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
 from dataclasses import dataclass
-from typing import List
-import webvtt
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from backend import metrics
+from backend.cue_index import CueIndex
+from backend.cue_table import CueTable
+
+# Cue timings line: "[HH:]MM:SS.mmm --> [HH:]MM:SS.mmm [settings]"
+_TIMINGS_PATTERN = re.compile(
+    r'\s*(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})\s*-->\s*(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})'
+)
+_NOTE_PATTERN = re.compile(r'NOTE(?:\s.+|$)')
+_STYLE_PATTERN = re.compile(r'STYLE[ \t]*$')
+_REGION_PATTERN = re.compile(r'REGION[ \t]*$')
+_CUE_TAG_PATTERN = re.compile(r'<.*?>')
+# Line breaks recognized by text-mode file reads (universal newlines)
+_LINE_BREAK_PATTERN = re.compile(r'\r\n?|\n')
 
 
 @dataclass
@@ -32,7 +53,7 @@ class SubtitleCue:
         
         Args:
             current_time: Current playback time in seconds
-            
+        
         Returns:
             True if subtitle is active at current time
         """
@@ -42,68 +63,311 @@ class SubtitleCue:
 class VTTParserService:
     """Service for parsing VTT subtitle files."""
     
-    def parse_vtt_file(self, file_path: str) -> List[SubtitleCue]:
+    # Cache limits
+    DEFAULT_CACHE_MAX_ENTRIES = 64
+    DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+    
+    def __init__(
+        self,
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    ):
         """
-        Parse VTT file using webvtt-py library.
+        Initialize VTTParserService.
+        
+        Args:
+            cache_max_entries: Maximum number of parsed files kept in the cache
+            cache_max_bytes: Maximum estimated memory used by cached cues
+        """
+        self.cache_max_entries = cache_max_entries
+        self.cache_max_bytes = cache_max_bytes
+        
+        # path -> [mtime_ns, size, cues, estimated_bytes, cue_index, payloads], in LRU order
+        self._cache: "OrderedDict[str, list]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def parse_vtt_file(self, file_path: str) -> CueTable:
+        """
+        Parse VTT file with the built-in streaming parser.
+        
+        Results are cached by path and reused for as long as the file's
+        mtime and size are unchanged.
         
         Args:
             file_path: Path to VTT file
-            
+        
         Returns:
-            List of SubtitleCue objects
-            
+            CueTable of parsed cues
+        
         Raises:
             FileNotFoundError: If file does not exist
             ValueError: If VTT file is malformed
         """
+        key = self._cache_key(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            stat = None
+        
+        if stat is not None:
+            cues = self._cache_get(key, stat.st_mtime_ns, stat.st_size)
+            if cues is not None:
+                return cues
+        
+        started = time.perf_counter()
         try:
-            vtt = webvtt.read(file_path)
-            return self._convert_captions_to_cues(vtt)
+            with open(file_path, encoding='utf-8-sig') as f:
+                cues = CueTable.from_rows(iter_vtt_rows(f))
         except Exception as e:
             raise ValueError(f"Failed to parse VTT file: {str(e)}")
+        metrics.observe_vtt_parse(time.perf_counter() - started, len(cues))
+        
+        if stat is not None:
+            self._cache_put(key, stat.st_mtime_ns, stat.st_size, cues)
+        
+        return cues
     
-    def parse_vtt_content(self, content: str) -> List[SubtitleCue]:
+    def iter_ndjson(self, file_path: str, batch_size: int = 1000) -> Iterator[bytes]:
+        """
+        Stream a VTT file's cues as NDJSON with memory bounded by the batch size.
+        
+        Cached cues are serialized from the cache. Otherwise the file is
+        parsed batch by batch while streaming and nothing is cached, so a
+        transcript too large for the cache is never held in memory whole.
+        
+        Args:
+            file_path: Path to VTT file
+            batch_size: Cues per yielded chunk
+        
+        Yields:
+            UTF-8 encoded chunks of complete lines (see CueTable.iter_ndjson)
+        
+        Raises:
+            FileNotFoundError: If file does not exist
+            ValueError: If VTT file is malformed (possibly after earlier chunks)
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            stat = None
+        
+        if stat is not None:
+            cues = self._cache_get(self._cache_key(file_path), stat.st_mtime_ns, stat.st_size)
+            if cues is not None:
+                yield from cues.iter_ndjson(batch_size=batch_size)
+                return
+        
+        with open(file_path, encoding='utf-8-sig') as f:
+            rows = iter_vtt_rows(f)
+            while True:
+                try:
+                    batch = CueTable.from_rows(islice(rows, batch_size))
+                except Exception as e:
+                    raise ValueError(f"Failed to parse VTT file: {str(e)}")
+                if not batch:
+                    return
+                yield from batch.iter_ndjson(batch_size=batch_size)
+    
+    def parse_vtt_content(self, content: str) -> CueTable:
         """
         Parse VTT content string.
         
         Args:
             content: VTT file content as string
-            
+        
         Returns:
-            List of SubtitleCue objects
-            
+            CueTable of parsed cues
+        
         Raises:
             ValueError: If VTT content is malformed
         """
         try:
-            vtt = webvtt.from_string(content)
-            return self._convert_captions_to_cues(vtt)
+            return CueTable.from_rows(iter_vtt_rows(content.lstrip('\ufeff').splitlines()))
         except Exception as e:
             raise ValueError(f"Failed to parse VTT content: {str(e)}")
     
-    def _convert_captions_to_cues(self, vtt) -> List[SubtitleCue]:
+    def get_cue_index(self, file_path: str) -> CueIndex:
         """
-        Convert webvtt captions to SubtitleCue objects.
+        Get a time-interval index over a VTT file's cues.
+        
+        The index is built once per parsed file and cached together with
+        its cues, so it is dropped whenever the cues are.
         
         Args:
-            vtt: WebVTT object from webvtt-py
-            
+            file_path: Path to VTT file
+        
         Returns:
-            List of SubtitleCue objects
+            CueIndex over the file's cues
+        
+        Raises:
+            ValueError: If VTT file is malformed
         """
-        cues = []
-        for caption in vtt:
-            start_seconds = self.time_to_seconds(caption.start)
-            end_seconds = self.time_to_seconds(caption.end)
-            text = caption.text
-            
-            cues.append(SubtitleCue(
-                start_time=start_seconds,
-                end_time=end_seconds,
-                text=text
-            ))
+        cues = self.parse_vtt_file(file_path)
+        key = self._cache_key(file_path)
         
-        return cues
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[2] is cues and entry[4] is not None:
+                return entry[4]
+        
+        index = CueIndex(cues)
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[2] is cues and entry[4] is None:
+                index_bytes = index.estimated_size()
+                entry[3] += index_bytes
+                entry[4] = index
+                self._cache_bytes += index_bytes
+                self._evict_locked()
+        
+        return index
+    
+    def get_encoded(self, file_path: str, variant: Hashable, encode: Callable[[CueTable], bytes]) -> bytes:
+        """
+        Get a serialized form of a VTT file's cues, encoding it at most once.
+        
+        Encoded payloads (e.g. gzip-compressed JSON or the binary format)
+        are cached with the file's cues under `variant` and count towards
+        the cache byte limit, so they are dropped together with the cues.
+        
+        Args:
+            file_path: Path to VTT file
+            variant: Key identifying the serialization (e.g. media type and coding)
+            encode: Builds the payload from the cue table
+        
+        Returns:
+            Encoded payload
+        
+        Raises:
+            ValueError: If VTT file is malformed
+        """
+        cues = self.parse_vtt_file(file_path)
+        key = self._cache_key(file_path)
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[2] is cues:
+                payload = entry[5].get(variant)
+                if payload is not None:
+                    return payload
+        
+        payload = encode(cues)
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[2] is cues and variant not in entry[5]:
+                entry[5][variant] = payload
+                entry[3] += len(payload)
+                self._cache_bytes += len(payload)
+                self._evict_locked()
+        
+        return payload
+    
+    def cache_parsed(self, file_path: str, cues: CueTable) -> None:
+        """
+        Cache cues that were parsed while the file was being written.
+        
+        Lets an upload hand its cues to later reads without parsing the
+        stored file again.
+        
+        Args:
+            file_path: Path of the stored VTT file
+            cues: Cues parsed from exactly that file's content
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        self._cache_put(self._cache_key(file_path), stat.st_mtime_ns, stat.st_size, cues)
+    
+    def invalidate(self, file_path: str) -> None:
+        """
+        Drop cached cues for a file.
+        
+        Args:
+            file_path: Path to VTT file
+        """
+        key = self._cache_key(file_path)
+        with self._cache_lock:
+            entry = self._cache.pop(key, None)
+            if entry is not None:
+                self._cache_bytes -= entry[3]
+    
+    def clear_cache(self) -> None:
+        """Drop all cached cues and reset the hit/miss counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+    
+    def cache_stats(self) -> dict:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, entries and estimated bytes
+        """
+        with self._cache_lock:
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "entries": len(self._cache),
+                "bytes": self._cache_bytes,
+            }
+    
+    @staticmethod
+    def _cache_key(file_path: str) -> str:
+        """Normalize a file path into a cache key."""
+        return os.path.abspath(str(file_path))
+    
+    def _cache_get(self, key: str, mtime_ns: int, size: int) -> Optional[CueTable]:
+        """
+        Look up cached cues, discarding the entry if the file has changed.
+        
+        Returns:
+            Cached cue table, or None on a miss
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] == mtime_ns and entry[1] == size:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    return entry[2]
+                # Stale entry: file was modified or replaced
+                del self._cache[key]
+                self._cache_bytes -= entry[3]
+            self.cache_misses += 1
+            return None
+    
+    def _cache_put(self, key: str, mtime_ns: int, size: int, cues: CueTable) -> None:
+        """Store parsed cues and evict least recently used entries over the limits."""
+        estimated_bytes = cues.estimated_size()
+        if estimated_bytes > self.cache_max_bytes or self.cache_max_entries <= 0:
+            return
+        
+        with self._cache_lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_bytes -= previous[3]
+            
+            self._cache[key] = [mtime_ns, size, cues, estimated_bytes, None, {}]
+            self._cache_bytes += estimated_bytes
+            self._evict_locked()
+    
+    def _evict_locked(self) -> None:
+        """Evict least recently used entries until the cache is within its limits."""
+        while self._cache and (
+            len(self._cache) > self.cache_max_entries
+            or self._cache_bytes > self.cache_max_bytes
+        ):
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted[3]
     
     @staticmethod
     def time_to_seconds(time_str: str) -> float:
@@ -116,7 +380,7 @@ class VTTParserService:
         
         Args:
             time_str: VTT timestamp string
-            
+        
         Returns:
             Time in seconds as float
         """
@@ -135,3 +399,258 @@ class VTTParserService:
             return minutes * 60 + seconds
         else:
             raise ValueError(f"Invalid time format: {time_str}")
+
+
+def iter_vtt_rows(lines: Iterable[str]) -> Iterator[Tuple[float, float, str]]:
+    """
+    Parse WebVTT lines into (start, end, text) rows in a single pass.
+    
+    Lines may keep their trailing newlines, so an open text file can be
+    passed directly. Only the block currently being read is buffered.
+    Follows the rules of webvtt-py: the header block is skipped, NOTE
+    blocks are ignored, STYLE and REGION blocks must precede the first cue,
+    cue settings after the end timestamp are ignored and cue text tags are
+    stripped.
+    
+    Args:
+        lines: Iterable of WebVTT lines
+    
+    Yields:
+        (start seconds, end seconds, text) tuples in file order
+    
+    Raises:
+        ValueError: If the content is empty or malformed
+    """
+    line_iter = iter(lines)
+    header = next(line_iter, None)
+    if header is None:
+        raise ValueError('The file is empty.')
+    if not header.startswith('WEBVTT'):
+        raise ValueError('The file does not have a valid format')
+    
+    block: List[str] = [header.rstrip('\r\n')]
+    block_line_number = 1
+    in_header = True
+    seen_cue = False
+    
+    for line_number, line in enumerate(line_iter, start=2):
+        line = line.rstrip('\r\n')
+        if line:
+            if not block:
+                if not line.strip():
+                    continue
+                block_line_number = line_number
+            block.append(line)
+            continue
+        
+        if not block:
+            continue
+        if in_header:
+            # First block holds the WEBVTT signature and header text
+            in_header = False
+        else:
+            for row in _parse_block(block, block_line_number, seen_cue):
+                seen_cue = True
+                yield row
+        block = []
+    
+    if block and not in_header:
+        yield from _parse_block(block, block_line_number, seen_cue)
+
+
+class VTTStreamParser:
+    """
+    Push-style WebVTT parser fed with raw bytes as they arrive.
+    
+    Applies the same rules as iter_vtt_rows, but takes the content in
+    arbitrary chunks (e.g. straight from an upload stream) so malformed
+    input is detected as soon as the offending block is complete. Decoding
+    is UTF-8 with an optional BOM; lines split on CR, LF or CRLF even when
+    a chunk boundary falls between CR and LF.
+    
+    Usage:
+        parser = VTTStreamParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        cues = parser.close()
+    """
+    
+    def __init__(self):
+        """Initialize an empty parser."""
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._pending = ''
+        self._skip_lf = False
+        self._line_number = 0
+        self._block: List[str] = []
+        self._block_line_number = 1
+        self._in_header = True
+        self._seen_cue = False
+        self._table = CueTable()
+        self._closed = False
+    
+    @property
+    def cue_count(self) -> int:
+        """Number of cues parsed so far."""
+        return len(self._table)
+    
+    def feed(self, data: bytes) -> None:
+        """
+        Parse the next chunk of content.
+        
+        Args:
+            data: Raw bytes continuing the content fed so far
+        
+        Raises:
+            ValueError: If the content is not UTF-8 or is malformed
+        """
+        text = self._decoder.decode(data)
+        if self._skip_lf and text:
+            # CRLF split across chunks: the CR already ended the line
+            if text[0] == '\n':
+                text = text[1:]
+            self._skip_lf = False
+        if not text:
+            return
+        
+        lines = _LINE_BREAK_PATTERN.split(self._pending + text)
+        self._pending = lines.pop()
+        self._skip_lf = text[-1] == '\r'
+        if self._line_number == 0 and not lines and len(self._pending) >= 6:
+            # Reject a wrong signature before the first line ends
+            self._check_header(self._pending)
+        self._feed_lines(lines)
+    
+    def close(self) -> CueTable:
+        """
+        Finish parsing after the last chunk.
+        
+        Calling close again returns the same table.
+        
+        Returns:
+            CueTable of all parsed cues
+        
+        Raises:
+            ValueError: If the content is empty, truncated or malformed
+        """
+        if self._closed:
+            return self._table
+        
+        self._pending += self._decoder.decode(b'', final=True)
+        if self._pending:
+            self._feed_lines([self._pending])
+            self._pending = ''
+        if self._line_number == 0:
+            raise ValueError('The file is empty.')
+        
+        block = self._block
+        if block and not self._in_header:
+            append = self._table.append
+            for start, end, text in _parse_block(block, self._block_line_number, self._seen_cue):
+                append(start, end, text)
+        self._block = []
+        
+        self._table.finish()
+        self._closed = True
+        return self._table
+    
+    @staticmethod
+    def _check_header(line: str) -> None:
+        """Validate the WEBVTT signature line."""
+        if not line.startswith('WEBVTT'):
+            raise ValueError('The file does not have a valid format')
+    
+    def _feed_lines(self, lines: List[str]) -> None:
+        """Run complete lines through the block state machine of iter_vtt_rows."""
+        if not lines:
+            return
+        
+        line_number = self._line_number
+        if line_number == 0:
+            self._check_header(lines[0])
+            self._block = [lines[0]]
+            line_number = 1
+            lines = lines[1:]
+        
+        block = self._block
+        append = self._table.append
+        for line in lines:
+            line_number += 1
+            if line:
+                if not block:
+                    if not line.strip():
+                        continue
+                    self._block_line_number = line_number
+                block.append(line)
+                continue
+            
+            if not block:
+                continue
+            if self._in_header:
+                # First block holds the WEBVTT signature and header text
+                self._in_header = False
+            else:
+                for start, end, text in _parse_block(block, self._block_line_number, self._seen_cue):
+                    self._seen_cue = True
+                    append(start, end, text)
+            block = self._block = []
+        
+        self._line_number = line_number
+
+
+def _parse_block(block: List[str], block_line_number: int, seen_cue: bool) -> Iterator[Tuple[float, float, str]]:
+    """
+    Parse one blank-line separated block.
+    
+    Args:
+        block: Non-empty lines of the block
+        block_line_number: 1-based line number of the block's first line
+        seen_cue: Whether a cue has already been parsed
+    
+    Yields:
+        (start seconds, end seconds, text) tuples found in the block
+    
+    Raises:
+        ValueError: If the block is malformed
+    """
+    first = block[0]
+    if '-->' in first:
+        timings_index = 0
+    elif len(block) > 1 and '-->' in block[1]:
+        # First line is a cue identifier
+        timings_index = 1
+    elif _NOTE_PATTERN.match(first):
+        return
+    elif _STYLE_PATTERN.match(first) or _REGION_PATTERN.match(first):
+        if seen_cue:
+            raise ValueError(
+                f'{first.strip()} block defined after the first cue in line {block_line_number}.'
+            )
+        return
+    elif len(block) == 1:
+        raise ValueError(f'Standalone cue identifier in line {block_line_number}.')
+    else:
+        raise ValueError(f'Missing timing cue in line {block_line_number + 1}.')
+    
+    # Every further timings line inside the block starts another cue
+    index = timings_index
+    count = len(block)
+    while index < count:
+        match = _TIMINGS_PATTERN.match(block[index])
+        if match is None:
+            raise ValueError(f'Invalid time format in line {block_line_number + index}')
+        
+        text_start = index + 1
+        index = text_start
+        while index < count and '-->' not in block[index]:
+            index += 1
+        
+        text = '\n'.join(block[text_start:index])
+        if '<' in text:
+            text = _CUE_TAG_PATTERN.sub('', text)
+        
+        h1, m1, s1, ms1, h2, m2, s2, ms2 = match.groups()
+        yield (
+            (int(h1) * 3600 if h1 else 0) + int(m1) * 60 + (int(s1) * 1000 + int(ms1)) / 1000,
+            (int(h2) * 3600 if h2 else 0) + int(m2) * 60 + (int(s2) * 1000 + int(ms2)) / 1000,
+            text
+        )
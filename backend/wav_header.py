@@ -0,0 +1,151 @@
+"""Header-only RIFF/WAVE parser for audio metadata."""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# 32-bit size placeholder used by RF64 and by writers that never patched the header
+SIZE_PLACEHOLDER = 0xFFFFFFFF
+
+
+@dataclass
+class WavInfo:
+    """Format and length of a WAV file, read from its header."""
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bit_depth: int
+    block_align: int
+    byte_rate: int
+    data_offset: int
+    data_size: int
+    
+    @property
+    def frame_count(self) -> int:
+        """Number of sample frames in the data chunk."""
+        if self.block_align <= 0:
+            return 0
+        return self.data_size // self.block_align
+    
+    @property
+    def duration(self) -> float:
+        """Playback duration in seconds."""
+        if self.format_tag in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) and self.sample_rate > 0:
+            return self.frame_count / self.sample_rate
+        if self.byte_rate > 0:
+            return self.data_size / self.byte_rate
+        return 0.0
+
+
+def read_wav_info(source: Union[str, Path, BinaryIO]) -> WavInfo:
+    """
+    Read format and length information from a WAV file header.
+    
+    Walks the RIFF chunk list with seeks, reading only chunk headers plus the
+    fmt and ds64 bodies, so the cost does not depend on the audio length.
+    Supports WAVE_FORMAT_EXTENSIBLE (the real format is taken from the
+    sub-format GUID) and RF64/BW64 files whose sizes live in the ds64 chunk.
+    
+    Args:
+        source: Path or binary file object positioned anywhere
+    
+    Returns:
+        WavInfo for the file
+    
+    Raises:
+        ValueError: If the file is not a readable WAV file
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            return _read_wav_info(f)
+    return _read_wav_info(source)
+
+
+def _read_wav_info(f: BinaryIO) -> WavInfo:
+    """Parse the header from an open binary file."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    f.seek(0)
+    
+    header = f.read(12)
+    if len(header) < 12 or header[8:12] != b'WAVE':
+        raise ValueError("Not a WAVE file")
+    riff_id = header[0:4]
+    if riff_id not in (b'RIFF', b'RF64', b'BW64'):
+        raise ValueError(f"Unsupported container: {riff_id!r}")
+    is_rf64 = riff_id != b'RIFF'
+    
+    ds64_data_size: Optional[int] = None
+    fmt: Optional[tuple] = None
+    position = 12
+    
+    while position + 8 <= file_size:
+        f.seek(position)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        body_offset = position + 8
+        
+        if chunk_id == b'ds64':
+            body = f.read(min(chunk_size, 28))
+            if len(body) < 16:
+                raise ValueError("Truncated ds64 chunk")
+            ds64_data_size = struct.unpack_from('<Q', body, 8)[0]
+        
+        elif chunk_id == b'fmt ':
+            fmt = _parse_fmt(f.read(min(chunk_size, 40)))
+        
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            if chunk_size == SIZE_PLACEHOLDER and is_rf64 and ds64_data_size is not None:
+                data_size = ds64_data_size
+            else:
+                data_size = chunk_size
+            # Streamed or truncated files: never claim more data than exists
+            data_size = min(data_size, file_size - body_offset)
+            
+            format_tag, channels, sample_rate, byte_rate, block_align, bit_depth = fmt
+            return WavInfo(
+                format_tag=format_tag,
+                channels=channels,
+                sample_rate=sample_rate,
+                bit_depth=bit_depth,
+                block_align=block_align,
+                byte_rate=byte_rate,
+                data_offset=body_offset,
+                data_size=data_size
+            )
+        
+        # Chunks are padded to an even length
+        position = body_offset + chunk_size + (chunk_size & 1)
+    
+    raise ValueError("No data chunk found")
+
+
+def _parse_fmt(body: bytes) -> tuple:
+    """
+    Parse a fmt chunk body.
+    
+    Returns:
+        (format_tag, channels, sample_rate, byte_rate, block_align, bit_depth)
+    """
+    if len(body) < 16:
+        raise ValueError("Truncated fmt chunk")
+    format_tag, channels, sample_rate, byte_rate, block_align, bit_depth = struct.unpack_from('<HHIIHH', body)
+    
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 40:
+        # cbSize, wValidBitsPerSample, dwChannelMask, then the sub-format GUID
+        # whose first two bytes are the actual format tag
+        format_tag = struct.unpack_from('<H', body, 24)[0]
+    
+    if channels == 0:
+        raise ValueError("Invalid channel count")
+    if block_align == 0 and bit_depth:
+        block_align = channels * ((bit_depth + 7) // 8)
+    
+    return format_tag, channels, sample_rate, byte_rate, block_align, bit_depth
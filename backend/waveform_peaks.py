@@ -0,0 +1,333 @@
+"""Multi-resolution waveform peaks computed from WAV files."""
+
+import os
+import struct
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from backend.file_storage import FileStorageService
+from backend.wav_header import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, WavInfo, read_wav_info
+
+# NumPy is imported inside the functions using it, so starting the server
+# does not pay for loading it
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def map_wav_samples(audio_path: Path, info: WavInfo) -> "np.ndarray":
+    """
+    Memory-map the data chunk of a WAV file.
+    
+    Args:
+        audio_path: Path of the WAV file
+        info: Parsed header of the file
+    
+    Returns:
+        Read-only array of shape (frames, channels), or (frames, channels, 3)
+        bytes for 24-bit PCM; pass blocks of it to normalize_samples
+    
+    Raises:
+        ValueError: If the sample format is not supported
+    """
+    import numpy as np
+    
+    channels = info.channels
+    bytes_per_sample = (info.bit_depth + 7) // 8
+    if info.block_align != channels * bytes_per_sample:
+        raise ValueError(f"Unsupported block alignment: {info.block_align}")
+    
+    if info.format_tag == WAVE_FORMAT_PCM and bytes_per_sample == 3:
+        shape = (info.frame_count, channels, 3)
+        dtype = np.dtype('u1')
+    else:
+        dtype = _sample_dtype(info)
+        shape = (info.frame_count, channels)
+    
+    return np.memmap(audio_path, dtype=dtype, mode='r', offset=info.data_offset, shape=shape)
+
+
+def _sample_dtype(info: WavInfo) -> "np.dtype":
+    """NumPy dtype for a sample format."""
+    import numpy as np
+    
+    if info.format_tag == WAVE_FORMAT_PCM and info.bit_depth in (8, 16, 32):
+        return np.dtype({8: 'u1', 16: '<i2', 32: '<i4'}[info.bit_depth])
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT and info.bit_depth in (32, 64):
+        return np.dtype({32: '<f4', 64: '<f8'}[info.bit_depth])
+    raise ValueError(f"Unsupported sample format: tag {info.format_tag:#x}, {info.bit_depth} bits")
+
+
+def normalize_samples(block: "np.ndarray") -> "np.ndarray":
+    """
+    Convert a block of mapped samples to int16 full scale.
+    
+    Args:
+        block: Slice of an array returned by map_wav_samples
+    
+    Returns:
+        int16 array of shape (frames, channels)
+    """
+    import numpy as np
+    
+    if block.ndim == 3:
+        # 24-bit PCM: assemble little-endian bytes and keep the top 16 bits
+        wide = block.astype(np.int32)
+        return ((wide[..., 0] | (wide[..., 1] << 8) | (wide[..., 2] << 16)) << 8 >> 16).astype(np.int16)
+    if block.dtype == np.uint8:
+        return ((block.astype(np.int16) - 128) << 8)
+    if block.dtype == np.int16:
+        return np.asarray(block)
+    if block.dtype == np.int32:
+        return (block >> 16).astype(np.int16)
+    return (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+@dataclass
+class PeakLevel:
+    """One zoom level of a peak pyramid."""
+    samples_per_peak: int
+    count: int
+    offset: int
+
+
+class WaveformPeakService:
+    """
+    Service for computing and serving min/max waveform peaks.
+    
+    The WAV data chunk is memory-mapped and reduced block by block with
+    NumPy to (min, max) pairs of the channel-mixed signal, stored as int16.
+    Level 0 covers `base_samples_per_peak` frames per peak; each further
+    level is `level_factor` times coarser and is reduced from the level
+    below. All levels are written to a sidecar in upload_dir/.peaks/, named
+    after the stored file (the blob digest for content-addressed uploads),
+    so a zoomed view reads only the slice it needs.
+    
+    Sidecar layout (little-endian): magic b'WSPK', version u16, level count
+    u16, sample rate u32, source data size u64, then per level
+    samples_per_peak u32, count u64, byte offset u64; peak data follows as
+    interleaved int16 min/max pairs.
+    """
+    
+    PEAKS_DIRNAME = '.peaks'
+    SIDECAR_SUFFIX = '.peaks'
+    MAGIC = b'WSPK'
+    VERSION = 1
+    HEADER_FORMAT = '<4sHHIQ'
+    LEVEL_FORMAT = '<IQQ'
+    
+    # Frames reduced per NumPy pass; bounds memory for multi-GB files
+    BLOCK_FRAMES = 1 << 20
+    
+    def __init__(
+        self,
+        file_storage: FileStorageService,
+        base_samples_per_peak: int = 256,
+        level_factor: int = 4,
+        min_peaks: int = 1024
+    ):
+        """
+        Initialize WaveformPeakService.
+        
+        Args:
+            file_storage: Storage service whose upload directory holds the sidecars
+            base_samples_per_peak: Frames per peak at level 0
+            level_factor: Zoom factor between consecutive levels
+            min_peaks: Stop adding levels once a level has at most this many peaks
+        """
+        self.file_storage = file_storage
+        self.base_samples_per_peak = base_samples_per_peak
+        self.level_factor = level_factor
+        self.min_peaks = min_peaks
+        
+        # Sidecar lookups by ensure_peaks
+        self._stats_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @property
+    def peaks_dir(self) -> Path:
+        """Directory holding all peak sidecars."""
+        return self.file_storage.upload_dir / self.PEAKS_DIRNAME
+    
+    def sidecar_path(self, audio_path: Path) -> Path:
+        """Path of the peak sidecar for an audio file (blob digest or legacy name)."""
+        return self.peaks_dir / f"{Path(audio_path).name}{self.SIDECAR_SUFFIX}"
+    
+    def invalidate(self, audio_path: Path) -> None:
+        """
+        Remove the peak sidecar of a deleted audio file.
+        
+        Args:
+            audio_path: Path of the audio file
+        """
+        try:
+            os.remove(self.sidecar_path(audio_path))
+        except FileNotFoundError:
+            pass
+    
+    def ensure_peaks(self, audio_path: Path) -> Tuple[int, List[PeakLevel]]:
+        """
+        Return the peak pyramid header, computing the sidecar if needed.
+        
+        Args:
+            audio_path: Path of the WAV file
+        
+        Returns:
+            Tuple of (sample_rate, levels)
+        
+        Raises:
+            ValueError: If the file is not a supported WAV file
+        """
+        info = read_wav_info(audio_path)
+        header = self._read_header(audio_path, info)
+        with self._stats_lock:
+            if header is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+        if header is None:
+            self.compute_peaks(audio_path, info)
+            header = self._read_header(audio_path, info)
+        return header
+    
+    def cache_stats(self) -> dict:
+        """
+        Get sidecar lookup counters.
+        
+        Returns:
+            Dictionary with hits and misses
+        """
+        with self._stats_lock:
+            return {"hits": self.cache_hits, "misses": self.cache_misses}
+    
+    def compute_peaks(self, audio_path: Path, info: Optional[WavInfo] = None) -> Path:
+        """
+        Compute all peak levels and write the sidecar atomically.
+        
+        Args:
+            audio_path: Path of the WAV file
+            info: Parsed header (read from the file if omitted)
+        
+        Returns:
+            Path of the sidecar
+        
+        Raises:
+            ValueError: If the file is not a supported WAV file
+        """
+        if info is None:
+            info = read_wav_info(audio_path)
+        
+        levels = [self._base_level(audio_path, info)]
+        while len(levels[-1]) > self.min_peaks:
+            levels.append(self._reduce(levels[-1], self.level_factor))
+        
+        sidecar = self.sidecar_path(audio_path)
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        header = struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, len(levels), info.sample_rate, info.data_size)
+        header_size = len(header) + len(levels) * struct.calcsize(self.LEVEL_FORMAT)
+        temp_path = sidecar.with_name(f"{sidecar.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                offset = header_size
+                samples_per_peak = self.base_samples_per_peak
+                for peaks in levels:
+                    f.write(struct.pack(self.LEVEL_FORMAT, samples_per_peak, len(peaks), offset))
+                    offset += peaks.nbytes
+                    samples_per_peak *= self.level_factor
+                for peaks in levels:
+                    f.write(peaks.astype('<i2', copy=False).tobytes())
+            os.replace(temp_path, sidecar)
+        except BaseException:
+            if temp_path.exists():
+                os.remove(temp_path)
+            raise
+        
+        return sidecar
+    
+    def read_peaks(self, audio_path: Path, level: PeakLevel, start: int, stop: int) -> "np.ndarray":
+        """
+        Read a slice of one level from the sidecar.
+        
+        Args:
+            audio_path: Path of the WAV file
+            level: Level returned by ensure_peaks
+            start: First peak index
+            stop: One past the last peak index
+        
+        Returns:
+            int16 array of shape (n, 2) holding min and max per peak
+        """
+        import numpy as np
+        
+        start = max(0, min(start, level.count))
+        stop = max(start, min(stop, level.count))
+        with open(self.sidecar_path(audio_path), 'rb') as f:
+            f.seek(level.offset + start * 4)
+            data = f.read((stop - start) * 4)
+        return np.frombuffer(data, dtype='<i2').reshape(-1, 2)
+    
+    def _read_header(self, audio_path: Path, info: WavInfo) -> Optional[Tuple[int, List[PeakLevel]]]:
+        """Read the sidecar header, or None if missing or stale."""
+        try:
+            with open(self.sidecar_path(audio_path), 'rb') as f:
+                head = f.read(struct.calcsize(self.HEADER_FORMAT))
+                magic, version, level_count, sample_rate, data_size = struct.unpack(self.HEADER_FORMAT, head)
+                if magic != self.MAGIC or version != self.VERSION or data_size != info.data_size:
+                    return None
+                level_size = struct.calcsize(self.LEVEL_FORMAT)
+                levels = [
+                    PeakLevel(*struct.unpack(self.LEVEL_FORMAT, f.read(level_size)))
+                    for _ in range(level_count)
+                ]
+        except (OSError, struct.error):
+            return None
+        return sample_rate, levels
+    
+    def _base_level(self, audio_path: Path, info: WavInfo) -> "np.ndarray":
+        """Compute level 0 peaks from the memory-mapped data chunk."""
+        import numpy as np
+        
+        frame_count = info.frame_count
+        if frame_count == 0:
+            return np.zeros((0, 2), dtype=np.int16)
+        
+        samples = map_wav_samples(audio_path, info)
+        peak_frames = self.base_samples_per_peak
+        block_frames = max(peak_frames, self.BLOCK_FRAMES // peak_frames * peak_frames)
+        peaks = np.empty((-(-frame_count // peak_frames), 2), dtype=np.int16)
+        
+        for block_start in range(0, frame_count, block_frames):
+            block = normalize_samples(samples[block_start:block_start + block_frames])
+            first_peak = block_start // peak_frames
+            full = len(block) // peak_frames * peak_frames
+            if full:
+                # Frames of one peak are contiguous, so reducing over all of
+                # their samples also mixes the channels by their extremes
+                grouped = block[:full].reshape(full // peak_frames, -1)
+                peaks[first_peak:first_peak + full // peak_frames, 0] = grouped.min(axis=1)
+                peaks[first_peak:first_peak + full // peak_frames, 1] = grouped.max(axis=1)
+            if full < len(block):
+                peaks[-1] = (block[full:].min(), block[full:].max())
+        
+        del samples
+        return peaks
+    
+    @staticmethod
+    def _reduce(peaks: "np.ndarray", factor: int) -> "np.ndarray":
+        """Combine groups of `factor` peaks into one."""
+        import numpy as np
+        
+        count = len(peaks)
+        full = count // factor * factor
+        reduced = np.empty((-(-count // factor), 2), dtype=np.int16)
+        if full:
+            grouped = peaks[:full].reshape(-1, factor, 2)
+            reduced[:full // factor, 0] = grouped[:, :, 0].min(axis=1)
+            reduced[:full // factor, 1] = grouped[:, :, 1].max(axis=1)
+        if full < count:
+            reduced[-1] = (peaks[full:, 0].min(), peaks[full:, 1].max())
+        return reduced
@@ -0,0 +1,100 @@
+"""
+Benchmark seek-heavy audio access: plain FileResponse vs RangedFileResponse.
+
+Simulates a player seeking to random positions in a long WAV file and
+reading a window of audio after each seek. The plain FileResponse ignores
+Range, so a player has to read from the start of the file up to the seek
+target; RangedFileResponse answers each seek with a 206 for just the window.
+
+Usage:
+    python benchmarks/bench_audio_range.py [file_mb] [seeks]
+
+Defaults to a 256 MB file and 50 seeks reading 256 KB each.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import FileResponse
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.ranged_file_response import RangedFileResponse  # noqa: E402
+
+WINDOW = 256 * 1024
+
+
+def build_app(path: str) -> Starlette:
+    """App serving the same file through both response classes."""
+    async def plain(request: Request):
+        return FileResponse(path, media_type="audio/wav")
+    
+    async def ranged(request: Request):
+        return RangedFileResponse(path, request.headers, media_type="audio/wav")
+    
+    return Starlette(routes=[Route("/plain", plain), Route("/ranged", ranged)])
+
+
+async def seek_plain(client: httpx.AsyncClient, offset: int) -> int:
+    """Read from the start until the window after offset has arrived."""
+    received = 0
+    async with client.stream("GET", "/plain", headers={"Range": f"bytes={offset}-{offset + WINDOW - 1}"}) as response:
+        async for chunk in response.aiter_raw():
+            received += len(chunk)
+            if received >= offset + WINDOW:
+                break
+    return received
+
+
+async def seek_ranged(client: httpx.AsyncClient, offset: int) -> int:
+    """Fetch only the window after offset."""
+    response = await client.get("/ranged", headers={"Range": f"bytes={offset}-{offset + WINDOW - 1}"})
+    assert response.status_code == 206
+    return len(response.content)
+
+
+async def run(path: str, offsets, seek) -> tuple:
+    """Run all seeks and return (seconds, bytes transferred)."""
+    transport = httpx.ASGITransport(app=build_app(path))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        transferred = 0
+        for offset in offsets:
+            transferred += await seek(client, offset)
+        return time.perf_counter() - start, transferred
+
+
+def main() -> None:
+    file_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    seeks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    size = file_mb * 1024 * 1024
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "long.wav")
+        with open(path, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(file_mb):
+                f.write(block)
+        
+        rng = random.Random(0)
+        offsets = [rng.randrange(0, size - WINDOW) for _ in range(seeks)]
+        
+        print(f"{file_mb} MB file, {seeks} seeks, {WINDOW // 1024} KB per seek")
+        plain_time, plain_bytes = asyncio.run(run(path, offsets, seek_plain))
+        ranged_time, ranged_bytes = asyncio.run(run(path, offsets, seek_ranged))
+        print(f"  FileResponse:        {plain_time * 1000:9.1f} ms  {plain_bytes / 2**20:9.1f} MB transferred")
+        print(f"  RangedFileResponse:  {ranged_time * 1000:9.1f} ms  {ranged_bytes / 2**20:9.1f} MB transferred")
+        print(f"  speedup: {plain_time / ranged_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
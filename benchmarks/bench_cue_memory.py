@@ -0,0 +1,157 @@
+"""
+Benchmark per-request memory of the subtitle cue endpoint on a huge file.
+
+Serves a 500k-cue VTT file through the application and records how far
+each request raises the process's peak resident memory (ru_maxrss). Every
+mode runs in a fresh interpreter so the peaks don't mask each other:
+
+- legacy: the original response, a list of cue dicts in one JSONResponse
+- json: GET /api/files/subtitle/{name}, the whole document at once
+- ndjson: GET ...?format=ndjson, streamed in batches
+- page: GET ...?limit=1000 from the middle of the file (warm cue index)
+
+The response body is discarded as it is sent, so only memory held by the
+server counts. The default 64 MB parsed-cue cache is too small for this
+file, so json and ndjson run uncached; page uses a cache large enough to
+keep the cue index, as it needs one.
+
+Usage:
+    python benchmarks/bench_cue_memory.py [cues]
+"""
+
+import asyncio
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+def write_vtt(path: Path, cue_count: int) -> None:
+    """Write a VTT file with the given number of two-second cues."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for i in range(cue_count):
+            minutes, seconds = divmod(i * 2, 60)
+            hours, minutes = divmod(minutes, 60)
+            f.write(f"{hours:02d}:{minutes:02d}:{seconds:02d}.000 --> {hours:02d}:{minutes:02d}:{seconds:02d}.900\n")
+            f.write(f"Cue number {i}\n\n")
+
+
+async def call(app, path: str, query: str = "") -> int:
+    """Run one GET through the ASGI app, discarding the body; return its size."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"identity")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    received = False
+    body_bytes = 0
+    
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        nonlocal body_bytes
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path}?{query} returned {message['status']}")
+        if message["type"] == "http.response.body":
+            body_bytes += len(message.get("body", b""))
+    
+    await app(scope, receive, send)
+    return body_bytes
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(label: str, app, path: str, query: str = "") -> None:
+    """Print the peak memory growth and time of one request."""
+    before = peak_rss()
+    start = time.perf_counter()
+    size = asyncio.run(call(app, path, query))
+    elapsed = time.perf_counter() - start
+    growth = (peak_rss() - before) / 2**20
+    print(f"  {label:8s} peak +{growth:7.1f} MB  {elapsed:6.2f} s  body {size / 2**20:7.1f} MB", flush=True)
+
+
+def build_legacy_app(path: str):
+    """App serving the pre-streaming response: cue dicts in a JSONResponse."""
+    async def app(scope, receive, send):
+        cues = main.vtt_parser.parse_vtt_file(path)
+        response = JSONResponse(content={"cues": [cue.to_dict() for cue in cues]})
+        await response(scope, receive, send)
+    return app
+
+
+def store(tmp: str, cue_count: int) -> str:
+    """Write the test file into the application's storage; return its blob path."""
+    main.file_storage.upload_dir = Path(tmp)
+    source = Path(tmp) / "source.vtt"
+    write_vtt(source, cue_count)
+    
+    async def save():
+        async def chunks():
+            with open(source, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    yield chunk
+        return await main.file_storage.save_stream(chunks(), "long.vtt")
+    
+    stored = str(asyncio.run(save()))
+    source.unlink()
+    return stored
+
+
+def run_mode(mode: str, tmp: str, cue_count: int) -> None:
+    """Measure one mode against a file already in storage."""
+    main.file_storage.upload_dir = Path(tmp)
+    stored = str(main.file_storage.get_file_path("long.vtt"))
+    path = "/api/files/subtitle/long.vtt"
+    
+    if mode == "legacy":
+        measure(mode, build_legacy_app(stored), path)
+    elif mode == "json":
+        measure(mode, main.app, path)
+    elif mode == "ndjson":
+        measure(mode, main.app, path, "format=ndjson")
+    elif mode == "page":
+        main.vtt_parser.cache_max_bytes = 1 << 40
+        asyncio.run(call(main.app, path, "limit=1"))
+        measure(mode, main.app, path, f"after={cue_count}&limit=1000")
+
+
+def run(cue_count: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stored = store(tmp, cue_count)
+        print(f"{cue_count} cues, {Path(stored).stat().st_size / 2**20:.1f} MB VTT", flush=True)
+        for mode in ("legacy", "json", "ndjson", "page"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, tmp, str(cue_count)], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
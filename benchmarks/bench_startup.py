@@ -0,0 +1,116 @@
+"""
+Benchmark cold start: importing the app and serving the first byte of `/`.
+
+Each run starts a fresh interpreter, as a machine woken up by a request
+would, in an empty working directory holding only a link to static/, and
+measures from before `import main` to:
+
+- import: the end of the import
+- first_byte: the first body chunk of GET / after the lifespan startup
+
+Interpreter startup itself is not included. The child also reports which
+optional heavy modules ended up loaded and what the import created in the
+working directory, so lazy imports and deferred setup can be checked.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+
+Defaults to 5 runs and prints the best and median of each measure.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that should only be imported once a request needs them
+HEAVY_MODULES = ("numpy", "aiofiles", "webvtt")
+
+
+async def _first_byte(app) -> Tuple[int, float]:
+    """Run the lifespan startup and GET /; return the status and first body chunk time."""
+    status = 0
+    first_body = asyncio.get_running_loop().create_future()
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not first_body.done():
+            first_body.set_result(time.perf_counter())
+    
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+    return status, first_body.result()
+
+
+def child() -> None:
+    """Measure one cold start in this (fresh) interpreter and print JSON."""
+    entries = set(os.listdir())
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    created = sorted(set(os.listdir()) - entries)
+    status, first_byte = asyncio.run(_first_byte(main.app))
+    print(json.dumps({
+        "import": imported - start,
+        "first_byte": first_byte - start,
+        "status": status,
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+        "created_at_import": created,
+    }))
+
+
+def measure_startup() -> Dict:
+    """
+    Run one cold start in a new interpreter.
+    
+    Returns:
+        Dictionary with "import" and "first_byte" seconds, the response
+        "status" of GET /, the "heavy_modules" loaded by then and the
+        working directory entries "created_at_import"
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        os.symlink(ROOT / "static", Path(workdir) / "static")
+        result = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            cwd=workdir, capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONPATH": str(ROOT)}
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    if sys.argv[1:] == ["--child"]:
+        child()
+        return
+    
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results: List[Dict] = [measure_startup() for _ in range(runs)]
+    
+    print(f"cold start over {runs} runs (best / median)")
+    for key in ("import", "first_byte"):
+        values = [result[key] for result in results]
+        print(f"  {key:<12} {min(values) * 1000:8.1f} ms  {statistics.median(values) * 1000:8.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(results[-1]['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Benchmark suite for the upload, parse and serve paths, with a regression gate.
+
+Cases, each timed as the best of several runs on synthetic fixtures:
+
+- save_stream: storing a file fed in chunks of 16 KB, 256 KB and 1 MB
+- save_file: storing an UploadFile (1 MB reads) of 4 MB and 32 MB
+- parse_vtt_file: parsing 1k, 10k and 100k cue files with the cache off
+- time_to_seconds: converting 1k, 10k and 100k timestamps
+- to_dict: turning 1k, 10k and 100k parsed cues into response dicts
+- ranged_get: 16 concurrent clients each fetching 8 random 256 KB ranges
+  of a 64 MB WAV through the application
+- cold_start: importing the app in a fresh interpreter and serving the
+  first byte of / (see bench_startup.py)
+
+Results are compared to a stored baseline. Every run also times a fixed
+pure-Python calibration loop; on a machine other than the baseline's, the
+baseline is scaled by the ratio of the two calibrations before comparing,
+which is rough but keeps the gate usable there. A case fails when
+it is slower than its scaled baseline by more than the threshold, and
+still is after being re-measured; the baseline keeps the best of three
+passes.
+
+Usage:
+    python benchmarks/bench_suite.py [--threshold 0.3] [--filter NAME] [--repeat N]
+    python benchmarks/bench_suite.py --update-baseline
+
+Exits with status 1 if any case regressed.
+"""
+
+import argparse
+import asyncio
+import gc
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_startup import measure_startup  # noqa: E402
+from backend.file_storage import FileStorageService  # noqa: E402
+from backend.vtt_parser import VTTParserService  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_REPEAT = 5
+MIN_SAMPLE_SECONDS = 0.05
+BASELINE_PASSES = 3  # full passes when updating the baseline
+CONFIRM_RUNS = 2  # re-measurements of a case before it counts as a regression
+
+MB = 1024 * 1024
+CUE_COUNTS = (1_000, 10_000, 100_000)
+RANGE_WINDOW = 256 * 1024
+RANGE_CLIENTS = 16
+RANGE_REQUESTS_PER_CLIENT = 8
+
+
+# Synthetic fixtures
+
+def write_vtt(path: Path, cue_count: int) -> None:
+    """Write a VTT file with the given number of cues."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for i in range(cue_count):
+            f.write(f"{i + 1}\n{_timestamp(i * 2.5)} --> {_timestamp(i * 2.5 + 2.0)} align:start\n")
+            f.write(f"Subtitle line number {i} with some lecture text\n\n")
+
+
+def _timestamp(seconds: float) -> str:
+    """Format seconds as HH:MM:SS.mmm."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def write_wav(path: Path, size: int) -> None:
+    """Write a 16-bit 48 kHz stereo WAV of about size bytes filled with noise."""
+    data_size = (size - 44) // 4 * 4
+    fmt = struct.pack('<HHIIHH', 1, 2, 48000, 48000 * 4, 4, 16)
+    block = random.Random(0).randbytes(MB)
+    with open(path, "wb") as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', data_size))
+        remaining = data_size
+        while remaining:
+            f.write(block[:min(remaining, MB)])
+            remaining -= min(remaining, MB)
+
+
+# Timing helpers
+
+def best_of(func: Callable[[], None], repeat: int, clock: Callable[[], float] = time.perf_counter) -> float:
+    """
+    Return the fastest of several runs of func in seconds.
+    
+    Garbage collection is paused while timing, as in timeit. Functions
+    faster than MIN_SAMPLE_SECONDS are called several times per sample and
+    the per-call time is returned, so short cases are not dominated by
+    timer and scheduler noise.
+    """
+    number = 1
+    while True:
+        start = clock()
+        for _ in range(number):
+            func()
+        if clock() - start >= MIN_SAMPLE_SECONDS or number >= 1000:
+            break
+        number *= 2
+    
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = clock()
+            for _ in range(number):
+                func()
+            timings.append((clock() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return min(timings)
+
+
+def cpu_best_of(func: Callable[[], None], repeat: int) -> float:
+    """best_of on process CPU time, for cases that do no I/O."""
+    return best_of(func, repeat, clock=time.process_time)
+
+
+def calibrate(repeat: int = 15) -> float:
+    """Time a fixed pure-Python workload, used to scale baselines between machines."""
+    def workload():
+        table = {}
+        for i in range(100_000):
+            table[i % 1000] = table.get(i % 1000, 0) + i * 3 // 7
+    return cpu_best_of(workload, repeat)
+
+
+async def _chunks(data: bytes, chunk_size: int):
+    view = memoryview(data)
+    for i in range(0, len(data), chunk_size):
+        yield bytes(view[i:i + chunk_size])
+
+
+# Cases; each returns (seconds, description of the rate)
+
+def bench_save_stream(tmp: Path, size: int, chunk_size: int, repeat: int) -> Tuple[float, str]:
+    storage = FileStorageService(upload_dir=str(tmp / "save_stream"))
+    data = random.Random(size).randbytes(size)
+    # Distinct content per run, so nothing is deduplicated
+    runs = itertools.count()
+    
+    def run():
+        payload = next(runs).to_bytes(8, "little") + data
+        asyncio.run(storage.save_stream(_chunks(payload, chunk_size), "bench.wav"))
+    seconds = best_of(run, repeat)
+    return seconds, f"{size / MB / seconds:8.1f} MB/s"
+
+
+def bench_save_file(tmp: Path, size: int, repeat: int) -> Tuple[float, str]:
+    storage = FileStorageService(upload_dir=str(tmp / "save_file"))
+    data = random.Random(size + 1).randbytes(size)
+    runs = itertools.count()
+    
+    def run():
+        payload = next(runs).to_bytes(8, "little") + data
+        upload = UploadFile(io.BytesIO(payload), filename="bench.wav")
+        asyncio.run(storage.save_file(upload, "bench.wav"))
+    seconds = best_of(run, repeat)
+    return seconds, f"{size / MB / seconds:8.1f} MB/s"
+
+
+def bench_parse(tmp: Path, cue_count: int, repeat: int) -> Tuple[float, str]:
+    path = tmp / f"parse_{cue_count}.vtt"
+    write_vtt(path, cue_count)
+    parser = VTTParserService(cache_max_entries=0)
+    seconds = cpu_best_of(lambda: parser.parse_vtt_file(str(path)), repeat)
+    return seconds, f"{cue_count / seconds:10.0f} cues/s"
+
+
+def bench_time_to_seconds(cue_count: int, repeat: int) -> Tuple[float, str]:
+    stamps = [_timestamp(i * 2.5) for i in range(cue_count)]
+    convert = VTTParserService.time_to_seconds
+    
+    def run():
+        for stamp in stamps:
+            convert(stamp)
+    seconds = cpu_best_of(run, repeat)
+    return seconds, f"{cue_count / seconds:10.0f} calls/s"
+
+
+def bench_to_dict(tmp: Path, cue_count: int, repeat: int) -> Tuple[float, str]:
+    path = tmp / f"to_dict_{cue_count}.vtt"
+    write_vtt(path, cue_count)
+    cues = VTTParserService(cache_max_entries=0).parse_vtt_file(str(path))
+    seconds = cpu_best_of(lambda: [cue.to_dict() for cue in cues], repeat)
+    return seconds, f"{cue_count / seconds:10.0f} cues/s"
+
+
+def bench_ranged_get(tmp: Path, repeat: int) -> Tuple[float, str]:
+    import main
+    
+    upload_dir = tmp / "ranged_get"
+    upload_dir.mkdir(exist_ok=True)
+    source = tmp / "long.wav"
+    size = 64 * MB
+    write_wav(source, size)
+    main.file_storage.upload_dir = upload_dir
+    with open(source, "rb") as f:
+        asyncio.run(main.file_storage.save_stream(_chunks(f.read(), MB), "long.wav"))
+    
+    latencies: List[float] = []
+    
+    async def client_session(client: httpx.AsyncClient, rng: random.Random):
+        for _ in range(RANGE_REQUESTS_PER_CLIENT):
+            offset = rng.randrange(0, size - RANGE_WINDOW)
+            start = time.perf_counter()
+            response = await client.get(
+                "/api/files/audio/long.wav",
+                headers={"Range": f"bytes={offset}-{offset + RANGE_WINDOW - 1}"}
+            )
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 206 and len(response.content) == RANGE_WINDOW
+    
+    async def run_clients():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await asyncio.gather(*(client_session(client, random.Random(i)) for i in range(RANGE_CLIENTS)))
+    
+    seconds = best_of(lambda: asyncio.run(run_clients()), repeat)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95)]
+    return seconds, f"p50 {p50 * 1000:6.1f} ms  p95 {p95 * 1000:6.1f} ms"
+
+
+def bench_cold_start(repeat: int) -> Tuple[float, str]:
+    # Each run is a new process, so best_of's in-process repetition does not apply
+    runs = [measure_startup() for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["first_byte"])
+    return best["first_byte"], f"import {best['import'] * 1000:6.1f} ms"
+
+
+def build_cases(tmp: Path, repeat: int) -> Dict[str, Callable[[], Tuple[float, str]]]:
+    """Map case names to functions running them."""
+    cases = {}
+    for size in (4 * MB, 32 * MB):
+        for chunk_size in (16 * 1024, 256 * 1024, MB):
+            cases[f"save_stream[size={size // MB}MB,chunk={chunk_size // 1024}KB]"] = (
+                lambda size=size, chunk_size=chunk_size: bench_save_stream(tmp, size, chunk_size, repeat)
+            )
+        cases[f"save_file[size={size // MB}MB]"] = lambda size=size: bench_save_file(tmp, size, repeat)
+    for cue_count in CUE_COUNTS:
+        cases[f"parse_vtt_file[cues={cue_count}]"] = lambda n=cue_count: bench_parse(tmp, n, repeat)
+        cases[f"time_to_seconds[calls={cue_count}]"] = lambda n=cue_count: bench_time_to_seconds(n, repeat)
+        cases[f"to_dict[cues={cue_count}]"] = lambda n=cue_count: bench_to_dict(tmp, n, repeat)
+    cases[f"ranged_get[clients={RANGE_CLIENTS}]"] = lambda: bench_ranged_get(tmp, repeat)
+    cases["cold_start[first_byte]"] = lambda: bench_cold_start(repeat)
+    return cases
+
+
+# Baseline comparison
+
+def load_baseline(path: Path) -> Optional[dict]:
+    """Read a stored baseline, or None if there is none."""
+    if not path.is_file():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def machine_description() -> str:
+    """Identify the interpreter and hardware a baseline was recorded on."""
+    return f"Python {platform.python_version()}, {platform.system()} {platform.machine()}, {os.cpu_count()} CPUs"
+
+
+def baseline_scale(calibration: float, baseline: dict) -> float:
+    """
+    Factor to scale baseline timings by for this machine.
+
+    On the machine the baseline was recorded on, timings are compared as
+    they are; the calibration loop is as noisy as the cases, so scaling
+    would only add noise.
+
+    Args:
+        calibration: Calibration time of this run
+        baseline: Stored baseline with "calibration" and "machine"
+
+    Returns:
+        1.0 on the baseline machine, otherwise the calibration ratio
+    """
+    if baseline.get("machine") == machine_description():
+        return 1.0
+    return calibration / baseline["calibration"]
+
+
+def compare(results: Dict[str, float], scale: float, baseline: dict) -> Dict[str, Optional[float]]:
+    """
+    Compare results to a baseline.
+
+    Args:
+        results: Case name -> seconds
+        scale: Factor for baseline timings (see baseline_scale)
+        baseline: Stored baseline with "results"
+
+    Returns:
+        Case name -> ratio of the result to its scaled baseline (None for
+        cases missing from the baseline)
+    """
+    ratios = {}
+    for name, seconds in results.items():
+        expected = baseline["results"].get(name)
+        ratios[name] = seconds / (expected * scale) if expected else None
+    return ratios
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON file")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="allowed slowdown against the baseline (default: 0.3 = 30%%)")
+    arg_parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    arg_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per case, best is kept")
+    args = arg_parser.parse_args()
+    
+    baseline = None if args.update_baseline else load_baseline(args.baseline)
+    results: Dict[str, float] = {}
+    rates: Dict[str, str] = {}
+    
+    def measure(name: str, run: Callable[[], Tuple[float, str]]) -> None:
+        seconds, rate = run()
+        if name not in results or seconds < results[name]:
+            results[name] = seconds
+            rates[name] = rate
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = {name: run for name, run in build_cases(Path(tmp), args.repeat).items() if args.filter in name}
+        calibration = float("inf")
+        # A baseline should be the machine at its best, so take the fastest of several passes
+        passes = BASELINE_PASSES if args.update_baseline else 1
+        for number in range(passes):
+            print(f"pass {number + 1}/{passes}: {len(cases)} cases", flush=True)
+            calibration = min(calibration, calibrate())
+            for name, run in cases.items():
+                measure(name, run)
+        
+        ratios: Dict[str, Optional[float]] = {}
+        if baseline:
+            # Re-measure apparent regressions so a noisy moment does not fail the run
+            scale = baseline_scale(calibration, baseline)
+            for attempt in range(CONFIRM_RUNS + 1):
+                ratios = compare(results, scale, baseline)
+                suspects = [name for name, ratio in ratios.items() if ratio is not None and ratio > 1 + args.threshold]
+                if not suspects or attempt == CONFIRM_RUNS:
+                    break
+                print(f"re-measuring {len(suspects)} case(s) over the threshold", flush=True)
+                for name in suspects:
+                    measure(name, cases[name])
+    
+    regressions = []
+    if baseline:
+        print(f"calibration {calibration * 1000:.1f} ms; baseline timings scaled by {scale:.2f}")
+    else:
+        print(f"calibration {calibration * 1000:.1f} ms")
+    for name, seconds in results.items():
+        line = f"  {name:<40} {seconds * 1000:10.2f} ms  {rates[name]}"
+        if baseline and ratios[name] is None:
+            line += "   (no baseline)"
+        elif baseline:
+            line += f"   {ratios[name]:5.2f}x baseline"
+            if ratios[name] > 1 + args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    
+    if args.update_baseline:
+        stored = load_baseline(args.baseline) or {}
+        if args.filter and stored:
+            # Keep the other cases, rescaled if they come from another machine
+            rescale = baseline_scale(calibration, stored)
+            merged = {name: seconds * rescale for name, seconds in stored["results"].items()}
+            merged.update(results)
+            results = merged
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "calibration": calibration,
+                "machine": machine_description(),
+                "results": dict(sorted(results.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    
+    if regressions:
+        print(f"{len(regressions)} case(s) more than {args.threshold:.0%} slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
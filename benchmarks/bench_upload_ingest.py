@@ -0,0 +1,94 @@
+"""
+Benchmark upload ingestion: UploadFile spooling vs direct-to-disk streaming.
+
+Starlette's UploadFile spools every file part to a SpooledTemporaryFile
+(rolling over to disk past 1 MB) before the endpoint runs, and the endpoint
+then copies it to storage, so each upload is written to disk twice. The
+streaming path parses the multipart body from request.stream() and writes
+the file part straight to storage.
+
+Bytes written are read from /proc/self/io (wchar), which counts every
+write() the process makes, including the temporary spool.
+
+Usage:
+    python benchmarks/bench_upload_ingest.py [file_mb] [uploads]
+
+Defaults to a 64 MB file uploaded 5 times per path.
+"""
+
+import asyncio
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, File, Request, UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.file_storage import FileStorageService  # noqa: E402
+from backend.multipart_stream import MultipartStreamReader  # noqa: E402
+
+
+def bytes_written() -> int:
+    """Total bytes this process has passed to write() so far."""
+    with open('/proc/self/io') as f:
+        for line in f:
+            if line.startswith('wchar:'):
+                return int(line.split()[1])
+    raise RuntimeError("wchar not available in /proc/self/io")
+
+
+def build_app(storage: FileStorageService) -> FastAPI:
+    """App exposing both ingestion paths into the same storage."""
+    app = FastAPI()
+    
+    @app.post("/spooled")
+    async def spooled(file: UploadFile = File(...)):
+        await storage.save_file(file, "spooled.wav")
+        return {}
+    
+    @app.post("/streamed")
+    async def streamed(request: Request):
+        reader = MultipartStreamReader(request.stream(), request.headers["content-type"])
+        await reader.next_part()
+        await storage.save_stream(reader.iter_data(), "streamed.wav")
+        return {}
+    
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, data: bytes, uploads: int):
+    """Upload the same payload repeatedly; return (seconds, bytes written) per upload."""
+    before_bytes = bytes_written()
+    start = time.perf_counter()
+    for _ in range(uploads):
+        response = await client.post(path, files={"file": ("audio.wav", io.BytesIO(data), "audio/wav")})
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed / uploads, (bytes_written() - before_bytes) / uploads
+
+
+async def run(file_mb: int, uploads: int) -> None:
+    data = b"\x01" * (file_mb * 1024 * 1024)
+    
+    with tempfile.TemporaryDirectory() as upload_dir:
+        app = build_app(FileStorageService(upload_dir=upload_dir))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            print(f"{uploads} uploads of {file_mb} MB each")
+            for label, path in (("UploadFile + save_file", "/spooled"), ("streamed save_stream", "/streamed")):
+                seconds, written = await measure(client, path, data, uploads)
+                print(f"  {label:24s} {seconds * 1000:8.1f} ms/upload  {written / len(data):5.2f}x file size written")
+
+
+def main() -> None:
+    file_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.run(run(file_mb, uploads))
+
+
+if __name__ == "__main__":
+    main()
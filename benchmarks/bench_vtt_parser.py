@@ -0,0 +1,89 @@
+"""
+Benchmark the built-in VTT parser against the previous webvtt-py path.
+
+Usage:
+    python benchmarks/bench_vtt_parser.py [cue_count ...]
+
+Defaults to 10k and 100k cue files written to a temporary directory.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.vtt_parser import SubtitleCue, VTTParserService  # noqa: E402
+
+
+def write_vtt(path: Path, cue_count: int) -> None:
+    """Write a synthetic VTT file with the given number of cues."""
+    lines = ["WEBVTT", ""]
+    for i in range(cue_count):
+        start = i * 2.5
+        end = start + 2.0
+        lines.append(str(i + 1))
+        lines.append(f"{_timestamp(start)} --> {_timestamp(end)} align:start")
+        lines.append(f"Subtitle line number {i} with some lecture text")
+        lines.append("")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _timestamp(seconds: float) -> str:
+    """Format seconds as HH:MM:SS.mmm."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def parse_with_webvtt(path: str):
+    """Previous implementation: webvtt.read plus time_to_seconds per caption."""
+    import webvtt
+
+    return [
+        SubtitleCue(
+            start_time=VTTParserService.time_to_seconds(caption.start),
+            end_time=VTTParserService.time_to_seconds(caption.end),
+            text=caption.text
+        )
+        for caption in webvtt.read(path)
+    ]
+
+
+def best_of(func, *args, repeat: int = 3) -> float:
+    """Return the fastest of several runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(cue_counts):
+    # Cache disabled so every run measures a full parse
+    parser = VTTParserService(cache_max_entries=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for cue_count in cue_counts:
+            path = Path(tmp) / f"bench_{cue_count}.vtt"
+            write_vtt(path, cue_count)
+
+            native = best_of(parser.parse_vtt_file, str(path))
+            try:
+                legacy = best_of(parse_with_webvtt, str(path))
+            except ImportError:
+                legacy = None
+
+            line = f"{cue_count:>8} cues  native {native * 1000:9.1f} ms"
+            if legacy is not None:
+                line += f"  webvtt-py {legacy * 1000:9.1f} ms  speedup {legacy / native:5.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    main(counts)
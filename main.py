@@ -18,28 +18,104 @@ You should have received a copy of the GNU Affero General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Header, BackgroundTasks
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from pathlib import Path
+from contextlib import asynccontextmanager
+import asyncio
+import itertools
+import json
+import math
 import os
+import time
+from urllib.parse import quote
 
-from backend.file_storage import FileStorageService
-from backend.vtt_parser import VTTParserService
+from backend import blocking_io, metrics
+from backend.archive_reader import aiter_member, is_archive_filename, list_members
+from backend.blocking_io import run_blocking
+from backend.file_storage import FileStorageService, FileTooLargeError
+from backend.multipart_stream import MultipartError, MultipartPart, MultipartStreamReader
+from backend.player_sessions import PlayerSessionError, PlayerSessionService
+from backend.ranged_file_response import RangedFileResponse, RangedStreamResponse, content_disposition, etag_matches
+from backend.request_profiler import ProfilingMiddleware, RequestProfiler
+from backend.static_assets import Asset, StaticAssetService
+from backend.storage_backends import LocalStorageBackend, S3StorageBackend, create_s3_client
+from backend.storage_gc import StorageCollector
+from backend.upload_sessions import UploadSessionError, UploadSessionService
+from backend.cue_encoding import CUE_BINARY_MEDIA_TYPE, accepts_binary_cues, compress, negotiate_encoding
+from backend.cue_index import CueIndex
+from backend.cue_table import CueTable
+from backend.vtt_parser import VTTParserService, VTTStreamParser
+from backend.waveform_peaks import WaveformPeakService
+from backend.wav_header import read_wav_info
 
 # Configuration from environment variables
 MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", "2147483648"))  # 2GB default
 UPLOAD_TIMEOUT = int(os.getenv("UPLOAD_TIMEOUT", "300"))  # 5 minutes default
 ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
+VTT_CACHE_MAX_ENTRIES = int(os.getenv("VTT_CACHE_MAX_ENTRIES", "64"))
+VTT_CACHE_MAX_BYTES = int(os.getenv("VTT_CACHE_MAX_BYTES", "67108864"))  # 64MB default
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", "86400"))  # 24 hours default
+BLOCKING_IO_THREADS = int(os.getenv("BLOCKING_IO_THREADS", "8"))
+STORAGE_QUOTA_BYTES = int(os.getenv("STORAGE_QUOTA_BYTES", "0"))  # 0 = no quota
+FILE_TTL = int(os.getenv("FILE_TTL", "0"))  # seconds since last access, 0 = keep files
+STORAGE_GC_INTERVAL = int(os.getenv("STORAGE_GC_INTERVAL", "600"))  # 10 minutes default, 0 = disabled
+DISK_USAGE_INTERVAL = int(os.getenv("DISK_USAGE_INTERVAL", "300"))  # 5 minutes default, 0 = disabled
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")  # "local" or "s3"
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION") or None
+S3_PRESIGNED_URLS = os.getenv("S3_PRESIGNED_URLS", "true").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fraction of requests, 0 = off
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")  # empty = header-triggered profiling and downloads off
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "32"))
+
+# Seconds before the first storage sweep after startup
+STORAGE_GC_STARTUP_DELAY = 60
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare directories on startup, and run periodic garbage collection of
+    the upload directory while serving.
+    
+    Setup that touches the filesystem lives here rather than at import time,
+    so importing the app stays cheap on cold starts.
+    """
+    file_storage.create_upload_dir()
+    static_dir.mkdir(exist_ok=True)
+    # Reads the prebuilt assets, or fingerprints and compresses them if the sources changed
+    await run_blocking(static_assets.ensure_built)
+    tasks = []
+    # The first sweep and measurement wait so they do not compete with the
+    # request that woke the server up
+    if STORAGE_GC_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            storage_collector.run(STORAGE_GC_INTERVAL, delay=min(STORAGE_GC_INTERVAL, STORAGE_GC_STARTUP_DELAY))
+        ))
+    if DISK_USAGE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            storage_collector.run_usage(DISK_USAGE_INTERVAL, delay=min(DISK_USAGE_INTERVAL, STORAGE_GC_STARTUP_DELAY))
+        ))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="W Sync",
     description="WAV Audio & Subtitle Synchronizer - Sync audio files with VTT subtitles",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS middleware for large file support
@@ -52,16 +128,98 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Opt-in request profiling; not installed at all unless configured
+PROFILES_PATH = "/api/admin/profiles"
+request_profiler = RequestProfiler(
+    sample_rate=PROFILE_SAMPLE_RATE,
+    token=PROFILE_TOKEN,
+    max_profiles=PROFILE_RING_SIZE
+)
+if request_profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=request_profiler, exclude_prefixes=(PROFILES_PATH,))
+
+# Record request latency per route, outside CORS so preflights are timed too
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Initialize services
-file_storage = FileStorageService(upload_dir="uploads")
-vtt_parser = VTTParserService()
+if STORAGE_BACKEND == "s3":
+    storage_backend = S3StorageBackend(
+        create_s3_client(endpoint_url=S3_ENDPOINT_URL, region_name=S3_REGION),
+        S3_BUCKET,
+        prefix=S3_PREFIX,
+        presign=S3_PRESIGNED_URLS
+    )
+else:
+    storage_backend = LocalStorageBackend()
+file_storage = FileStorageService(upload_dir="uploads", max_file_size=MAX_UPLOAD_SIZE, backend=storage_backend)
+vtt_parser = VTTParserService(
+    cache_max_entries=VTT_CACHE_MAX_ENTRIES,
+    cache_max_bytes=VTT_CACHE_MAX_BYTES
+)
+file_storage.add_delete_callback(vtt_parser.invalidate)
+blocking_io.set_max_workers(BLOCKING_IO_THREADS)
+waveform_peaks = WaveformPeakService(file_storage)
+file_storage.add_delete_callback(waveform_peaks.invalidate)
+upload_sessions = UploadSessionService(file_storage, session_ttl=UPLOAD_SESSION_TTL)
+player_sessions = PlayerSessionService(file_storage, vtt_parser)
+storage_collector = StorageCollector(
+    file_storage,
+    upload_sessions=upload_sessions,
+    waveform_peaks=waveform_peaks,
+    max_total_bytes=STORAGE_QUOTA_BYTES,
+    file_ttl=FILE_TTL
+)
+
+
+# Metrics read from the services at scrape time
 
-# Create static directory if it doesn't exist
+
+def _cache_counter(key: str):
+    """Samples of one cache_stats() counter for every cache."""
+    def samples():
+        return [
+            ({"cache": "vtt"}, vtt_parser.cache_stats()[key]),
+            ({"cache": "peaks"}, waveform_peaks.cache_stats()[key]),
+            ({"cache": "session"}, player_sessions.cache_stats()[key]),
+        ]
+    return samples
+
+
+metrics.register_callback(
+    'wsync_cache_hits_total', 'Lookups served from a cache', 'counter', _cache_counter("hits")
+)
+metrics.register_callback(
+    'wsync_cache_misses_total', 'Lookups that had to compute the value', 'counter', _cache_counter("misses")
+)
+metrics.register_callback(
+    'wsync_vtt_cache_bytes', 'Estimated memory used by cached cues', 'gauge',
+    lambda: [({}, vtt_parser.cache_stats()["bytes"])]
+)
+metrics.register_callback(
+    'wsync_upload_dir_bytes', 'Disk space allocated by files in the upload directory', 'gauge',
+    lambda: [({}, storage_collector.disk_bytes)]
+)
+metrics.register_callback(
+    'wsync_upload_dir_files', 'Number of files in the upload directory', 'gauge',
+    lambda: [({}, storage_collector.disk_files)]
+)
+metrics.register_callback(
+    'wsync_storage_gc_reclaimed_bytes_total', 'Bytes freed by storage garbage collection', 'counter',
+    lambda: [({}, storage_collector.total_bytes_reclaimed)]
+)
+
+
+# Static directory; created by lifespan if it doesn't exist
 static_dir = Path("static")
-static_dir.mkdir(exist_ok=True)
 
-# Mount static files for CSS and JavaScript
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount static files; the page itself references the fingerprinted copies under /assets
+app.mount("/static", StaticFiles(directory=static_dir, check_dir=False), name="static")
+
+# Fingerprinted, precompressed copies of the frontend (see StaticAssetService)
+static_assets = StaticAssetService(static_dir, static_dir / ".build", watch=ENVIRONMENT == "development")
+
+# Fingerprinted names change with their content, so browsers never need to revalidate them
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 
 # Pydantic models for API responses
@@ -70,6 +228,10 @@ class AudioUploadResponse(BaseModel):
     filename: str
     size: int
     duration: Optional[float] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bit_depth: Optional[int] = None
+    sha256: Optional[str] = None
 
 
 class SubtitleUploadResponse(BaseModel):
@@ -84,26 +246,206 @@ class ImageUploadResponse(BaseModel):
     url: str
 
 
+class BatchUploadResponse(BaseModel):
+    """Response for a batch upload; kinds missing from the batch are null."""
+    audio: Optional[AudioUploadResponse] = None
+    subtitle: Optional[SubtitleUploadResponse] = None
+    image: Optional[ImageUploadResponse] = None
+    skipped: List[str] = []
+
+
+class BlobLinkRequest(BaseModel):
+    """Request to store already uploaded content under a filename."""
+    filename: str
+
+
+class BlobLinkResponse(BaseModel):
+    """Response for linking a filename to stored content."""
+    filename: str
+    size: int
+    sha256: str
+
+
+class UploadSessionRequest(BaseModel):
+    """Request to start a resumable upload."""
+    filename: str
+    size: int
+    kind: str = "audio"
+
+
+class UploadSessionResponse(BaseModel):
+    """Status of a resumable upload session."""
+    id: str
+    filename: str
+    kind: str
+    size: int
+    offset: int
+    ranges: List[List[int]]
+    expires_at: float
+
+
+class UploadCompleteResponse(BaseModel):
+    """Response for a finalized resumable upload."""
+    filename: str
+    kind: str
+    size: int
+    sha256: str
+
+
+class FileInfo(BaseModel):
+    """Catalog entry of a stored file; content metadata is null where it does not apply."""
+    name: str
+    kind: str
+    size: int
+    sha256: Optional[str] = None
+    created_at: float
+    accessed_at: float
+    duration: Optional[float] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bit_depth: Optional[int] = None
+    cue_count: Optional[int] = None
+
+
+class FileListResponse(BaseModel):
+    """One page of stored files, newest first."""
+    files: List[FileInfo]
+    next: Optional[int] = None
+
+
+class PlayerSessionRequest(BaseModel):
+    """Files to group into a player session."""
+    audio: str
+    subtitles: List[str]
+    image: Optional[str] = None
+
+
+class PlayerSessionCreated(BaseModel):
+    """Response for a new player session."""
+    id: str
+    url: str
+
+
 class DeleteResponse(BaseModel):
     """Response for file deletion."""
     success: bool
     message: str
 
 
-@app.post("/api/upload/audio", response_model=AudioUploadResponse)
-async def upload_audio(file: UploadFile = File(...)):
+def _json_response(body: str) -> Response:
+    """Wrap an already serialized JSON document in a response."""
+    return Response(content=body.encode("utf-8"), media_type="application/json")
+
+
+def _negotiate_cue_format(request: Request) -> Tuple[str, str]:
+    """
+    Pick the media type and content coding for a cue payload.
+    
+    Returns:
+        Tuple of (CUE_BINARY_MEDIA_TYPE or "application/json", "br"/"gzip"/"identity")
+    """
+    media_type = CUE_BINARY_MEDIA_TYPE if accepts_binary_cues(request.headers.get("accept")) else "application/json"
+    return media_type, negotiate_encoding(request.headers.get("accept-encoding"))
+
+
+def _encode_cue_payload(cues: CueTable, media_type: str, encoding: str, filename: Optional[str] = None) -> bytes:
+    """
+    Serialize cues as JSON ({"cues": [...]}, plus "filename" if given) or the
+    binary cue format, then apply the content coding.
+    """
+    if media_type == CUE_BINARY_MEDIA_TYPE:
+        data = cues.to_binary()
+    elif filename is None:
+        data = ('{"cues":%s}' % cues.to_json()).encode("utf-8")
+    else:
+        data = ('{"filename":%s,"cues":%s}' % (json.dumps(filename, ensure_ascii=False), cues.to_json())).encode("utf-8")
+    return compress(data, encoding)
+
+
+def _cue_response(body: bytes, media_type: str, encoding: str, headers: Optional[dict] = None) -> Response:
+    """Wrap an encoded cue payload, marking how it was negotiated."""
+    response_headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    response_headers.update(headers or {})
+    return Response(content=body, media_type=media_type, headers=response_headers)
+
+
+# Bytes a multipart body may carry beyond the file itself (boundaries and part headers)
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Uploads read the request stream directly; describe the form for the API docs
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+async def _open_upload(request: Request) -> Tuple[MultipartStreamReader, MultipartPart]:
+    """
+    Start reading the "file" field of a multipart upload from the request stream.
+    
+    Unlike UploadFile, nothing is spooled to a temporary file: the caller
+    streams the part body with reader.iter_data() to its destination.
+    
+    Returns:
+        Tuple of (reader positioned at the file body, file part headers)
+    
+    Raises:
+        HTTPException: 413 if Content-Length already exceeds the upload limit,
+            422 if there is no file field, 400 if the body is malformed
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > file_storage.MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+        max_size_gb = file_storage.MAX_FILE_SIZE / (1024**3)
+        raise HTTPException(status_code=413, detail=f"파일 크기가 너무 큽니다 (최대 {max_size_gb:.1f}GB)")
+    
+    try:
+        reader = MultipartStreamReader(request.stream(), request.headers.get("content-type", ""))
+    except MultipartError:
+        raise HTTPException(status_code=422, detail="업로드할 파일이 없습니다")
+    
+    try:
+        while True:
+            part = await reader.next_part()
+            if part is None:
+                raise HTTPException(status_code=422, detail="업로드할 파일이 없습니다")
+            if part.name == "file" and part.filename is not None:
+                return reader, part
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
+
+
+@app.post("/api/upload/audio", response_model=AudioUploadResponse, openapi_extra=UPLOAD_OPENAPI)
+async def upload_audio(request: Request, background_tasks: BackgroundTasks):
     """
     Upload WAV audio file.
     
+    The multipart body is streamed straight to storage. Waveform peaks are
+    computed in the background after the response.
+    
     Args:
-        file: Uploaded WAV file
-        
+        request: Request with a multipart/form-data body containing a "file" field
+        background_tasks: Post-response tasks
+    
     Returns:
-        AudioUploadResponse with filename, size, and optional duration
-        
+        AudioUploadResponse with filename, size, and header-derived duration and format
+    
     Raises:
         HTTPException: If file validation fails or upload fails
     """
+    reader, file = await _open_upload(request)
+    
     # Validate audio file
     is_valid, error_message = file_storage.validate_audio(file)
     if not is_valid:
@@ -116,18 +458,10 @@ async def upload_audio(file: UploadFile = File(...)):
     sanitized_filename = file_storage.sanitize_filename(file.filename)
     
     try:
-        # Save file
-        file_path = await file_storage.save_file(file, sanitized_filename)
-        
-        # Get file size
-        file_size = file_path.stat().st_size
-        
-        return AudioUploadResponse(
-            filename=sanitized_filename,
-            size=file_size,
-            duration=None  # Duration can be calculated client-side
-        )
+        return await _store_audio(reader.iter_data(), sanitized_filename, background_tasks)
     
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
     except ValueError as e:
         raise HTTPException(status_code=413, detail=str(e))
     except IOError as e:
@@ -136,20 +470,99 @@ async def upload_audio(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"예상치 못한 오류가 발생했습니다: {str(e)}")
 
 
-@app.post("/api/upload/subtitle", response_model=SubtitleUploadResponse)
-async def upload_subtitle(file: UploadFile = File(...)):
+async def _store_audio(chunks: AsyncIterator[bytes], filename: str, background_tasks: BackgroundTasks) -> AudioUploadResponse:
+    """
+    Store streamed WAV content and describe it from its header.
+    
+    Waveform peaks are scheduled to be computed after the response.
+    
+    Raises:
+        FileTooLargeError: If the content exceeds the upload limit
+        IOError: If the file cannot be stored
+    """
+    # Save file
+    file_path = await file_storage.save_stream(chunks, filename)
+    
+    # Get file size and read format and duration from the header only
+    file_size, wav_info = await run_blocking(_inspect_audio, file_path)
+    
+    if wav_info is not None:
+        await run_blocking(file_storage.set_file_metadata, filename, **_audio_metadata(wav_info))
+        background_tasks.add_task(_compute_peaks, file_path)
+    
+    return AudioUploadResponse(
+        filename=filename,
+        size=file_size,
+        duration=wav_info.duration if wav_info else None,
+        sample_rate=wav_info.sample_rate if wav_info else None,
+        channels=wav_info.channels if wav_info else None,
+        bit_depth=wav_info.bit_depth if wav_info else None,
+        sha256=file_storage.get_file_hash(filename)
+    )
+
+
+class EmptySubtitleError(ValueError):
+    """Raised while streaming a subtitle upload that contains no cues."""
+
+
+async def _store_subtitle(chunks: AsyncIterator[bytes], filename: str) -> Tuple[Path, CueTable]:
+    """
+    Store streamed VTT content, parsing each chunk before it is written.
+    
+    Malformed or empty files fail before anything is committed to storage,
+    and the parsed cues go to the cache so reads skip re-parsing the file.
+    
+    Returns:
+        Tuple of (stored file path, parsed cues)
+    
+    Raises:
+        EmptySubtitleError: If the file has no cues
+        ValueError: If the file is not valid VTT
+        IOError: If the file cannot be stored
+    """
+    parser = VTTStreamParser()
+    parse_seconds = 0.0
+    
+    def timed(func, *args):
+        # Runs in the worker, so waiting for the pool is not counted
+        nonlocal parse_seconds
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            parse_seconds += time.perf_counter() - started
+    
+    async def parsed_chunks():
+        async for chunk in chunks:
+            await run_blocking(timed, parser.feed, chunk)
+            yield chunk
+        if not await run_blocking(timed, parser.close):
+            raise EmptySubtitleError()
+    
+    file_path = await file_storage.save_stream(parsed_chunks(), filename)
+    cues = await run_blocking(parser.close)
+    metrics.observe_vtt_parse(parse_seconds, len(cues))
+    await run_blocking(vtt_parser.cache_parsed, str(file_path), cues)
+    await run_blocking(file_storage.set_file_metadata, filename, cue_count=len(cues))
+    return file_path, cues
+
+
+@app.post("/api/upload/subtitle", response_model=SubtitleUploadResponse, openapi_extra=UPLOAD_OPENAPI)
+async def upload_subtitle(request: Request):
     """
     Upload VTT subtitle file and parse it.
     
     Args:
-        file: Uploaded VTT file
-        
+        request: Request with a multipart/form-data body containing a "file" field
+    
     Returns:
         SubtitleUploadResponse with filename and parsed cues
-        
+    
     Raises:
         HTTPException: If file validation fails or parsing fails
     """
+    reader, file = await _open_upload(request)
+    
     # Validate subtitle file
     is_valid, error_message = file_storage.validate_subtitle(file)
     if not is_valid:
@@ -162,56 +575,54 @@ async def upload_subtitle(file: UploadFile = File(...)):
     sanitized_filename = file_storage.sanitize_filename(file.filename)
     
     try:
-        # Save file
-        file_path = await file_storage.save_file(file, sanitized_filename)
-        
-        # Parse VTT file
-        cues = vtt_parser.parse_vtt_file(str(file_path))
+        # Save and parse file
+        file_path, cues = await _store_subtitle(reader.iter_data(), sanitized_filename)
         
-        # Check if VTT file is empty
-        if not cues:
-            await file_storage.delete_file(sanitized_filename)
-            raise HTTPException(
-                status_code=400,
-                detail="자막 파일이 비어있습니다. 올바른 VTT 파일을 업로드해주세요"
+        media_type, encoding = _negotiate_cue_format(request)
+        if media_type == CUE_BINARY_MEDIA_TYPE:
+            # Same payload as a later GET, so encode it once into the cache
+            body = await run_blocking(
+                vtt_parser.get_encoded, str(file_path), (media_type, encoding),
+                lambda table: _encode_cue_payload(table, media_type, encoding)
             )
+            return _cue_response(body, media_type, encoding, {"X-Filename": quote(sanitized_filename)})
         
-        # Convert cues to dictionaries
-        cues_dict = [cue.to_dict() for cue in cues]
-        
-        return SubtitleUploadResponse(
-            filename=sanitized_filename,
-            cues=cues_dict
-        )
+        body = await run_blocking(_encode_cue_payload, cues, media_type, encoding, sanitized_filename)
+        return _cue_response(body, media_type, encoding)
     
+    except EmptySubtitleError:
+        raise HTTPException(
+            status_code=400,
+            detail="자막 파일이 비어있습니다. 올바른 VTT 파일을 업로드해주세요"
+        )
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
-        # Delete file if parsing fails
-        if file_storage.get_file_path(sanitized_filename):
-            await file_storage.delete_file(sanitized_filename)
         raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
     except IOError as e:
         raise HTTPException(status_code=500, detail=f"파일 저장 실패: {str(e)}")
     except Exception as e:
-        # Clean up on unexpected error
-        if file_storage.get_file_path(sanitized_filename):
-            await file_storage.delete_file(sanitized_filename)
         raise HTTPException(status_code=500, detail=f"예상치 못한 오류가 발생했습니다: {str(e)}")
 
 
-@app.post("/api/upload/image", response_model=ImageUploadResponse)
-async def upload_image(file: UploadFile = File(...)):
+@app.post("/api/upload/image", response_model=ImageUploadResponse, openapi_extra=UPLOAD_OPENAPI)
+async def upload_image(request: Request):
     """
     Upload optional image file (JPG, PNG, GIF, WebP).
     
     Args:
-        file: Uploaded image file
-        
+        request: Request with a multipart/form-data body containing a "file" field
+    
     Returns:
         ImageUploadResponse with filename and URL to access the image
-        
+    
     Raises:
         HTTPException: If file validation fails or upload fails
     """
+    reader, file = await _open_upload(request)
+    
     # Validate image file
     is_valid, error_message = file_storage.validate_image(file)
     if not is_valid:
@@ -225,7 +636,7 @@ async def upload_image(file: UploadFile = File(...)):
     
     try:
         # Save file
-        file_path = await file_storage.save_file(file, sanitized_filename)
+        file_path = await file_storage.save_stream(reader.iter_data(), sanitized_filename)
         
         # Generate URL to access the image
         image_url = f"/api/files/image/{sanitized_filename}"
@@ -235,6 +646,8 @@ async def upload_image(file: UploadFile = File(...)):
             url=image_url
         )
     
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
     except ValueError as e:
         raise HTTPException(status_code=413, detail=str(e))
     except IOError as e:
@@ -243,130 +656,1142 @@ async def upload_image(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"예상치 못한 오류가 발생했습니다: {str(e)}")
 
 
-@app.get("/api/files/audio/{filename}")
-async def get_audio(filename: str):
+# Batch uploads take up to one file of each kind, sent as parts or inside archives
+BATCH_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}}
+                    },
+                    "required": ["files"],
+                }
+            }
+        },
+    }
+}
+
+
+def _upload_kind(filename: str) -> Optional[str]:
+    """Return "audio", "subtitle" or "image" for a filename by its extension, or None."""
+    file_ext = Path(filename).suffix.lower()
+    for kind, extensions in UploadSessionService.KIND_EXTENSIONS.items():
+        if file_ext in extensions:
+            return kind
+    return None
+
+
+def _validate_batch_file(kind: str, file) -> str:
     """
-    Serve audio file for streaming.
+    Validate one file of a batch upload with the validator for its kind.
     
     Args:
-        filename: Name of the audio file
-        
+        kind: "audio", "subtitle" or "image"
+        file: Object with filename and content_type (multipart part or archive member)
+    
     Returns:
-        FileResponse with audio file stream
-        
+        Sanitized filename
+    
     Raises:
-        HTTPException: If file not found
+        HTTPException: 400 naming the file if validation fails
+    """
+    validate = {
+        "audio": file_storage.validate_audio,
+        "subtitle": file_storage.validate_subtitle,
+        "image": file_storage.validate_image,
+    }[kind]
+    is_valid, error_message = validate(file)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=f"{file.filename}: {error_message}")
+    return file_storage.sanitize_filename(file.filename)
+
+
+async def _store_batch_member(
+    kind: str,
+    filename: str,
+    chunks: AsyncIterator[bytes],
+    background_tasks: BackgroundTasks
+) -> str:
     """
-    file_path = file_storage.get_file_path(filename)
+    Store and process one file of a batch upload.
     
-    if not file_path:
-        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    Returns:
+        JSON document shaped like the single-file upload response for the kind
     
-    return FileResponse(
-        file_path,
-        media_type="audio/wav",
-        filename=filename
-    )
+    Raises:
+        HTTPException: If the file cannot be stored or parsed; the detail names the file
+    """
+    try:
+        if kind == "audio":
+            response = await _store_audio(chunks, filename, background_tasks)
+            return response.model_dump_json()
+        
+        if kind == "subtitle":
+            _, cues = await _store_subtitle(chunks, filename)
+            body = await run_blocking(_encode_cue_payload, cues, "application/json", "identity", filename)
+            return body.decode("utf-8")
+        
+        await file_storage.save_stream(chunks, filename)
+        return ImageUploadResponse(filename=filename, url=f"/api/files/image/{filename}").model_dump_json()
+    
+    except EmptySubtitleError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{filename}: 자막 파일이 비어있습니다. 올바른 VTT 파일을 업로드해주세요"
+        )
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=f"{filename}: {str(e)}")
+    except ValueError as e:
+        if kind == "subtitle":
+            raise HTTPException(status_code=400, detail=f"{filename}: VTT 파싱 실패: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"{filename}: {str(e)}")
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"{filename}: 파일 저장 실패: {str(e)}")
 
 
-@app.get("/api/files/subtitle/{filename}")
-async def get_subtitle(filename: str):
+async def _read_part_body(reader: MultipartStreamReader, body_read: asyncio.Event) -> AsyncIterator[bytes]:
+    """Yield the current part body, setting body_read once the reader has moved past it."""
+    try:
+        async for chunk in reader.iter_data():
+            yield chunk
+    finally:
+        body_read.set()
+
+
+@app.post("/api/upload/batch", response_model=BatchUploadResponse, openapi_extra=BATCH_UPLOAD_OPENAPI)
+async def upload_batch(request: Request, background_tasks: BackgroundTasks):
     """
-    Get parsed subtitle data as JSON.
+    Upload the audio, subtitle and image of a session in one request.
+    
+    Each file part is either a single file or a zip/tar archive of them.
+    Files are recognized by extension, and at most one of each kind may be
+    sent. Archive members are streamed to storage concurrently; plain parts
+    arrive one after another, so each one is stored and parsed while the
+    next is still being received.
     
     Args:
-        filename: Name of the subtitle file
-        
+        request: Request with a multipart/form-data body of file parts
+        background_tasks: Post-response tasks
+    
     Returns:
-        JSONResponse with parsed subtitle cues
-        
+        BatchUploadResponse with the single-file upload response of each
+        kind sent, and archive members that were not recognized
+    
     Raises:
-        HTTPException: If file not found or parsing fails
+        HTTPException: If any file fails validation, storage or parsing;
+            files already stored stay stored
     """
-    file_path = file_storage.get_file_path(filename)
+    content_length = request.headers.get("content-length", "")
+    max_batch_size = file_storage.MAX_FILE_SIZE * len(UploadSessionService.KIND_EXTENSIONS) + MULTIPART_OVERHEAD
+    if content_length.isdigit() and int(content_length) > max_batch_size:
+        max_size_gb = file_storage.MAX_FILE_SIZE / (1024**3)
+        raise HTTPException(status_code=413, detail=f"파일 크기가 너무 큽니다 (파일당 최대 {max_size_gb:.1f}GB)")
     
-    if not file_path:
-        raise HTTPException(status_code=404, detail="자막 파일을 찾을 수 없습니다")
+    try:
+        reader = MultipartStreamReader(request.stream(), request.headers.get("content-type", ""))
+    except MultipartError:
+        raise HTTPException(status_code=422, detail="업로드할 파일이 없습니다")
+    
+    tasks = {}
+    skipped: List[str] = []
+    spooled: List[Path] = []
+    
+    def start(kind: str, filename: str, chunks: AsyncIterator[bytes]) -> asyncio.Task:
+        if kind in tasks:
+            raise HTTPException(status_code=400, detail=f"같은 종류의 파일이 여러 개 있습니다: {filename}")
+        tasks[kind] = asyncio.create_task(_store_batch_member(kind, filename, chunks, background_tasks))
+        return tasks[kind]
     
     try:
-        # Parse VTT file
-        cues = vtt_parser.parse_vtt_file(str(file_path))
+        while (part := await reader.next_part()) is not None:
+            if part.filename is None:
+                continue
+            
+            if is_archive_filename(part.filename):
+                # Archives are indexed from the end, so spool them before reading members
+                archive_path = await file_storage.spool_stream(reader.iter_data(), suffix=".archive")
+                spooled.append(archive_path)
+                for member in await run_blocking(list_members, archive_path):
+                    kind = _upload_kind(member.filename)
+                    if kind is None:
+                        skipped.append(member.name)
+                        continue
+                    filename = _validate_batch_file(kind, member)
+                    start(kind, filename, aiter_member(archive_path, member.name))
+                continue
+            
+            kind = _upload_kind(part.filename)
+            if kind is None:
+                raise HTTPException(status_code=400, detail=f"지원되지 않는 파일 형식입니다: {part.filename}")
+            filename = _validate_batch_file(kind, part)
+            
+            # The next part starts where this body ends: wait for the body to
+            # be read, not for the file to be stored and parsed
+            body_read = asyncio.Event()
+            task = start(kind, filename, _read_part_body(reader, body_read))
+            waiter = asyncio.ensure_future(body_read.wait())
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if task.done():
+                task.result()
         
-        # Convert cues to dictionaries
-        cues_dict = [cue.to_dict() for cue in cues]
+        if not tasks:
+            raise HTTPException(status_code=422, detail="업로드할 파일이 없습니다")
         
-        return JSONResponse(content={"cues": cues_dict})
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
     
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 업로드 요청입니다: {str(e)}")
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"압축 파일을 읽을 수 없습니다: {str(e)}")
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"파일 저장 실패: {str(e)}")
+    finally:
+        # Stop the remaining files after a failure; their partial writes are discarded
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for archive_path in spooled:
+            await file_storage.discard_spooled(archive_path)
+    
+    return _json_response('{"audio":%s,"subtitle":%s,"image":%s,"skipped":%s}' % (
+        results.get("audio", "null"),
+        results.get("subtitle", "null"),
+        results.get("image", "null"),
+        json.dumps(skipped, ensure_ascii=False),
+    ))
 
 
-@app.get("/api/files/image/{filename}")
-async def get_image(filename: str):
+@app.post("/api/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(request: UploadSessionRequest):
     """
-    Serve image file.
+    Start a resumable upload.
     
     Args:
-        filename: Name of the image file
-        
+        request: Filename, total size in bytes and file kind
+    
     Returns:
-        FileResponse with image file
-        
+        UploadSessionResponse for the new session
+    
     Raises:
-        HTTPException: If file not found
+        HTTPException: If the file kind, name or size is not accepted
     """
-    file_path = file_storage.get_file_path(filename)
+    try:
+        session = await run_blocking(upload_sessions.create_session, request.filename, request.size, request.kind)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     
-    if not file_path:
-        raise HTTPException(status_code=404, detail="이미지 파일을 찾을 수 없습니다")
+    return JSONResponse(
+        status_code=201,
+        content=session,
+        headers={"Location": f"/api/uploads/{session['id']}"}
+    )
+
+
+@app.get("/api/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str):
+    """
+    Get the status of a resumable upload, including received byte ranges.
     
-    # Determine media type from file extension
-    import mimetypes
-    media_type, _ = mimetypes.guess_type(str(file_path))
+    Args:
+        session_id: Upload session identifier
     
-    return FileResponse(
-        file_path,
-        media_type=media_type or "application/octet-stream",
-        filename=filename
-    )
+    Returns:
+        UploadSessionResponse
+    
+    Raises:
+        HTTPException: If the session does not exist or has expired
+    """
+    try:
+        return await run_blocking(upload_sessions.get_session, session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
 
 
-@app.delete("/api/files/{filename}", response_model=DeleteResponse)
-async def delete_file(filename: str):
+@app.head("/api/uploads/{session_id}")
+async def head_upload_session(session_id: str):
     """
-    Delete uploaded file.
+    Get the current offset of a resumable upload (tus style).
     
     Args:
-        filename: Name of the file to delete
-        
+        session_id: Upload session identifier
+    
     Returns:
-        DeleteResponse with success status and message
-        
+        Empty response with Upload-Offset and Upload-Length headers
+    
     Raises:
-        HTTPException: If deletion fails
+        HTTPException: If the session does not exist or has expired
     """
     try:
-        success = await file_storage.delete_file(filename)
-        
-        if success:
-            return DeleteResponse(
-                success=True,
-                message=f"파일 '{filename}'이(가) 삭제되었습니다"
-            )
-        else:
-            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+        session = await run_blocking(upload_sessions.get_session, session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     
-    except IOError as e:
-        raise HTTPException(status_code=500, detail=f"파일 삭제 실패: {str(e)}")
+    return Response(status_code=200, headers={
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["size"]),
+        "Cache-Control": "no-store"
+    })
 
 
-@app.get("/")
-async def serve_frontend():
-    """Serve main HTML page."""
-    index_path = static_dir / "index.html"
-    if not index_path.exists():
+@app.patch("/api/uploads/{session_id}", status_code=204)
+async def append_upload_chunk(
+    session_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset")
+):
+    """
+    Append a chunk at the current offset (tus style).
+    
+    Args:
+        session_id: Upload session identifier
+        request: Request whose body is the chunk
+        upload_offset: Offset the chunk starts at; must equal the current offset
+    
+    Returns:
+        Empty 204 response with the new Upload-Offset header
+    
+    Raises:
+        HTTPException: If the session is unknown or the offset does not match
+    """
+    try:
+        session = await upload_sessions.write_chunk(
+            session_id, upload_offset, request.stream(), sequential=True
+        )
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    return Response(status_code=204, headers={"Upload-Offset": str(session["offset"])})
+
+
+@app.put("/api/uploads/{session_id}", response_model=UploadSessionResponse)
+async def put_upload_chunk(session_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """
+    Write a chunk at any offset; chunks may be sent in parallel.
+    
+    Args:
+        session_id: Upload session identifier
+        request: Request whose body is the chunk
+        offset: Offset the chunk starts at
+    
+    Returns:
+        UploadSessionResponse after the write
+    
+    Raises:
+        HTTPException: If the session is unknown or the chunk is out of bounds
+    """
+    try:
+        return await upload_sessions.write_chunk(session_id, offset, request.stream())
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@app.post("/api/uploads/{session_id}/complete", response_model=UploadCompleteResponse)
+async def complete_upload_session(session_id: str, background_tasks: BackgroundTasks):
+    """
+    Finalize a resumable upload and store the file.
+    
+    Args:
+        session_id: Upload session identifier
+        background_tasks: Post-response tasks (waveform peaks for audio)
+    
+    Returns:
+        UploadCompleteResponse with filename, kind, size and digest
+    
+    Raises:
+        HTTPException: If the session is unknown, not fully uploaded, busy
+            or holds an invalid subtitle file
+    """
+    try:
+        result = await upload_sessions.complete_session(session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"파일 저장 실패: {str(e)}")
+    
+    blob_path = file_storage.get_blob_path(result["sha256"])
+    cues = result.pop("cues", None)
+    if cues is not None:
+        # Parsed while completing; keep the cues for reads
+        await run_blocking(vtt_parser.cache_parsed, str(blob_path), cues)
+        await run_blocking(file_storage.set_file_metadata, result["filename"], cue_count=len(cues))
+    elif result["kind"] == "audio":
+        background_tasks.add_task(_compute_peaks, blob_path)
+        background_tasks.add_task(_describe_audio, result["filename"], blob_path)
+    
+    return result
+
+
+@app.delete("/api/uploads/{session_id}", status_code=204)
+async def abort_upload_session(session_id: str):
+    """
+    Abort a resumable upload and discard its data.
+    
+    Args:
+        session_id: Upload session identifier
+    
+    Raises:
+        HTTPException: If the session does not exist or is being completed
+    """
+    try:
+        await run_blocking(upload_sessions.abort_session, session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    return Response(status_code=204)
+
+
+@app.head("/api/blobs/{sha256}")
+async def head_blob(sha256: str):
+    """
+    Check whether content with a SHA-256 digest is already stored.
+    
+    Lets the client skip uploading a file the server already has.
+    
+    Args:
+        sha256: Hex SHA-256 digest of the file content
+    
+    Returns:
+        Empty 200 response with Content-Length of the stored content
+    
+    Raises:
+        HTTPException: If the digest is invalid or the content is not stored
+    """
+    try:
+        blob_info = await run_blocking(file_storage.get_blob_info, sha256.lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if blob_info is None:
+        raise HTTPException(status_code=404, detail="저장된 파일이 없습니다")
+    
+    return Response(status_code=200, headers={"Content-Length": str(blob_info.size)})
+
+
+@app.post("/api/blobs/{sha256}/link", response_model=BlobLinkResponse)
+async def link_blob(sha256: str, request: BlobLinkRequest):
+    """
+    Store already uploaded content under a new filename without re-uploading it.
+    
+    Args:
+        sha256: Hex SHA-256 digest of stored content
+        request: Filename to map to the content
+    
+    Returns:
+        BlobLinkResponse with filename, size and digest
+    
+    Raises:
+        HTTPException: If the filename or digest is invalid or the content is not stored
+    """
+    if not file_storage.is_allowed_filename(request.filename):
+        raise HTTPException(status_code=400, detail="지원되지 않는 파일 형식입니다")
+    
+    sanitized_filename = file_storage.sanitize_filename(request.filename)
+    
+    try:
+        blob_path = await run_blocking(file_storage.link_blob, sha256.lower(), sanitized_filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if blob_path is None:
+        raise HTTPException(status_code=404, detail="저장된 파일이 없습니다")
+    
+    blob_info = await run_blocking(file_storage.get_blob_info, sha256.lower())
+    return BlobLinkResponse(
+        filename=sanitized_filename,
+        size=blob_info.size if blob_info is not None else 0,
+        sha256=sha256.lower()
+    )
+
+
+@app.api_route("/api/files/audio/{filename}", methods=["GET", "HEAD"])
+async def get_audio(filename: str, request: Request):
+    """
+    Serve audio file for streaming.
+    
+    Supports Range requests (single and multipart/byteranges) for seeking,
+    and conditional requests against a strong ETag: the file's SHA-256 for
+    content-addressed files, its inode/size/mtime otherwise.
+    
+    With a remote storage backend the client is redirected to a presigned
+    URL, or, if the backend has none, the requested ranges are read from
+    the backend without downloading the whole file first.
+    
+    Args:
+        filename: Name of the audio file
+        request: Incoming request (Range and conditional headers)
+    
+    Returns:
+        RangedFileResponse with audio file stream
+    
+    Raises:
+        HTTPException: If file not found
+    """
+    if file_storage.backend.remote:
+        response = await _remote_audio_response(filename, request)
+        if response is not None:
+            return response
+    
+    file_path = await file_storage.get_file_path_async(filename)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    
+    try:
+        file_stat = await run_blocking(os.stat, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    
+    sha256 = file_storage.get_file_hash(filename)
+    return RangedFileResponse(
+        str(file_path),
+        request.headers,
+        media_type="audio/wav",
+        filename=filename,
+        etag=f'"{sha256}"' if sha256 else None,
+        stat_result=file_stat
+    )
+
+
+async def _remote_audio_response(filename: str, request: Request) -> Optional[Response]:
+    """
+    Serve audio from a remote backend without passing through the local cache.
+    
+    Returns:
+        A redirect to a presigned URL or a ranged passthrough response, or
+        None if the content is cached locally and can be served from disk
+    
+    Raises:
+        HTTPException: If file not found
+    """
+    sha256 = file_storage.get_file_hash(filename)
+    if sha256 is None:
+        return None
+    
+    backend = file_storage.backend
+    blob_path = file_storage.get_blob_path(sha256)
+    url = backend.presigned_url(sha256, filename, "audio/wav")
+    if url is not None:
+        file_storage.record_access(filename)
+        return RedirectResponse(url, status_code=307)
+    
+    if await run_blocking(blob_path.is_file):
+        return None
+    
+    blob_info = await run_blocking(file_storage.get_blob_info, sha256)
+    if blob_info is None:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    
+    file_storage.record_access(filename)
+    return RangedStreamResponse(
+        lambda start, end: backend.read_range(sha256, blob_path, start, end),
+        blob_info.size,
+        int(blob_info.modified),
+        f'"{sha256}"',
+        request.headers,
+        media_type="audio/wav",
+        filename=filename
+    )
+
+
+def _inspect_audio(file_path: Path) -> tuple:
+    """
+    Get the size and header information of a stored audio file.
+    
+    Returns:
+        Tuple of (size in bytes, WavInfo or None if the header is unreadable)
+    """
+    file_size = file_path.stat().st_size
+    try:
+        wav_info = read_wav_info(file_path)
+    except (ValueError, OSError):
+        wav_info = None
+    return file_size, wav_info
+
+
+def _audio_metadata(wav_info) -> dict:
+    """Catalog metadata of a WAV file from its parsed header."""
+    return {
+        "duration": wav_info.duration,
+        "sample_rate": wav_info.sample_rate,
+        "channels": wav_info.channels,
+        "bit_depth": wav_info.bit_depth,
+    }
+
+
+async def _describe_audio(filename: str, file_path: Path) -> None:
+    """
+    Record catalog metadata of an audio file stored without being read (resumable uploads).
+    
+    Files with an unreadable header are left without metadata.
+    """
+    try:
+        metadata = _audio_metadata(await run_blocking(read_wav_info, file_path))
+        await run_blocking(file_storage.set_file_metadata, filename, **metadata)
+    except (ValueError, OSError):
+        pass
+
+
+# Upper bound on peaks returned per request; clients zoom out via coarser levels
+MAX_PEAKS_PER_REQUEST = 65536
+
+
+async def _compute_peaks(audio_path: Path) -> None:
+    """Precompute waveform peaks after an upload; failures are retried on demand."""
+    try:
+        await run_blocking(waveform_peaks.ensure_peaks, audio_path)
+    except (ValueError, OSError):
+        pass
+
+
+@app.get("/api/files/audio/{filename}/peaks")
+async def get_audio_peaks(
+    filename: str,
+    level: int = Query(0, ge=0),
+    from_: float = Query(0.0, alias="from", ge=0),
+    to: Optional[float] = Query(None, ge=0)
+):
+    """
+    Get waveform min/max peaks for a time range at one zoom level.
+    
+    Level 0 is the finest; each level is WaveformPeakService.level_factor
+    times coarser. Peaks are computed on first request if the background
+    job has not finished.
+    
+    Args:
+        filename: Name of the audio file
+        level: Zoom level
+        from_: Range start in seconds
+        to: Range end in seconds (default: end of file)
+    
+    Returns:
+        JSON response with level geometry and a flat [min, max, ...] int16 list
+    
+    Raises:
+        HTTPException: If the file, level or range is invalid
+    """
+    if to is not None and to < from_:
+        raise HTTPException(status_code=400, detail="잘못된 시간 범위입니다 (from은 to보다 작아야 합니다)")
+    
+    file_path = await file_storage.get_file_path_async(filename)
+    if not file_path:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    
+    try:
+        sample_rate, levels = await run_blocking(waveform_peaks.ensure_peaks, file_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"파형을 계산할 수 없는 오디오 형식입니다: {str(e)}")
+    
+    if level >= len(levels):
+        raise HTTPException(status_code=400, detail=f"잘못된 레벨입니다 (0-{len(levels) - 1})")
+    
+    peak_level = levels[level]
+    peak_seconds = peak_level.samples_per_peak / sample_rate if sample_rate else 0.0
+    start = int(from_ / peak_seconds) if peak_seconds else 0
+    stop = math.ceil(to / peak_seconds) if peak_seconds and to is not None else peak_level.count
+    stop = min(stop, peak_level.count)
+    if stop - start > MAX_PEAKS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail="요청 범위가 너무 큽니다. 더 높은 레벨을 사용하세요")
+    
+    peaks = await run_blocking(waveform_peaks.read_peaks, file_path, peak_level, start, stop)
+    
+    return _json_response(json.dumps({
+        "level": level,
+        "levels": len(levels),
+        "level_factor": waveform_peaks.level_factor,
+        "sample_rate": sample_rate,
+        "samples_per_peak": peak_level.samples_per_peak,
+        "count": peak_level.count,
+        "start": start,
+        "peaks": peaks.ravel().tolist(),
+    }, separators=(",", ":")))
+
+
+# Cursor pagination of subtitle cues
+DEFAULT_CUES_PER_PAGE = 1000
+MAX_CUES_PER_PAGE = 10000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@app.get("/api/files/subtitle/{filename}")
+async def get_subtitle(
+    filename: str,
+    request: Request,
+    format_: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$"),
+    after: Optional[float] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_CUES_PER_PAGE)
+):
+    """
+    Get parsed subtitle data as JSON, NDJSON or the binary cue format.
+    
+    Without query parameters the format follows the Accept header
+    (CUE_BINARY_MEDIA_TYPE must be asked for explicitly) and the payload is
+    gzip or brotli compressed per Accept-Encoding. Each negotiated variant
+    is encoded once per file and served from the parsed-cue cache
+    afterwards.
+    
+    `format=ndjson` streams one cue object per line in batches instead of
+    building the whole document. `after`/`limit` return one page of cues
+    in start order, starting after the `after` time; the next page's cursor
+    is "next" in JSON or the X-Next-Cursor header in NDJSON.
+    
+    Args:
+        filename: Name of the subtitle file
+        request: Request carrying the negotiation headers
+        format_: "json" or "ndjson" (query parameter "format")
+        after: Page cursor: only cues starting after this time
+        limit: Cues per page
+    
+    Returns:
+        Response with parsed subtitle cues
+    
+    Raises:
+        HTTPException: If file not found or parsing fails
+    """
+    if after is not None or limit is not None:
+        cue_index = await _load_cue_index(filename)
+        rows, cursor = cue_index.page_after(after, limit or DEFAULT_CUES_PER_PAGE)
+        if format_ == "ndjson":
+            headers = {"X-Next-Cursor": repr(cursor)} if cursor is not None else None
+            return StreamingResponse(cue_index.table.iter_ndjson(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+        return _json_response('{"cues":%s,"next":%s}' % (cue_index.table.to_json(rows), json.dumps(cursor)))
+    
+    file_path = await file_storage.get_file_path_async(filename)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="자막 파일을 찾을 수 없습니다")
+    
+    try:
+        if format_ == "ndjson":
+            # Produce the first batch up front so a malformed file still gets a 400
+            chunks = vtt_parser.iter_ndjson(str(file_path))
+            first = await run_blocking(next, chunks, b"")
+            return StreamingResponse(itertools.chain([first], chunks), media_type=NDJSON_MEDIA_TYPE)
+        
+        media_type, encoding = _negotiate_cue_format(request)
+        body = await run_blocking(
+            vtt_parser.get_encoded, str(file_path), (media_type, encoding),
+            lambda cues: _encode_cue_payload(cues, media_type, encoding)
+        )
+        return _cue_response(body, media_type, encoding)
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
+
+
+async def _load_cue_index(filename: str) -> CueIndex:
+    """
+    Resolve a subtitle file and return its cue index.
+    
+    Raises:
+        HTTPException: If file not found or parsing fails
+    """
+    file_path = await file_storage.get_file_path_async(filename)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="자막 파일을 찾을 수 없습니다")
+    
+    try:
+        return await run_blocking(vtt_parser.get_cue_index, str(file_path))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
+
+
+@app.get("/api/files/subtitle/{filename}/at")
+async def get_subtitle_at(filename: str, t: float = Query(..., ge=0)):
+    """
+    Get subtitle cues active at a playback time.
+    
+    Args:
+        filename: Name of the subtitle file
+        t: Playback time in seconds
+    
+    Returns:
+        JSON response with active cues and the start time of the next cue
+    
+    Raises:
+        HTTPException: If file not found or parsing fails
+    """
+    cue_index = await _load_cue_index(filename)
+    
+    return _json_response('{"time":%s,"cues":%s,"next_start":%s}' % (
+        json.dumps(t),
+        cue_index.table.to_json(cue_index.rows_at(t)),
+        json.dumps(cue_index.next_start(t))
+    ))
+
+
+@app.get("/api/files/subtitle/{filename}/window")
+async def get_subtitle_window(
+    filename: str,
+    from_: float = Query(..., alias="from", ge=0),
+    to: float = Query(..., ge=0)
+):
+    """
+    Get subtitle cues overlapping a time window.
+    
+    Args:
+        filename: Name of the subtitle file
+        from_: Window start in seconds
+        to: Window end in seconds (exclusive)
+    
+    Returns:
+        JSON response with cues overlapping [from, to)
+    
+    Raises:
+        HTTPException: If the window is invalid, file not found or parsing fails
+    """
+    if to < from_:
+        raise HTTPException(status_code=400, detail="잘못된 시간 범위입니다 (from은 to보다 작아야 합니다)")
+    
+    cue_index = await _load_cue_index(filename)
+    
+    return _json_response('{"from":%s,"to":%s,"cues":%s}' % (
+        json.dumps(from_),
+        json.dumps(to),
+        cue_index.table.to_json(cue_index.rows_in_window(from_, to))
+    ))
+
+
+@app.get("/api/sync/estimate")
+async def estimate_sync(
+    audio: str = Query(...),
+    subtitle: str = Query(...),
+    max_offset: float = Query(60.0, gt=0, le=600)
+):
+    """
+    Estimate how far a subtitle file is out of sync with an audio file.
+    
+    Voice activity in the audio is cross-correlated with the times the
+    cues are shown. A cue at time t belongs at t + offset + drift * t.
+    
+    Args:
+        audio: Name of the WAV file
+        subtitle: Name of the subtitle file
+        max_offset: Largest constant offset to search, in seconds either way
+    
+    Returns:
+        JSON response with offset, drift, drift_ppm, confidence and the
+        per-segment offsets the drift was fitted to
+    
+    Raises:
+        HTTPException: If a file is not found or cannot be analyzed
+    """
+    audio_path = await file_storage.get_file_path_async(audio)
+    if not audio_path:
+        raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다")
+    subtitle_path = await file_storage.get_file_path_async(subtitle)
+    if not subtitle_path:
+        raise HTTPException(status_code=404, detail="자막 파일을 찾을 수 없습니다")
+    
+    try:
+        cues = await run_blocking(vtt_parser.parse_vtt_file, str(subtitle_path))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
+    
+    # Imported here: it loads NumPy, which startup should not pay for
+    from backend.sync_estimator import SyncEstimator
+    
+    estimator = SyncEstimator(max_offset=max_offset)
+    try:
+        estimate = await run_blocking(estimator.estimate, audio_path, cues.starts, cues.ends)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"싱크를 추정할 수 없습니다: {str(e)}")
+    
+    return estimate.to_dict()
+
+
+@app.get("/api/files/image/{filename}")
+async def get_image(filename: str):
+    """
+    Serve image file.
+    
+    Args:
+        filename: Name of the image file
+    
+    Returns:
+        FileResponse with image file
+    
+    Raises:
+        HTTPException: If file not found
+    """
+    file_path = await file_storage.get_file_path_async(filename)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="이미지 파일을 찾을 수 없습니다")
+    
+    # Determine media type from file extension
+    import mimetypes
+    media_type, _ = mimetypes.guess_type(filename)
+    
+    return FileResponse(
+        file_path,
+        media_type=media_type or "application/octet-stream",
+        filename=filename
+    )
+
+
+@app.post("/api/session", response_model=PlayerSessionCreated, status_code=201)
+async def create_player_session(request: PlayerSessionRequest):
+    """
+    Group stored files into a player session.
+    
+    Args:
+        request: Audio filename, subtitle filenames in track order and optional image filename
+    
+    Returns:
+        PlayerSessionCreated with the session id and bundle URL
+    
+    Raises:
+        HTTPException: If a file has the wrong kind or is not stored
+    """
+    try:
+        session_id = await run_blocking(
+            player_sessions.create_session, request.audio, request.subtitles, request.image
+        )
+    except PlayerSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    url = f"/api/session/{session_id}"
+    return JSONResponse(status_code=201, content={"id": session_id, "url": url}, headers={"Location": url})
+
+
+@app.get("/api/session/{session_id}")
+async def get_player_session(session_id: str, request: Request):
+    """
+    Get everything the player needs for a session in one response.
+    
+    The bundle holds the audio URL, duration and format, each subtitle
+    track's cues (or index URLs for long tracks), the image URL, and the
+    ETag of every member. It is cached and rebuilt only when a member file
+    changes; its own strong ETag allows revalidation with If-None-Match.
+    
+    Args:
+        session_id: Player session id
+        request: Request carrying Accept-Encoding and If-None-Match
+    
+    Returns:
+        JSON bundle, gzip or brotli compressed per Accept-Encoding, or 304
+    
+    Raises:
+        HTTPException: If the session or a member file is gone, or a subtitle track is malformed
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    try:
+        body, etag = await run_blocking(player_sessions.get_bundle, session_id, encoding)
+    except PlayerSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"VTT 파싱 실패: {str(e)}")
+    
+    # Members can change under the same URL, so clients revalidate every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Pagination of the file listing
+DEFAULT_FILES_PER_PAGE = 100
+MAX_FILES_PER_PAGE = 1000
+
+
+@app.get("/api/files", response_model=FileListResponse)
+async def list_files(
+    limit: int = Query(DEFAULT_FILES_PER_PAGE, ge=1, le=MAX_FILES_PER_PAGE),
+    after: Optional[int] = Query(None),
+    kind: Optional[str] = Query(None, pattern="^(audio|subtitle|image)$")
+):
+    """
+    List stored files with their metadata, newest first.
+    
+    Served from the file catalog: no directory scan, and durations and
+    cue counts recorded at upload time instead of re-reading the files.
+    
+    Args:
+        limit: Files per page
+        after: Page cursor: "next" of the previous page
+        kind: Only list files of this kind
+    
+    Returns:
+        FileListResponse with the page of files and the next page's cursor
+    """
+    entries, cursor = await run_blocking(file_storage.list_catalog, limit, after, kind)
+    return FileListResponse(files=[entry.to_dict() for entry in entries], next=cursor)
+
+
+@app.delete("/api/files/{filename}", response_model=DeleteResponse)
+async def delete_file(filename: str):
+    """
+    Delete uploaded file.
+    
+    Args:
+        filename: Name of the file to delete
+    
+    Returns:
+        DeleteResponse with success status and message
+    
+    Raises:
+        HTTPException: If deletion fails
+    """
+    try:
+        success = await file_storage.delete_file(filename)
+        
+        if success:
+            return DeleteResponse(
+                success=True,
+                message=f"파일 '{filename}'이(가) 삭제되었습니다"
+            )
+        else:
+            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+    
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"파일 삭제 실패: {str(e)}")
+
+
+def _check_profile_access(token: Optional[str]) -> None:
+    """
+    Allow profile downloads only with the configured token.
+    
+    Raises:
+        HTTPException: 404 if profile downloads are disabled, 403 for a wrong token
+    """
+    if request_profiler.token is None:
+        raise HTTPException(status_code=404, detail="프로파일링이 활성화되어 있지 않습니다")
+    if not request_profiler.check_token(token):
+        raise HTTPException(status_code=403, detail="프로파일 토큰이 올바르지 않습니다")
+
+
+@app.get(PROFILES_PATH, include_in_schema=False)
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """
+    List kept request profiles, newest first.
+    
+    Requests are profiled when sent with the X-Profile-Token header, or at
+    random with PROFILE_SAMPLE_RATE; their responses carry X-Profile-Id.
+    
+    Args:
+        x_profile_token: PROFILE_TOKEN
+    
+    Returns:
+        JSON list of profile summaries
+    
+    Raises:
+        HTTPException: If profile downloads are disabled or the token is wrong
+    """
+    _check_profile_access(x_profile_token)
+    return {"profiles": [record.to_dict() for record in request_profiler.list_profiles()]}
+
+
+@app.get(PROFILES_PATH + "/{profile_id}", include_in_schema=False)
+async def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """
+    Download one request profile as collapsed stacks.
+    
+    Each line is "frame;frame;... count", ready for flamegraph.pl or
+    speedscope.
+    
+    Args:
+        profile_id: Value of a profiled response's X-Profile-Id header
+        x_profile_token: PROFILE_TOKEN
+    
+    Returns:
+        Plain text attachment
+    
+    Raises:
+        HTTPException: If access is denied or the profile is no longer kept
+    """
+    _check_profile_access(x_profile_token)
+    record = request_profiler.get_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return Response(
+        content=record.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": content_disposition(f"profile-{record.id}.folded")}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Expose service metrics in the Prometheus text format.
+    
+    Everything is read from values kept as requests run; upload directory
+    usage is the last measurement taken every DISK_USAGE_INTERVAL seconds.
+    
+    Returns:
+        Plain text response for a Prometheus scraper
+    """
+    body = await run_blocking(metrics.REGISTRY.render)
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
+
+def _asset_response(asset: Asset, request: Request, cache_control: str) -> Response:
+    """
+    Serve a built asset in the content coding negotiated from Accept-Encoding,
+    answering If-None-Match with 304.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding not in asset.bodies:
+        encoding = "identity"
+    etag = f'"{asset.etag}"' if encoding == "identity" else f'"{asset.etag}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+
+@app.get("/assets/{name}")
+async def serve_asset(name: str, request: Request):
+    """
+    Serve a fingerprinted frontend asset, cached by browsers for good.
+    
+    Args:
+        name: Built asset name, e.g. app.1a2b3c4d5e6f.js
+        request: Request carrying Accept-Encoding
+    
+    Returns:
+        Precompressed asset with an immutable Cache-Control
+    
+    Raises:
+        HTTPException: If no current asset has that name
+    """
+    asset = await run_blocking(static_assets.get, name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return _asset_response(asset, request, IMMUTABLE_CACHE_CONTROL)
+
+
+@app.get("/")
+async def serve_frontend(request: Request):
+    """
+    Serve main HTML page.
+    
+    The page references fingerprinted assets, so it is revalidated on every
+    visit (a 304 when nothing changed) while the assets are not requested
+    again at all.
+    """
+    index = await run_blocking(static_assets.index)
+    if index is None:
         raise HTTPException(status_code=404, detail="Frontend not found")
-    return FileResponse(index_path)
+    return _asset_response(index, request, "no-cache")
 
 
 @app.get("/robots.txt")
@@ -3,6 +3,74 @@
  * Handles audio playback with synchronized subtitle display
  */
 
+// Only files up to this size are hashed for the duplicate pre-check; larger files
+// are uploaded straight away and deduplicated by the server when the upload commits
+const DEDUP_PRECHECK_MAX_SIZE = 64 * 1024 * 1024;
+
+/**
+ * Body of the hashing worker: answers each posted File with its SHA-256
+ * as lowercase hex, off the main thread so the page stays responsive
+ */
+function hashWorkerMain() {
+    self.onmessage = async (event) => {
+        try {
+            const digest = await crypto.subtle.digest('SHA-256', await event.data.arrayBuffer());
+            const sha256 = Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+            self.postMessage({ sha256 });
+        } catch (error) {
+            self.postMessage({ error: String(error) });
+        }
+    };
+}
+
+// Resumable uploads: larger files are sent in chunks that can be retried and resumed
+const RESUMABLE_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024;
+const RESUMABLE_PARALLEL_CHUNKS = 3;
+const RESUMABLE_MAX_RETRIES = 5;
+
+// Packed cue table served for this Accept type (see CueTable.to_binary)
+const CUE_BINARY_TYPE = 'application/vnd.wsync.cues';
+const CUE_BINARY_MAGIC = 0x55435357; // 'WSCU' little-endian
+
+/**
+ * Decode a binary cue payload into {start, end, text} objects
+ * Layout: 16-byte header, float64 starts/ends, uint32 text ids,
+ * uint32 UTF-8 text lengths, then the texts
+ */
+function decodeCueBinary(buffer) {
+    const view = new DataView(buffer);
+    if (view.getUint32(0, true) !== CUE_BINARY_MAGIC || view.getUint16(4, true) !== 1) {
+        throw new Error('Unsupported subtitle payload');
+    }
+    const cueCount = view.getUint32(8, true);
+    const textCount = view.getUint32(12, true);
+    
+    let offset = 16;
+    const column = (ArrayType, length) => {
+        const values = new ArrayType(buffer, offset, length);
+        offset += length * ArrayType.BYTES_PER_ELEMENT;
+        return values;
+    };
+    const starts = column(Float64Array, cueCount);
+    const ends = column(Float64Array, cueCount);
+    const textIds = column(Uint32Array, cueCount);
+    const textLengths = column(Uint32Array, textCount);
+    
+    const decoder = new TextDecoder();
+    const texts = new Array(textCount);
+    for (let i = 0; i < textCount; i++) {
+        texts[i] = decoder.decode(new Uint8Array(buffer, offset, textLengths[i]));
+        offset += textLengths[i];
+    }
+    
+    const cues = new Array(cueCount);
+    for (let i = 0; i < cueCount; i++) {
+        cues[i] = { start: starts[i], end: ends[i], text: texts[textIds[i]] };
+    }
+    return cues;
+}
+
 class AudioSubtitleViewer {
     constructor() {
         // DOM element references
@@ -31,12 +99,17 @@ class AudioSubtitleViewer {
         this.fullscreenBtn = document.getElementById('fullscreenBtn');
         this.fontSizeIncrease = document.getElementById('fontSizeIncrease');
         this.fontSizeDecrease = document.getElementById('fontSizeDecrease');
+        this.waveformCanvas = document.getElementById('waveform');
         
         // Application state
         this.subtitles = [];
+        this.sortedCues = [];
+        this.maxCueDuration = 0;
         this.currentAudioFilename = null;
         this.currentSubtitleFilename = null;
         this.currentImageFilename = null;
+        this.waveformPeaks = null;
+        this.waveformColumns = null;
         this.uploadStartTime = null;
         this.uploadedBytes = 0;
         this.isFullscreen = false;
@@ -49,6 +122,12 @@ class AudioSubtitleViewer {
         this.initializeDarkMode();
         this.initializeEventListeners();
         this.initializeKeyboardShortcuts();
+        
+        // Reopen the files of a shared or reloaded player link
+        const sessionId = new URLSearchParams(window.location.search).get('session');
+        if (sessionId) {
+            this.restoreSession(sessionId);
+        }
     }
     
     /**
@@ -458,6 +537,12 @@ class AudioSubtitleViewer {
         // Audio player seek listener to update subtitle when user seeks
         this.audioPlayer.addEventListener('seeked', () => this.updateSubtitle());
         
+        // Waveform: load peaks for each new audio file and track the playhead
+        this.audioPlayer.addEventListener('loadedmetadata', () => this.loadWaveform());
+        this.audioPlayer.addEventListener('timeupdate', () => this.drawWaveform());
+        this.waveformCanvas.addEventListener('click', (e) => this.seekFromWaveform(e));
+        window.addEventListener('resize', () => this.drawWaveform());
+        
         // Audio player ended listener
         this.audioPlayer.addEventListener('ended', () => {
             this.subtitleDisplay.textContent = '';
@@ -679,9 +764,13 @@ class AudioSubtitleViewer {
                 await this.uploadImage(imageFile);
             } else {
                 // Hide image container if no image
+                this.currentImageFilename = null;
                 this.imageContainer.style.display = 'none';
             }
             
+            // Remember the files in the URL so a reload reopens them in one request
+            await this.saveSession();
+            
             // Show success message
             this.showStatus('success', '파일 업로드 완료! 재생을 시작하세요');
             
@@ -720,18 +809,293 @@ class AudioSubtitleViewer {
         }
     }
     
+    /**
+     * Group the uploaded files into a player session and put its id in the URL
+     * A failure only means the page can't be restored later, so it is not reported
+     */
+    async saveSession() {
+        try {
+            const response = await fetch('/api/session', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    audio: this.currentAudioFilename,
+                    subtitles: [this.currentSubtitleFilename],
+                    image: this.currentImageFilename
+                })
+            });
+            if (!response.ok) {
+                return;
+            }
+            const session = await response.json();
+            const url = new URL(window.location.href);
+            url.searchParams.set('session', session.id);
+            history.replaceState(null, '', url);
+        } catch (error) {
+            console.warn('Failed to save session:', error);
+        }
+    }
+    
+    /**
+     * Restore the player from a session bundle
+     * One request returns the audio, the cues (or where to fetch them) and the image
+     */
+    async restoreSession(sessionId) {
+        try {
+            const response = await fetch(`/api/session/${encodeURIComponent(sessionId)}`);
+            if (!response.ok) {
+                throw new Error(`Session unavailable (${response.status})`);
+            }
+            const bundle = await response.json();
+            
+            // Long tracks are not embedded; load them in the binary format
+            const track = bundle.subtitles[0];
+            let cues = track.cues;
+            if (!cues) {
+                const cueResponse = await fetch(track.url, {
+                    headers: { 'Accept': `${CUE_BINARY_TYPE}, application/json;q=0.5` }
+                });
+                if (!cueResponse.ok) {
+                    throw new Error(`Subtitle unavailable (${cueResponse.status})`);
+                }
+                cues = (cueResponse.headers.get('Content-Type') || '').startsWith(CUE_BINARY_TYPE)
+                    ? decodeCueBinary(await cueResponse.arrayBuffer())
+                    : (await cueResponse.json()).cues;
+            }
+            
+            this.setAudioSource(bundle.audio.filename);
+            this.currentSubtitleFilename = track.filename;
+            this.subtitles = cues;
+            this.buildCueIndex();
+            
+            if (bundle.image) {
+                this.currentImageFilename = bundle.image.filename;
+                this.imageDisplay.src = bundle.image.url;
+                this.imageContainer.style.display = 'flex';
+            } else {
+                this.imageContainer.style.display = 'none';
+            }
+            
+            this.playerSection.style.display = 'block';
+        } catch (error) {
+            // Files were deleted or the link is stale; start from the upload form
+            console.warn('Failed to restore session:', error);
+            const url = new URL(window.location.href);
+            url.searchParams.delete('session');
+            history.replaceState(null, '', url);
+        }
+    }
+    
     /**
      * Upload audio file via fetch API with progress tracking
      * Requirements: 1.1, 1.2
      */
     async uploadAudio(file) {
+        // Skip the upload entirely when the server already has identical content
+        const existing = await this.linkExistingAudio(file);
+        if (existing) {
+            return existing;
+        }
+        
+        // Large files use resumable chunked uploads so a dropped connection doesn't restart from zero
+        if (file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+            const data = await this.uploadResumable(file, 'audio', 'Audio');
+            this.setAudioSource(data.filename);
+            return data;
+        }
+        
         return this.uploadFileWithProgress(file, '/api/upload/audio', 'Audio');
     }
     
+    /**
+     * Point the audio player at an uploaded file
+     */
+    setAudioSource(filename) {
+        this.currentAudioFilename = filename;
+        this.audioPlayer.src = `/api/files/audio/${filename}`;
+        this.audioPlayer.load();
+    }
+    
+    /**
+     * Upload a file through a resumable upload session
+     * Chunks are sent in parallel and retried; an interrupted upload of the
+     * same file continues from the chunks the server already has
+     */
+    async uploadResumable(file, kind, fileType) {
+        const storageKey = `upload:${kind}:${file.name}:${file.size}:${file.lastModified}`;
+        
+        let session = await this.getUploadSession(localStorage.getItem(storageKey));
+        if (!session) {
+            const response = await fetch('/api/uploads', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ filename: file.name, size: file.size, kind })
+            });
+            if (!response.ok) {
+                throw new Error(await this.getErrorDetail(response, `${fileType} upload failed`));
+            }
+            session = await response.json();
+            localStorage.setItem(storageKey, session.id);
+        }
+        
+        // Skip chunks the server already received
+        const pending = [];
+        for (let offset = 0; offset < file.size; offset += RESUMABLE_CHUNK_SIZE) {
+            const end = Math.min(offset + RESUMABLE_CHUNK_SIZE, file.size);
+            if (!session.ranges.some(([start, stop]) => start <= offset && end <= stop)) {
+                pending.push(offset);
+            }
+        }
+        let uploaded = session.ranges.reduce((total, [start, stop]) => total + (stop - start), 0);
+        
+        this.uploadProgress.style.display = 'block';
+        this.progressText.textContent = `Uploading ${fileType}...`;
+        this.uploadStartTime = Date.now();
+        this.updateProgress((uploaded / file.size) * 100, uploaded, file.size);
+        
+        try {
+            const worker = async () => {
+                while (pending.length > 0) {
+                    const offset = pending.shift();
+                    const chunk = file.slice(offset, offset + RESUMABLE_CHUNK_SIZE);
+                    await this.putChunkWithRetry(session.id, offset, chunk);
+                    uploaded += chunk.size;
+                    this.updateProgress((uploaded / file.size) * 100, uploaded, file.size);
+                }
+            };
+            await Promise.all(Array.from({ length: RESUMABLE_PARALLEL_CHUNKS }, worker));
+            
+            const response = await fetch(`/api/uploads/${session.id}/complete`, { method: 'POST' });
+            if (!response.ok) {
+                throw new Error(await this.getErrorDetail(response, `${fileType} upload failed`));
+            }
+            
+            localStorage.removeItem(storageKey);
+            return await response.json();
+            
+        } finally {
+            this.uploadProgress.style.display = 'none';
+        }
+    }
+    
+    /**
+     * Fetch the status of an upload session, or null if it no longer exists
+     */
+    async getUploadSession(sessionId) {
+        if (!sessionId) {
+            return null;
+        }
+        try {
+            const response = await fetch(`/api/uploads/${sessionId}`);
+            return response.ok ? await response.json() : null;
+        } catch (error) {
+            return null;
+        }
+    }
+    
+    /**
+     * Send one chunk, retrying with exponential backoff on network or server errors
+     */
+    async putChunkWithRetry(sessionId, offset, chunk) {
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const response = await fetch(`/api/uploads/${sessionId}?offset=${offset}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: chunk
+                });
+                if (response.ok) {
+                    return;
+                }
+                // Client errors (expired session, bad offset) won't succeed on retry
+                if (response.status < 500 || attempt >= RESUMABLE_MAX_RETRIES) {
+                    throw new Error(await this.getErrorDetail(response, 'Chunk upload failed'));
+                }
+            } catch (error) {
+                if (error.name !== 'TypeError' || attempt >= RESUMABLE_MAX_RETRIES) {
+                    throw error;
+                }
+            }
+            await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt));
+        }
+    }
+    
+    /**
+     * Extract the error detail from a failed response
+     */
+    async getErrorDetail(response, fallback) {
+        try {
+            const error = await response.json();
+            return error.detail || `${fallback} (${response.status})`;
+        } catch (e) {
+            return `${fallback} (${response.status})`;
+        }
+    }
+    
+    /**
+     * Store an audio file by reference if the server already has its content
+     * Returns the link response, or null when the file must be uploaded
+     */
+    async linkExistingAudio(file) {
+        if (file.size > DEDUP_PRECHECK_MAX_SIZE) {
+            return null;
+        }
+        
+        try {
+            const sha256 = await this.hashFile(file);
+            
+            const head = await fetch(`/api/blobs/${sha256}`, { method: 'HEAD' });
+            if (!head.ok) {
+                return null;
+            }
+            
+            const response = await fetch(`/api/blobs/${sha256}/link`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ filename: file.name })
+            });
+            if (!response.ok) {
+                return null;
+            }
+            
+            const data = await response.json();
+            this.setAudioSource(data.filename);
+            return data;
+            
+        } catch (error) {
+            // The pre-check is only an optimization; fall back to a normal upload
+            console.warn('Duplicate check failed:', error);
+            return null;
+        }
+    }
+    
+    /**
+     * Compute the SHA-256 of a file as lowercase hex in a Web Worker
+     */
+    hashFile(file) {
+        const url = URL.createObjectURL(new Blob([`(${hashWorkerMain})();`], { type: 'text/javascript' }));
+        const worker = new Worker(url);
+        
+        return new Promise((resolve, reject) => {
+            worker.onmessage = (event) => {
+                if (event.data.error) {
+                    reject(new Error(event.data.error));
+                } else {
+                    resolve(event.data.sha256);
+                }
+            };
+            worker.onerror = (event) => reject(new Error(event.message || 'Hash worker failed'));
+            worker.postMessage(file);
+        }).finally(() => {
+            worker.terminate();
+            URL.revokeObjectURL(url);
+        });
+    }
+    
     /**
      * Generic file upload with progress tracking
      */
-    async uploadFileWithProgress(file, endpoint, fileType) {
+    async uploadFileWithProgress(file, endpoint, fileType, accept = null) {
         const formData = new FormData();
         formData.append('file', file);
         
@@ -753,20 +1117,18 @@ class AudioSubtitleViewer {
                     }
                 });
                 
+                // Binary responses need the raw bytes; JSON is decoded from them on demand
+                const text = () => (accept ? new TextDecoder().decode(xhr.response) : xhr.responseText);
+                
                 xhr.addEventListener('load', () => {
-                    if (xhr.status >= 200 && xhr.status < 300) {
-                        resolve({
-                            ok: true,
-                            status: xhr.status,
-                            json: () => Promise.resolve(JSON.parse(xhr.responseText))
-                        });
-                    } else {
-                        resolve({
-                            ok: false,
-                            status: xhr.status,
-                            json: () => Promise.resolve(JSON.parse(xhr.responseText))
-                        });
-                    }
+                    resolve({
+                        ok: xhr.status >= 200 && xhr.status < 300,
+                        status: xhr.status,
+                        contentType: (xhr.getResponseHeader('Content-Type') || '').split(';')[0],
+                        header: (name) => xhr.getResponseHeader(name),
+                        arrayBuffer: () => Promise.resolve(xhr.response),
+                        json: () => Promise.resolve(JSON.parse(text()))
+                    });
                 });
                 
                 xhr.addEventListener('error', () => {
@@ -774,6 +1136,10 @@ class AudioSubtitleViewer {
                 });
                 
                 xhr.open('POST', endpoint);
+                if (accept) {
+                    xhr.setRequestHeader('Accept', accept);
+                    xhr.responseType = 'arraybuffer';
+                }
                 xhr.send(formData);
             });
             
@@ -797,7 +1163,12 @@ class AudioSubtitleViewer {
                 throw new Error(errorMessage);
             }
             
-            const data = await response.json();
+            const data = response.contentType === CUE_BINARY_TYPE
+                ? {
+                    filename: decodeURIComponent(response.header('X-Filename') || ''),
+                    cues: decodeCueBinary(await response.arrayBuffer())
+                }
+                : await response.json();
             
             // Handle audio-specific logic
             if (endpoint.includes('/audio')) {
@@ -903,7 +1274,9 @@ class AudioSubtitleViewer {
      * Requirements: 2.1, 2.2
      */
     async uploadSubtitle(file) {
-        const data = await this.uploadFileWithProgress(file, '/api/upload/subtitle', 'Subtitle');
+        const data = await this.uploadFileWithProgress(
+            file, '/api/upload/subtitle', 'Subtitle', `${CUE_BINARY_TYPE}, application/json;q=0.5`
+        );
         
         this.currentSubtitleFilename = data.filename;
         this.subtitles = data.cues;
@@ -912,6 +1285,8 @@ class AudioSubtitleViewer {
             throw new Error('Subtitle file contains no valid subtitles');
         }
         
+        this.buildCueIndex();
+        
         return data;
     }
     
@@ -1038,6 +1413,124 @@ class AudioSubtitleViewer {
         }
     }
     
+    /**
+     * Fetch waveform peaks for the current audio file
+     * Picks the coarsest pyramid level that still has a peak per canvas pixel
+     */
+    async loadWaveform() {
+        const filename = this.currentAudioFilename;
+        const canvas = this.waveformCanvas;
+        this.waveformPeaks = null;
+        this.waveformColumns = null;
+        if (!filename) {
+            return;
+        }
+        
+        canvas.style.display = 'block';
+        const width = canvas.clientWidth * (window.devicePixelRatio || 1);
+        const base = `/api/files/audio/${encodeURIComponent(filename)}/peaks`;
+        
+        try {
+            // An empty range returns only the pyramid geometry
+            const infoResponse = await fetch(`${base}?level=0&from=0&to=0`);
+            if (!infoResponse.ok) {
+                throw new Error(await this.getErrorDetail(infoResponse, 'Waveform unavailable'));
+            }
+            const info = await infoResponse.json();
+            
+            let level = 0;
+            let count = info.count;
+            while (level < info.levels - 1 && count / info.level_factor >= width) {
+                level++;
+                count = Math.ceil(count / info.level_factor);
+            }
+            
+            const response = await fetch(`${base}?level=${level}`);
+            if (!response.ok) {
+                throw new Error(await this.getErrorDetail(response, 'Waveform unavailable'));
+            }
+            const data = await response.json();
+            
+            // Ignore responses for a file that has since been replaced
+            if (filename !== this.currentAudioFilename) {
+                return;
+            }
+            this.waveformPeaks = data;
+            this.drawWaveform();
+        } catch (error) {
+            canvas.style.display = 'none';
+            console.warn('Waveform could not be loaded:', error);
+        }
+    }
+    
+    /**
+     * Draw the waveform with the played portion highlighted
+     */
+    drawWaveform() {
+        const data = this.waveformPeaks;
+        if (!data) {
+            return;
+        }
+        
+        const canvas = this.waveformCanvas;
+        const ratio = window.devicePixelRatio || 1;
+        const width = Math.max(1, Math.round(canvas.clientWidth * ratio));
+        const height = Math.max(1, Math.round(canvas.clientHeight * ratio));
+        if (canvas.width !== width || canvas.height !== height) {
+            canvas.width = width;
+            canvas.height = height;
+        }
+        
+        // Reduce peaks to one (min, max) column per pixel, once per width
+        if (!this.waveformColumns || this.waveformColumns.length !== width * 2) {
+            const peaks = data.peaks;
+            const count = peaks.length / 2;
+            const columns = new Int16Array(width * 2);
+            for (let x = 0; x < width; x++) {
+                const from = Math.floor(x * count / width);
+                const to = Math.max(from + 1, Math.floor((x + 1) * count / width));
+                let low = 0;
+                let high = 0;
+                for (let i = from; i < to && i < count; i++) {
+                    low = Math.min(low, peaks[2 * i]);
+                    high = Math.max(high, peaks[2 * i + 1]);
+                }
+                columns[2 * x] = low;
+                columns[2 * x + 1] = high;
+            }
+            this.waveformColumns = columns;
+        }
+        
+        const duration = data.count * data.samples_per_peak / data.sample_rate;
+        const playedWidth = duration > 0 ? (this.audioPlayer.currentTime / duration) * width : 0;
+        const styles = getComputedStyle(document.documentElement);
+        const playedColor = styles.getPropertyValue('--bg-gradient-start').trim() || '#667eea';
+        const restColor = styles.getPropertyValue('--text-muted').trim() || '#999';
+        
+        const ctx = canvas.getContext('2d');
+        const middle = height / 2;
+        ctx.clearRect(0, 0, width, height);
+        for (let x = 0; x < width; x++) {
+            const low = this.waveformColumns[2 * x];
+            const high = this.waveformColumns[2 * x + 1];
+            ctx.fillStyle = x < playedWidth ? playedColor : restColor;
+            ctx.fillRect(x, middle - (high / 32768) * middle, 1, Math.max(1, ((high - low) / 32768) * middle));
+        }
+    }
+    
+    /**
+     * Seek to the position clicked on the waveform
+     */
+    seekFromWaveform(e) {
+        const duration = this.audioPlayer.duration;
+        if (!isFinite(duration) || duration <= 0) {
+            return;
+        }
+        const rect = this.waveformCanvas.getBoundingClientRect();
+        this.isIntentionalSeek = true;
+        this.audioPlayer.currentTime = ((e.clientX - rect.left) / rect.width) * duration;
+    }
+    
     /**
      * Update subtitle display based on current playback time
      * Requirements: 2.3, 2.4, 2.5
@@ -1054,14 +1547,44 @@ class AudioSubtitleViewer {
         }
     }
     
+    /**
+     * Sort cues by start time for binary search in findActiveCue
+     */
+    buildCueIndex() {
+        this.sortedCues = [...this.subtitles].sort((a, b) => a.start - b.start);
+        this.maxCueDuration = this.sortedCues.reduce(
+            (max, cue) => Math.max(max, cue.end - cue.start), 0
+        );
+    }
+    
     /**
      * Find active subtitle cue based on current playback time
+     * Binary search on start times; overlapping cues resolve to the earliest start
      * Requirements: 2.3, 2.4, 2.5
      */
     findActiveCue(time) {
-        return this.subtitles.find(cue => 
-            cue.start <= time && time < cue.end
-        );
+        const cues = this.sortedCues;
+        
+        // Index of the first cue starting after the current time
+        let low = 0;
+        let high = cues.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (cues[mid].start <= time) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        
+        // Only cues starting within the longest cue duration can still be active
+        let activeCue;
+        for (let i = low - 1; i >= 0 && time - cues[i].start <= this.maxCueDuration; i--) {
+            if (time < cues[i].end) {
+                activeCue = cues[i];
+            }
+        }
+        return activeCue;
     }
     
     /**
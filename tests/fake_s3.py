@@ -0,0 +1,108 @@
+"""In-process stand-in for the boto3 S3 client methods used by S3StorageBackend."""
+
+import hashlib
+import io
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+
+class FakeClientError(Exception):
+    """Mimics botocore.exceptions.ClientError (code in response["Error"]["Code"])."""
+    
+    def __init__(self, code, operation):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation")
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """
+    Stores objects in memory per bucket.
+    
+    Supports conditional GET/PUT (IfNoneMatch/IfMatch), ranged GET,
+    multipart upload and presigned URLs, and records each call.
+    """
+    
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+    
+    def _object(self, bucket, key, operation):
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise FakeClientError("404" if operation == "HeadObject" else "NoSuchKey", operation)
+    
+    def _store(self, bucket, key, data):
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.objects[(bucket, key)] = {
+            "data": data,
+            "etag": etag,
+            "modified": datetime.now(timezone.utc),
+        }
+        return etag
+    
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **kwargs):
+        self.calls.append(("put_object", Key))
+        data = Body if isinstance(Body, bytes) else Body.read()
+        existing = self.objects.get((Bucket, Key))
+        if IfNoneMatch == "*" and existing is not None:
+            raise FakeClientError("PreconditionFailed", "PutObject")
+        if IfMatch is not None and (existing is None or existing["etag"] != IfMatch):
+            raise FakeClientError("PreconditionFailed", "PutObject")
+        return {"ETag": self._store(Bucket, Key, data)}
+    
+    def head_object(self, Bucket, Key):
+        self.calls.append(("head_object", Key))
+        stored = self._object(Bucket, Key, "HeadObject")
+        return {"ContentLength": len(stored["data"]), "ETag": stored["etag"], "LastModified": stored["modified"]}
+    
+    def get_object(self, Bucket, Key, Range=None, IfNoneMatch=None):
+        self.calls.append(("get_object", Key, Range))
+        stored = self._object(Bucket, Key, "GetObject")
+        if IfNoneMatch is not None and IfNoneMatch == stored["etag"]:
+            raise FakeClientError("304", "GetObject")
+        data = stored["data"]
+        if Range is not None:
+            first, _, last = Range.removeprefix("bytes=").partition("-")
+            data = data[int(first):int(last) + 1]
+        return {
+            "Body": io.BytesIO(data),
+            "ContentLength": len(data),
+            "ETag": stored["etag"],
+            "LastModified": stored["modified"],
+        }
+    
+    def delete_object(self, Bucket, Key):
+        self.calls.append(("delete_object", Key))
+        self.objects.pop((Bucket, Key), None)
+        return {}
+    
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.calls.append(("create_multipart_upload", Key))
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+    
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append(("upload_part", Key, PartNumber))
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{hashlib.md5(Body).hexdigest()}"'}
+    
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append(("complete_multipart_upload", Key))
+        parts = self.uploads.pop(UploadId)
+        data = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+        return {"ETag": self._store(Bucket, Key, data)}
+    
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append(("abort_multipart_upload", Key))
+        self.uploads.pop(UploadId, None)
+        return {}
+    
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        query = "&".join(
+            f"{name}={quote(str(value), safe='')}"
+            for name, value in sorted(Params.items()) if name not in ("Bucket", "Key")
+        )
+        return f"https://{Params['Bucket']}.s3.example.com/{Params['Key']}?X-Amz-Expires={ExpiresIn}&{query}"
@@ -0,0 +1,153 @@
+"""Tests for uploading several files or an archive in one request."""
+
+import io
+import tarfile
+import zipfile
+
+from main import file_storage
+
+
+def make_zip(members):
+    """Build a zip archive from {name: bytes}."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def make_tar_gz(members):
+    """Build a gzip-compressed tar archive from {name: bytes}."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class TestBatchUpload:
+    """Test the batch upload endpoint."""
+    
+    def test_upload_all_kinds_as_parts(self, client, sample_wav_file, sample_vtt_file, sample_image_file):
+        """Test audio, subtitle and image parts are stored and described together."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("talk.wav", sample_wav_file.read_bytes(), "audio/wav")),
+            ("files", ("talk.vtt", sample_vtt_file.read_bytes(), "text/vtt")),
+            ("files", ("cover.png", sample_image_file.read_bytes(), "image/png")),
+        ])
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["audio"]["filename"] == "talk.wav"
+        assert data["audio"]["sample_rate"] == 44100
+        assert data["subtitle"]["filename"] == "talk.vtt"
+        assert [cue["text"] for cue in data["subtitle"]["cues"]] == [
+            "First subtitle line", "Second subtitle line", "Third subtitle line"
+        ]
+        assert data["image"] == {"filename": "cover.png", "url": "/api/files/image/cover.png"}
+        assert data["skipped"] == []
+        
+        assert file_storage.get_file_path("talk.wav").read_bytes() == sample_wav_file.read_bytes()
+        assert client.get("/api/files/subtitle/talk.vtt").json()["cues"] == data["subtitle"]["cues"]
+    
+    def test_missing_kinds_are_null(self, client, sample_vtt_file):
+        """Test a batch with only a subtitle."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("only.vtt", sample_vtt_file.read_bytes(), "text/vtt")),
+        ])
+        assert response.status_code == 200
+        assert response.json()["audio"] is None
+        assert response.json()["image"] is None
+        assert len(response.json()["subtitle"]["cues"]) == 3
+    
+    def test_zip_archive(self, client, sample_wav_file, sample_vtt_file, sample_image_file):
+        """Test members of a zip archive are stored and unknown members are skipped."""
+        archive = make_zip({
+            "session/talk.wav": sample_wav_file.read_bytes(),
+            "session/talk.vtt": sample_vtt_file.read_bytes(),
+            "session/cover.png": sample_image_file.read_bytes(),
+            "session/README.txt": b"notes",
+            "__MACOSX/session/._talk.wav": b"resource fork",
+        })
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("session.zip", archive, "application/zip")),
+        ])
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["audio"]["filename"] == "talk.wav"
+        assert len(data["subtitle"]["cues"]) == 3
+        assert data["image"]["filename"] == "cover.png"
+        assert data["skipped"] == ["session/README.txt"]
+        assert file_storage.get_file_path("cover.png").read_bytes() == sample_image_file.read_bytes()
+    
+    def test_tar_archive_with_separate_part(self, client, sample_wav_file, sample_vtt_file, sample_image_file):
+        """Test a tar.gz archive combined with a plain part."""
+        archive = make_tar_gz({
+            "talk.wav": sample_wav_file.read_bytes(),
+            "talk.vtt": sample_vtt_file.read_bytes(),
+        })
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("session.tar.gz", archive, "application/gzip")),
+            ("files", ("cover.png", sample_image_file.read_bytes(), "image/png")),
+        ])
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["audio"]["filename"] == "talk.wav"
+        assert data["subtitle"]["filename"] == "talk.vtt"
+        assert data["image"]["filename"] == "cover.png"
+    
+    def test_duplicate_kind_rejected(self, client, sample_vtt_file):
+        """Test two files of the same kind are rejected."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("a.vtt", sample_vtt_file.read_bytes(), "text/vtt")),
+            ("files", ("b.vtt", sample_vtt_file.read_bytes(), "text/vtt")),
+        ])
+        assert response.status_code == 400
+        assert "b.vtt" in response.json()["detail"]
+    
+    def test_invalid_subtitle_names_file(self, client, sample_wav_file, invalid_vtt_file):
+        """Test a malformed subtitle fails the batch with the file in the detail."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("talk.wav", sample_wav_file.read_bytes(), "audio/wav")),
+            ("files", ("broken.vtt", invalid_vtt_file.read_bytes(), "text/vtt")),
+        ])
+        assert response.status_code == 400
+        assert "broken.vtt" in response.json()["detail"]
+        assert file_storage.get_file_path("broken.vtt") is None
+    
+    def test_unsupported_part_rejected(self, client):
+        """Test a plain part with an unknown extension is rejected."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("notes.txt", b"notes", "text/plain")),
+        ])
+        assert response.status_code == 400
+    
+    def test_corrupt_archive_rejected(self, client):
+        """Test an archive that cannot be read."""
+        response = client.post("/api/upload/batch", files=[
+            ("files", ("session.zip", b"not an archive", "application/zip")),
+        ])
+        assert response.status_code == 400
+    
+    def test_no_files(self, client):
+        """Test a body without file parts."""
+        response = client.post("/api/upload/batch", data={"name": "value"}, files=[])
+        assert response.status_code == 422
+        
+        response = client.post("/api/upload/batch")
+        assert response.status_code == 422
+    
+    def test_temporary_files_removed(self, client, test_upload_dir, sample_vtt_file, invalid_vtt_file):
+        """Test spooled archives and partial writes are cleaned up, also after a failure."""
+        archive = make_zip({"talk.vtt": sample_vtt_file.read_bytes()})
+        client.post("/api/upload/batch", files=[("files", ("ok.zip", archive, "application/zip"))])
+        
+        archive = make_zip({"broken.vtt": invalid_vtt_file.read_bytes()})
+        client.post("/api/upload/batch", files=[("files", ("bad.zip", archive, "application/zip"))])
+        
+        incoming_dir = test_upload_dir / file_storage.INCOMING_DIRNAME
+        assert list(incoming_dir.iterdir()) == []
@@ -0,0 +1,185 @@
+"""Tests for cue payload negotiation, compression and the binary format."""
+
+import struct
+from array import array
+
+import pytest
+
+from backend.cue_encoding import CUE_BINARY_MEDIA_TYPE, accepts_binary_cues, negotiate_encoding
+from backend.cue_table import CueTable
+
+EXPECTED_CUES = [
+    {"start": 0.0, "end": 2.0, "text": "First subtitle line"},
+    {"start": 2.0, "end": 5.0, "text": "Second subtitle line"},
+    {"start": 5.0, "end": 8.0, "text": "Third subtitle line"},
+]
+
+
+def decode_binary(data: bytes) -> list:
+    """Reference decoder for CueTable.to_binary payloads."""
+    magic, version, _, cue_count, text_count = struct.unpack_from('<4sHHII', data)
+    assert (magic, version) == (b'WSCU', 1)
+    offset = 16
+    
+    def column(typecode, length):
+        nonlocal offset
+        values = array(typecode)
+        values.frombytes(data[offset:offset + length * values.itemsize])
+        offset += length * values.itemsize
+        return values
+    
+    starts = column('d', cue_count)
+    ends = column('d', cue_count)
+    text_ids = column('I', cue_count)
+    texts = []
+    for length in column('I', text_count):
+        texts.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+    assert offset == len(data)
+    return [
+        {"start": starts[i], "end": ends[i], "text": texts[text_ids[i]]}
+        for i in range(cue_count)
+    ]
+
+
+class TestNegotiation:
+    """Test Accept and Accept-Encoding handling."""
+    
+    @pytest.mark.parametrize("header,expected", [
+        (None, "identity"),
+        ("", "identity"),
+        ("gzip, deflate", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("gzip;q=0", "identity"),
+        ("identity", "identity"),
+        ("deflate", "identity"),
+    ])
+    def test_gzip_negotiation(self, header, expected):
+        """Test that gzip is chosen only when acceptable."""
+        assert negotiate_encoding(header) == expected
+    
+    def test_prefers_brotli(self):
+        """Test that br wins ties and wildcards pick the preferred coding."""
+        assert negotiate_encoding("gzip, br") == "br"
+        assert negotiate_encoding("*") == "br"
+        assert negotiate_encoding("br;q=0.1, gzip") == "gzip"
+    
+    @pytest.mark.parametrize("header,expected", [
+        (None, False),
+        ("*/*", False),
+        ("application/json", False),
+        (CUE_BINARY_MEDIA_TYPE, True),
+        (f"{CUE_BINARY_MEDIA_TYPE}, application/json;q=0.5", True),
+        (f"{CUE_BINARY_MEDIA_TYPE};q=0.5, application/json", False),
+        (f"{CUE_BINARY_MEDIA_TYPE};q=0", False),
+    ])
+    def test_binary_is_opt_in(self, header, expected):
+        """Test that the binary format requires an explicit Accept entry."""
+        assert accepts_binary_cues(header) is expected
+
+
+class TestBinaryFormat:
+    """Test CueTable.to_binary."""
+    
+    def test_round_trip(self):
+        """Test that the packed table decodes to the same cues as the JSON form."""
+        table = CueTable.from_rows([
+            (0.0, 1.5, "[Music]"),
+            (1.5, 3.25, "한국어 자막"),
+            (3.25, 4.0, "[Music]"),
+        ])
+        assert decode_binary(table.to_binary()) == [cue.to_dict() for cue in table]
+    
+    def test_time_columns_are_aligned(self):
+        """Test that float64 columns start at 8-byte aligned offsets."""
+        data = CueTable.from_rows([(0.0, 1.0, "a")]).to_binary()
+        assert struct.unpack_from('<d', data, 16)[0] == 0.0
+        assert struct.unpack_from('<d', data, 24)[0] == 1.0
+    
+    def test_empty_table(self):
+        """Test the payload of a table without cues."""
+        assert decode_binary(CueTable().to_binary()) == []
+
+
+class TestSubtitleEndpoints:
+    """Test negotiated responses of the subtitle endpoints."""
+    
+    @pytest.fixture
+    def uploaded(self, client, sample_vtt_file):
+        """Upload the sample subtitle and return its name."""
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post("/api/upload/subtitle", files={"file": ("cues.vtt", f, "text/vtt")})
+        assert response.status_code == 200
+        return "cues.vtt"
+    
+    def test_gzip_json(self, client, uploaded):
+        """Test that JSON is gzip-compressed when the client accepts it."""
+        response = client.get(f"/api/files/subtitle/{uploaded}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == {"cues": EXPECTED_CUES}
+    
+    def test_identity_json(self, client, uploaded):
+        """Test that the plain document is unchanged without Accept-Encoding."""
+        response = client.get(f"/api/files/subtitle/{uploaded}", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"cues": EXPECTED_CUES}
+    
+    def test_binary(self, client, uploaded):
+        """Test the binary format, compressed and not."""
+        for accept_encoding in ("identity", "gzip"):
+            response = client.get(
+                f"/api/files/subtitle/{uploaded}",
+                headers={"Accept": CUE_BINARY_MEDIA_TYPE, "Accept-Encoding": accept_encoding}
+            )
+            assert response.status_code == 200
+            assert response.headers["content-type"] == CUE_BINARY_MEDIA_TYPE
+            assert decode_binary(response.content) == EXPECTED_CUES
+    
+    def test_brotli(self, client, uploaded):
+        """Test that br is served when it is the accepted coding."""
+        response = client.get(f"/api/files/subtitle/{uploaded}", headers={"Accept-Encoding": "br"})
+        assert response.headers["content-encoding"] == "br"
+        # httpx decodes br itself
+        assert response.json() == {"cues": EXPECTED_CUES}
+    
+    def test_encoded_payload_is_cached(self, client, uploaded, monkeypatch):
+        """Test that a variant is compressed once and then served from the cache."""
+        import main
+        
+        calls = []
+        original = main.compress
+        monkeypatch.setattr(main, "compress", lambda data, encoding: calls.append(encoding) or original(data, encoding))
+        
+        for _ in range(3):
+            response = client.get(f"/api/files/subtitle/{uploaded}", headers={"Accept-Encoding": "gzip"})
+            assert response.json() == {"cues": EXPECTED_CUES}
+        assert calls == ["gzip"]
+        
+        # Deleting the file drops the cached payloads with the cues
+        client.delete(f"/api/files/{uploaded}")
+        assert client.get(f"/api/files/subtitle/{uploaded}").status_code == 404
+    
+    def test_upload_binary_response(self, client, sample_vtt_file):
+        """Test that uploads negotiate the same formats and name the stored file."""
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post(
+                "/api/upload/subtitle",
+                files={"file": ("자막 파일.vtt", f, "text/vtt")},
+                headers={"Accept": CUE_BINARY_MEDIA_TYPE, "Accept-Encoding": "gzip"}
+            )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert decode_binary(response.content) == EXPECTED_CUES
+        assert response.headers["x-filename"]
+    
+    def test_upload_gzip_json(self, client, sample_vtt_file):
+        """Test that the upload JSON keeps its filename and cues when compressed."""
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post(
+                "/api/upload/subtitle",
+                files={"file": ("up.vtt", f, "text/vtt")},
+                headers={"Accept-Encoding": "gzip"}
+            )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == {"filename": "up.vtt", "cues": EXPECTED_CUES}
@@ -0,0 +1,154 @@
+"""Tests for the cue time-interval index and its query endpoints."""
+
+import json
+import random
+
+from backend.cue_index import CueIndex
+from backend.vtt_parser import SubtitleCue
+
+
+def make_overlapping_cues(count, seed=7):
+    """Create cues with random, frequently overlapping intervals."""
+    rng = random.Random(seed)
+    cues = []
+    for i in range(count):
+        start = round(rng.uniform(0, 600), 3)
+        duration = round(rng.choice([0.5, 2.0, 5.0, 120.0]) * rng.random(), 3)
+        cues.append(SubtitleCue(start_time=start, end_time=start + duration, text=f"cue {i}"))
+    return cues
+
+
+class TestCueIndex:
+    """Test CueIndex point and range queries."""
+    
+    def test_point_query_matches_linear_scan(self):
+        """Test that at() returns exactly the cues active per is_active()."""
+        cues = make_overlapping_cues(500)
+        index = CueIndex(cues)
+        
+        for t in [0.0, 1.25, 59.9, 300.0, 450.5, 599.999, 700.0]:
+            expected = sorted((c for c in cues if c.is_active(t)), key=lambda c: c.start_time)
+            assert [c.text for c in index.at(t)] == [c.text for c in expected]
+    
+    def test_window_query_matches_linear_scan(self):
+        """Test that window() returns cues overlapping [start, end)."""
+        cues = make_overlapping_cues(500)
+        index = CueIndex(cues)
+        
+        for start, end in [(0.0, 10.0), (100.0, 100.5), (250.0, 400.0), (590.0, 1000.0)]:
+            expected = sorted(
+                (c for c in cues if c.start_time < end and c.end_time > start),
+                key=lambda c: c.start_time
+            )
+            assert [c.text for c in index.window(start, end)] == [c.text for c in expected]
+    
+    def test_long_cue_spanning_many_short_cues(self):
+        """Test that a long early cue is still found late in the file."""
+        cues = [SubtitleCue(0.0, 1000.0, "chapter")]
+        cues += [SubtitleCue(float(i), i + 0.5, f"line {i}") for i in range(1, 900)]
+        index = CueIndex(cues)
+        
+        assert [c.text for c in index.at(850.2)] == ["chapter", "line 850"]
+        assert [c.text for c in index.at(850.7)] == ["chapter"]
+        assert index.next_start(850.7) == 851.0
+    
+    def test_empty_index(self):
+        """Test queries on a file without cues."""
+        index = CueIndex([])
+        assert index.at(1.0) == []
+        assert index.window(0.0, 10.0) == []
+        assert index.next_start(0.0) is None
+        assert index.page_after(None, 10) == ([], None)
+    
+    def test_pages_cover_all_cues_without_splitting_ties(self):
+        """Test that following cursors visits every cue once in start order."""
+        cues = make_overlapping_cues(500)
+        # Many cues sharing a start time across a page boundary
+        cues += [SubtitleCue(300.0, 301.0, f"tie {i}") for i in range(25)]
+        index = CueIndex(cues)
+        
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = index.page_after(cursor, 16)
+            assert len(rows) >= 1
+            seen.extend(rows)
+            if cursor is None:
+                break
+            assert index.table.starts[rows[-1]] == cursor
+        
+        assert seen == list(index.order)
+
+
+class TestCueQueryEndpoints:
+    """Test the /at and /window subtitle endpoints."""
+    
+    def upload(self, client, sample_vtt_file):
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post(
+                "/api/upload/subtitle",
+                files={"file": ("test_subtitle.vtt", f, "text/vtt")}
+            )
+        assert response.status_code == 200
+        return response.json()["filename"]
+    
+    def test_cues_at_time(self, client, sample_vtt_file):
+        """Test fetching the active cue at a playback time."""
+        filename = self.upload(client, sample_vtt_file)
+        
+        response = client.get(f"/api/files/subtitle/{filename}/at", params={"t": 2.5})
+        assert response.status_code == 200
+        data = response.json()
+        assert [c["text"] for c in data["cues"]] == ["Second subtitle line"]
+        assert data["next_start"] == 5.0
+    
+    def test_cues_in_window(self, client, sample_vtt_file):
+        """Test fetching the cues overlapping a time window."""
+        filename = self.upload(client, sample_vtt_file)
+        
+        response = client.get(f"/api/files/subtitle/{filename}/window", params={"from": 1.0, "to": 5.0})
+        assert response.status_code == 200
+        assert [c["text"] for c in response.json()["cues"]] == [
+            "First subtitle line", "Second subtitle line"
+        ]
+    
+    def test_invalid_window(self, client, sample_vtt_file):
+        """Test that a window ending before it starts is rejected."""
+        filename = self.upload(client, sample_vtt_file)
+        
+        response = client.get(f"/api/files/subtitle/{filename}/window", params={"from": 5.0, "to": 1.0})
+        assert response.status_code == 400
+    
+    def test_paginated_cues(self, client, sample_vtt_file):
+        """Test walking the cues page by page with the returned cursor."""
+        filename = self.upload(client, sample_vtt_file)
+        
+        first = client.get(f"/api/files/subtitle/{filename}", params={"limit": 2}).json()
+        assert [c["text"] for c in first["cues"]] == ["First subtitle line", "Second subtitle line"]
+        assert first["next"] == 2.0
+        
+        second = client.get(f"/api/files/subtitle/{filename}", params={"after": first["next"], "limit": 2}).json()
+        assert [c["text"] for c in second["cues"]] == ["Third subtitle line"]
+        assert second["next"] is None
+        
+        assert client.get(f"/api/files/subtitle/{filename}", params={"limit": 0}).status_code == 422
+    
+    def test_ndjson_stream(self, client, sample_vtt_file):
+        """Test streaming all cues, and one page, as NDJSON."""
+        filename = self.upload(client, sample_vtt_file)
+        
+        response = client.get(f"/api/files/subtitle/{filename}", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["text"] for line in response.text.splitlines()] == [
+            "First subtitle line", "Second subtitle line", "Third subtitle line"
+        ]
+        
+        response = client.get(f"/api/files/subtitle/{filename}", params={"format": "ndjson", "limit": 1})
+        assert len(response.text.splitlines()) == 1
+        assert response.headers["x-next-cursor"] == "0.0"
+    
+    def test_missing_subtitle(self, client):
+        """Test querying a subtitle file that doesn't exist."""
+        response = client.get("/api/files/subtitle/missing.vtt/at", params={"t": 1.0})
+        assert response.status_code == 404
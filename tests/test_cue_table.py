@@ -0,0 +1,69 @@
+"""Tests for the columnar cue table."""
+
+import json
+
+import pytest
+
+from backend.cue_table import CueTable
+
+
+@pytest.fixture
+def table():
+    """Create a small table with a repeated text."""
+    return CueTable.from_rows([
+        (0.0, 1.5, "[Music]"),
+        (1.5, 3.25, 'Quote "this" \\ and\nnewline'),
+        (3.25, 4.0, "[Music]"),
+        (4.0, 5.123, "한국어 자막"),
+    ])
+
+
+class TestCueTable:
+    """Test CueTable storage, views and serialization."""
+    
+    def test_texts_are_interned(self, table):
+        """Test that repeated texts are stored once."""
+        assert len(table) == 4
+        assert len(table.texts) == 3
+        assert table.text_ids[0] == table.text_ids[2]
+    
+    def test_append_after_finish_keeps_interning(self, table):
+        """Test that appending to a finished table reuses existing texts."""
+        table.finish()
+        table.append(5.123, 6.0, "[Music]")
+        
+        assert len(table.texts) == 3
+        assert table.text_ids[4] == table.text_ids[0]
+    
+    def test_views_expose_cue_fields(self, table):
+        """Test per-cue views and their helpers."""
+        cue = table[1]
+        assert cue.start_time == 1.5
+        assert cue.end_time == 3.25
+        assert cue.to_dict() == {"start": 1.5, "end": 3.25, "text": 'Quote "this" \\ and\nnewline'}
+        assert cue.is_active(2.0)
+        assert not cue.is_active(3.25)
+        assert table[-1].text == "한국어 자막"
+        with pytest.raises(IndexError):
+            table[4]
+    
+    def test_to_json_matches_dict_serialization(self, table):
+        """Test that column serialization equals serializing per-cue dicts."""
+        expected = json.dumps([cue.to_dict() for cue in table], ensure_ascii=False, separators=(",", ":"))
+        assert table.to_json() == expected
+        assert json.loads(table.to_json([3, 0])) == [table[3].to_dict(), table[0].to_dict()]
+    
+    def test_ndjson_lines_match_json(self, table):
+        """Test that NDJSON carries the same objects, batched into whole lines."""
+        chunks = list(table.iter_ndjson(batch_size=3))
+        assert len(chunks) == 2
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == json.loads(table.to_json())
+        assert list(table.iter_ndjson([2])) == [(table.to_json([2])[1:-1] + "\n").encode("utf-8")]
+    
+    def test_empty_table(self):
+        """Test serializing a table without cues."""
+        table = CueTable()
+        assert not table
+        assert table.to_json() == "[]"
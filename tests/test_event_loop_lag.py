@@ -0,0 +1,71 @@
+"""Tests that file handling does not block the event loop."""
+
+import asyncio
+import io
+import time
+
+import httpx
+
+from main import app, file_storage, vtt_parser
+
+# Longest the loop may go without running a ready task
+MAX_LAG_SECONDS = 0.1
+
+
+def write_vtt(path, cue_count):
+    """Write a VTT file with the given number of cues."""
+    lines = ["WEBVTT", ""]
+    for i in range(cue_count):
+        minutes, seconds = divmod(i * 2, 60)
+        hours, minutes = divmod(minutes, 60)
+        lines.append(f"{hours:02d}:{minutes:02d}:{seconds:02d}.000 --> {hours:02d}:{minutes:02d}:{seconds:02d}.900")
+        lines.append(f"Cue number {i}")
+        lines.append("")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+async def measure_lag(until: asyncio.Future) -> float:
+    """Sample how late a 1ms sleep wakes up until the future completes."""
+    worst = 0.0
+    while not until.done():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - start - 0.001)
+    return worst
+
+
+class TestEventLoopLag:
+    """Test event loop responsiveness during uploads and parsing."""
+    
+    def test_upload_and_parse_keep_loop_responsive(self, test_upload_dir, monkeypatch, tmp_path):
+        """Test loop lag while a large upload and a large subtitle parse run concurrently."""
+        monkeypatch.setattr(file_storage, "upload_dir", test_upload_dir)
+        vtt_parser.clear_cache()
+        
+        audio_data = b"\x00" * (32 * 1024 * 1024)
+        vtt_path = tmp_path / "long.vtt"
+        write_vtt(vtt_path, 100_000)
+        
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+                response = await client.post(
+                    "/api/upload/subtitle",
+                    files={"file": ("long.vtt", vtt_path.read_bytes(), "text/vtt")}
+                )
+                assert response.status_code == 200
+                vtt_parser.clear_cache()
+                
+                # A file object makes httpx stream the body in chunks, like a real server
+                work = asyncio.ensure_future(asyncio.gather(
+                    client.post("/api/upload/audio", files={"file": ("big.wav", io.BytesIO(audio_data), "audio/wav")}),
+                    client.get("/api/files/subtitle/long.vtt"),
+                ))
+                lag = await measure_lag(work)
+                upload, parsed = await work
+                assert upload.status_code == 200
+                assert parsed.status_code == 200
+                return lag
+        
+        lag = asyncio.run(scenario())
+        assert lag < MAX_LAG_SECONDS, f"event loop blocked for {lag * 1000:.0f} ms"
@@ -0,0 +1,195 @@
+"""Tests for the SQLite file catalog and the file listing endpoint."""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from backend.file_catalog import CatalogEntry, FileCatalog
+from backend.file_storage import FileStorageService
+from main import file_storage
+
+
+def entry(name, kind="audio", sha256=None, created_at=1000.0, **metadata):
+    """Catalog entry with defaults for the fields a test does not care about."""
+    return CatalogEntry(
+        name=name, kind=kind, size=10, sha256=sha256,
+        created_at=created_at, accessed_at=created_at, **metadata
+    )
+
+
+async def _chunks(data, chunk_size=4):
+    """Yield content in small chunks."""
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+def upload(client, kind, path, name, content_type):
+    """Upload a file through the single-file endpoint for its kind."""
+    response = client.post(f"/api/upload/{kind}", files={"file": (name, path.read_bytes(), content_type)})
+    assert response.status_code == 200
+
+
+class TestFileCatalog:
+    """Test FileCatalog on its own."""
+    
+    def test_database_uses_wal(self, tmp_path):
+        """Test the database is created on first use in WAL mode."""
+        catalog = FileCatalog(tmp_path / "db" / "catalog.sqlite3")
+        assert not (tmp_path / "db").exists()
+        
+        catalog.add(entry("a.wav"))
+        catalog.close()
+        
+        connection = sqlite3.connect(tmp_path / "db" / "catalog.sqlite3")
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        connection.close()
+    
+    def test_add_get_remove(self, tmp_path):
+        """Test rows round-trip and can be removed."""
+        catalog = FileCatalog(tmp_path / "catalog.sqlite3")
+        catalog.add(entry("a.wav", duration=1.5, sample_rate=48000))
+        
+        assert catalog.get("a.wav") == entry("a.wav", duration=1.5, sample_rate=48000)
+        assert catalog.remove("a.wav")
+        assert catalog.get("a.wav") is None
+        assert not catalog.remove("a.wav")
+    
+    def test_metadata_copied_for_same_content(self, tmp_path):
+        """Test a new name for stored content inherits its metadata."""
+        catalog = FileCatalog(tmp_path / "catalog.sqlite3")
+        catalog.add(entry("a.vtt", kind="subtitle", sha256="f" * 64, cue_count=3))
+        
+        catalog.add(entry("b.vtt", kind="subtitle", sha256="f" * 64))
+        
+        assert catalog.get("b.vtt").cue_count == 3
+    
+    def test_set_metadata(self, tmp_path):
+        """Test metadata is set on existing rows and unknown fields are rejected."""
+        catalog = FileCatalog(tmp_path / "catalog.sqlite3")
+        catalog.add(entry("a.vtt", kind="subtitle"))
+        
+        assert catalog.set_metadata("a.vtt", cue_count=7)
+        assert catalog.get("a.vtt").cue_count == 7
+        assert not catalog.set_metadata("missing.vtt", cue_count=1)
+        with pytest.raises(ValueError):
+            catalog.set_metadata("a.vtt", size=1)
+    
+    def test_pages_are_stable(self, tmp_path):
+        """Test pagination newest first, by kind, unaffected by new rows."""
+        catalog = FileCatalog(tmp_path / "catalog.sqlite3")
+        for i in range(5):
+            catalog.add(entry(f"{i}.wav" if i % 2 else f"{i}.vtt", kind="audio" if i % 2 else "subtitle"))
+        
+        first, cursor = catalog.list_page(2)
+        assert [e.name for e in first] == ["4.vtt", "3.wav"]
+        catalog.add(entry("new.wav"))
+        second, cursor = catalog.list_page(2, after=cursor)
+        assert [e.name for e in second] == ["2.vtt", "1.wav"]
+        last, cursor = catalog.list_page(2, after=cursor)
+        assert [e.name for e in last] == ["0.vtt"]
+        assert cursor is None
+        
+        audio, _ = catalog.list_page(10, kind="audio")
+        assert [e.name for e in audio] == ["new.wav", "3.wav", "1.wav"]
+    
+    def test_access_times_only_move_forward(self, tmp_path):
+        """Test flushed access times never go back in time."""
+        catalog = FileCatalog(tmp_path / "catalog.sqlite3")
+        catalog.add(entry("a.wav", created_at=1000.0))
+        
+        catalog.update_access_times({"a.wav": 2000.0, "missing.wav": 3000.0})
+        catalog.update_access_times({"a.wav": 1500.0})
+        
+        assert catalog.get("a.wav").accessed_at == 2000.0
+        assert catalog.count() == 1
+
+
+class TestStorageCatalog:
+    """Test FileStorageService keeps the catalog in sync."""
+    
+    def test_store_overwrite_and_delete(self, tmp_path):
+        """Test rows follow stores, overwrites and deletes."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        asyncio.run(storage.save_stream(_chunks(b"first"), "a.vtt"))
+        asyncio.run(storage.save_stream(_chunks(b"second"), "a.vtt"))
+        
+        row = storage.catalog.get("a.vtt")
+        assert (row.kind, row.size) == ("subtitle", 6)
+        assert row.sha256 == storage.get_file_hash("a.vtt")
+        
+        asyncio.run(storage.delete_file("a.vtt"))
+        assert storage.catalog.get("a.vtt") is None
+    
+    def test_existing_files_are_backfilled(self, tmp_path):
+        """Test a catalog created for existing storage lists what is there."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        asyncio.run(storage.save_stream(_chunks(b"WEBVTT\n"), "a.vtt"))
+        (tmp_path / "legacy.png").write_bytes(b"png")
+        storage.catalog.close()
+        for path in tmp_path.glob(FileStorageService.CATALOG_FILENAME + "*"):
+            path.unlink()
+        
+        restarted = FileStorageService(upload_dir=str(tmp_path))
+        entries, _ = restarted.list_catalog(10)
+        
+        assert sorted((e.name, e.kind, e.size) for e in entries) == [("a.vtt", "subtitle", 7), ("legacy.png", "image", 3)]
+
+
+class TestListFilesEndpoint:
+    """Test GET /api/files."""
+    
+    def test_lists_uploads_with_metadata(self, client, sample_wav_file, sample_vtt_file, sample_image_file):
+        """Test each upload is listed with the metadata read at upload time."""
+        upload(client, "audio", sample_wav_file, "talk.wav", "audio/wav")
+        upload(client, "subtitle", sample_vtt_file, "talk.vtt", "text/vtt")
+        upload(client, "image", sample_image_file, "cover.png", "image/png")
+        
+        response = client.get("/api/files")
+        
+        assert response.status_code == 200
+        files = {f["name"]: f for f in response.json()["files"]}
+        assert [f["name"] for f in response.json()["files"]] == ["cover.png", "talk.vtt", "talk.wav"]
+        assert files["talk.wav"]["kind"] == "audio"
+        assert files["talk.wav"]["sample_rate"] == 44100
+        assert files["talk.wav"]["duration"] == 0.0
+        assert files["talk.vtt"]["cue_count"] == 3
+        assert files["cover.png"]["size"] == len(sample_image_file.read_bytes())
+        assert files["cover.png"]["duration"] is None
+        assert response.json()["next"] is None
+    
+    def test_pagination_and_kind_filter(self, client, sample_vtt_file):
+        """Test limit/after paging and the kind filter."""
+        for name in ("a.vtt", "b.vtt", "c.vtt"):
+            upload(client, "subtitle", sample_vtt_file, name, "text/vtt")
+        
+        first = client.get("/api/files", params={"limit": 2}).json()
+        second = client.get("/api/files", params={"limit": 2, "after": first["next"]}).json()
+        
+        assert [f["name"] for f in first["files"]] == ["c.vtt", "b.vtt"]
+        assert [f["name"] for f in second["files"]] == ["a.vtt"]
+        assert second["next"] is None
+        assert client.get("/api/files", params={"kind": "audio"}).json()["files"] == []
+        assert client.get("/api/files", params={"kind": "video"}).status_code == 422
+    
+    def test_delete_and_link_update_listing(self, client, sample_vtt_file):
+        """Test deleted files disappear and linked copies keep metadata."""
+        upload(client, "subtitle", sample_vtt_file, "a.vtt", "text/vtt")
+        sha256 = file_storage.get_file_hash("a.vtt")
+        
+        client.post(f"/api/blobs/{sha256}/link", json={"filename": "copy.vtt"})
+        client.delete("/api/files/a.vtt")
+        
+        files = client.get("/api/files").json()["files"]
+        assert [(f["name"], f["cue_count"]) for f in files] == [("copy.vtt", 3)]
+    
+    def test_resumable_upload_is_described(self, client, sample_vtt_file):
+        """Test metadata of a resumable upload is recorded after completion."""
+        data = sample_vtt_file.read_bytes()
+        session = client.post("/api/uploads", json={"filename": "long.vtt", "size": len(data), "kind": "subtitle"}).json()
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 0}, content=data)
+        
+        assert client.post(f"/api/uploads/{session['id']}/complete").status_code == 200
+        
+        files = client.get("/api/files").json()["files"]
+        assert [(f["name"], f["cue_count"]) for f in files] == [("long.vtt", 3)]
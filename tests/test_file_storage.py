@@ -0,0 +1,124 @@
+"""Tests for content-addressed file storage."""
+
+import hashlib
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from backend.file_storage import FileStorageService
+
+
+def upload(client, sample_wav_file, name):
+    """Upload a WAV file under the given name."""
+    with open(sample_wav_file, 'rb') as f:
+        response = client.post(
+            "/api/upload/audio",
+            files={"file": (name, f, "audio/wav")}
+        )
+    assert response.status_code == 200
+    return response.json()
+
+
+def blob_files(upload_dir):
+    """List stored blobs."""
+    return sorted(p.name for p in (upload_dir / FileStorageService.BLOBS_DIRNAME).iterdir())
+
+
+class TestContentAddressedStorage:
+    """Test deduplication and reference counting."""
+    
+    def test_reupload_is_stored_once(self, client, sample_wav_file, test_upload_dir):
+        """Test that identical content under two names uses one blob."""
+        first = upload(client, sample_wav_file, "first.wav")
+        second = upload(client, sample_wav_file, "second.wav")
+        
+        expected_hash = hashlib.sha256(sample_wav_file.read_bytes()).hexdigest()
+        assert first["sha256"] == second["sha256"] == expected_hash
+        assert blob_files(test_upload_dir) == [expected_hash]
+        assert client.get("/api/files/audio/second.wav").content == sample_wav_file.read_bytes()
+    
+    def test_blob_deleted_with_last_reference(self, client, sample_wav_file, test_upload_dir):
+        """Test that content is only removed when no filename references it."""
+        upload(client, sample_wav_file, "first.wav")
+        upload(client, sample_wav_file, "second.wav")
+        
+        assert client.delete("/api/files/first.wav").status_code == 200
+        assert len(blob_files(test_upload_dir)) == 1
+        assert client.get("/api/files/audio/second.wav").status_code == 200
+        
+        assert client.delete("/api/files/second.wav").status_code == 200
+        assert blob_files(test_upload_dir) == []
+    
+    def test_overwrite_releases_previous_content(self, client, sample_wav_file, tmp_path, test_upload_dir):
+        """Test that re-saving a name with new content frees the old blob."""
+        upload(client, sample_wav_file, "audio.wav")
+        
+        changed = tmp_path / "changed.wav"
+        changed.write_bytes(sample_wav_file.read_bytes() + b"\x00\x00")
+        data = upload(client, changed, "audio.wav")
+        
+        assert blob_files(test_upload_dir) == [data["sha256"]]
+    
+    def test_manifest_survives_restart(self, test_upload_dir):
+        """Test that a new service instance sees earlier name mappings."""
+        import asyncio
+        
+        storage = FileStorageService(upload_dir=str(test_upload_dir))
+        upload_file = UploadFile(file=BytesIO(b"WEBVTT\n"), filename="a.vtt")
+        asyncio.run(storage.save_file(upload_file, "a.vtt"))
+        
+        restarted = FileStorageService(upload_dir=str(test_upload_dir))
+        assert restarted.get_file_hash("a.vtt") == hashlib.sha256(b"WEBVTT\n").hexdigest()
+        assert restarted.get_file_path("a.vtt").read_bytes() == b"WEBVTT\n"
+    
+    def test_legacy_plain_files_are_still_served(self, client, test_upload_dir):
+        """Test that files stored before content addressing can be fetched and deleted."""
+        (test_upload_dir / "old.wav").write_bytes(b"RIFF")
+        
+        assert client.get("/api/files/audio/old.wav").status_code == 200
+        assert client.delete("/api/files/old.wav").status_code == 200
+        assert not (test_upload_dir / "old.wav").exists()
+    
+    def test_internal_files_are_not_served(self, client, sample_wav_file):
+        """Test that the manifest cannot be fetched by name."""
+        upload(client, sample_wav_file, "audio.wav")
+        assert client.get(f"/api/files/image/{FileStorageService.MANIFEST_FILENAME}").status_code == 404
+
+
+class TestBlobPrecheck:
+    """Test the blob pre-check and link endpoints."""
+    
+    def test_head_known_and_unknown_blob(self, client, sample_wav_file):
+        """Test HEAD for stored, unknown and invalid digests."""
+        sha256 = upload(client, sample_wav_file, "audio.wav")["sha256"]
+        
+        response = client.head(f"/api/blobs/{sha256}")
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == sample_wav_file.stat().st_size
+        
+        assert client.head(f"/api/blobs/{'0' * 64}").status_code == 404
+        assert client.head("/api/blobs/not-a-hash").status_code == 400
+    
+    def test_link_skips_upload(self, client, sample_wav_file, test_upload_dir):
+        """Test that linking stores existing content under a new name."""
+        sha256 = upload(client, sample_wav_file, "audio.wav")["sha256"]
+        
+        response = client.post(f"/api/blobs/{sha256}/link", json={"filename": "copy.wav"})
+        assert response.status_code == 200
+        assert response.json() == {
+            "filename": "copy.wav",
+            "size": sample_wav_file.stat().st_size,
+            "sha256": sha256
+        }
+        assert client.get("/api/files/audio/copy.wav").status_code == 200
+        assert blob_files(test_upload_dir) == [sha256]
+    
+    @pytest.mark.parametrize("sha256,filename,status", [
+        ("0" * 64, "copy.wav", 404),
+        ("0" * 64, "copy.exe", 400),
+    ])
+    def test_link_rejects_invalid_requests(self, client, sha256, filename, status):
+        """Test linking unknown content or disallowed filenames."""
+        response = client.post(f"/api/blobs/{sha256}/link", json={"filename": filename})
+        assert response.status_code == status
@@ -0,0 +1,176 @@
+"""Tests for the Prometheus metrics endpoint and instrumentation."""
+
+import asyncio
+import re
+
+import pytest
+
+from backend import metrics
+from backend.file_storage import FileStorageService
+from backend.vtt_parser import VTTParserService
+
+
+def sample_value(text, metric, **labels):
+    """Find one sample in exposition text by name and labels."""
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        match = re.fullmatch(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)', line)
+        assert match, f"malformed sample line: {line!r}"
+        sample_labels = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+        if match.group(1) == metric and sample_labels == {k: str(v) for k, v in labels.items()}:
+            return float(match.group(3))
+    return None
+
+
+async def _chunks(data, chunk_size=4):
+    """Yield content in small chunks."""
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+class TestMetricTypes:
+    """Test metric families and text rendering."""
+    
+    def test_counter_and_gauge(self):
+        """Test counters and labelled gauges render one sample each."""
+        registry = metrics.Registry()
+        requests = registry.register(metrics.Counter('test_requests_total', 'Requests'))
+        queue = registry.register(metrics.Gauge('test_queue', 'Queue length', ('name',)))
+        requests.inc()
+        requests.inc(2)
+        queue.labels('a').inc(5)
+        queue.labels('a').dec(2)
+        queue.labels('b').set(7)
+        
+        text = registry.render()
+        
+        assert '# TYPE test_requests_total counter' in text
+        assert sample_value(text, 'test_requests_total') == 3
+        assert sample_value(text, 'test_queue', name='a') == 3
+        assert sample_value(text, 'test_queue', name='b') == 7
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, count and sum."""
+        registry = metrics.Registry()
+        latency = registry.register(metrics.Histogram('test_seconds', 'Latency', buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+        
+        text = registry.render()
+        
+        assert sample_value(text, 'test_seconds_bucket', le='0.1') == 2
+        assert sample_value(text, 'test_seconds_bucket', le='1') == 3
+        assert sample_value(text, 'test_seconds_bucket', le='+Inf') == 4
+        assert sample_value(text, 'test_seconds_count') == 4
+        assert sample_value(text, 'test_seconds_sum') == pytest.approx(3.65)
+    
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes in label values keep lines parseable."""
+        registry = metrics.Registry()
+        registry.register(metrics.Counter('test_total', 'Test', ('path',))).labels('a"b\\c').inc()
+        
+        assert sample_value(registry.render(), 'test_total', path='a\\"b\\\\c') == 1
+    
+    def test_wrong_label_count(self):
+        """Test labels() rejects a wrong number of values."""
+        with pytest.raises(ValueError):
+            metrics.Counter('test_total', 'Test', ('a', 'b')).labels('x')
+    
+    def test_cue_count_classes(self):
+        """Test cue counts map to bounded label values."""
+        assert metrics.cue_count_class(0) == '0-100'
+        assert metrics.cue_count_class(1000) == '100-1k'
+        assert metrics.cue_count_class(5000) == '1k-10k'
+        assert metrics.cue_count_class(10 ** 6) == '100k+'
+
+
+class TestInstrumentation:
+    """Test the services update their metrics."""
+    
+    def test_save_stream_counts_bytes_and_chunk_writes(self, tmp_path):
+        """Test every written chunk is counted and the upload gauge returns to zero."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        bytes_before = metrics.UPLOAD_BYTES._default.get()
+        writes_before = metrics.UPLOAD_CHUNK_WRITE_SECONDS._default.snapshot()[0]
+        
+        asyncio.run(storage.save_stream(_chunks(b"x" * 10), "a.wav"))
+        
+        assert metrics.UPLOAD_BYTES._default.get() - bytes_before == 10
+        assert sum(metrics.UPLOAD_CHUNK_WRITE_SECONDS._default.snapshot()[0]) - sum(writes_before) == 3
+        assert metrics.UPLOADS_IN_PROGRESS._default.get() == 0
+    
+    def test_parse_duration_by_cue_count(self, sample_vtt_file):
+        """Test parsing a file records its duration under its cue count class."""
+        child = metrics.VTT_PARSE_SECONDS.labels('0-100')
+        before = sum(child.snapshot()[0])
+        parser = VTTParserService()
+        
+        parser.parse_vtt_file(str(sample_vtt_file))
+        parser.parse_vtt_file(str(sample_vtt_file))
+        
+        # The second call is a cache hit and parses nothing
+        assert sum(child.snapshot()[0]) - before == 1
+    
+    def test_disk_usage(self, tmp_path):
+        """Test disk usage covers stored content and internal files."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        asyncio.run(storage.save_stream(_chunks(b"x" * 5000), "a.wav"))
+        
+        files, used = storage.disk_usage()
+        
+        assert files >= 2  # blob and manifest
+        assert used >= 4096
+
+
+class TestMetricsEndpoint:
+    """Test GET /metrics."""
+    
+    def test_exposition_format(self, client):
+        """Test the endpoint serves parseable Prometheus text."""
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        # Every sample line must parse
+        sample_value(response.text, 'no_such_metric')
+        assert sample_value(response.text, 'wsync_upload_dir_files') == 0
+    
+    def test_route_latency_uses_route_template(self, client):
+        """Test requests are labelled by route template and status."""
+        client.get("/api/files/subtitle/missing.vtt")
+        client.get("/api/files/subtitle/other.vtt")
+        client.get("/no/such/path")
+        
+        text = client.get("/metrics").text
+        
+        count = sample_value(
+            text, 'wsync_http_request_duration_seconds_count',
+            method='GET', route='/api/files/subtitle/{filename}', status=404
+        )
+        assert count is not None and count >= 2
+        assert 'missing.vtt' not in text
+        assert sample_value(
+            text, 'wsync_http_request_duration_seconds_count', method='GET', route='unmatched', status=404
+        ) >= 1
+    
+    def test_upload_and_cache_metrics(self, client, sample_vtt_file, monkeypatch):
+        """Test an upload shows up in byte, disk and cache metrics."""
+        import main
+        
+        # Restore the measured usage afterwards, so other tests see an empty directory
+        monkeypatch.setattr(main.storage_collector, "disk_files", 0)
+        monkeypatch.setattr(main.storage_collector, "disk_bytes", 0)
+        before = sample_value(client.get("/metrics").text, 'wsync_upload_bytes_total')
+        content = sample_vtt_file.read_bytes()
+        client.post("/api/upload/subtitle", files={"file": ("test.vtt", content, "text/vtt")})
+        client.get("/api/files/subtitle/test.vtt")
+        asyncio.run(main.storage_collector.measure_usage())
+        
+        text = client.get("/metrics").text
+        
+        assert sample_value(text, 'wsync_upload_bytes_total') - before == len(content)
+        assert sample_value(text, 'wsync_uploads_in_progress') == 0
+        assert sample_value(text, 'wsync_upload_dir_bytes') > 0
+        assert sample_value(text, 'wsync_cache_hits_total', cache='vtt') >= 1
+        assert sample_value(text, 'wsync_cache_misses_total', cache='peaks') is not None
@@ -0,0 +1,115 @@
+"""Tests for streaming multipart upload ingestion."""
+
+import asyncio
+
+import pytest
+
+from backend.multipart_stream import MultipartError, MultipartStreamReader
+from main import file_storage
+
+BOUNDARY = "----wsyncboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def build_body(parts):
+    """Build a multipart body from (name, filename, content_type, data) tuples."""
+    body = b""
+    for name, filename, content_type, data in parts:
+        body += f"--{BOUNDARY}\r\n".encode()
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"Content-Disposition: {disposition}\r\n".encode()
+        if content_type:
+            body += f"Content-Type: {content_type}\r\n".encode()
+        body += b"\r\n" + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def chunked(data, size):
+    """Yield data in fixed-size chunks."""
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def read_all(body, chunk_size):
+    """Read every part of a body into (name, filename, content_type, data) tuples."""
+    reader = MultipartStreamReader(chunked(body, chunk_size), CONTENT_TYPE)
+    parts = []
+    while True:
+        part = await reader.next_part()
+        if part is None:
+            return parts
+        data = b"".join([chunk async for chunk in reader.iter_data()])
+        parts.append((part.name, part.filename, part.content_type, data))
+
+
+class TestMultipartStreamReader:
+    """Test incremental multipart parsing."""
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_parts_across_chunk_boundaries(self, chunk_size):
+        """Test that parts parse identically however the body is split."""
+        payload = bytes(range(256)) * 40 + f"\r\n--{BOUNDARY}x".encode()
+        parts = [
+            ("note", None, None, b"hello"),
+            ("file", "음성.wav", "audio/wav", payload),
+        ]
+        assert asyncio.run(read_all(build_body(parts), chunk_size)) == parts
+    
+    def test_rejects_non_multipart(self):
+        """Test that other content types are rejected up front."""
+        with pytest.raises(MultipartError):
+            MultipartStreamReader(chunked(b"", 1), "application/json")
+    
+    def test_truncated_body(self):
+        """Test that a body ending inside a part raises."""
+        body = build_body([("file", "a.wav", "audio/wav", b"x" * 100)])[:-40]
+        
+        async def scenario():
+            reader = MultipartStreamReader(chunked(body, 16), CONTENT_TYPE)
+            await reader.next_part()
+            async for _ in reader.iter_data():
+                pass
+        
+        with pytest.raises(MultipartError):
+            asyncio.run(scenario())
+
+
+class TestStreamingUpload:
+    """Test the upload endpoints' streaming path."""
+    
+    def test_upload_is_not_spooled(self, client, test_upload_dir):
+        """Test that a streamed upload is stored and leaves no temp files."""
+        data = b"RIFF" + b"\x00" * 5000
+        response = client.post("/api/upload/image", files={"file": ("cover.png", data, "image/png")})
+        assert response.status_code == 200
+        assert file_storage.get_file_path("cover.png").read_bytes() == data
+        assert not list((test_upload_dir / ".incoming").iterdir())
+    
+    def test_content_length_rejected_early(self, client, monkeypatch):
+        """Test that an oversized Content-Length is refused before the body is read."""
+        monkeypatch.setattr(file_storage, "MAX_FILE_SIZE", 1024)
+        body = build_body([("file", "big.wav", "audio/wav", b"\x00" * 200_000)])
+        response = client.post("/api/upload/audio", content=body, headers={"Content-Type": CONTENT_TYPE})
+        assert response.status_code == 413
+    
+    def test_size_limit_enforced_while_streaming(self, client, monkeypatch, test_upload_dir):
+        """Test that a body under the Content-Length slack is still cut off at the limit."""
+        monkeypatch.setattr(file_storage, "MAX_FILE_SIZE", 1024)
+        response = client.post("/api/upload/audio", files={"file": ("big.wav", b"\x00" * 4096, "audio/wav")})
+        assert response.status_code == 413
+        assert file_storage.get_file_path("big.wav") is None
+        assert not list((test_upload_dir / ".incoming").iterdir())
+    
+    def test_missing_file_field(self, client):
+        """Test that a form without a file part is rejected."""
+        body = build_body([("note", None, None, b"hello")])
+        response = client.post("/api/upload/image", content=body, headers={"Content-Type": CONTENT_TYPE})
+        assert response.status_code == 422
+    
+    def test_malformed_body(self, client):
+        """Test that a truncated multipart body is rejected."""
+        body = build_body([("file", "a.png", "image/png", b"x" * 100)])[:-40]
+        response = client.post("/api/upload/image", content=body, headers={"Content-Type": CONTENT_TYPE})
+        assert response.status_code == 400
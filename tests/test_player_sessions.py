@@ -0,0 +1,189 @@
+"""Tests for player sessions and the session bundle endpoint."""
+
+import json
+
+import pytest
+
+from backend.file_storage import FileStorageService
+from backend.player_sessions import PlayerSessionError, PlayerSessionService
+from backend.vtt_parser import VTTParserService
+
+
+def upload(client, kind, name, content, content_type):
+    """Upload a file through the single-file endpoint for its kind."""
+    response = client.post(f"/api/upload/{kind}", files={"file": (name, content, content_type)})
+    assert response.status_code == 200
+
+
+def vtt(*texts):
+    """VTT content with one two-second cue per text."""
+    blocks = [
+        f"00:00:{i * 2:02d}.000 --> 00:00:{i * 2 + 2:02d}.000\n{text}\n" for i, text in enumerate(texts)
+    ]
+    return ("WEBVTT\n\n" + "\n".join(blocks)).encode()
+
+
+@pytest.fixture
+def stored(client, sample_wav_file, sample_vtt_file, sample_image_file):
+    """Upload an audio file, two subtitle tracks and an image."""
+    upload(client, "audio", "talk.wav", sample_wav_file.read_bytes(), "audio/wav")
+    upload(client, "subtitle", "talk.vtt", sample_vtt_file.read_bytes(), "text/vtt")
+    upload(client, "subtitle", "talk.ko.vtt", vtt("안녕하세요"), "text/vtt")
+    upload(client, "image", "cover.png", sample_image_file.read_bytes(), "image/png")
+    return client
+
+
+def create(client, **members):
+    """Create a session and return its id."""
+    response = client.post("/api/session", json=members)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+class TestPlayerSessionService:
+    """Test PlayerSessionService on its own."""
+    
+    @pytest.fixture
+    def service(self, tmp_path, sample_vtt_file):
+        """Service over a storage holding two legacy (unhashed) files."""
+        storage = FileStorageService(upload_dir=str(tmp_path / "uploads"))
+        storage.create_upload_dir()
+        (storage.upload_dir / "legacy.wav").write_bytes(b"RIFF")
+        (storage.upload_dir / "legacy.vtt").write_bytes(sample_vtt_file.read_bytes())
+        return PlayerSessionService(storage, VTTParserService(), inline_cue_limit=2)
+    
+    def test_long_tracks_are_referenced_not_embedded(self, service):
+        """Test a track above the inline limit comes with its cue count and index URLs only."""
+        session_id = service.create_session("legacy.wav", ["legacy.vtt"])
+        
+        body, _ = service.get_bundle(session_id)
+        
+        track = json.loads(body)["subtitles"][0]
+        assert track["cues"] is None
+        assert track["cue_count"] == 3
+        assert track["index"]["at"] == "/api/files/subtitle/legacy.vtt/at"
+    
+    def test_legacy_file_change_invalidates(self, service):
+        """Test replacing an unhashed file rebuilds the bundle under a new ETag."""
+        session_id = service.create_session("legacy.wav", ["legacy.vtt"])
+        _, etag = service.get_bundle(session_id)
+        _, same = service.get_bundle(session_id)
+        
+        (service.file_storage.upload_dir / "legacy.wav").write_bytes(b"RIFF-changed")
+        _, changed = service.get_bundle(session_id)
+        
+        assert same == etag
+        assert changed != etag
+        assert service.cache_stats()["hits"] == 1
+        assert service.cache_stats()["misses"] == 2
+    
+    def test_rejects_wrong_kinds_and_missing_files(self, service):
+        """Test members are checked when the session is created."""
+        with pytest.raises(PlayerSessionError) as exc_info:
+            service.create_session("legacy.vtt", ["legacy.vtt"])
+        assert exc_info.value.status_code == 400
+        
+        with pytest.raises(PlayerSessionError) as exc_info:
+            service.create_session("legacy.wav", [])
+        assert exc_info.value.status_code == 400
+        
+        with pytest.raises(PlayerSessionError) as exc_info:
+            service.create_session("legacy.wav", ["missing.vtt"])
+        assert exc_info.value.status_code == 404
+    
+    def test_sessions_survive_a_restart(self, service):
+        """Test a session is read back from the catalog by a new service."""
+        session_id = service.create_session("legacy.wav", ["legacy.vtt"])
+        
+        restarted = PlayerSessionService(service.file_storage, VTTParserService())
+        body, _ = restarted.get_bundle(session_id)
+        
+        assert b'"legacy.wav"' in body
+
+
+class TestSessionEndpoint:
+    """Test POST /api/session and GET /api/session/{id}."""
+    
+    def test_bundle_holds_everything_the_player_needs(self, stored):
+        """Test one response carries duration, cues, image URL and member ETags."""
+        session_id = create(stored, audio="talk.wav", subtitles=["talk.vtt", "talk.ko.vtt"], image="cover.png")
+        
+        response = stored.get(f"/api/session/{session_id}")
+        
+        assert response.status_code == 200
+        bundle = response.json()
+        assert bundle["id"] == session_id
+        assert bundle["audio"]["url"] == "/api/files/audio/talk.wav"
+        assert bundle["audio"]["duration"] == 0.0
+        assert bundle["audio"]["sample_rate"] == 44100
+        assert [track["filename"] for track in bundle["subtitles"]] == ["talk.vtt", "talk.ko.vtt"]
+        assert bundle["subtitles"][0]["cue_count"] == 3
+        assert bundle["subtitles"][0]["cues"][0]["text"] == "First subtitle line"
+        assert bundle["subtitles"][1]["cues"][0]["text"] == "안녕하세요"
+        assert bundle["image"]["url"] == "/api/files/image/cover.png"
+        
+        audio_etag = stored.get("/api/files/audio/talk.wav").headers["etag"]
+        assert bundle["audio"]["etag"] == audio_etag
+    
+    def test_create_returns_location(self, stored):
+        """Test a new session points at its bundle."""
+        response = stored.post("/api/session", json={"audio": "talk.wav", "subtitles": ["talk.vtt"]})
+        
+        assert response.status_code == 201
+        assert response.headers["location"] == response.json()["url"]
+        assert stored.get(response.json()["url"]).json()["image"] is None
+    
+    def test_revalidation_returns_304(self, stored):
+        """Test an unchanged bundle revalidates with If-None-Match."""
+        session_id = create(stored, audio="talk.wav", subtitles=["talk.vtt"])
+        first = stored.get(f"/api/session/{session_id}")
+        
+        response = stored.get(f"/api/session/{session_id}", headers={"If-None-Match": first.headers["etag"]})
+        
+        assert first.headers["cache-control"] == "no-cache"
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_member_change_invalidates_bundle(self, stored):
+        """Test re-uploading a member file changes the bundle and its ETag."""
+        session_id = create(stored, audio="talk.wav", subtitles=["talk.vtt"])
+        first = stored.get(f"/api/session/{session_id}")
+        
+        upload(stored, "subtitle", "talk.vtt", vtt("Replaced"), "text/vtt")
+        response = stored.get(f"/api/session/{session_id}", headers={"If-None-Match": first.headers["etag"]})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] != first.headers["etag"]
+        assert response.json()["subtitles"][0]["cues"][0]["text"] == "Replaced"
+    
+    def test_deleted_member_returns_404(self, stored):
+        """Test a bundle is not served once one of its files is deleted."""
+        session_id = create(stored, audio="talk.wav", subtitles=["talk.vtt"], image="cover.png")
+        assert stored.get(f"/api/session/{session_id}").status_code == 200
+        
+        stored.delete("/api/files/cover.png")
+        
+        assert stored.get(f"/api/session/{session_id}").status_code == 404
+    
+    def test_compressed_bundle(self, stored):
+        """Test the bundle is compressed per Accept-Encoding under its own ETag."""
+        session_id = create(stored, audio="talk.wav", subtitles=["talk.vtt"])
+        plain = stored.get(f"/api/session/{session_id}", headers={"Accept-Encoding": "identity"})
+        
+        response = stored.get(f"/api/session/{session_id}", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] != plain.headers["etag"]
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == plain.json()
+    
+    def test_unknown_session(self, client):
+        """Test unknown and malformed session ids return 404."""
+        assert client.get("/api/session/" + "0" * 32).status_code == 404
+        assert client.get("/api/session/not-a-session").status_code == 404
+    
+    def test_missing_member_rejected(self, stored):
+        """Test a session cannot name a file that is not stored."""
+        response = stored.post("/api/session", json={"audio": "talk.wav", "subtitles": ["nope.vtt"]})
+        
+        assert response.status_code == 404
@@ -0,0 +1,144 @@
+"""Tests for ranged and conditional audio serving."""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from backend.ranged_file_response import ZEROCOPY_EXTENSION, RangedFileResponse, parse_range_header
+
+
+@pytest.fixture
+def uploaded_audio(client, tmp_path):
+    """Upload a WAV file with a distinctive byte pattern and return its bytes."""
+    data = bytes(range(256)) * 64
+    wav_path = tmp_path / "long.wav"
+    wav_path.write_bytes(data)
+    with open(wav_path, "rb") as f:
+        response = client.post("/api/upload/audio", files={"file": ("long.wav", f, "audio/wav")})
+    assert response.status_code == 200
+    return data
+
+
+class TestParseRangeHeader:
+    """Test Range header parsing."""
+    
+    def test_forms(self):
+        """Test closed, open-ended and suffix ranges."""
+        assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+        assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+        assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+        assert parse_range_header("bytes=990-2000", 1000) == [(990, 999)]
+    
+    def test_coalesces_overlapping_ranges(self):
+        """Test that overlapping and adjacent ranges are merged."""
+        assert parse_range_header("bytes=50-99, 0-49, 200-300, 250-399", 1000) == [(0, 99), (200, 399)]
+    
+    def test_unsatisfiable_and_malformed(self):
+        """Test that unsatisfiable ranges give [] and malformed headers None."""
+        assert parse_range_header("bytes=1000-", 1000) == []
+        assert parse_range_header("bytes=5-1", 1000) is None
+        assert parse_range_header("bytes=a-b", 1000) is None
+        assert parse_range_header("items=0-1", 1000) is None
+
+
+class TestRangedAudio:
+    """Test Range, ETag and conditional requests on the audio endpoint."""
+    
+    def test_full_response_headers(self, client, uploaded_audio):
+        """Test that a plain GET advertises ranges and a SHA-256 ETag."""
+        response = client.get("/api/files/audio/long.wav")
+        assert response.status_code == 200
+        assert response.content == uploaded_audio
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == f'"{hashlib.sha256(uploaded_audio).hexdigest()}"'
+        assert response.headers["content-length"] == str(len(uploaded_audio))
+    
+    def test_single_range(self, client, uploaded_audio):
+        """Test a 206 response for one range."""
+        response = client.get("/api/files/audio/long.wav", headers={"Range": "bytes=1000-1999"})
+        assert response.status_code == 206
+        assert response.content == uploaded_audio[1000:2000]
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(uploaded_audio)}"
+        assert response.headers["content-length"] == "1000"
+    
+    def test_multi_range(self, client, uploaded_audio):
+        """Test a multipart/byteranges response."""
+        response = client.get("/api/files/audio/long.wav", headers={"Range": "bytes=0-9, -10"})
+        assert response.status_code == 206
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/byteranges; boundary=")
+        boundary = content_type.split("boundary=")[1].encode()
+        assert response.headers["content-length"] == str(len(response.content))
+        
+        parts = response.content.split(b"--" + boundary)
+        assert parts[-1] == b"--\r\n"
+        bodies = [part.split(b"\r\n\r\n", 1) for part in parts[1:-1]]
+        size = len(uploaded_audio)
+        assert b"Content-Range: bytes 0-9/%d" % size in bodies[0][0]
+        assert bodies[0][1] == uploaded_audio[:10] + b"\r\n"
+        assert b"Content-Range: bytes %d-%d/%d" % (size - 10, size - 1, size) in bodies[1][0]
+        assert bodies[1][1] == uploaded_audio[-10:] + b"\r\n"
+    
+    def test_unsatisfiable_range(self, client, uploaded_audio):
+        """Test 416 for a range past the end of the file."""
+        response = client.get("/api/files/audio/long.wav", headers={"Range": f"bytes={len(uploaded_audio)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(uploaded_audio)}"
+    
+    def test_if_none_match(self, client, uploaded_audio):
+        """Test 304 when the client already has the current version."""
+        etag = client.get("/api/files/audio/long.wav").headers["etag"]
+        response = client.get("/api/files/audio/long.wav", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        
+        response = client.get("/api/files/audio/long.wav", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+    
+    def test_if_range(self, client, uploaded_audio):
+        """Test that a stale If-Range validator yields the full file."""
+        etag = client.get("/api/files/audio/long.wav").headers["etag"]
+        
+        response = client.get("/api/files/audio/long.wav", headers={"Range": "bytes=0-9", "If-Range": etag})
+        assert response.status_code == 206
+        
+        response = client.get("/api/files/audio/long.wav", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == uploaded_audio
+    
+    def test_head(self, client, uploaded_audio):
+        """Test that HEAD returns headers without a body."""
+        response = client.head("/api/files/audio/long.wav", headers={"Range": "bytes=0-9"})
+        assert response.status_code == 206
+        assert response.headers["content-length"] == "10"
+        assert response.content == b""
+    
+    def test_legacy_file_etag(self, client, test_upload_dir):
+        """Test that files outside the manifest get an identity-based ETag."""
+        (test_upload_dir / "legacy.wav").write_bytes(b"RIFF0000WAVE")
+        stat = os.stat(test_upload_dir / "legacy.wav")
+        
+        response = client.get("/api/files/audio/legacy.wav", headers={"Range": "bytes=4-7"})
+        assert response.status_code == 206
+        assert response.content == b"0000"
+        assert response.headers["etag"] == f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    
+    def test_zerocopy_extension(self, tmp_path):
+        """Test that servers offering the zero-copy extension get sendfile messages."""
+        path = tmp_path / "audio.wav"
+        path.write_bytes(b"0123456789")
+        response = RangedFileResponse(str(path), {"range": "bytes=2-5"}, media_type="audio/wav")
+        messages = []
+        
+        async def send(message):
+            messages.append(message)
+        
+        scope = {"type": "http", "method": "GET", "extensions": {ZEROCOPY_EXTENSION: {}}}
+        asyncio.run(response(scope, None, send))
+        
+        zerocopy = [message for message in messages if message["type"] == ZEROCOPY_EXTENSION]
+        assert len(zerocopy) == 1
+        assert (zerocopy[0]["offset"], zerocopy[0]["count"]) == (2, 4)
+        assert messages[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
@@ -0,0 +1,175 @@
+"""Tests for on-demand request profiling."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from backend.blocking_io import run_blocking
+from backend.request_profiler import AWAITING_ROOT, WORKER_ROOT, ProfilingMiddleware, RequestProfiler
+
+TOKEN = "s3cret"
+
+
+def spin(seconds):
+    """Keep the CPU busy for a while."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def blocking_work():
+    """Busy work run in the blocking I/O pool."""
+    spin(0.1)
+
+
+def build_app(profiler):
+    """App with endpoints spending time on the loop, in the pool and waiting."""
+    app = FastAPI()
+    
+    @app.get("/work")
+    async def work():
+        spin(0.1)
+        await run_blocking(blocking_work)
+        await asyncio.sleep(0.1)
+        return {"ok": True}
+    
+    @app.get("/admin/secret")
+    async def excluded():
+        return {}
+    
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, exclude_prefixes=("/admin",))
+    return app
+
+
+class TestRequestProfiler:
+    """Test profiling through ProfilingMiddleware."""
+    
+    def test_token_header_profiles_request(self):
+        """Test a request with the token is profiled and others are not."""
+        profiler = RequestProfiler(token=TOKEN, interval=0.002)
+        client = TestClient(build_app(profiler))
+        
+        assert "x-profile-id" not in client.get("/work").headers
+        assert "x-profile-id" not in client.get("/work", headers={"X-Profile-Token": "wrong"}).headers
+        response = client.get("/work", headers={"X-Profile-Token": TOKEN})
+        
+        assert response.status_code == 200
+        record = profiler.get_profile(response.headers["x-profile-id"])
+        assert record.method == "GET"
+        assert record.path == "/work"
+        assert record.status == 200
+        assert record.duration >= 0.3
+        assert len(profiler.list_profiles()) == 1
+    
+    def test_samples_are_attributed(self):
+        """Test loop, worker and waiting time each show up in the stacks."""
+        profiler = RequestProfiler(token=TOKEN, interval=0.002)
+        client = TestClient(build_app(profiler))
+        
+        response = client.get("/work", headers={"X-Profile-Token": TOKEN})
+        stacks = profiler.get_profile(response.headers["x-profile-id"]).stacks
+        
+        def samples(predicate):
+            return sum(count for stack, count in stacks.items() if predicate(stack))
+        
+        on_loop = samples(lambda stack: "build_app.<locals>.work;tests.test_request_profiler:spin" in stack)
+        in_pool = samples(lambda stack: stack.startswith(WORKER_ROOT) and "blocking_work" in stack)
+        waiting = stacks.get(AWAITING_ROOT, 0)
+        assert on_loop > 5
+        assert in_pool > 5
+        assert waiting > 5
+        # Frames above the middleware (event loop, test client) are cut off
+        loop_stacks = [stack for stack in stacks if not stack.startswith("[")]
+        assert all(stack.startswith("starlette.") for stack in loop_stacks)
+    
+    def test_collapsed_format(self):
+        """Test the download format is one "stack count" line per stack."""
+        profiler = RequestProfiler(token=TOKEN, interval=0.002)
+        client = TestClient(build_app(profiler))
+        response = client.get("/work", headers={"X-Profile-Token": TOKEN})
+        
+        record = profiler.get_profile(response.headers["x-profile-id"])
+        lines = record.collapsed().splitlines()
+        
+        assert lines
+        total = 0
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack
+            total += int(count)
+        assert total == record.sample_count
+    
+    def test_sample_rate_and_exclusions(self):
+        """Test sampling picks requests without a header, except excluded paths."""
+        profiler = RequestProfiler(sample_rate=1.0)
+        client = TestClient(build_app(profiler))
+        
+        assert "x-profile-id" in client.get("/work").headers
+        assert "x-profile-id" not in client.get("/admin/secret").headers
+        assert not profiler.check_token(TOKEN)
+    
+    def test_ring_is_bounded(self):
+        """Test only the newest profiles are kept."""
+        profiler = RequestProfiler(sample_rate=1.0, max_profiles=2)
+        app = FastAPI()
+        
+        @app.get("/fast")
+        async def fast():
+            return {}
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
+        client = TestClient(app)
+        
+        ids = [client.get("/fast").headers["x-profile-id"] for _ in range(3)]
+        
+        assert [record.id for record in profiler.list_profiles()] == ids[:0:-1]
+        assert profiler.get_profile(ids[0]) is None
+    
+    def test_disabled_profiler(self):
+        """Test a profiler without sample rate or token is disabled."""
+        assert not RequestProfiler().enabled
+        assert RequestProfiler(token=TOKEN).enabled
+        assert RequestProfiler(sample_rate=0.01).enabled
+
+
+class TestProfileEndpoints:
+    """Test the profile download endpoints of the application."""
+    
+    @pytest.fixture
+    def profiled_app(self, client, monkeypatch):
+        """Application profiler with a token and one recorded profile."""
+        profiler = RequestProfiler(token=TOKEN, interval=0.002)
+        monkeypatch.setattr(main, "request_profiler", profiler)
+        response = TestClient(build_app(profiler)).get("/work", headers={"X-Profile-Token": TOKEN})
+        return client, response.headers["x-profile-id"]
+    
+    def test_list_and_download(self, profiled_app):
+        """Test listing and downloading profiles with the token."""
+        client, profile_id = profiled_app
+        headers = {"X-Profile-Token": TOKEN}
+        
+        listing = client.get("/api/admin/profiles", headers=headers)
+        assert listing.status_code == 200
+        assert listing.json()["profiles"][0]["id"] == profile_id
+        
+        download = client.get(f"/api/admin/profiles/{profile_id}", headers=headers)
+        assert download.status_code == 200
+        assert download.headers["content-type"].startswith("text/plain")
+        assert f"profile-{profile_id}.folded" in download.headers["content-disposition"]
+        assert WORKER_ROOT in download.text
+        
+        assert client.get("/api/admin/profiles/missing", headers=headers).status_code == 404
+    
+    def test_access_requires_token(self, profiled_app):
+        """Test profiles are not served without the right token."""
+        client, profile_id = profiled_app
+        
+        assert client.get("/api/admin/profiles").status_code == 403
+        assert client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Profile-Token": "x"}).status_code == 403
+    
+    def test_disabled_without_token(self, client):
+        """Test the endpoints do not exist when profiling is not configured."""
+        assert client.get("/api/admin/profiles", headers={"X-Profile-Token": ""}).status_code == 404
@@ -0,0 +1,88 @@
+"""Tests for cold start: lazy imports, deferred setup and the startup budget."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from backend.file_storage import FileStorageService
+from backend.storage_gc import StorageCollector
+from benchmarks.bench_startup import measure_startup
+
+# Import plus first byte of / in a fresh interpreter; about 0.3-0.5s on a
+# single shared CPU, so this only catches gross regressions. Smaller ones
+# are caught by the cold_start case of benchmarks/bench_suite.py.
+STARTUP_BUDGET_SECONDS = 2.0
+
+
+async def _chunks(data, chunk_size=4):
+    """Yield content in small chunks."""
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+@pytest.fixture(scope="module")
+def cold_start():
+    """Best of a few cold starts of the application."""
+    return min((measure_startup() for _ in range(3)), key=lambda run: run["first_byte"])
+
+
+class TestColdStart:
+    """Test importing the app and serving / in a fresh interpreter."""
+    
+    def test_first_byte_within_budget(self, cold_start):
+        """Test the front page is served and startup stays within budget."""
+        assert cold_start["status"] == 200
+        assert cold_start["import"] <= cold_start["first_byte"] < STARTUP_BUDGET_SECONDS
+    
+    def test_heavy_modules_are_not_imported(self, cold_start):
+        """Test NumPy and aiofiles are left for the requests needing them."""
+        assert cold_start["heavy_modules"] == []
+    
+    def test_import_creates_nothing(self, cold_start):
+        """Test importing the app does not touch the working directory."""
+        assert cold_start["created_at_import"] == []
+
+
+class TestDeferredSetup:
+    """Test setup moved out of import time still happens when needed."""
+    
+    def test_lifespan_creates_directories(self, tmp_path, monkeypatch):
+        """Test the upload and static directories are created on startup."""
+        monkeypatch.setattr(main.file_storage, "upload_dir", tmp_path / "uploads")
+        monkeypatch.setattr(main, "static_dir", tmp_path / "static")
+        
+        with TestClient(main.app):
+            assert (tmp_path / "uploads").is_dir()
+            assert (tmp_path / "static").is_dir()
+    
+    def test_storage_created_on_first_write(self, tmp_path):
+        """Test a service on a missing directory lists nothing and creates it on write."""
+        storage = FileStorageService(upload_dir=str(tmp_path / "data" / "uploads"))
+        
+        assert storage.list_files() == []
+        assert not (tmp_path / "data").exists()
+        
+        asyncio.run(storage.save_stream(_chunks(b"WEBVTT\n"), "a.vtt"))
+        
+        assert storage.list_files() == ["a.vtt"]
+    
+    def test_first_sweep_is_delayed(self, tmp_path, monkeypatch):
+        """Test background collection waits before its first sweep."""
+        collector = StorageCollector(FileStorageService(upload_dir=str(tmp_path)))
+        sweeps = []
+        
+        async def sweep():
+            sweeps.append(asyncio.get_running_loop().time())
+        monkeypatch.setattr(collector, "sweep", sweep)
+        
+        async def run_briefly(delay):
+            task = asyncio.create_task(collector.run(interval=60, delay=delay))
+            await asyncio.sleep(0.05)
+            task.cancel()
+        
+        asyncio.run(run_briefly(delay=30))
+        assert sweeps == []
+        asyncio.run(run_briefly(delay=0))
+        assert len(sweeps) == 1
@@ -0,0 +1,138 @@
+"""Tests for fingerprinted, precompressed frontend assets."""
+
+import gzip
+import re
+
+import brotli
+import pytest
+
+from backend.static_assets import StaticAssetService
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta property="og:image" content="https://example.com/static/logo.svg">
+    <link rel="stylesheet" href="/static/style.css">
+    <link rel="icon" href="/static/logo.svg">
+</head>
+<body>
+    <script src="/static/app.js"></script>
+    <a href="/static/robots.txt">robots</a>
+</body>
+</html>
+"""
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    """Frontend sources: an index page, a script, a stylesheet and an icon."""
+    source = tmp_path / "static"
+    source.mkdir()
+    (source / "index.html").write_text(INDEX_HTML)
+    (source / "app.js").write_text("console.log('hello');\n" * 200)
+    (source / "style.css").write_text("body { color: black; }\n" * 200)
+    (source / "logo.svg").write_text("<svg></svg>")
+    (source / "robots.txt").write_text("User-agent: *\n")
+    return source
+
+
+class TestStaticAssetService:
+    """Test StaticAssetService on its own."""
+    
+    def test_index_references_fingerprinted_assets(self, source_dir):
+        """Test src/href references are rewritten and other URLs are left alone."""
+        service = StaticAssetService(source_dir, source_dir / ".build")
+        
+        html = service.index().bodies["identity"].decode()
+        
+        script = re.search(r'src="/assets/(app\.[0-9a-f]{12}\.js)"', html)
+        assert script and service.get(script.group(1)) is not None
+        assert re.search(r'href="/assets/style\.[0-9a-f]{12}\.css"', html)
+        assert 'content="https://example.com/static/logo.svg"' in html
+        assert 'href="/static/robots.txt"' in html
+    
+    def test_compressed_variants(self, source_dir):
+        """Test gzip and brotli variants are written and decode to the original."""
+        service = StaticAssetService(source_dir, source_dir / ".build")
+        service.ensure_built()
+        
+        name = next(path.name for path in (source_dir / ".build").glob("app.*.js"))
+        asset = service.get(name)
+        
+        assert gzip.decompress(asset.bodies["gzip"]) == asset.bodies["identity"]
+        assert brotli.decompress(asset.bodies["br"]) == asset.bodies["identity"]
+        assert (source_dir / ".build" / (name + ".gz")).is_file()
+        assert (source_dir / ".build" / (name + ".br")).is_file()
+        assert asset.media_type.endswith("javascript; charset=utf-8")
+    
+    def test_prebuilt_assets_are_reused(self, source_dir):
+        """Test a build of the same sources is loaded, not rebuilt."""
+        StaticAssetService(source_dir, source_dir / ".build").ensure_built()
+        manifest = source_dir / ".build" / "manifest.json"
+        built_at = manifest.stat().st_mtime_ns
+        
+        StaticAssetService(source_dir, source_dir / ".build").ensure_built()
+        
+        assert manifest.stat().st_mtime_ns == built_at
+    
+    def test_changed_source_gets_new_fingerprint(self, source_dir):
+        """Test editing an asset renames it and drops the old build."""
+        service = StaticAssetService(source_dir, source_dir / ".build", watch=True)
+        old_html = service.index().bodies["identity"]
+        old_name = re.search(rb'/assets/(app\.[0-9a-f]{12}\.js)', old_html).group(1).decode()
+        
+        (source_dir / "app.js").write_text("console.log('changed');\n")
+        new_html = service.index().bodies["identity"]
+        
+        assert old_name.encode() not in new_html
+        assert service.get(old_name) is None
+        assert not (source_dir / ".build" / old_name).exists()
+    
+    def test_no_frontend(self, tmp_path):
+        """Test a missing index page is reported instead of built."""
+        service = StaticAssetService(tmp_path / "missing", tmp_path / "build")
+        
+        assert service.ensure_built() is False
+        assert service.index() is None
+        assert not (tmp_path / "build").exists()
+
+
+class TestAssetEndpoints:
+    """Test GET / and GET /assets/{name}."""
+    
+    def test_index_is_revalidated(self, client):
+        """Test the page is served with no-cache and answers If-None-Match with 304."""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["content-encoding"] == "gzip"
+        assert "/assets/" in response.text
+        
+        repeat = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+    
+    def test_assets_are_immutable(self, client):
+        """Test fingerprinted assets are cached forever in the negotiated coding."""
+        html = client.get("/", headers={"Accept-Encoding": "identity"}).text
+        url = re.search(r'src="(/assets/app\.[0-9a-f]{12}\.js)"', html).group(1)
+        
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+        compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+        
+        assert plain.status_code == 200
+        assert "immutable" in plain.headers["cache-control"]
+        assert "content-encoding" not in plain.headers
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["vary"] == "Accept-Encoding"
+        assert compressed.headers["etag"] != plain.headers["etag"]
+        assert compressed.content == plain.content
+    
+    def test_unknown_asset(self, client):
+        """Test names that are not current fingerprints return 404."""
+        assert client.get("/assets/app.000000000000.js").status_code == 404
+    
+    def test_unfingerprinted_files_still_served(self, client):
+        """Test /static keeps serving sources for URLs outside the page (e.g. og:image)."""
+        assert client.get("/static/favicon.svg").status_code == 200
@@ -0,0 +1,172 @@
+"""Tests for the S3-compatible storage backend against an in-process fake."""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from backend.file_storage import FileStorageService
+from backend.storage_backends import S3StorageBackend
+from main import file_storage
+from tests.fake_s3 import FakeS3Client
+
+BUCKET = "wsync-test"
+
+
+async def _chunks(data, chunk_size=7):
+    """Yield content in small chunks."""
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+@pytest.fixture
+def s3():
+    """In-process S3 stand-in shared by all instances in a test."""
+    return FakeS3Client()
+
+
+@pytest.fixture
+def s3_client(client, s3, monkeypatch):
+    """Test client whose storage keeps blobs and manifest in the fake bucket."""
+    monkeypatch.setattr(file_storage, "backend", S3StorageBackend(s3, BUCKET, prefix="app/", presign=False))
+    return client
+
+
+def upload_audio(client, sample_wav_file, name="talk.wav"):
+    """Upload a WAV file and return the response body."""
+    response = client.post("/api/upload/audio", files={"file": (name, sample_wav_file.read_bytes(), "audio/wav")})
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestS3StorageBackend:
+    """Test FileStorageService on top of S3StorageBackend."""
+    
+    def test_upload_stores_blob_and_manifest_in_bucket(self, s3_client, s3, sample_wav_file):
+        """Test uploaded content and the filename mapping land in the bucket."""
+        data = upload_audio(s3_client, sample_wav_file)
+        
+        sha256 = hashlib.sha256(sample_wav_file.read_bytes()).hexdigest()
+        assert data["sha256"] == sha256
+        assert s3.objects[(BUCKET, f"app/blobs/{sha256}")]["data"] == sample_wav_file.read_bytes()
+        assert b'"talk.wav"' in s3.objects[(BUCKET, "app/manifest.json")]["data"]
+    
+    def test_large_blob_uses_multipart_upload(self, tmp_path, s3):
+        """Test content above the threshold is uploaded in parts."""
+        backend = S3StorageBackend(s3, BUCKET, multipart_threshold=16, part_size=10)
+        storage = FileStorageService(upload_dir=str(tmp_path), backend=backend)
+        content = bytes(range(35))
+        
+        asyncio.run(storage.save_stream(_chunks(content), "big.wav"))
+        
+        sha256 = hashlib.sha256(content).hexdigest()
+        assert s3.objects[(BUCKET, f"blobs/{sha256}")]["data"] == content
+        assert [call[2] for call in s3.calls if call[0] == "upload_part"] == [1, 2, 3, 4]
+        assert ("complete_multipart_upload", f"blobs/{sha256}") in s3.calls
+    
+    def test_failed_multipart_upload_is_aborted(self, tmp_path, s3, monkeypatch):
+        """Test a failing part aborts the upload and stores nothing."""
+        backend = S3StorageBackend(s3, BUCKET, multipart_threshold=16, part_size=10)
+        storage = FileStorageService(upload_dir=str(tmp_path), backend=backend)
+        
+        def fail(**kwargs):
+            raise ConnectionError("connection reset")
+        monkeypatch.setattr(s3, "upload_part", fail)
+        
+        with pytest.raises(IOError):
+            asyncio.run(storage.save_stream(_chunks(bytes(35)), "big.wav"))
+        
+        assert any(call[0] == "abort_multipart_upload" for call in s3.calls)
+        assert storage.get_file_path("big.wav") is None
+        assert not s3.uploads
+    
+    def test_other_instance_sees_upload(self, tmp_path, s3):
+        """Test an instance with an empty cache downloads content stored by another."""
+        first = FileStorageService(upload_dir=str(tmp_path / "a"), backend=S3StorageBackend(s3, BUCKET))
+        second = FileStorageService(upload_dir=str(tmp_path / "b"), backend=S3StorageBackend(s3, BUCKET))
+        
+        asyncio.run(first.save_stream(_chunks(b"WEBVTT\n\nshared"), "shared.vtt"))
+        
+        path = second.get_file_path("shared.vtt")
+        assert path is not None
+        assert path.read_bytes() == b"WEBVTT\n\nshared"
+        assert path.parent == tmp_path / "b" / FileStorageService.BLOBS_DIRNAME
+    
+    def test_concurrent_manifest_updates_are_kept(self, tmp_path, s3):
+        """Test instances writing the manifest from stale copies do not lose names."""
+        first = FileStorageService(upload_dir=str(tmp_path / "a"), backend=S3StorageBackend(s3, BUCKET))
+        second = FileStorageService(upload_dir=str(tmp_path / "b"), backend=S3StorageBackend(s3, BUCKET))
+        first.list_files()
+        second.list_files()
+        
+        asyncio.run(first.save_stream(_chunks(b"one"), "one.vtt"))
+        asyncio.run(second.save_stream(_chunks(b"two"), "two.vtt"))
+        
+        third = FileStorageService(upload_dir=str(tmp_path / "c"), backend=S3StorageBackend(s3, BUCKET))
+        assert sorted(third.list_files()) == ["one.vtt", "two.vtt"]
+    
+    def test_delete_removes_object(self, s3_client, s3, sample_wav_file):
+        """Test deleting the last name deletes the blob from the bucket."""
+        data = upload_audio(s3_client, sample_wav_file)
+        
+        assert s3_client.delete("/api/files/talk.wav").status_code == 200
+        assert (BUCKET, f"app/blobs/{data['sha256']}") not in s3.objects
+        assert s3_client.get("/api/files/audio/talk.wav").status_code == 404
+    
+    def test_head_and_link_blob(self, s3_client, sample_wav_file):
+        """Test deduplication endpoints check the bucket."""
+        data = upload_audio(s3_client, sample_wav_file)
+        
+        head = s3_client.head(f"/api/blobs/{data['sha256']}")
+        assert head.status_code == 200
+        assert head.headers["content-length"] == str(len(sample_wav_file.read_bytes()))
+        
+        response = s3_client.post(f"/api/blobs/{data['sha256']}/link", json={"filename": "copy.wav"})
+        assert response.status_code == 200
+        assert response.json()["size"] == len(sample_wav_file.read_bytes())
+
+
+class TestRemoteAudioServing:
+    """Test audio streaming with a remote backend."""
+    
+    def test_presigned_redirect(self, s3_client, sample_wav_file):
+        """Test audio requests are redirected to a presigned URL."""
+        data = upload_audio(s3_client, sample_wav_file)
+        file_storage.backend.presign = True
+        
+        response = s3_client.get("/api/files/audio/talk.wav", follow_redirects=False)
+        
+        assert response.status_code == 307
+        location = response.headers["location"]
+        assert location.startswith(f"https://{BUCKET}.s3.example.com/app/blobs/{data['sha256']}?")
+        assert "ResponseContentType=audio%2Fwav" in location
+        assert "talk.wav" in location
+    
+    def test_ranged_passthrough_without_local_copy(self, s3_client, s3, sample_wav_file):
+        """Test ranges are read from the bucket when the content is not cached."""
+        data = upload_audio(s3_client, sample_wav_file)
+        file_storage.get_blob_path(data["sha256"]).unlink()
+        content = sample_wav_file.read_bytes()
+        
+        response = s3_client.get("/api/files/audio/talk.wav", headers={"Range": "bytes=4-11"})
+        
+        assert response.status_code == 206
+        assert response.content == content[4:12]
+        assert response.headers["content-range"] == f"bytes 4-11/{len(content)}"
+        assert response.headers["etag"] == f'"{data["sha256"]}"'
+        assert ("get_object", f"app/blobs/{data['sha256']}", "bytes=4-11") in s3.calls
+        assert not file_storage.get_blob_path(data["sha256"]).exists()
+        
+        not_modified = s3_client.get("/api/files/audio/talk.wav", headers={"If-None-Match": f'"{data["sha256"]}"'})
+        assert not_modified.status_code == 304
+    
+    def test_cached_copy_served_from_disk(self, s3_client, s3, sample_wav_file):
+        """Test a locally cached copy is served without touching the bucket."""
+        upload_audio(s3_client, sample_wav_file)
+        s3.calls.clear()
+        
+        response = s3_client.get("/api/files/audio/talk.wav")
+        
+        assert response.status_code == 200
+        assert response.content == sample_wav_file.read_bytes()
+        assert not any(call[0] == "get_object" and "blobs/" in call[1] for call in s3.calls)
@@ -0,0 +1,178 @@
+"""Tests for storage quota, TTL expiry and garbage collection."""
+
+import asyncio
+import os
+import time
+
+from backend.file_storage import FileStorageService
+from backend.storage_gc import StorageCollector
+from backend.upload_sessions import UploadSessionService
+from backend.waveform_peaks import WaveformPeakService
+
+
+async def _chunks(data):
+    """Yield content as a single chunk."""
+    yield data
+
+
+def store(storage, name, data, accessed_at=None):
+    """Store content under a name, optionally backdating its last access."""
+    asyncio.run(storage.save_stream(_chunks(data), name))
+    if accessed_at is not None:
+        storage._access_times[name] = accessed_at
+
+
+def backdate(path, seconds):
+    """Set a file's modification time into the past."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestAccessTimes:
+    """Test access time tracking in FileStorageService."""
+    
+    def test_get_file_path_records_access(self, tmp_path):
+        """Test lookups update the access time and get_access_time does not."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "a.vtt", b"WEBVTT\n", accessed_at=100.0)
+        assert storage.get_access_time("a.vtt") == 100.0
+        assert storage.get_access_time("a.vtt") == 100.0
+        
+        storage.get_file_path("a.vtt")
+        assert storage.get_access_time("a.vtt") > 100.0
+        assert storage.get_access_time("missing.vtt") is None
+    
+    def test_access_times_survive_restart(self, tmp_path):
+        """Test saved access times are loaded by a new service instance."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "a.vtt", b"WEBVTT\n", accessed_at=100.0)
+        storage.save_access_times()
+        
+        assert FileStorageService(upload_dir=str(tmp_path)).get_access_time("a.vtt") == 100.0
+    
+    def test_unknown_files_fall_back_to_mtime(self, tmp_path):
+        """Test legacy files without a recorded access use their modification time."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        legacy = tmp_path / "old.vtt"
+        legacy.write_bytes(b"WEBVTT\n")
+        backdate(legacy, 3600)
+        
+        assert storage.list_files() == ["old.vtt"]
+        assert abs(storage.get_access_time("old.vtt") - legacy.stat().st_mtime) < 1e-6
+
+
+class TestStorageCollector:
+    """Test sweeps of the upload directory."""
+    
+    def test_quota_evicts_least_recently_accessed(self, tmp_path):
+        """Test files are deleted oldest access first until under quota."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "old.wav", b"a" * 100, accessed_at=1000.0)
+        store(storage, "mid.wav", b"b" * 100, accessed_at=2000.0)
+        store(storage, "new.wav", b"c" * 100, accessed_at=3000.0)
+        
+        collector = StorageCollector(storage, max_total_bytes=250, batch_size=1)
+        report = asyncio.run(collector.sweep(now=4000.0))
+        
+        assert report.files_deleted == 1
+        assert report.bytes_reclaimed == 100
+        assert report.bytes_stored == 200
+        assert storage.get_file_path("old.wav") is None
+        assert storage.get_file_path("mid.wav") is not None
+        assert collector.total_bytes_reclaimed == 100
+    
+    def test_shared_content_counts_once(self, tmp_path):
+        """Test names sharing a blob only free space when the last one goes."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "copy1.wav", b"a" * 100, accessed_at=1000.0)
+        store(storage, "copy2.wav", b"a" * 100, accessed_at=1500.0)
+        store(storage, "other.wav", b"b" * 100, accessed_at=2000.0)
+        
+        collector = StorageCollector(storage, max_total_bytes=150)
+        report = asyncio.run(collector.sweep(now=3000.0))
+        
+        assert report.files_deleted == 2
+        assert report.bytes_reclaimed == 100
+        assert storage.list_files() == ["other.wav"]
+    
+    def test_ttl_expires_unused_files(self, tmp_path):
+        """Test files not accessed within the TTL are deleted."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "stale.vtt", b"WEBVTT\n", accessed_at=1000.0)
+        store(storage, "fresh.vtt", b"WEBVTT\n\n", accessed_at=9500.0)
+        
+        report = asyncio.run(StorageCollector(storage, file_ttl=3600).sweep(now=10000.0))
+        
+        assert report.files_deleted == 1
+        assert storage.list_files() == ["fresh.vtt"]
+    
+    def test_accessed_files_are_kept(self, tmp_path):
+        """Test a file accessed after it was picked is not evicted."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "a.wav", b"a" * 100, accessed_at=1000.0)
+        
+        assert storage.evict_file("a.wav", 900.0) is None
+        assert storage.get_file_path("a.wav") is not None
+        assert storage.evict_file("a.wav", 1000.0) is None
+        assert storage.evict_file("a.wav", time.time() + 1) == 100
+    
+    def test_abandoned_partial_files_removed(self, tmp_path):
+        """Test stale partial writes are removed and active ones kept."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        incoming_dir = tmp_path / FileStorageService.INCOMING_DIRNAME
+        incoming_dir.mkdir()
+        stale = incoming_dir / "stale.part"
+        stale.write_bytes(b"x" * 50)
+        backdate(stale, 7200)
+        active = incoming_dir / "active.part"
+        active.write_bytes(b"x" * 50)
+        
+        report = asyncio.run(StorageCollector(storage, incoming_ttl=3600).sweep())
+        
+        assert report.temp_files_deleted == 1
+        assert report.bytes_reclaimed == 50
+        assert not stale.exists()
+        assert active.exists()
+    
+    def test_sessions_and_orphan_sidecars_removed(self, tmp_path):
+        """Test expired upload sessions and peaks of deleted audio are cleaned up."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        sessions = UploadSessionService(storage, session_ttl=60)
+        peaks = WaveformPeakService(storage)
+        session = sessions.create_session("long.wav", 10, "audio")
+        
+        peaks.peaks_dir.mkdir()
+        orphan = peaks.peaks_dir / ("0" * 64 + WaveformPeakService.SIDECAR_SUFFIX)
+        orphan.write_bytes(b"p" * 30)
+        
+        collector = StorageCollector(storage, upload_sessions=sessions, waveform_peaks=peaks)
+        report = asyncio.run(collector.sweep(now=session["expires_at"] + 1))
+        
+        assert report.sessions_expired == 1
+        assert report.temp_files_deleted == 1
+        assert not orphan.exists()
+        assert report.bytes_reclaimed >= 30
+    
+    def test_nothing_to_do(self, tmp_path):
+        """Test a sweep without quota or TTL keeps everything."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "a.wav", b"a" * 100, accessed_at=1.0)
+        
+        report = asyncio.run(StorageCollector(storage).sweep())
+        
+        assert report.files_deleted == 0
+        assert report.bytes_reclaimed == 0
+        assert report.bytes_stored == 100
+    
+    def test_measure_usage(self, tmp_path):
+        """Test usage is measured on demand and kept for metrics."""
+        storage = FileStorageService(upload_dir=str(tmp_path))
+        store(storage, "a.wav", b"a" * 5000)
+        collector = StorageCollector(storage)
+        assert (collector.disk_files, collector.disk_bytes) == (0, 0)
+        
+        files, used = asyncio.run(collector.measure_usage())
+        
+        assert files >= 2  # blob and manifest
+        assert used >= 4096
+        assert (collector.disk_files, collector.disk_bytes) == (files, used)
@@ -0,0 +1,115 @@
+"""Tests for subtitle offset and drift estimation."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from backend.sync_estimator import SyncEstimator
+
+SAMPLE_RATE = 8000
+
+
+def make_cues(seconds, seed=2):
+    """Create speech-like cue intervals with random lengths and pauses."""
+    rng = np.random.default_rng(seed)
+    cues = []
+    t = 1.0
+    while t < seconds - 10:
+        duration = rng.uniform(1.0, 4.0)
+        cues.append((t, t + duration))
+        t += duration + rng.uniform(0.3, 3.0)
+    return cues
+
+
+def write_speech_wav(path, seconds, speech, seed=1):
+    """Write 16-bit mono noise: loud inside the speech intervals, quiet elsewhere."""
+    rng = np.random.default_rng(seed)
+    gain = np.full(int(seconds * SAMPLE_RATE), 0.002, dtype=np.float32)
+    for start, end in speech:
+        gain[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.3
+    samples = (rng.standard_normal(len(gain)).astype(np.float32) * gain * 32767).astype('<i2')
+    
+    fmt = struct.pack('<HHIIHH', 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+    data = samples.tobytes()
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(data)) + data
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def write_vtt(path, cues):
+    """Write cues as a VTT file."""
+    lines = ["WEBVTT", ""]
+    for i, (start, end) in enumerate(cues):
+        lines += [f"{start // 60:02.0f}:{start % 60:06.3f} --> {end // 60:02.0f}:{end % 60:06.3f}", f"line {i}", ""]
+    path.write_text("\n".join(lines))
+
+
+class TestSyncEstimator:
+    """Test the voice activity correlation."""
+    
+    @pytest.mark.parametrize("offset", [-7.3, 0.0, 2.5])
+    def test_constant_offset(self, tmp_path, offset):
+        """Test that a constant shift is recovered to within one frame."""
+        cues = make_cues(300)
+        audio = tmp_path / "speech.wav"
+        write_speech_wav(audio, 300, [(start + offset, end + offset) for start, end in cues])
+        
+        estimate = SyncEstimator(segment_seconds=60).estimate(audio, [c[0] for c in cues], [c[1] for c in cues])
+        assert estimate.offset == pytest.approx(offset, abs=0.03)
+        assert abs(estimate.drift) < 1e-4
+        assert estimate.confidence > 0.5
+    
+    def test_offset_and_drift(self, tmp_path):
+        """Test that a linear drift is recovered from the per-segment offsets."""
+        offset, drift = 1.5, 0.002
+        cues = make_cues(600)
+        audio = tmp_path / "speech.wav"
+        write_speech_wav(audio, 600, [(s + offset + drift * s, e + offset + drift * e) for s, e in cues])
+        
+        estimate = SyncEstimator(segment_seconds=60).estimate(audio, [c[0] for c in cues], [c[1] for c in cues])
+        assert estimate.offset == pytest.approx(offset, abs=0.05)
+        assert estimate.drift == pytest.approx(drift, abs=1e-4)
+        assert len(estimate.segments) >= 8
+    
+    def test_coverage_signal(self):
+        """Test that overlapping cues merge and times are clipped to the signal."""
+        estimator = SyncEstimator(frame_seconds=1.0)
+        coverage = estimator.cue_coverage([1.0, 2.0, 8.0], [3.0, 4.0, 20.0], 10)
+        assert (coverage > 0).tolist() == [False, True, True, True, False, False, False, False, True, True]
+    
+    def test_silent_audio(self, tmp_path):
+        """Test that audio without speech is reported as unusable."""
+        audio = tmp_path / "silence.wav"
+        write_speech_wav(audio, 30, [])
+        with pytest.raises(ValueError):
+            SyncEstimator().estimate(audio, [1.0], [2.0])
+
+
+class TestSyncEndpoint:
+    """Test the /api/sync/estimate API."""
+    
+    def test_estimate(self, client, tmp_path):
+        """Test estimating the offset of uploaded files."""
+        cues = make_cues(120)
+        audio = tmp_path / "speech.wav"
+        write_speech_wav(audio, 120, [(start + 3.0, end + 3.0) for start, end in cues])
+        subtitle = tmp_path / "speech.vtt"
+        write_vtt(subtitle, cues)
+        with open(audio, "rb") as f:
+            assert client.post("/api/upload/audio", files={"file": ("speech.wav", f, "audio/wav")}).status_code == 200
+        with open(subtitle, "rb") as f:
+            assert client.post("/api/upload/subtitle", files={"file": ("speech.vtt", f, "text/vtt")}).status_code == 200
+        
+        response = client.get("/api/sync/estimate", params={"audio": "speech.wav", "subtitle": "speech.vtt"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["offset"] == pytest.approx(3.0, abs=0.05)
+        assert set(data) == {"offset", "drift", "drift_ppm", "confidence", "segments"}
+        
+        response = client.get("/api/sync/estimate", params={"audio": "speech.wav", "subtitle": "speech.vtt", "max_offset": 1})
+        assert response.json()["offset"] != pytest.approx(3.0, abs=0.05)
+    
+    def test_missing_files(self, client):
+        """Test unknown audio or subtitle names."""
+        response = client.get("/api/sync/estimate", params={"audio": "missing.wav", "subtitle": "missing.vtt"})
+        assert response.status_code == 404
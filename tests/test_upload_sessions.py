@@ -0,0 +1,199 @@
+"""Tests for resumable upload sessions."""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from backend.file_storage import FileStorageService
+from backend.upload_sessions import UploadSessionError, UploadSessionService
+
+
+def create_session(client, size, filename="long.wav", kind="audio"):
+    """Start a resumable upload and return its status."""
+    response = client.post("/api/uploads", json={"filename": filename, "size": size, "kind": kind})
+    assert response.status_code == 201
+    assert response.headers["location"] == f"/api/uploads/{response.json()['id']}"
+    return response.json()
+
+
+class TestResumableUploads:
+    """Test the tus-style resumable upload protocol."""
+    
+    def test_sequential_upload(self, client, sample_wav_file):
+        """Test PATCH chunks at the current offset, then finalize."""
+        data = sample_wav_file.read_bytes()
+        session = create_session(client, len(data))
+        
+        response = client.patch(
+            f"/api/uploads/{session['id']}",
+            content=data[:20],
+            headers={"Upload-Offset": "0", "Content-Type": "application/offset+octet-stream"}
+        )
+        assert response.status_code == 204
+        assert response.headers["upload-offset"] == "20"
+        
+        head = client.head(f"/api/uploads/{session['id']}")
+        assert head.headers["upload-offset"] == "20"
+        assert head.headers["upload-length"] == str(len(data))
+        
+        client.patch(f"/api/uploads/{session['id']}", content=data[20:], headers={"Upload-Offset": "20"})
+        
+        response = client.post(f"/api/uploads/{session['id']}/complete")
+        assert response.status_code == 200
+        assert response.json()["sha256"] == hashlib.sha256(data).hexdigest()
+        assert client.get("/api/files/audio/long.wav").content == data
+        assert client.get(f"/api/uploads/{session['id']}").status_code == 404
+    
+    def test_patch_at_wrong_offset_conflicts(self, client):
+        """Test that a PATCH not at the current offset is rejected."""
+        session = create_session(client, 100)
+        
+        response = client.patch(f"/api/uploads/{session['id']}", content=b"x" * 10, headers={"Upload-Offset": "50"})
+        assert response.status_code == 409
+    
+    def test_parallel_out_of_order_chunks(self, client):
+        """Test PUT chunks arriving in any order."""
+        data = bytes(range(256)) * 4
+        session = create_session(client, len(data))
+        
+        for offset in (768, 0, 512, 256):
+            response = client.put(
+                f"/api/uploads/{session['id']}",
+                params={"offset": offset},
+                content=data[offset:offset + 256]
+            )
+            assert response.status_code == 200
+        
+        assert response.json()["ranges"] == [[0, 1024]]
+        assert client.post(f"/api/uploads/{session['id']}/complete").status_code == 200
+        assert client.get("/api/files/audio/long.wav").content == data
+    
+    def test_incomplete_session_cannot_finish(self, client):
+        """Test that finalizing with a gap in the data fails."""
+        session = create_session(client, 100)
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 50}, content=b"x" * 50)
+        
+        status = client.get(f"/api/uploads/{session['id']}").json()
+        assert status["offset"] == 0
+        assert status["ranges"] == [[50, 100]]
+        assert client.post(f"/api/uploads/{session['id']}/complete").status_code == 409
+    
+    def test_chunk_past_declared_size(self, client):
+        """Test that data beyond the declared size is rejected."""
+        session = create_session(client, 10)
+        response = client.put(f"/api/uploads/{session['id']}", params={"offset": 5}, content=b"x" * 10)
+        assert response.status_code == 413
+    
+    def test_rejects_invalid_sessions(self, client):
+        """Test validation when starting a session."""
+        assert client.post("/api/uploads", json={"filename": "a.mp3", "size": 10}).status_code == 400
+        assert client.post("/api/uploads", json={"filename": "a.wav", "size": 0}).status_code == 400
+        assert client.post("/api/uploads", json={"filename": "a.wav", "size": 3 * 1024**3}).status_code == 413
+        assert client.get(f"/api/uploads/{'0' * 32}").status_code == 404
+    
+    def test_abort_session(self, client):
+        """Test discarding a session."""
+        session = create_session(client, 10)
+        assert client.delete(f"/api/uploads/{session['id']}").status_code == 204
+        assert client.head(f"/api/uploads/{session['id']}").status_code == 404
+    
+    def test_malformed_subtitle_is_rejected(self, client):
+        """Test a resumable subtitle upload is validated like the subtitle endpoint."""
+        data = b"NOT A VTT FILE\n\n00:00 --> nonsense\n"
+        session = create_session(client, len(data), filename="bad.vtt", kind="subtitle")
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 0}, content=data)
+        
+        response = client.post(f"/api/uploads/{session['id']}/complete")
+        
+        assert response.status_code == 400
+        assert client.get(f"/api/uploads/{session['id']}").status_code == 404
+        assert client.get("/api/files/subtitle/bad.vtt").status_code == 404
+    
+    def test_subtitle_without_cues_is_rejected(self, client):
+        """Test a valid but empty WebVTT file is not stored."""
+        data = b"WEBVTT\n"
+        session = create_session(client, len(data), filename="empty.vtt", kind="subtitle")
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 0}, content=data)
+        
+        assert client.post(f"/api/uploads/{session['id']}/complete").status_code == 400
+    
+    def test_subtitle_cues_are_recorded(self, client, sample_vtt_file):
+        """Test a completed subtitle is listed with its cue count."""
+        data = sample_vtt_file.read_bytes()
+        session = create_session(client, len(data), filename="good.vtt", kind="subtitle")
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 0}, content=data)
+        
+        assert client.post(f"/api/uploads/{session['id']}/complete").status_code == 200
+        assert client.get("/api/files", params={"kind": "subtitle"}).json()["files"][0]["cue_count"] == 3
+
+
+class TestSessionPersistence:
+    """Test sessions across restarts and expiry."""
+    
+    def test_session_survives_restart(self, client, test_upload_dir):
+        """Test that a new service instance can continue an existing session."""
+        from main import file_storage
+        
+        session = create_session(client, 10)
+        client.put(f"/api/uploads/{session['id']}", params={"offset": 0}, content=b"12345")
+        
+        restarted = UploadSessionService(file_storage)
+        assert restarted.get_session(session["id"])["offset"] == 5
+    
+    def test_abandoned_sessions_expire(self, client, test_upload_dir):
+        """Test that sessions idle longer than the TTL are removed."""
+        from main import file_storage
+        
+        session = create_session(client, 10)
+        updated_at = session["expires_at"] - UploadSessionService.DEFAULT_SESSION_TTL
+        service = UploadSessionService(file_storage, session_ttl=60)
+        
+        assert service.expire_sessions(now=updated_at + 30) == 0
+        assert service.expire_sessions(now=updated_at + 61) == 1
+        assert not (test_upload_dir / UploadSessionService.SESSIONS_DIRNAME / session["id"]).exists()
+
+
+async def _body(data):
+    """Chunk body yielding data once."""
+    yield data
+
+
+class TestConcurrentCompletion:
+    """Test completing a session excludes other operations on it."""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Service with a fully uploaded 10-byte session."""
+        service = UploadSessionService(FileStorageService(upload_dir=str(tmp_path)))
+        session = service.create_session("a.wav", 10, "audio")
+        asyncio.run(service.write_chunk(session["id"], 0, _body(b"x" * 10)))
+        return service, session["id"]
+    
+    def test_second_complete_conflicts(self, service):
+        """Test only one of two concurrent completes stores the file."""
+        service, session_id = service
+        
+        async def complete_twice():
+            return await asyncio.gather(
+                service.complete_session(session_id), service.complete_session(session_id),
+                return_exceptions=True
+            )
+        first, second = asyncio.run(complete_twice())
+        
+        assert first["sha256"] == hashlib.sha256(b"x" * 10).hexdigest()
+        assert isinstance(second, UploadSessionError) and second.status_code == 409
+    
+    def test_chunk_during_complete_conflicts(self, service):
+        """Test a chunk arriving while the session is completed gets a 409."""
+        service, session_id = service
+        
+        async def complete_and_write():
+            return await asyncio.gather(
+                service.complete_session(session_id), service.write_chunk(session_id, 0, _body(b"y")),
+                return_exceptions=True
+            )
+        completed, written = asyncio.run(complete_and_write())
+        
+        assert completed["size"] == 10
+        assert isinstance(written, UploadSessionError) and written.status_code == 409
@@ -0,0 +1,299 @@
+"""Unit tests for the VTT parser service."""
+
+import os
+
+import pytest
+
+from backend.vtt_parser import VTTParserService, VTTStreamParser
+
+
+VTT_CONTENT = """WEBVTT
+
+00:00:00.000 --> 00:00:02.000
+First subtitle line
+
+00:00:02.000 --> 00:00:05.000
+Second subtitle line
+"""
+
+
+@pytest.fixture
+def parser():
+    """Create a parser with an empty cache."""
+    return VTTParserService()
+
+
+class TestParsedCueCache:
+    """Test the parsed-cue LRU cache."""
+    
+    def test_repeated_parse_hits_cache(self, parser, sample_vtt_file):
+        """Test that parsing an unchanged file twice reuses the cached cues."""
+        first = parser.parse_vtt_file(str(sample_vtt_file))
+        second = parser.parse_vtt_file(str(sample_vtt_file))
+        
+        assert second is first
+        stats = parser.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+    
+    def test_modified_file_is_reparsed(self, parser, sample_vtt_file):
+        """Test that a change in mtime or size invalidates the entry."""
+        first = parser.parse_vtt_file(str(sample_vtt_file))
+        
+        sample_vtt_file.write_text(VTT_CONTENT)
+        stat = sample_vtt_file.stat()
+        os.utime(sample_vtt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        second = parser.parse_vtt_file(str(sample_vtt_file))
+        assert len(first) == 3
+        assert len(second) == 2
+        assert parser.cache_stats()["misses"] == 2
+    
+    def test_entry_limit_evicts_least_recently_used(self, tmp_path):
+        """Test that the entry limit evicts the least recently used file."""
+        parser = VTTParserService(cache_max_entries=2)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"sub{i}.vtt"
+            path.write_text(VTT_CONTENT)
+            paths.append(str(path))
+        
+        parser.parse_vtt_file(paths[0])
+        parser.parse_vtt_file(paths[1])
+        parser.parse_vtt_file(paths[0])  # paths[1] is now least recently used
+        parser.parse_vtt_file(paths[2])
+        
+        assert parser.cache_stats()["entries"] == 2
+        parser.parse_vtt_file(paths[0])
+        assert parser.cache_stats()["hits"] == 2
+        parser.parse_vtt_file(paths[1])
+        assert parser.cache_stats()["misses"] == 4
+    
+    def test_byte_limit_skips_oversized_entries(self, sample_vtt_file):
+        """Test that results larger than the byte limit are not cached."""
+        parser = VTTParserService(cache_max_bytes=10)
+        parser.parse_vtt_file(str(sample_vtt_file))
+        
+        stats = parser.cache_stats()
+        assert stats["entries"] == 0
+        assert stats["bytes"] == 0
+    
+    def test_cue_index_is_built_once(self, parser, sample_vtt_file):
+        """Test that the cue index is cached alongside the parsed cues."""
+        first = parser.get_cue_index(str(sample_vtt_file))
+        second = parser.get_cue_index(str(sample_vtt_file))
+        
+        assert second is first
+        assert len(first) == 3
+    
+    def test_ndjson_streams_with_and_without_cache(self, sample_vtt_file):
+        """Test that NDJSON is the same whether served from the cache or the file."""
+        cached = VTTParserService()
+        expected = b"".join(cached.parse_vtt_file(str(sample_vtt_file)).iter_ndjson())
+        assert b"".join(cached.iter_ndjson(str(sample_vtt_file))) == expected
+        assert cached.cache_stats()["hits"] == 1
+        
+        uncached = VTTParserService(cache_max_entries=0)
+        chunks = list(uncached.iter_ndjson(str(sample_vtt_file), batch_size=2))
+        assert len(chunks) == 2
+        assert b"".join(chunks) == expected
+        assert uncached.cache_stats()["entries"] == 0
+    
+    def test_ndjson_stream_reports_malformed_file(self, tmp_path):
+        """Test that a parse error while streaming raises ValueError."""
+        vtt_path = tmp_path / "bad.vtt"
+        vtt_path.write_text("WEBVTT\n\n00:00.000 --> 00:01.000\nOk\n\nidentifier only\n")
+        with pytest.raises(ValueError):
+            list(VTTParserService(cache_max_entries=0).iter_ndjson(str(vtt_path), batch_size=1))
+    
+    def test_delete_invalidates_cache(self, client, sample_vtt_file):
+        """Test that deleting a subtitle through the API drops its cache entry."""
+        from main import vtt_parser
+        
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post(
+                "/api/upload/subtitle",
+                files={"file": ("cached.vtt", f, "text/vtt")}
+            )
+        assert response.status_code == 200
+        
+        entries_before = vtt_parser.cache_stats()["entries"]
+        client.delete("/api/files/cached.vtt")
+        assert vtt_parser.cache_stats()["entries"] == entries_before - 1
+
+
+COMPLEX_VTT_CONTENT = """WEBVTT - Lecture transcript
+Kind: captions
+
+STYLE
+::cue { color: yellow; }
+
+REGION
+id:speaker width:40%
+
+NOTE This is a comment
+spanning two lines
+
+intro
+00:00:00.000 --> 00:00:01.500 align:start position:10%
+<v Speaker>Hello</v> <b>world</b>
+
+00:01.500 --> 00:03.250
+Short timestamp form
+with a second line
+
+01:00:00.123 --> 01:00:02.456 line:0
+Hour mark
+00:00:04.000 --> 00:00:05.000
+Second cue in the same block
+"""
+
+
+class TestStreamingParser:
+    """Test the built-in single-pass WebVTT parser."""
+    
+    def test_parses_blocks_settings_and_tags(self, parser):
+        """Test header, NOTE/STYLE/REGION blocks, settings and cue tags."""
+        cues = parser.parse_vtt_content(COMPLEX_VTT_CONTENT)
+        
+        assert [(c.start_time, c.end_time) for c in cues] == [
+            (0.0, 1.5), (1.5, 3.25), (3600.123, 3602.456), (4.0, 5.0)
+        ]
+        assert cues[0].text == "Hello world"
+        assert cues[1].text == "Short timestamp form\nwith a second line"
+        assert cues[3].text == "Second cue in the same block"
+    
+    def test_matches_webvtt_py(self, parser, tmp_path):
+        """Test that results match the webvtt-py based implementation."""
+        webvtt = pytest.importorskip("webvtt")
+        
+        vtt_path = tmp_path / "complex.vtt"
+        vtt_path.write_text(COMPLEX_VTT_CONTENT.replace("REGION\nid:speaker width:40%\n\n", ""))
+        
+        expected = [
+            (
+                VTTParserService.time_to_seconds(caption.start),
+                VTTParserService.time_to_seconds(caption.end),
+                caption.text
+            )
+            for caption in webvtt.read(str(vtt_path))
+        ]
+        actual = [(c.start_time, c.end_time, c.text) for c in parser.parse_vtt_file(str(vtt_path))]
+        
+        assert actual == expected
+    
+    def test_reads_utf8_bom_and_crlf(self, parser, tmp_path):
+        """Test files saved with a UTF-8 BOM and Windows line endings."""
+        vtt_path = tmp_path / "bom.vtt"
+        vtt_path.write_bytes(b"\xef\xbb\xbfWEBVTT\r\n\r\n00:00.000 --> 00:01.000\r\nHi\r\n")
+        
+        cues = parser.parse_vtt_file(str(vtt_path))
+        assert [(c.start_time, c.end_time, c.text) for c in cues] == [(0.0, 1.0, "Hi")]
+    
+    @pytest.mark.parametrize("content", [
+        "",
+        "Not a WEBVTT file\n",
+        "WEBVTT\n\n00:00.000 --> 00:0x.000\nBad timestamp\n",
+        "WEBVTT\n\nidentifier only\n",
+        "WEBVTT\n\nno timings\nhere\n",
+        "WEBVTT\n\n00:00.000 --> 00:01.000\nText\n\nSTYLE\n::cue { color: red; }\n",
+    ])
+    def test_malformed_content_raises_value_error(self, parser, content):
+        """Test that malformed content raises ValueError."""
+        with pytest.raises(ValueError):
+            parser.parse_vtt_content(content)
+
+
+def feed_in_chunks(data: bytes, chunk_size: int):
+    """Parse bytes with VTTStreamParser, fed chunk_size bytes at a time."""
+    stream_parser = VTTStreamParser()
+    for i in range(0, len(data), chunk_size):
+        stream_parser.feed(data[i:i + chunk_size])
+    return stream_parser.close()
+
+
+class TestVTTStreamParser:
+    """Test the push-style parser used for uploads."""
+    
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 1 << 20])
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_matches_file_parser(self, parser, tmp_path, chunk_size, newline):
+        """Test that any chunking gives the same cues as parsing the file."""
+        content = COMPLEX_VTT_CONTENT.replace("Hour mark", "시간 표시").replace("\n", newline)
+        data = b"\xef\xbb\xbf" + content.encode("utf-8")
+        vtt_path = tmp_path / "complex.vtt"
+        vtt_path.write_bytes(data)
+        
+        expected = [(c.start_time, c.end_time, c.text) for c in parser.parse_vtt_file(str(vtt_path))]
+        actual = [(c.start_time, c.end_time, c.text) for c in feed_in_chunks(data, chunk_size)]
+        assert actual == expected
+    
+    @pytest.mark.parametrize("content", [
+        "",
+        "Not a WEBVTT file\n",
+        "WEBVTT\n\n00:00.000 --> 00:0x.000\nBad timestamp\n",
+        "WEBVTT\n\nidentifier only\n",
+        "WEBVTT\n\nno timings\nhere\n",
+        "WEBVTT\n\n00:00.000 --> 00:01.000\nText\n\nSTYLE\n::cue { color: red; }\n",
+    ])
+    def test_malformed_content_raises_value_error(self, content):
+        """Test that the same inputs rejected by the file parser are rejected."""
+        with pytest.raises(ValueError):
+            feed_in_chunks(content.encode("utf-8"), 3)
+    
+    def test_rejects_during_feed(self):
+        """Test that errors surface from the chunk that completes the bad block."""
+        stream_parser = VTTStreamParser()
+        with pytest.raises(ValueError):
+            stream_parser.feed(b"NOT VTT")
+        
+        stream_parser = VTTStreamParser()
+        stream_parser.feed(b"WEBVTT\n\n00:00.000 --> 00:01.000\nOk\n\n")
+        assert stream_parser.cue_count == 1
+        with pytest.raises(ValueError):
+            stream_parser.feed(b"00:0x.000 --> 00:02.000\nBad\n\n")
+    
+    def test_invalid_utf8_raises_value_error(self):
+        """Test that undecodable bytes are rejected."""
+        with pytest.raises(ValueError):
+            feed_in_chunks(b"WEBVTT\n\n00:00.000 --> 00:01.000\n\xff\xfe\n", 4)
+
+
+class TestSubtitleUploadStreaming:
+    """Test that subtitle uploads are parsed while they stream to disk."""
+    
+    def test_upload_populates_cache(self, client, sample_vtt_file):
+        """Test that reading an uploaded subtitle reuses the cues from the upload."""
+        from main import vtt_parser
+        vtt_parser.clear_cache()
+        
+        with open(sample_vtt_file, 'rb') as f:
+            response = client.post("/api/upload/subtitle", files={"file": ("streamed.vtt", f, "text/vtt")})
+        assert response.status_code == 200
+        
+        response = client.get("/api/files/subtitle/streamed.vtt")
+        assert response.status_code == 200
+        assert response.json()["cues"] == [
+            {"start": 0.0, "end": 2.0, "text": "First subtitle line"},
+            {"start": 2.0, "end": 5.0, "text": "Second subtitle line"},
+            {"start": 5.0, "end": 8.0, "text": "Third subtitle line"},
+        ]
+        stats = vtt_parser.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 0
+    
+    @pytest.mark.parametrize("content", [
+        b"Not a WEBVTT file\n",
+        b"WEBVTT\n\n",
+        b"WEBVTT\n\n00:00.000 --> 00:01.000\nOk\n\nidentifier only\n",
+    ])
+    def test_rejected_upload_is_never_stored(self, client, test_upload_dir, content):
+        """Test that malformed or empty subtitles leave nothing behind."""
+        from main import file_storage
+        
+        response = client.post("/api/upload/subtitle", files={"file": ("bad.vtt", content, "text/vtt")})
+        assert response.status_code == 400
+        assert file_storage.get_file_path("bad.vtt") is None
+        assert not list((test_upload_dir / ".incoming").iterdir())
+        assert not (test_upload_dir / ".blobs").exists() or not list((test_upload_dir / ".blobs").iterdir())
@@ -0,0 +1,101 @@
+"""Tests for the WAV header parser."""
+
+import io
+import struct
+
+import pytest
+
+from backend.wav_header import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, read_wav_info
+
+
+def chunk(chunk_id: bytes, body: bytes) -> bytes:
+    """Build a RIFF chunk, padded to an even length."""
+    return chunk_id + struct.pack('<I', len(body)) + body + (b'\x00' if len(body) % 2 else b'')
+
+
+def fmt_body(format_tag=1, channels=2, sample_rate=48000, bit_depth=16) -> bytes:
+    """Build a plain fmt chunk body."""
+    block_align = channels * bit_depth // 8
+    return struct.pack('<HHIIHH', format_tag, channels, sample_rate, sample_rate * block_align, block_align, bit_depth)
+
+
+def riff(*chunks: bytes) -> bytes:
+    """Wrap chunks in a RIFF/WAVE header."""
+    body = b'WAVE' + b''.join(chunks)
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+class TestReadWavInfo:
+    """Test header-only WAV parsing."""
+    
+    def test_pcm(self):
+        """Test a PCM file with an extra chunk before fmt."""
+        data = b'\x00' * (48000 * 4 * 2)
+        info = read_wav_info(io.BytesIO(riff(chunk(b'LIST', b'INFOx'), chunk(b'fmt ', fmt_body()), chunk(b'data', data))))
+        assert (info.format_tag, info.channels, info.sample_rate, info.bit_depth) == (WAVE_FORMAT_PCM, 2, 48000, 16)
+        assert info.data_size == len(data)
+        assert info.duration == 2.0
+    
+    def test_extensible(self):
+        """Test that WAVE_FORMAT_EXTENSIBLE reports the sub-format."""
+        guid = struct.pack('<H', WAVE_FORMAT_IEEE_FLOAT) + b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+        body = fmt_body(0xFFFE, 1, 8000, 32) + struct.pack('<HHI', 22, 32, 4) + guid
+        info = read_wav_info(io.BytesIO(riff(chunk(b'fmt ', body), chunk(b'data', b'\x00' * 32000))))
+        assert info.format_tag == WAVE_FORMAT_IEEE_FLOAT
+        assert info.bit_depth == 32
+        assert info.duration == 1.0
+    
+    def test_rf64(self):
+        """Test that RF64 sizes come from the ds64 chunk."""
+        data = b'\x00' * 4000
+        ds64 = struct.pack('<QQQI', 0, len(data), 1000, 0)
+        body = (
+            b'WAVE' + chunk(b'ds64', ds64) + chunk(b'fmt ', fmt_body(1, 1, 2000, 16))
+            + b'data' + struct.pack('<I', 0xFFFFFFFF) + data
+        )
+        info = read_wav_info(io.BytesIO(b'RF64' + struct.pack('<I', 0xFFFFFFFF) + body))
+        assert info.data_size == len(data)
+        assert info.duration == 1.0
+    
+    def test_truncated_data_is_clamped(self):
+        """Test that a data size past the end of the file is clamped."""
+        header = riff(chunk(b'fmt ', fmt_body(1, 1, 1000, 8)))
+        info = read_wav_info(io.BytesIO(header + b'data' + struct.pack('<I', 10 ** 6) + b'\x00' * 500))
+        assert info.data_size == 500
+        assert info.duration == 0.5
+    
+    @pytest.mark.parametrize("content", [
+        b'',
+        b'RIFF\x00\x00\x00\x00AVI ',
+        riff(chunk(b'data', b'\x00' * 4)),
+        riff(chunk(b'fmt ', fmt_body())),
+    ])
+    def test_invalid(self, content):
+        """Test that non-WAV or incomplete headers raise ValueError."""
+        with pytest.raises(ValueError):
+            read_wav_info(io.BytesIO(content))
+
+
+class TestAudioUploadMetadata:
+    """Test that audio uploads report header-derived metadata."""
+    
+    def test_upload_reports_format(self, client, tmp_path):
+        """Test duration, sample rate, channels and bit depth in the response."""
+        wav_path = tmp_path / "tone.wav"
+        wav_path.write_bytes(riff(chunk(b'fmt ', fmt_body(1, 2, 44100, 16)), chunk(b'data', b'\x00' * 44100 * 4 * 3)))
+        with open(wav_path, "rb") as f:
+            response = client.post("/api/upload/audio", files={"file": ("tone.wav", f, "audio/wav")})
+        
+        data = response.json()
+        assert data["duration"] == 3.0
+        assert (data["sample_rate"], data["channels"], data["bit_depth"]) == (44100, 2, 16)
+    
+    def test_unreadable_header_still_uploads(self, client, tmp_path):
+        """Test that a file with a broken header is stored without metadata."""
+        wav_path = tmp_path / "broken.wav"
+        wav_path.write_bytes(b"not really a wav file")
+        with open(wav_path, "rb") as f:
+            response = client.post("/api/upload/audio", files={"file": ("broken.wav", f, "audio/wav")})
+        
+        assert response.status_code == 200
+        assert response.json()["duration"] is None
@@ -0,0 +1,136 @@
+"""Tests for waveform peak pyramids."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from backend.file_storage import FileStorageService
+from backend.waveform_peaks import WaveformPeakService
+
+
+def write_wav(path, samples, sample_rate=8000, format_tag=1, bit_depth=16):
+    """Write a WAV file from a (frames, channels) array of encoded samples."""
+    frames, channels = samples.shape
+    if bit_depth == 24:
+        raw = samples.astype('<i4').view(np.uint8).reshape(frames, channels, 4)[:, :, :3].tobytes()
+    else:
+        raw = samples.tobytes()
+    block_align = channels * bit_depth // 8
+    fmt = struct.pack('<HHIIHH', format_tag, channels, sample_rate, sample_rate * block_align, block_align, bit_depth)
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'data' + struct.pack('<I', len(raw)) + raw
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def reference_peaks(signal, samples_per_peak):
+    """Straightforward min/max per peak of a channel-mixed int16 signal."""
+    low = signal.min(axis=1)
+    high = signal.max(axis=1)
+    return np.array([
+        (low[i:i + samples_per_peak].min(), high[i:i + samples_per_peak].max())
+        for i in range(0, len(low), samples_per_peak)
+    ], dtype=np.int16)
+
+
+@pytest.fixture
+def peak_service(test_upload_dir):
+    """Peak service with a small pyramid geometry."""
+    return WaveformPeakService(FileStorageService(upload_dir=str(test_upload_dir)), base_samples_per_peak=16, min_peaks=8)
+
+
+class TestWaveformPeakService:
+    """Test peak computation and the sidecar format."""
+    
+    def test_pcm16_pyramid(self, peak_service, tmp_path):
+        """Test level 0 against a reference and coarser levels against reductions."""
+        rng = np.random.default_rng(0)
+        samples = rng.integers(-32768, 32767, size=(1000, 2), dtype=np.int16)
+        audio = tmp_path / "a.wav"
+        write_wav(audio, samples)
+        
+        sample_rate, levels = peak_service.ensure_peaks(audio)
+        assert sample_rate == 8000
+        assert [level.samples_per_peak for level in levels] == [16, 64, 256]
+        assert [level.count for level in levels] == [63, 16, 4]
+        
+        level0 = peak_service.read_peaks(audio, levels[0], 0, levels[0].count)
+        np.testing.assert_array_equal(level0, reference_peaks(samples, 16))
+        level1 = peak_service.read_peaks(audio, levels[1], 0, levels[1].count)
+        np.testing.assert_array_equal(level1, reference_peaks(samples, 64))
+        
+        np.testing.assert_array_equal(peak_service.read_peaks(audio, levels[0], 10, 12), level0[10:12])
+    
+    @pytest.mark.parametrize("format_tag,bit_depth,encode", [
+        (1, 8, lambda s: ((s.astype(np.int32) >> 8) + 128).astype(np.uint8)),
+        (1, 24, lambda s: s.astype(np.int32) << 8),
+        (1, 32, lambda s: s.astype('<i4') << 16),
+        (3, 32, lambda s: (s / 32768).astype('<f4')),
+    ])
+    def test_sample_formats(self, peak_service, tmp_path, format_tag, bit_depth, encode):
+        """Test that other sample formats normalize to the same int16 peaks."""
+        samples = (np.arange(-32768, 32768, 256, dtype=np.int32).reshape(-1, 1)).astype(np.int16)
+        audio = tmp_path / "f.wav"
+        write_wav(audio, encode(samples), format_tag=format_tag, bit_depth=bit_depth)
+        
+        _, levels = peak_service.ensure_peaks(audio)
+        peaks = peak_service.read_peaks(audio, levels[0], 0, levels[0].count).astype(np.int32)
+        expected = reference_peaks(samples, 16).astype(np.int32)
+        # 8-bit keeps only the top byte; float rounds toward zero
+        tolerance = 256 if bit_depth == 8 else 1
+        assert np.abs(peaks - expected).max() <= tolerance
+    
+    def test_sidecar_reused_until_invalidated(self, peak_service, tmp_path):
+        """Test that the sidecar is written once and removed by invalidate."""
+        audio = tmp_path / "a.wav"
+        write_wav(audio, np.zeros((100, 1), dtype=np.int16))
+        peak_service.ensure_peaks(audio)
+        sidecar = peak_service.sidecar_path(audio)
+        mtime = sidecar.stat().st_mtime_ns
+        
+        peak_service.ensure_peaks(audio)
+        assert sidecar.stat().st_mtime_ns == mtime
+        
+        peak_service.invalidate(audio)
+        assert not sidecar.exists()
+
+
+class TestPeaksEndpoint:
+    """Test the peaks API."""
+    
+    def test_range_query(self, client, tmp_path):
+        """Test that from/to select the covering peaks of a level."""
+        samples = np.tile(np.array([[1000], [-1000]], dtype=np.int16), (8000, 1))
+        audio = tmp_path / "tone.wav"
+        write_wav(audio, samples)
+        with open(audio, "rb") as f:
+            client.post("/api/upload/audio", files={"file": ("tone.wav", f, "audio/wav")})
+        
+        response = client.get("/api/files/audio/tone.wav/peaks", params={"level": 0, "from": 0.5, "to": 1.0})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sample_rate"] == 8000
+        assert data["samples_per_peak"] == 256
+        assert data["start"] == 15
+        assert len(data["peaks"]) == 2 * (32 - 15)
+        assert data["peaks"][:2] == [-1000, 1000]
+    
+    def test_invalid_requests(self, client, sample_wav_file):
+        """Test unknown files, bad levels and reversed ranges."""
+        assert client.get("/api/files/audio/missing.wav/peaks").status_code == 404
+        
+        with open(sample_wav_file, "rb") as f:
+            client.post("/api/upload/audio", files={"file": ("test_audio.wav", f, "audio/wav")})
+        assert client.get("/api/files/audio/test_audio.wav/peaks", params={"level": 5}).status_code == 400
+        assert client.get("/api/files/audio/test_audio.wav/peaks", params={"from": 2, "to": 1}).status_code == 400
+    
+    def test_delete_removes_sidecar(self, client, tmp_path, test_upload_dir):
+        """Test that deleting the audio file removes its peaks."""
+        audio = tmp_path / "tone.wav"
+        write_wav(audio, np.zeros((4000, 1), dtype=np.int16))
+        with open(audio, "rb") as f:
+            client.post("/api/upload/audio", files={"file": ("tone.wav", f, "audio/wav")})
+        assert client.get("/api/files/audio/tone.wav/peaks").status_code == 200
+        assert list((test_upload_dir / ".peaks").iterdir())
+        
+        client.delete("/api/files/tone.wav")
+        assert not list((test_upload_dir / ".peaks").iterdir())